@@ -0,0 +1,17 @@
+# Finds the c-blosc2 library. This module defines:
+#   - BLOSC2_INCLUDE_DIR, directory containing headers
+#   - BLOSC2_LIBRARIES, the c-blosc2 library path
+#   - BLOSC2_FOUND, whether c-blosc2 has been found
+
+find_path(BLOSC2_INCLUDE_DIR
+  NAMES blosc2.h
+  DOC "c-blosc2 include directory")
+mark_as_advanced(BLOSC2_INCLUDE_DIR)
+find_library(BLOSC2_LIBRARIES
+  NAMES blosc2
+  DOC "c-blosc2 library")
+mark_as_advanced(BLOSC2_LIBRARIES)
+
+include(FindPackageHandleStandardArgs)
+find_package_handle_standard_args(BLOSC2
+  REQUIRED_VARS BLOSC2_LIBRARIES BLOSC2_INCLUDE_DIR)
@@ -2,14 +2,7 @@
 
 #include "z5/handle.hxx"
 #include "z5/filesystem/attributes.hxx"
-
-#ifdef WITH_S3
-#include "z5/s3/attributes.hxx"
-#endif
-
-#ifdef WITH_GCS
-#include "z5/gcs/attributes.hxx"
-#endif
+#include "z5/kv/attributes.hxx"
 
 
 namespace z5 {
@@ -63,18 +56,10 @@ namespace attrs_detail {
     template<class GROUP>
     inline void readAttributes(const handle::Group<GROUP> & group, nlohmann::json & j) {
 
-        #ifdef WITH_S3
-        if(group.isS3()) {
-            s3::readAttributes(group, j);
-            return;
-        }
-        #endif
-        #ifdef WITH_GCS
-        if(group.isGcs()) {
-            gcs::readAttributes(group, j);
+        if(group.isKeyValueStore()) {
+            kv::readAttributes(group, j);
             return;
         }
-        #endif
 
         filesystem::readAttributes(group, j);
     }
@@ -88,18 +73,10 @@ namespace attrs_detail {
             throw std::invalid_argument(err.c_str());
         }
 
-        #ifdef WITH_S3
-        if(group.isS3()) {
-            s3::writeAttributes(group, j);
-            return;
-        }
-        #endif
-        #ifdef WITH_GCS
-        if(group.isGcs()) {
-            gcs::writeAttributes(group, j);
+        if(group.isKeyValueStore()) {
+            kv::writeAttributes(group, j);
             return;
         }
-        #endif
 
         filesystem::writeAttributes(group, j);
     }
@@ -113,18 +90,10 @@ namespace attrs_detail {
             throw std::invalid_argument(err.c_str());
         }
 
-        #ifdef WITH_S3
-        if(group.isS3()) {
-            s3::removeAttribute(group, key);
+        if(group.isKeyValueStore()) {
+            kv::removeAttribute(group, key);
             return;
         }
-        #endif
-        #ifdef WITH_GCS
-        if(group.isGcs()) {
-            gcs::removeAttribute(group, key);
-            return;
-        }
-        #endif
 
         filesystem::removeAttribute(group, key);
     }
@@ -143,18 +112,10 @@ namespace attrs_detail {
             attrs_detail::protectN5FileAttributes(j);
         }
 
-        #ifdef WITH_S3
-        if(file.isS3()) {
-            s3::writeAttributes(file, j);
+        if(file.isKeyValueStore()) {
+            kv::writeAttributes(file, j);
             return;
         }
-        #endif
-        #ifdef WITH_GCS
-        if(file.isGcs()) {
-            gcs::writeAttributes(file, j);
-            return;
-        }
-        #endif
 
         filesystem::writeAttributes(file, j);
     }
@@ -172,18 +133,10 @@ namespace attrs_detail {
             attrs_detail::protectN5FileAttributes(key);
         }
 
-        #ifdef WITH_S3
-        if(file.isS3()) {
-            s3::removeAttribute(file, key);
-            return;
-        }
-        #endif
-        #ifdef WITH_GCS
-        if(file.isGcs()) {
-            gcs::removeAttribute(file, key);
+        if(file.isKeyValueStore()) {
+            kv::removeAttribute(file, key);
             return;
         }
-        #endif
 
         filesystem::removeAttribute(file, key);
     }
@@ -192,20 +145,12 @@ namespace attrs_detail {
     template<class DATASET>
     inline void readAttributes(const handle::Dataset<DATASET> & ds, nlohmann::json & j) {
 
-        #ifdef WITH_S3
-        if(ds.isS3()) {
-            s3::readAttributes(ds, j);
-            return;
-        }
-        #endif
-        #ifdef WITH_GCS
-        if(ds.isGcs()) {
-            gcs::readAttributes(ds, j);
-            return;
-        }
-        #endif
 
-        filesystem::readAttributes(ds, j);
+        if(ds.isKeyValueStore()) {
+            kv::readAttributes(ds, j);
+        } else {
+            filesystem::readAttributes(ds, j);
+        }
         if(!ds.isZarr()) {
             attrs_detail::hideN5DatasetAttributes(j);
         }
@@ -224,18 +169,10 @@ namespace attrs_detail {
             attrs_detail::protectN5DatasetAttributes(j);
         }
 
-        #ifdef WITH_S3
-        if(ds.isS3()) {
-            s3::writeAttributes(ds, j);
+        if(ds.isKeyValueStore()) {
+            kv::writeAttributes(ds, j);
             return;
         }
-        #endif
-        #ifdef WITH_GCS
-        if(ds.isGcs()) {
-            gcs::writeAttributes(ds, j);
-            return;
-        }
-        #endif
 
         filesystem::writeAttributes(ds, j);
     }
@@ -253,18 +190,10 @@ namespace attrs_detail {
             attrs_detail::protectN5DatasetAttributes(key);
         }
 
-        #ifdef WITH_S3
-        if(ds.isS3()) {
-            s3::removeAttribute(ds, key);
+        if(ds.isKeyValueStore()) {
+            kv::removeAttribute(ds, key);
             return;
         }
-        #endif
-        #ifdef WITH_GCS
-        if(ds.isGcs()) {
-            gcs::removeAttribute(ds, key);
-            return;
-        }
-        #endif
 
         filesystem::removeAttribute(ds, key);
     }
@@ -272,16 +201,9 @@ namespace attrs_detail {
 
     template<class GROUP>
     inline bool isSubGroup(const handle::Group<GROUP> & group, const std::string & key){
-        #ifdef WITH_S3
-        if(group.isS3()) {
-            return s3::isSubGroup(group, key);
-        }
-        #endif
-        #ifdef WITH_GCS
-        if(group.isGcs()) {
-            return gcs::isSubGroup(group, key);
+        if(group.isKeyValueStore()) {
+            return kv::isSubGroup(group, key);
         }
-        #endif
         return filesystem::isSubGroup(group, key);
     }
 }
@@ -0,0 +1,85 @@
+#pragma once
+
+#include <cmath>
+#include <limits>
+#include <vector>
+#include <algorithm>
+
+
+namespace z5 {
+
+    // summary statistics of a single chunk, used to prune chunks in queries
+    // without reading them. the statistics only cover the part of the chunk
+    // inside of the dataset; chunks that don't exist are summarized as
+    // containing only the fill value.
+    struct ChunkSummary {
+        // false if the chunk was written without updating the summary
+        bool valid = false;
+        double min = 0;
+        double max = 0;
+        std::size_t nonFillCount = 0;
+        // the sorted unique values of the chunk, only for integer types;
+        // if the chunk has more uniques than the summary can store, the labels are not complete.
+        // the values of uint64 chunks are stored with the same bits as int64, so they are
+        // sorted by their int64 value
+        bool labelsComplete = false;
+        std::vector<int64_t> labels;
+    };
+
+
+    // predicates for the chunk summaries; bounds that are nan are not checked.
+    // all predicates refer to the statistics of the chunk, e.g. `maxGreater = x` matches
+    // chunks that contain a value larger than x.
+    struct ChunkQuery {
+        double minGreater = std::numeric_limits<double>::quiet_NaN();
+        double minLess = std::numeric_limits<double>::quiet_NaN();
+        double maxGreater = std::numeric_limits<double>::quiet_NaN();
+        double maxLess = std::numeric_limits<double>::quiet_NaN();
+        bool hasLabel = false;
+        // the label as it is stored in the labels of the summary and its value, see setLabel
+        int64_t label = 0;
+        double labelValue = 0;
+        bool nonEmpty = false;
+
+        // query for chunks that contain `val`, which must have the type of the dataset
+        template<class T>
+        inline void setLabel(const T val) {
+            hasLabel = true;
+            label = static_cast<int64_t>(val);
+            labelValue = static_cast<double>(val);
+        }
+
+        // chunks without a valid summary always match
+        inline bool matches(const ChunkSummary & summary) const {
+            if(!summary.valid) {
+                return true;
+            }
+            if(!std::isnan(minGreater) && !(summary.min > minGreater)) {
+                return false;
+            }
+            if(!std::isnan(minLess) && !(summary.min < minLess)) {
+                return false;
+            }
+            if(!std::isnan(maxGreater) && !(summary.max > maxGreater)) {
+                return false;
+            }
+            if(!std::isnan(maxLess) && !(summary.max < maxLess)) {
+                return false;
+            }
+            if(nonEmpty && summary.nonFillCount == 0) {
+                return false;
+            }
+            if(hasLabel) {
+                if(labelValue < summary.min || labelValue > summary.max) {
+                    return false;
+                }
+                if(summary.labelsComplete && !std::binary_search(summary.labels.begin(),
+                                                                 summary.labels.end(), label)) {
+                    return false;
+                }
+            }
+            return true;
+        }
+    };
+
+}
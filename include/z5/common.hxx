@@ -76,6 +76,11 @@ namespace z5 {
         flags["blosc"] = true;
         #endif
 
+        flags["blosc2"] = false;
+        #ifdef WITH_BLOSC2
+        flags["blosc2"] = true;
+        #endif
+
         flags["bzip2"] = false;
         #ifdef WITH_BZIP2
         flags["bzip2"] = true;
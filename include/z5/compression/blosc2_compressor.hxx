@@ -0,0 +1,213 @@
+#pragma once
+
+#ifdef WITH_BLOSC2
+
+#include <algorithm>
+#include <map>
+#include <sstream>
+
+#include <blosc2.h>
+#include <blosc2/filters-registry.h>
+#include "z5/compression/compressor_base.hxx"
+#include "z5/metadata.hxx"
+
+namespace z5 {
+namespace compression {
+
+    // blosc2 registers its codecs and filters once per process
+    inline void initBlosc2() {
+        static const bool initialized = [](){
+            blosc2_init();
+            return true;
+        }();
+        (void) initialized;
+    }
+
+
+    // decompression contexts only depend on the number of blosc threads,
+    // so each io thread keeps its contexts and reuses them for all chunks
+    struct Blosc2DecompressionContexts {
+
+        ~Blosc2DecompressionContexts() {
+            for(auto & elem : contexts) {
+                blosc2_free_ctx(elem.second);
+            }
+        }
+
+        blosc2_context * get(const int nThreads) {
+            auto it = contexts.find(nThreads);
+            if(it != contexts.end()) {
+                return it->second;
+            }
+            blosc2_dparams dparams = BLOSC2_DPARAMS_DEFAULTS;
+            dparams.nthreads = nThreads;
+            blosc2_context * ctx = blosc2_create_dctx(dparams);
+            if(ctx == NULL) {
+                throw std::runtime_error("Creating the blosc2 decompression context failed");
+            }
+            contexts[nThreads] = ctx;
+            return ctx;
+        }
+
+        std::map<int, blosc2_context *> contexts;
+    };
+
+
+    inline blosc2_context * blosc2DecompressionContext(const int nThreads) {
+        thread_local Blosc2DecompressionContexts contexts;
+        return contexts.get(nThreads);
+    }
+
+
+    template<typename T>
+    class Blosc2Compressor : public CompressorBase<T> {
+
+    public:
+        Blosc2Compressor(const DatasetMetadata & metadata) {
+            initBlosc2();
+            init(metadata);
+        }
+
+        void compress(const T * dataIn, std::vector<char> & dataOut, std::size_t sizeIn) const {
+
+            const std::size_t sizeBytes = sizeIn * sizeof(T);
+            if(sizeBytes > BLOSC2_MAX_BUFFERSIZE) {
+                throw std::runtime_error("Chunk is too large for blosc2 compression");
+            }
+            const std::size_t sizeOut = sizeBytes + BLOSC2_MAX_OVERHEAD;
+            dataOut.clear();
+            dataOut.resize(sizeOut);
+
+            // compression contexts hold the parameters of this dataset
+            blosc2_cparams cparams = BLOSC2_CPARAMS_DEFAULTS;
+            cparams.compcode = compcode_;
+            cparams.clevel = clevel_;
+            cparams.typesize = typesize_;
+            cparams.nthreads = nthreads_;
+            for(int i = 0; i < BLOSC2_MAX_FILTERS; ++i) {
+                cparams.filters[i] = filters_[i];
+                cparams.filters_meta[i] = filtersMeta_[i];
+            }
+            blosc2_context * cctx = blosc2_create_cctx(cparams);
+            if(cctx == NULL) {
+                throw std::runtime_error("Creating the blosc2 compression context failed");
+            }
+            const int sizeCompressed = blosc2_compress_ctx(cctx, dataIn, sizeBytes,
+                                                           &dataOut[0], sizeOut);
+            blosc2_free_ctx(cctx);
+
+            // check for errors
+            if(sizeCompressed <= 0) {
+                throw std::runtime_error("Blosc2 compression failed");
+            }
+            dataOut.resize(sizeCompressed);
+        }
+
+        void decompress(const std::vector<char> & dataIn, T * dataOut, std::size_t sizeOut) const {
+            blosc2_context * dctx = blosc2DecompressionContext(nthreads_);
+            const int sizeDecompressed = blosc2_decompress_ctx(dctx, &dataIn[0], dataIn.size(),
+                                                               dataOut, sizeOut * sizeof(T));
+            // check for errors
+            if(sizeDecompressed < 0) {
+                throw std::runtime_error("Blosc2 decompression failed");
+            }
+            // zarr chunks always have the full chunk shape, so a chunk of different size is corrupted
+            if(static_cast<std::size_t>(sizeDecompressed) != sizeOut * sizeof(T)) {
+                throw std::runtime_error("Blosc2 decompressed " + std::to_string(sizeDecompressed) +
+                                         " bytes, expected " + std::to_string(sizeOut * sizeof(T)));
+            }
+        }
+
+        inline types::Compressor type() const {
+            return types::blosc2;
+        }
+
+        inline void getOptions(types::CompressionOptions & opts) const {
+            opts["codec"] = codec_;
+            opts["level"] = clevel_;
+            opts["filters"] = filterNames_;
+            opts["typesize"] = typesize_;
+            opts["nthreads"] = nthreads_;
+        }
+
+    private:
+        // set the compression parameters from metadata
+        void init(const DatasetMetadata & metadata) {
+            const auto & opts = metadata.compressionOptions;
+            codec_ = boost::get<std::string>(opts.at("codec"));
+            compcode_ = blosc2_compname_to_compcode(codec_.c_str());
+            if(compcode_ < 0) {
+                throw std::runtime_error("Invalid blosc2 codec " + codec_);
+            }
+            clevel_ = boost::get<int>(opts.at("level"));
+            // a typesize of 0 stands for the size of the datatype
+            typesize_ = boost::get<int>(opts.at("typesize"));
+            if(typesize_ == 0) {
+                typesize_ = sizeof(T);
+            }
+            if(typesize_ < 0 || typesize_ > BLOSC_MAX_TYPESIZE) {
+                throw std::runtime_error("Invalid blosc2 typesize " + std::to_string(typesize_));
+            }
+            nthreads_ = boost::get<int>(opts.at("nthreads"));
+            if(nthreads_ < 1) {
+                throw std::runtime_error("The number of blosc2 threads must be positive");
+            }
+            filterNames_ = boost::get<std::string>(opts.at("filters"));
+            initFilters();
+        }
+
+        // the filters are given as comma separated names and are applied in order,
+        // they fill the last slots of the blosc2 filter pipeline
+        void initFilters() {
+            static const std::map<std::string, uint8_t> filterCodes({{
+                {"shuffle", BLOSC_SHUFFLE},
+                {"bitshuffle", BLOSC_BITSHUFFLE},
+                {"delta", BLOSC_DELTA},
+                {"bytedelta", BLOSC_FILTER_BYTEDELTA}
+            }});
+            std::vector<std::string> names;
+            std::stringstream ss(filterNames_);
+            std::string name;
+            while(std::getline(ss, name, ',')) {
+                if(!name.empty()) {
+                    names.emplace_back(name);
+                }
+            }
+            if(names.size() > BLOSC2_MAX_FILTERS) {
+                throw std::runtime_error("Too many blosc2 filters");
+            }
+            std::fill(filters_, filters_ + BLOSC2_MAX_FILTERS, BLOSC_NOFILTER);
+            std::fill(filtersMeta_, filtersMeta_ + BLOSC2_MAX_FILTERS, 0);
+            const std::size_t offset = BLOSC2_MAX_FILTERS - names.size();
+            for(std::size_t i = 0; i < names.size(); ++i) {
+                auto it = filterCodes.find(names[i]);
+                if(it == filterCodes.end()) {
+                    throw std::runtime_error("Invalid blosc2 filter " + names[i]);
+                }
+                filters_[offset + i] = it->second;
+                // bytedelta works on the bytes of each element
+                if(it->second == BLOSC_FILTER_BYTEDELTA) {
+                    filtersMeta_[offset + i] = typesize_;
+                }
+            }
+        }
+
+        // the blosc2 codec
+        std::string codec_;
+        int compcode_;
+        // compression level
+        int clevel_;
+        // size of the elements for the shuffle filters
+        int typesize_;
+        // number of internal blosc2 threads per chunk
+        int nthreads_;
+        // filter pipeline
+        std::string filterNames_;
+        uint8_t filters_[BLOSC2_MAX_FILTERS];
+        uint8_t filtersMeta_[BLOSC2_MAX_FILTERS];
+    };
+
+} // namespace compression
+} // namespace z5
+
+#endif
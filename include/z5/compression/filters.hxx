@@ -0,0 +1,220 @@
+#pragma once
+
+#include <cmath>
+#include <cstring>
+#include <memory>
+#include <type_traits>
+#include <vector>
+
+#include "z5/types/types.hxx"
+
+// filters that are applied to the data of zarr chunks before compression,
+// the encodings follow the numcodecs filters with the same id:
+// https://numcodecs.readthedocs.io/en/stable/filter.html
+
+namespace z5 {
+namespace compression {
+
+namespace filters_detail {
+
+    // integer differences and sums wrap around like in numpy; computing them in the
+    // matching unsigned type avoids the undefined behaviour of signed overflow
+    template<class T, bool = std::is_integral<T>::value>
+    struct WrappingArithmetic {
+        static inline T add(const T a, const T b) {return a + b;}
+        static inline T subtract(const T a, const T b) {return a - b;}
+    };
+
+    template<class T>
+    struct WrappingArithmetic<T, true> {
+        typedef typename std::make_unsigned<T>::type U;
+        static inline T add(const T a, const T b) {
+            return static_cast<T>(static_cast<U>(static_cast<U>(a) + static_cast<U>(b)));
+        }
+        static inline T subtract(const T a, const T b) {
+            return static_cast<T>(static_cast<U>(static_cast<U>(a) - static_cast<U>(b)));
+        }
+    };
+
+}
+
+    // abstract basis class for filters
+    template<typename T>
+    class FilterBase {
+
+    public:
+        virtual ~FilterBase() {}
+
+        //
+        // API -> must be implemented by child classes
+        //
+
+        // encode the values from `in` into `out`, which must not overlap
+        virtual void encode(const T *, T *, std::size_t) const = 0;
+        // decode the values inplace
+        virtual void decode(T *, std::size_t) const = 0;
+        virtual types::Filter type() const = 0;
+        virtual void getOptions(types::CompressionOptions &) const = 0;
+    };
+
+
+    // store the differences between consecutive values, which makes smooth data more compressible
+    template<typename T>
+    class DeltaFilter : public FilterBase<T> {
+        typedef filters_detail::WrappingArithmetic<T> Arithmetic;
+
+    public:
+        DeltaFilter() {
+        }
+
+        void encode(const T * in, T * out, std::size_t size) const {
+            if(size == 0) {
+                return;
+            }
+            out[0] = in[0];
+            // the loop has no dependencies between iterations, so it is vectorized
+            for(std::size_t i = 1; i < size; ++i) {
+                out[i] = Arithmetic::subtract(in[i], in[i - 1]);
+            }
+        }
+
+        void decode(T * data, std::size_t size) const {
+            for(std::size_t i = 1; i < size; ++i) {
+                data[i] = Arithmetic::add(data[i], data[i - 1]);
+            }
+        }
+
+        inline types::Filter type() const {
+            return types::delta;
+        }
+
+        inline void getOptions(types::CompressionOptions & opts) const {
+        }
+    };
+
+
+    // group the bytes by their significance: first the first byte of all elements,
+    // then the second byte and so on, which makes data with small values (e.g. labels) more compressible
+    template<typename T>
+    class ShuffleFilter : public FilterBase<T> {
+
+    public:
+        ShuffleFilter(const types::CompressionOptions & opts) {
+            const int elementSize = boost::get<int>(opts.at("elementsize"));
+            if(elementSize <= 0) {
+                throw std::runtime_error("The element size of the shuffle filter must be positive");
+            }
+            elementSize_ = elementSize;
+        }
+
+        void encode(const T * in, T * out, std::size_t size) const {
+            shuffle(reinterpret_cast<const char *>(in), reinterpret_cast<char *>(out), size * sizeof(T));
+        }
+
+        void decode(T * data, std::size_t size) const {
+            const std::size_t nBytes = size * sizeof(T);
+            std::vector<char> tmp(reinterpret_cast<const char *>(data),
+                                  reinterpret_cast<const char *>(data) + nBytes);
+            unshuffle(&tmp[0], reinterpret_cast<char *>(data), nBytes);
+        }
+
+        inline types::Filter type() const {
+            return types::shuffle;
+        }
+
+        inline void getOptions(types::CompressionOptions & opts) const {
+            opts["elementsize"] = static_cast<int>(elementSize_);
+        }
+
+    private:
+        // bytes that don't fill a complete element are copied unchanged
+        inline void shuffle(const char * in, char * out, const std::size_t nBytes) const {
+            const std::size_t count = nBytes / elementSize_;
+            for(std::size_t b = 0; b < elementSize_; ++b) {
+                char * outByte = out + b * count;
+                const char * inByte = in + b;
+                for(std::size_t i = 0; i < count; ++i) {
+                    outByte[i] = inByte[i * elementSize_];
+                }
+            }
+            const std::size_t rest = count * elementSize_;
+            std::memcpy(out + rest, in + rest, nBytes - rest);
+        }
+
+        inline void unshuffle(const char * in, char * out, const std::size_t nBytes) const {
+            const std::size_t count = nBytes / elementSize_;
+            for(std::size_t b = 0; b < elementSize_; ++b) {
+                const char * inByte = in + b * count;
+                char * outByte = out + b;
+                for(std::size_t i = 0; i < count; ++i) {
+                    outByte[i * elementSize_] = inByte[i];
+                }
+            }
+            const std::size_t rest = count * elementSize_;
+            std::memcpy(out + rest, in + rest, nBytes - rest);
+        }
+
+        std::size_t elementSize_;
+    };
+
+
+    // round floating point data to a fixed number of decimal digits, so that the
+    // trailing bits of the mantissa are zero and compress well (lossy)
+    template<typename T>
+    class QuantizeFilter : public FilterBase<T> {
+
+    public:
+        QuantizeFilter(const types::CompressionOptions & opts) {
+            if(!std::is_floating_point<T>::value) {
+                throw std::runtime_error("The quantize filter is only supported for floating point data");
+            }
+            digits_ = boost::get<int>(opts.at("digits"));
+            // the data is rounded to multiples of the largest power of two
+            // that is smaller than 10^-digits
+            const int bits = static_cast<int>(std::ceil(digits_ * std::log2(10.)));
+            scale_ = static_cast<T>(std::pow(2., bits));
+        }
+
+        void encode(const T * in, T * out, std::size_t size) const {
+            const T scale = scale_;
+            // nearbyint rounds half to even like numpy.around and is vectorized
+            for(std::size_t i = 0; i < size; ++i) {
+                out[i] = static_cast<T>(std::nearbyint(scale * in[i]) / scale);
+            }
+        }
+
+        // quantization can't be reverted, the encoded values are the decoded values
+        void decode(T * data, std::size_t size) const {
+        }
+
+        inline types::Filter type() const {
+            return types::quantize;
+        }
+
+        inline void getOptions(types::CompressionOptions & opts) const {
+            opts["digits"] = digits_;
+        }
+
+    private:
+        int digits_;
+        T scale_;
+    };
+
+
+    template<typename T>
+    inline std::unique_ptr<FilterBase<T>> makeFilter(const types::Filter filter,
+                                                     const types::CompressionOptions & opts) {
+        std::unique_ptr<FilterBase<T>> ptr;
+        switch(filter) {
+            case types::delta:
+                ptr.reset(new DeltaFilter<T>()); break;
+            case types::shuffle:
+                ptr.reset(new ShuffleFilter<T>(opts)); break;
+            case types::quantize:
+                ptr.reset(new QuantizeFilter<T>(opts)); break;
+        }
+        return ptr;
+    }
+
+}
+}
@@ -0,0 +1,53 @@
+#pragma once
+
+#include "z5/compression/compressor_base.hxx"
+#include "z5/compression/plugins.hxx"
+#include "z5/metadata.hxx"
+
+namespace z5 {
+namespace compression {
+
+    // compressor that forwards to a codec from the plugin registry,
+    // only available for zarr datasets
+    template<typename T>
+    class PluginCompressor : public CompressorBase<T> {
+
+    public:
+        PluginCompressor(const DatasetMetadata & metadata) {
+            init(metadata);
+        }
+
+        void compress(const T * dataIn, std::vector<char> & dataOut, std::size_t sizeIn) const {
+            dataOut.clear();
+            codec_.encode(config_, reinterpret_cast<const char *>(dataIn), sizeIn * sizeof(T), dataOut);
+        }
+
+        void decompress(const std::vector<char> & dataIn, T * dataOut, std::size_t sizeOut) const {
+            codec_.decode(config_, dataIn.data(), dataIn.size(),
+                          reinterpret_cast<char *>(dataOut), sizeOut * sizeof(T));
+        }
+
+        inline types::Compressor type() const {
+            return types::plugin;
+        }
+
+        inline void getOptions(types::CompressionOptions & opts) const {
+            opts["id"] = id_;
+            opts["config"] = config_;
+        }
+
+    private:
+        void init(const DatasetMetadata & metadata) {
+            id_ = boost::get<std::string>(metadata.compressionOptions.at("id"));
+            config_ = boost::get<std::string>(metadata.compressionOptions.at("config"));
+            codec_ = PluginCodecs::getCodec(id_);
+        }
+
+        // zarr id and json encoded configuration of the codec
+        std::string id_;
+        std::string config_;
+        PluginCodec codec_;
+    };
+
+} // namespace compression
+} // namespace z5
@@ -0,0 +1,83 @@
+#pragma once
+
+#include <functional>
+#include <map>
+#include <mutex>
+#include <stdexcept>
+#include <string>
+#include <vector>
+
+// registry for compression codecs that are implemented outside of z5 (e.g. numcodecs codecs
+// that are registered from python), so that zarr datasets compressed with codecs
+// z5 was not built with can still be read and written
+
+namespace z5 {
+namespace compression {
+
+    // the codec callbacks get the json encoded configuration of the zarr compressor
+    // (including the "id") and the chunk data as raw bytes
+    struct PluginCodec {
+        // encode `size` bytes from `data` into `out`
+        typedef std::function<void(const std::string &, const char *, std::size_t, std::vector<char> &)> EncodeFunction;
+        // decode `size` bytes from `data` into the `outSize` bytes of `out`
+        typedef std::function<void(const std::string &, const char *, std::size_t, char *, std::size_t)> DecodeFunction;
+
+        EncodeFunction encode;
+        DecodeFunction decode;
+    };
+
+
+    // the registered codecs are global and can be changed from any thread
+    struct PluginCodecs {
+
+        typedef std::map<std::string, PluginCodec> CodecMap;
+
+        static void registerCodec(const std::string & id, const PluginCodec & codec) {
+            if(!codec.encode || !codec.decode) {
+                throw std::invalid_argument("z5.PluginCodecs: codec " + id + " needs encode and decode functions");
+            }
+            std::lock_guard<std::mutex> lock(mutex());
+            codecs()[id] = codec;
+        }
+
+        static bool unregisterCodec(const std::string & id) {
+            std::lock_guard<std::mutex> lock(mutex());
+            return codecs().erase(id) > 0;
+        }
+
+        static bool isRegistered(const std::string & id) {
+            std::lock_guard<std::mutex> lock(mutex());
+            return codecs().find(id) != codecs().end();
+        }
+
+        // return a copy, so that unregistering a codec does not invalidate the callbacks of open datasets
+        static PluginCodec getCodec(const std::string & id) {
+            std::lock_guard<std::mutex> lock(mutex());
+            auto it = codecs().find(id);
+            if(it == codecs().end()) {
+                throw std::runtime_error("z5.PluginCodecs: no codec registered for " + id);
+            }
+            return it->second;
+        }
+
+        static void registeredCodecs(std::vector<std::string> & ids) {
+            std::lock_guard<std::mutex> lock(mutex());
+            for(const auto & elem : codecs()) {
+                ids.emplace_back(elem.first);
+            }
+        }
+
+    private:
+        static CodecMap & codecs() {
+            static CodecMap cMap;
+            return cMap;
+        }
+
+        static std::mutex & mutex() {
+            static std::mutex m;
+            return m;
+        }
+    };
+
+}
+}
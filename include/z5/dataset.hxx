@@ -4,6 +4,7 @@
 
 #include "z5/metadata.hxx"
 #include "z5/handle.hxx"
+#include "z5/chunk_summary.hxx"
 #include "z5/types/types.hxx"
 #include "z5/util/util.hxx"
 #include "z5/util/blocking.hxx"
@@ -12,10 +13,13 @@
 // different compression backends
 #include "z5/compression/raw_compressor.hxx"
 #include "z5/compression/blosc_compressor.hxx"
+#include "z5/compression/blosc2_compressor.hxx"
 #include "z5/compression/zlib_compressor.hxx"
 #include "z5/compression/bzip2_compressor.hxx"
 #include "z5/compression/xz_compressor.hxx"
 #include "z5/compression/lz4_compressor.hxx"
+#include "z5/compression/plugin_compressor.hxx"
+#include "z5/compression/filters.hxx"
 
 
 namespace z5 {
@@ -32,9 +36,14 @@ namespace z5 {
                                                     shape_(metadata.shape),
                                                     chunkShape_(metadata.chunkShape),
                                                     chunkSize_(std::accumulate(chunkShape_.begin(), chunkShape_.end(), 1, std::multiplies<std::size_t>())),
-                                                    chunking_(shape_, chunkShape_)
+                                                    chunking_(shape_, chunkShape_),
+                                                    dimensionSeparator_(metadata.dimensionSeparator),
+                                                    filterChain_(metadata.filters)
         {}
 
+        // the datasets are owned through pointers to this class
+        virtual ~Dataset() {}
+
         //
         // API - already implemented and should not be overwritten
         //
@@ -84,6 +93,25 @@ namespace z5 {
 
         inline types::Datatype getDtype() const {return dtype_;}
         inline bool isZarr() const {return isZarr_;}
+        inline const std::string & dimensionSeparator() const {return dimensionSeparator_;}
+        inline const types::FilterChain & filters() const {return filterChain_;}
+
+        // find the chunks that may match the query according to the chunk summaries
+        inline void chunksWhere(const ChunkQuery & query, std::vector<types::ShapeType> & chunks) const {
+            if(!hasChunkSummaries()) {
+                throw std::runtime_error("Chunk summaries are not enabled for this dataset");
+            }
+            std::vector<ChunkSummary> summaries;
+            readChunkSummaries(summaries);
+            chunks.clear();
+            types::ShapeType chunkId;
+            for(std::size_t chunkIndex = 0; chunkIndex < summaries.size(); ++chunkIndex) {
+                if(query.matches(summaries[chunkIndex])) {
+                    chunking_.blockIdToBlockCoordinate(chunkIndex, chunkId);
+                    chunks.push_back(chunkId);
+                }
+            }
+        }
 
         //
         // API - must implement
@@ -96,6 +124,56 @@ namespace z5 {
         // read a chunk - returns True if this is a varlen chunk
         virtual bool readChunk(const types::ShapeType &, void *) const = 0;
 
+        // read a chunk if it exists - returns false if it does not exist.
+        // backends for which checking the existence costs a request override this
+        // to read the chunk with a single request
+        virtual bool readChunkIfExists(const types::ShapeType & chunkId, void * dataOut, bool & isVarlen) const {
+            if(!chunkExists(chunkId)) {
+                return false;
+            }
+            isVarlen = readChunk(chunkId, dataOut);
+            return true;
+        }
+
+        // read / write the encoded chunk data as it is stored, without decompressing
+        // or compressing it - readRawChunk returns false if the chunk does not exist
+        virtual bool readRawChunk(const types::ShapeType &, std::vector<char> &) const = 0;
+        virtual void writeRawChunk(const types::ShapeType &, const std::vector<char> &) const = 0;
+
+        // get the number of bytes of the encoded chunk data without reading it
+        // returns false if the chunk does not exist
+        virtual bool getRawChunkSize(const types::ShapeType & chunkId, std::size_t & size) const {
+            std::vector<char> buffer;
+            if(!readRawChunk(chunkId, buffer)) {
+                return false;
+            }
+            size = buffer.size();
+            return true;
+        }
+
+        // copy the encoded chunk data to a dataset with the same format, dtype, chunks and compression
+        // returns false if the chunk does not exist
+        virtual bool copyRawChunk(const types::ShapeType & chunkId, const Dataset & out) const {
+            std::vector<char> buffer;
+            if(!readRawChunk(chunkId, buffer)) {
+                return false;
+            }
+            out.writeRawChunk(chunkId, buffer);
+            return true;
+        }
+
+        // per chunk summary statistics (see chunk_summary.hxx), which are kept up to date
+        // by writeChunk and removeChunk once they are enabled; not supported by all backends
+        virtual bool hasChunkSummaries() const {
+            return false;
+        }
+        virtual void enableChunkSummaries(const std::size_t maxLabels, const int nThreads) const {
+            throw std::runtime_error("Chunk summaries are not supported by this backend");
+        }
+        virtual void readChunkSummaries(std::vector<ChunkSummary> &) const {
+            throw std::runtime_error("Chunk summaries are not supported by this backend");
+        }
+
         // check the request type
         virtual void checkRequestType(const std::type_info &) const = 0;
 
@@ -128,6 +206,8 @@ namespace z5 {
         std::size_t chunkSize_;
 
         util::Blocking chunking_;
+        std::string dimensionSeparator_;
+        types::FilterChain filterChain_;
     };
 
 
@@ -137,12 +217,17 @@ namespace z5 {
     public:
         MixinTyped(const DatasetMetadata & metadata) : fillValue_(static_cast<T>(metadata.fillValue)) {
             init_compressor(metadata);
+            for(const auto & filter : metadata.filters) {
+                filters_.emplace_back(compression::makeFilter<T>(filter.first, filter.second));
+            }
         }
 
     protected:
         T fillValue_;
         // unique ptr to hold child classes of compressor
         std::unique_ptr<compression::CompressorBase<T>> compressor_;
+        // filters applied before the compressor, in order
+        std::vector<std::unique_ptr<compression::FilterBase<T>>> filters_;
 
     private:
         void init_compressor(const DatasetMetadata & metadata) {
@@ -153,6 +238,10 @@ namespace z5 {
                 case types::blosc:
             	    compressor_.reset(new compression::BloscCompressor<T>(metadata)); break;
                 #endif
+                #ifdef WITH_BLOSC2
+                case types::blosc2:
+                    compressor_.reset(new compression::Blosc2Compressor<T>(metadata)); break;
+                #endif
                 #ifdef WITH_ZLIB
                 case types::zlib:
                     compressor_.reset(new compression::ZlibCompressor<T>(metadata)); break;
@@ -169,6 +258,8 @@ namespace z5 {
                 case types::lz4:
                     compressor_.reset(new compression::Lz4Compressor<T>(metadata)); break;
                 #endif
+                case types::plugin:
+                    compressor_.reset(new compression::PluginCompressor<T>(metadata)); break;
             }
         }
     };
@@ -1,13 +1,10 @@
 #pragma once
 
 #include "z5/filesystem/factory.hxx"
+#include "z5/kv/factory.hxx"
 
 #ifdef WITH_S3
-#include "z5/s3/factory.hxx"
-#endif
-
-#ifdef WITH_GCS
-#include "z5/gcs/factory.hxx"
+#include "z5/s3/store.hxx"
 #endif
 
 
@@ -18,19 +15,11 @@ namespace z5 {
     inline std::unique_ptr<Dataset> openDataset(const handle::Group<GROUP> & root,
                                                 const std::string & key) {
 
-        // check if this is a s3 group
-        #ifdef WITH_S3
-        if(root.isS3()) {
-            s3::handle::Dataset ds(root, key);
-            return s3::openDataset(ds);
-        }
-        #endif
-        #ifdef WITH_GCS
-        if(root.isGcs()) {
-            gcs::handle::Dataset ds(root, key);
-            return gcs::openDataset(ds);
+        // check if this group belongs to a key-value store
+        if(root.isKeyValueStore()) {
+            kv::handle::Dataset ds(root, key);
+            return kv::openDataset(ds);
         }
-        #endif
 
         filesystem::handle::Dataset ds(root, key);
         return filesystem::openDataset(ds);
@@ -43,18 +32,10 @@ namespace z5 {
         const std::string & key,
         const DatasetMetadata & metadata
     ) {
-        #ifdef WITH_S3
-        if(root.isS3()) {
-            s3::handle::Dataset ds(root, key);
-            return s3::createDataset(ds, metadata);
+        if(root.isKeyValueStore()) {
+            kv::handle::Dataset ds(root, key);
+            return kv::createDataset(ds, metadata);
         }
-        #endif
-        #ifdef WITH_GCS
-        if(root.isGcs()) {
-            gcs::handle::Dataset ds(root, key);
-            return gcs::createDataset(ds, metadata);
-        }
-        #endif
 
         filesystem::handle::Dataset ds(root, key);
         return filesystem::createDataset(ds, metadata);
@@ -70,65 +51,58 @@ namespace z5 {
         const types::ShapeType & chunkShape,
         const std::string & compressor="raw",
         const types::CompressionOptions & compressionOptions=types::CompressionOptions(),
-        const double fillValue=0
+        const double fillValue=0,
+        const std::string & dimensionSeparator=".",
+        const std::vector<types::CompressionOptions> & filters=std::vector<types::CompressionOptions>()
     ) {
         DatasetMetadata metadata;
         createDatasetMetadata(dtype, shape, chunkShape, root.isZarr(),
                               compressor, compressionOptions, fillValue,
-                              metadata);
+                              metadata, dimensionSeparator, filters);
 
-        #ifdef WITH_S3
-        if(root.isS3()) {
-            s3::handle::Dataset ds(root, key);
-            return s3::createDataset(ds, metadata);
-        }
-        #endif
-        #ifdef WITH_GCS
-        if(root.isGcs()) {
-            gcs::handle::Dataset ds(root, key);
-            return gcs::createDataset(ds, metadata);
+        if(root.isKeyValueStore()) {
+            kv::handle::Dataset ds(root, key);
+            return kv::createDataset(ds, metadata);
         }
-        #endif
 
         filesystem::handle::Dataset ds(root, key);
         return filesystem::createDataset(ds, metadata);
     }
 
 
+    // move the chunks of the zarr dataset at `key` between the flat ('.') and nested ('/') layout
     template<class GROUP>
-    inline void createFile(const handle::File<GROUP> & file, const bool isZarr) {
-        #ifdef WITH_S3
-        if(file.isS3()) {
-            s3::createFile(file, isZarr);
+    inline void setDimensionSeparator(const handle::Group<GROUP> & root,
+                                      const std::string & key,
+                                      const std::string & dimensionSeparator,
+                                      const int nThreads=1) {
+        if(root.isKeyValueStore()) {
+            kv::handle::Dataset ds(root, key);
+            kv::setDimensionSeparator(ds, dimensionSeparator, nThreads);
             return;
         }
-        #endif
-        #ifdef WITH_GCS
-        if(file.isGcs()) {
-            gcs::createFile(file, isZarr);
+        filesystem::handle::Dataset ds(root, key);
+        filesystem::setDimensionSeparator(ds, dimensionSeparator, nThreads);
+    }
+
+
+    template<class GROUP>
+    inline void createFile(const handle::File<GROUP> & file, const bool isZarr) {
+        if(file.isKeyValueStore()) {
+            kv::createFile(file, isZarr);
             return;
         }
-        #endif
         filesystem::createFile(file, isZarr);
     }
 
 
     template<class GROUP>
     inline void createGroup(const handle::Group<GROUP> & root, const std::string & key) {
-        #ifdef WITH_S3
-        if(root.isS3()) {
-            s3::handle::Group newGroup(root, key);
-            s3::createGroup(newGroup, root.isZarr());
+        if(root.isKeyValueStore()) {
+            kv::handle::Group newGroup(root, key);
+            kv::createGroup(newGroup, root.isZarr());
             return;
         }
-        #endif
-        #ifdef WITH_GCS
-        if(root.isGcs()) {
-            gcs::handle::Group newGroup(root, key);
-            gcs::createGroup(newGroup, root.isZarr());
-            return;
-        }
-        #endif
         filesystem::handle::Group newGroup(root, key);
         filesystem::createGroup(newGroup, root.isZarr());
     }
@@ -158,23 +132,25 @@ namespace z5 {
     template<class GROUP1, class GROUP2>
     inline std::string relativePath(const handle::Group<GROUP1> & g1,
                                     const GROUP2 & g2) {
-        #ifdef WITH_S3
-        if(g1.isS3()) {
-            if(!g2.isS3()) {
-                throw std::runtime_error("Can't get relative path of different backends.");
-            }
-            return s3::relativePath(g1, g2);
-        }
-        #endif
-        #ifdef WITH_GCS
-        if(g1.isGcs()) {
-            if(!g2.isGcs()) {
+        if(g1.isKeyValueStore()) {
+            if(!g2.isKeyValueStore()) {
                 throw std::runtime_error("Can't get relative path of different backends.");
             }
-            return gcs::relativePath(g1, g2);
+            return kv::relativePath(g1, g2);
         }
-        #endif
         return filesystem::relativePath(g1, g2);
     }
 
+
+    // list all groups and datasets below the group
+    template<class GROUP>
+    inline void listHierarchy(const handle::Group<GROUP> & group,
+                              std::vector<HierarchyEntry> & out) {
+        if(group.isKeyValueStore()) {
+            kv::listHierarchy(group, out);
+            return;
+        }
+        filesystem::listHierarchy(group, out);
+    }
+
 }
@@ -0,0 +1,312 @@
+#pragma once
+
+#include <cstring>
+#include <map>
+#include <mutex>
+#include <sys/stat.h>
+
+#include "z5/chunk_summary.hxx"
+#include "z5/util/region.hxx"
+
+
+namespace z5 {
+namespace filesystem {
+
+namespace summary_detail {
+
+    // compute the summary of the region of shape `chunkShape` at the beginning of `data`,
+    // which has the shape `bufferShape` (zarr edge chunks are padded)
+    template<class T>
+    inline void summarizeChunk(const T * data, const types::ShapeType & bufferShape,
+                               const types::ShapeType & chunkShape, const T fillValue,
+                               const std::size_t maxLabels, ChunkSummary & summary) {
+        summary.valid = true;
+        summary.nonFillCount = 0;
+        summary.labelsComplete = std::is_integral<T>::value;
+        summary.labels.clear();
+
+        T minVal = std::numeric_limits<T>::max();
+        T maxVal = std::numeric_limits<T>::lowest();
+        auto & labels = summary.labels;
+
+        types::ShapeType strides;
+        util::region_detail::getStrides(bufferShape, strides);
+        const std::size_t rowLength = chunkShape.back();
+        util::region_detail::forEachRow(strides, types::ShapeType(chunkShape.size(), 0), chunkShape,
+                                        [&](const std::size_t row){
+            for(const T * it = data + row; it != data + row + rowLength; ++it) {
+                const T val = *it;
+                minVal = std::min(minVal, val);
+                maxVal = std::max(maxVal, val);
+                if(val != fillValue) {
+                    ++summary.nonFillCount;
+                }
+                if(!summary.labelsComplete) {
+                    continue;
+                }
+                const int64_t label = static_cast<int64_t>(val);
+                const auto pos = std::lower_bound(labels.begin(), labels.end(), label);
+                if(pos != labels.end() && *pos == label) {
+                    continue;
+                }
+                if(labels.size() == maxLabels) {
+                    summary.labelsComplete = false;
+                    labels.clear();
+                } else {
+                    labels.insert(pos, label);
+                }
+            }
+        });
+        summary.min = static_cast<double>(minVal);
+        summary.max = static_cast<double>(maxVal);
+    }
+
+
+    // chunks that don't exist only contain the fill value
+    template<class T>
+    inline void summarizeEmptyChunk(const T fillValue, const std::size_t maxLabels, ChunkSummary & summary) {
+        const types::ShapeType shape = {1};
+        summarizeChunk(&fillValue, shape, shape, fillValue, maxLabels, summary);
+        summary.nonFillCount = 0;
+    }
+
+}
+
+
+    // modification and status change time, inode and size of a chunk file when its summary
+    // was computed. the summaries are only updated by z5, so a different stamp means that the chunk
+    // was changed by another tool since. the status change time is also updated if a tool resets
+    // the modification time. chunks that don't exist have an empty stamp
+    struct ChunkStamp {
+        int64_t mtime = 0;
+        int64_t ctime = 0;
+        uint64_t inode = 0;
+        uint64_t size = 0;
+
+        inline bool operator==(const ChunkStamp & other) const {
+            return mtime == other.mtime && ctime == other.ctime && inode == other.inode && size == other.size;
+        }
+        inline bool operator!=(const ChunkStamp & other) const {
+            return !(*this == other);
+        }
+    };
+
+
+    // the times are read with stat in nanoseconds, fs::last_write_time only has a resolution
+    // of seconds for boost filesystem; on windows, stat only has a resolution of seconds
+    inline ChunkStamp chunkStamp(const fs::path & path) {
+        ChunkStamp stamp;
+        struct stat st;
+        if(::stat(path.string().c_str(), &st) != 0) {
+            return stamp;
+        }
+        #if defined(_WIN32)
+        stamp.mtime = static_cast<int64_t>(st.st_mtime) * 1000000000;
+        stamp.ctime = static_cast<int64_t>(st.st_ctime) * 1000000000;
+        #elif defined(__APPLE__)
+        stamp.mtime = static_cast<int64_t>(st.st_mtimespec.tv_sec) * 1000000000 + st.st_mtimespec.tv_nsec;
+        stamp.ctime = static_cast<int64_t>(st.st_ctimespec.tv_sec) * 1000000000 + st.st_ctimespec.tv_nsec;
+        #else
+        stamp.mtime = static_cast<int64_t>(st.st_mtim.tv_sec) * 1000000000 + st.st_mtim.tv_nsec;
+        stamp.ctime = static_cast<int64_t>(st.st_ctim.tv_sec) * 1000000000 + st.st_ctim.tv_nsec;
+        #endif
+        stamp.inode = st.st_ino;
+        stamp.size = st.st_size;
+        return stamp;
+    }
+
+
+    // the chunk summaries of a dataset, stored in a single file next to the chunks.
+    // the file consists of a header and one record of fixed size per chunk.
+    // header: magic, version, number of chunks, maximal number of labels (8 bytes each).
+    // record: valid, stamp (mtime, ctime, inode and size of the chunk file), min, max, number of non-fill values,
+    // number of labels (-1 if the labels are not complete) and the labels (8 bytes each).
+    // updated records are kept in memory and written in batches, pending records are written
+    // before reading the summaries and when the object is destroyed.
+    class ChunkSummaryFile {
+
+    public:
+        static fs::path summaryPath(const fs::path & datasetPath) {
+            return datasetPath / ".chunk_summaries";
+        }
+
+        static bool exists(const fs::path & datasetPath) {
+            return fs::exists(summaryPath(datasetPath));
+        }
+
+        // create the summary file with invalid records for all chunks
+        static void create(const fs::path & datasetPath, const std::size_t nChunks,
+                           const std::size_t maxLabels) {
+            const uint64_t header[4] = {magic(), version(), nChunks, maxLabels};
+            #ifdef WITH_BOOST_FS
+            fs::ofstream file(summaryPath(datasetPath), std::ios::binary);
+            #else
+            std::ofstream file(summaryPath(datasetPath), std::ios::binary);
+            #endif
+            file.write(reinterpret_cast<const char *>(header), sizeof(header));
+            const std::vector<char> invalid(recordSize(maxLabels), 0);
+            for(std::size_t chunkIndex = 0; chunkIndex < nChunks; ++chunkIndex) {
+                file.write(&invalid[0], invalid.size());
+            }
+            file.close();
+        }
+
+        ChunkSummaryFile(const fs::path & datasetPath) : path_(summaryPath(datasetPath)) {
+            uint64_t header[4];
+            #ifdef WITH_BOOST_FS
+            fs::ifstream file(path_, std::ios::binary);
+            #else
+            std::ifstream file(path_, std::ios::binary);
+            #endif
+            file.read(reinterpret_cast<char *>(header), sizeof(header));
+            if(!file || header[0] != magic() || header[1] != version()) {
+                throw std::runtime_error("Invalid chunk summary file " + path_.string());
+            }
+            nChunks_ = header[2];
+            maxLabels_ = header[3];
+        }
+
+        ~ChunkSummaryFile() {
+            try {
+                flush();
+            } catch(...) {
+                // the records of chunks that are not written in time don't match their stamp,
+                // so they are treated as invalid
+            }
+        }
+
+        ChunkSummaryFile(const ChunkSummaryFile &) = delete;
+        ChunkSummaryFile & operator=(const ChunkSummaryFile &) = delete;
+
+        inline std::size_t maxLabels() const {return maxLabels_;}
+        inline std::size_t numberOfChunks() const {return nChunks_;}
+
+        inline void write(const std::size_t chunkIndex, const ChunkSummary & summary,
+                          const ChunkStamp & stamp) const {
+            std::vector<char> record(recordSize(maxLabels_), 0);
+            const uint64_t valid = summary.valid;
+            const uint64_t nonFillCount = summary.nonFillCount;
+            const int64_t nLabels = summary.labelsComplete ? static_cast<int64_t>(summary.labels.size()) : -1;
+            if(nLabels > static_cast<int64_t>(maxLabels_)) {
+                throw std::runtime_error("Too many labels for chunk summary");
+            }
+            char * pos = &record[0];
+            pos = put(pos, valid);
+            pos = put(pos, stamp.mtime);
+            pos = put(pos, stamp.ctime);
+            pos = put(pos, stamp.inode);
+            pos = put(pos, stamp.size);
+            pos = put(pos, summary.min);
+            pos = put(pos, summary.max);
+            pos = put(pos, nonFillCount);
+            pos = put(pos, nLabels);
+            if(nLabels > 0) {
+                std::memcpy(pos, &summary.labels[0], nLabels * sizeof(int64_t));
+            }
+
+            std::lock_guard<std::mutex> lock(mutex_);
+            pending_[chunkIndex] = std::move(record);
+            if(pending_.size() >= maxPending()) {
+                writePending();
+            }
+        }
+
+        // write the pending records to the file
+        inline void flush() const {
+            std::lock_guard<std::mutex> lock(mutex_);
+            writePending();
+        }
+
+        inline void readAll(std::vector<ChunkSummary> & summaries, std::vector<ChunkStamp> & stamps) const {
+            flush();
+            const std::size_t size = recordSize(maxLabels_);
+            std::vector<char> records(nChunks_ * size);
+            #ifdef WITH_BOOST_FS
+            fs::ifstream file(path_, std::ios::binary);
+            #else
+            std::ifstream file(path_, std::ios::binary);
+            #endif
+            file.seekg(headerSize());
+            if(!records.empty()) {
+                file.read(&records[0], records.size());
+            }
+            if(!file) {
+                throw std::runtime_error("Could not read chunk summary file " + path_.string());
+            }
+
+            summaries.resize(nChunks_);
+            stamps.resize(nChunks_);
+            uint64_t valid, nonFillCount;
+            int64_t nLabels;
+            for(std::size_t chunkIndex = 0; chunkIndex < nChunks_; ++chunkIndex) {
+                auto & summary = summaries[chunkIndex];
+                const char * pos = &records[chunkIndex * size];
+                pos = get(pos, valid);
+                pos = get(pos, stamps[chunkIndex].mtime);
+                pos = get(pos, stamps[chunkIndex].ctime);
+                pos = get(pos, stamps[chunkIndex].inode);
+                pos = get(pos, stamps[chunkIndex].size);
+                pos = get(pos, summary.min);
+                pos = get(pos, summary.max);
+                pos = get(pos, nonFillCount);
+                pos = get(pos, nLabels);
+                summary.valid = valid;
+                summary.nonFillCount = nonFillCount;
+                summary.labelsComplete = nLabels >= 0;
+                summary.labels.resize(std::max(nLabels, int64_t(0)));
+                if(nLabels > 0) {
+                    std::memcpy(&summary.labels[0], pos, nLabels * sizeof(int64_t));
+                }
+            }
+        }
+
+    private:
+        static uint64_t magic() {return 0x5952414d4d555335;}  // "5SUMMARY"
+        static uint64_t version() {return 3;}
+        static std::size_t headerSize() {return 4 * sizeof(uint64_t);}
+        static std::size_t recordSize(const std::size_t maxLabels) {return (9 + maxLabels) * sizeof(uint64_t);}
+        static std::size_t maxPending() {return 1024;}
+
+        // must be called with the mutex locked; the records are written in the order
+        // of the chunks with a single stream
+        inline void writePending() const {
+            if(pending_.empty()) {
+                return;
+            }
+            #ifdef WITH_BOOST_FS
+            fs::fstream file(path_, std::ios::binary | std::ios::in | std::ios::out);
+            #else
+            std::fstream file(path_, std::ios::binary | std::ios::in | std::ios::out);
+            #endif
+            for(const auto & record : pending_) {
+                file.seekp(headerSize() + record.first * record.second.size());
+                file.write(&record.second[0], record.second.size());
+            }
+            file.close();
+            if(!file) {
+                throw std::runtime_error("Could not write chunk summary file " + path_.string());
+            }
+            pending_.clear();
+        }
+
+        template<class V>
+        static char * put(char * pos, const V val) {
+            std::memcpy(pos, &val, sizeof(V));
+            return pos + sizeof(V);
+        }
+
+        template<class V>
+        static const char * get(const char * pos, V & val) {
+            std::memcpy(&val, pos, sizeof(V));
+            return pos + sizeof(V);
+        }
+
+        fs::path path_;
+        std::size_t nChunks_;
+        std::size_t maxLabels_;
+        mutable std::mutex mutex_;
+        mutable std::map<std::size_t, std::vector<char>> pending_;
+    };
+
+}
+}
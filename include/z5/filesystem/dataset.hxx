@@ -2,8 +2,18 @@
 
 #include <ios>
 
+#ifdef __linux__
+#include <fcntl.h>
+#include <unistd.h>
+#include <sys/ioctl.h>
+#include <sys/stat.h>
+#include <linux/fs.h>
+#endif
+
 #include "z5/dataset.hxx"
 #include "z5/filesystem/handle.hxx"
+#include "z5/filesystem/chunk_summary.hxx"
+#include "z5/util/for_each.hxx"
 
 
 namespace z5 {
@@ -27,6 +37,9 @@ namespace filesystem {
                                                     handle_(handle){
             // disable sync of c++ and c streams for potentially faster I/O
             std::ios_base::sync_with_stdio(false);
+            if(ChunkSummaryFile::exists(handle_.path())) {
+                summaries_.reset(new ChunkSummaryFile(handle_.path()));
+            }
         }
 
         //
@@ -43,27 +56,29 @@ namespace filesystem {
             }
 
             // create chunk handle and check if this chunk is valid
-            handle::Chunk chunk(handle_, chunkIndices, defaultChunkShape(), shape());
+            handle::Chunk chunk(handle_, chunkIndices, defaultChunkShape(), shape(), dimensionSeparator_);
             checkChunk(chunk, isVarlen);
             const auto & path = chunk.path();
 
             // create the output buffer and format the data
             std::vector<char> buffer;
             // data_to_buffer will return false if there's nothing to write
-            if(!util::data_to_buffer(chunk, dataIn, buffer, Mixin::compressor_, Mixin::fillValue_, isVarlen, varSize)) {
+            if(!util::data_to_buffer(chunk, dataIn, buffer, Mixin::compressor_, Mixin::filters_, Mixin::fillValue_, isVarlen, varSize)) {
                 // if we have data on disc for the chunk, delete it
                 if(fs::exists(path)) {
                     fs::remove(path);
                 }
+                updateChunkSummary(chunk, isVarlen ? nullptr : dataIn);
                 return;
             }
 
             // write the chunk to disc
-            if(!isZarr_) {
-                // need to make sure we have the root directory if this is an n5 chunk
+            if(!isZarr_ || dimensionSeparator_ != ".") {
+                // need to make sure we have the root directory if this is an n5 or nested zarr chunk
                 chunk.create();
             }
             write(path, buffer);
+            updateChunkSummary(chunk, isVarlen ? nullptr : dataIn);
         }
 
 
@@ -71,7 +86,7 @@ namespace filesystem {
         // IMPORTANT we assume that the data pointer is already initialized up to chunkSize_
         inline bool readChunk(const types::ShapeType & chunkIndices, void * dataOut) const {
             // get the chunk handle
-            handle::Chunk chunk(handle_, chunkIndices, defaultChunkShape(), shape());
+            handle::Chunk chunk(handle_, chunkIndices, defaultChunkShape(), shape(), dimensionSeparator_);
 
             // make sure that we have a valid chunk
             checkChunk(chunk);
@@ -86,12 +101,67 @@ namespace filesystem {
             read(chunk.path(), buffer);
 
             // format the data
-            const bool is_varlen = util::buffer_to_data<T>(chunk, buffer, dataOut, Mixin::compressor_);
+            const bool is_varlen = util::buffer_to_data<T>(chunk, buffer, dataOut, Mixin::compressor_, Mixin::filters_);
 
             return is_varlen;
         }
 
 
+        inline bool readRawChunk(const types::ShapeType & chunkIndices, std::vector<char> & buffer) const {
+            handle::Chunk chunk(handle_, chunkIndices, defaultChunkShape(), shape(), dimensionSeparator_);
+            checkChunk(chunk);
+            if(!chunk.exists()) {
+                return false;
+            }
+            read(chunk.path(), buffer);
+            return true;
+        }
+
+
+        inline void writeRawChunk(const types::ShapeType & chunkIndices, const std::vector<char> & buffer) const {
+            // check if we are allowed to write
+            if(!handle_.mode().canWrite()) {
+                const std::string err = "Cannot write data in file mode " + handle_.mode().printMode();
+                throw std::invalid_argument(err.c_str());
+            }
+            handle::Chunk chunk(handle_, chunkIndices, defaultChunkShape(), shape(), dimensionSeparator_);
+            checkChunk(chunk);
+            if(!isZarr_ || dimensionSeparator_ != ".") {
+                chunk.create();
+            }
+            write(chunk.path(), buffer);
+            invalidateChunkSummary(chunk);
+        }
+
+
+        inline bool getRawChunkSize(const types::ShapeType & chunkIndices, std::size_t & size) const {
+            handle::Chunk chunk(handle_, chunkIndices, defaultChunkShape(), shape(), dimensionSeparator_);
+            checkChunk(chunk);
+            if(!chunk.exists()) {
+                return false;
+            }
+            size = fs::file_size(chunk.path());
+            return true;
+        }
+
+
+        // if the output is also a filesystem dataset, we copy the chunk file directly
+        // so that the data does not need to pass through user space if the OS supports it
+        inline bool copyRawChunk(const types::ShapeType & chunkIndices, const z5::Dataset & out) const {
+            const auto * fsOut = dynamic_cast<const Dataset<T> *>(&out);
+            if(fsOut == nullptr) {
+                return BaseType::copyRawChunk(chunkIndices, out);
+            }
+            handle::Chunk chunk(handle_, chunkIndices, defaultChunkShape(), shape(), dimensionSeparator_);
+            checkChunk(chunk);
+            if(!chunk.exists()) {
+                return false;
+            }
+            fsOut->writeRawChunkFromFile(chunkIndices, chunk.path());
+            return true;
+        }
+
+
         inline void checkRequestType(const std::type_info & type) const {
             if(type != typeid(T)) {
                 // TODO all in error message
@@ -101,19 +171,19 @@ namespace filesystem {
         }
 
         inline bool chunkExists(const types::ShapeType & chunkId) const {
-            handle::Chunk chunk(handle_, chunkId, defaultChunkShape(), shape());
+            handle::Chunk chunk(handle_, chunkId, defaultChunkShape(), shape(), dimensionSeparator_);
             return chunk.exists();
         }
 
 
         inline std::size_t getChunkSize(const types::ShapeType & chunkId) const {
-            handle::Chunk chunk(handle_, chunkId, defaultChunkShape(), shape());
+            handle::Chunk chunk(handle_, chunkId, defaultChunkShape(), shape(), dimensionSeparator_);
             return chunk.size();
         }
 
 
         inline void getChunkShape(const types::ShapeType & chunkId, types::ShapeType & chunkShape) const {
-            handle::Chunk chunk(handle_, chunkId, defaultChunkShape(), shape());
+            handle::Chunk chunk(handle_, chunkId, defaultChunkShape(), shape(), dimensionSeparator_);
             const auto & cshape = chunk.shape();
             chunkShape.resize(cshape.size());
             std::copy(cshape.begin(), cshape.end(), chunkShape.begin());
@@ -121,7 +191,7 @@ namespace filesystem {
 
 
         inline std::size_t getChunkShape(const types::ShapeType & chunkId, const unsigned dim) const {
-            handle::Chunk chunk(handle_, chunkId, defaultChunkShape(), shape());
+            handle::Chunk chunk(handle_, chunkId, defaultChunkShape(), shape(), dimensionSeparator_);
             const auto & cshape = chunk.shape();
             return cshape[dim];
         }
@@ -131,6 +201,12 @@ namespace filesystem {
         inline types::Compressor getCompressor() const {return Mixin::compressor_->type();}
         inline void getCompressor(std::string & compressor) const {
             auto compressorType = getCompressor();
+            if(compressorType == types::plugin) {
+                types::CompressionOptions opts;
+                getCompressionOptions(opts);
+                compressor = boost::get<std::string>(opts["id"]);
+                return;
+            }
             compressor = isZarr_ ? types::Compressors::compressorToZarr()[compressorType] : types::Compressors::compressorToN5()[compressorType];
         }
         inline void getCompressionOptions(types::CompressionOptions & opts) const {
@@ -144,7 +220,7 @@ namespace filesystem {
 
 
         inline bool checkVarlenChunk(const types::ShapeType & chunkId, std::size_t & chunkSize) const {
-            handle::Chunk chunk(handle_, chunkId, defaultChunkShape(), shape());
+            handle::Chunk chunk(handle_, chunkId, defaultChunkShape(), shape(), dimensionSeparator_);
             if(isZarr_ || !chunk.exists()) {
                 chunkSize = chunk.size();
                 return false;
@@ -164,17 +240,88 @@ namespace filesystem {
             return handle_.path();
         }
         inline void chunkPath(const types::ShapeType & chunkId, fs::path & path) const {
-            handle::Chunk chunk(handle_, chunkId, defaultChunkShape(), shape());
+            handle::Chunk chunk(handle_, chunkId, defaultChunkShape(), shape(), dimensionSeparator_);
             path = chunk.path();
         }
         inline void removeChunk(const types::ShapeType & chunkId) const {
-            handle::Chunk chunk(handle_, chunkId, defaultChunkShape(), shape());
+            handle::Chunk chunk(handle_, chunkId, defaultChunkShape(), shape(), dimensionSeparator_);
             chunk.remove();
+            if(summaries_) {
+                ChunkSummary summary;
+                summary_detail::summarizeEmptyChunk(Mixin::fillValue_, summaries_->maxLabels(), summary);
+                summaries_->write(chunking_.blockCoordinatesToBlockId(chunkId), summary, ChunkStamp());
+            }
         }
         inline void remove() const {
             handle_.remove();
         }
 
+        // chunk summaries
+        inline bool hasChunkSummaries() const {
+            return bool(summaries_);
+        }
+
+        // compute the summaries for all chunks and store them; labels are only
+        // stored for integer types and for chunks with at most `maxLabels` unique values.
+        // the summaries are kept up to date by z5; chunks that were changed by other tools
+        // are detected by their modification and status change time, inode and size and have
+        // no valid summary. on filesystems with timestamps of low resolution, a chunk that is
+        // rewritten in place with the same size within the resolution is not detected.
+        // must not be called concurrently with writing to the dataset
+        inline void enableChunkSummaries(const std::size_t maxLabels, const int nThreads) const {
+            if(!handle_.mode().canWrite()) {
+                const std::string err = "Cannot enable chunk summaries in file mode " + handle_.mode().printMode();
+                throw std::invalid_argument(err.c_str());
+            }
+            const std::size_t nLabels = std::is_integral<T>::value ? maxLabels : 0;
+            // write the pending records of the old summaries before replacing the file
+            summaries_.reset();
+            ChunkSummaryFile::create(handle_.path(), numberOfChunks(), nLabels);
+            summaries_.reset(new ChunkSummaryFile(handle_.path()));
+
+            const int nActualThreads = util::ParallelOptions(nThreads).getActualNumThreads();
+            std::vector<std::vector<T>> threadBuffer(nActualThreads);
+            util::parallel_for_each_chunk(*this, nThreads, [&](const int tid,
+                                                               const z5::Dataset & ds,
+                                                               const types::ShapeType & chunkId) {
+                handle::Chunk chunk(handle_, chunkId, defaultChunkShape(), shape(), dimensionSeparator_);
+                if(!chunk.exists()) {
+                    updateChunkSummary(chunk, nullptr);
+                    return;
+                }
+                std::size_t chunkSize;
+                if(checkVarlenChunk(chunkId, chunkSize)) {
+                    return;
+                }
+                auto & buffer = threadBuffer[tid];
+                buffer.resize(isZarr_ ? defaultChunkSize() : chunk.size());
+                readChunk(chunkId, &buffer[0]);
+                updateChunkSummary(chunk, &buffer[0]);
+            });
+            summaries_->flush();
+        }
+
+        inline void readChunkSummaries(std::vector<ChunkSummary> & summaries) const {
+            if(!summaries_) {
+                throw std::runtime_error("Chunk summaries are not enabled for this dataset");
+            }
+            std::vector<ChunkStamp> stamps;
+            summaries_->readAll(summaries, stamps);
+            // the summaries of chunks that were written by other tools are outdated
+            types::ShapeType chunkId;
+            for(std::size_t chunkIndex = 0; chunkIndex < summaries.size(); ++chunkIndex) {
+                auto & summary = summaries[chunkIndex];
+                if(!summary.valid) {
+                    continue;
+                }
+                chunking_.blockIdToBlockCoordinate(chunkIndex, chunkId);
+                handle::Chunk chunk(handle_, chunkId, defaultChunkShape(), shape(), dimensionSeparator_);
+                if(chunkStamp(chunk.path()) != stamps[chunkIndex]) {
+                    summary.valid = false;
+                }
+            }
+        }
+
         // delete copy constructor and assignment operator
         // because the compressor cannot be copied by default
         // and we don't really need this to be copyable afaik
@@ -185,6 +332,95 @@ namespace filesystem {
 
     private:
 
+        // update the summary of a chunk after writing it, `data` is null
+        // if the chunk does not exist (anymore) or if it is a varlen chunk
+        inline void updateChunkSummary(const handle::Chunk & chunk, const void * data) const {
+            if(!summaries_) {
+                return;
+            }
+            ChunkSummary summary;
+            if(data != nullptr) {
+                // zarr stores edge chunks with the full chunk shape
+                summary_detail::summarizeChunk(static_cast<const T *>(data),
+                                               isZarr_ ? chunk.defaultShape() : chunk.shape(),
+                                               chunk.shape(), Mixin::fillValue_,
+                                               summaries_->maxLabels(), summary);
+            } else if(!chunk.exists()) {
+                summary_detail::summarizeEmptyChunk(Mixin::fillValue_, summaries_->maxLabels(), summary);
+            }
+            summaries_->write(chunking_.blockCoordinatesToBlockId(chunk.chunkIndices()), summary,
+                              chunkStamp(chunk.path()));
+        }
+
+        // mark the summary of a chunk whose data we don't know as invalid
+        inline void invalidateChunkSummary(const handle::Chunk & chunk) const {
+            if(summaries_) {
+                summaries_->write(chunking_.blockCoordinatesToBlockId(chunk.chunkIndices()),
+                                  ChunkSummary(), ChunkStamp());
+            }
+        }
+
+        inline void writeRawChunkFromFile(const types::ShapeType & chunkIndices, const fs::path & src) const {
+            if(!handle_.mode().canWrite()) {
+                const std::string err = "Cannot write data in file mode " + handle_.mode().printMode();
+                throw std::invalid_argument(err.c_str());
+            }
+            handle::Chunk chunk(handle_, chunkIndices, defaultChunkShape(), shape(), dimensionSeparator_);
+            checkChunk(chunk);
+            if(!isZarr_ || dimensionSeparator_ != ".") {
+                chunk.create();
+            }
+            invalidateChunkSummary(chunk);
+            const auto & dst = chunk.path();
+            if(copyFile(src, dst)) {
+                return;
+            }
+            std::vector<char> buffer;
+            read(src, buffer);
+            write(dst, buffer);
+        }
+
+        // try to copy the file with a reflink or copy_file_range,
+        // returns false if neither is supported
+        inline bool copyFile(const fs::path & src, const fs::path & dst) const {
+            #ifdef __linux__
+            const int fdIn = ::open(src.string().c_str(), O_RDONLY);
+            if(fdIn < 0) {
+                return false;
+            }
+            const int fdOut = ::open(dst.string().c_str(), O_WRONLY | O_CREAT | O_TRUNC, 0644);
+            if(fdOut < 0) {
+                ::close(fdIn);
+                return false;
+            }
+
+            bool success = false;
+            #ifdef FICLONE
+            success = ::ioctl(fdOut, FICLONE, fdIn) == 0;
+            #endif
+
+            if(!success) {
+                struct stat st;
+                success = ::fstat(fdIn, &st) == 0;
+                std::size_t remaining = success ? st.st_size : 0;
+                while(success && remaining > 0) {
+                    const ssize_t copied = ::copy_file_range(fdIn, nullptr, fdOut, nullptr, remaining, 0);
+                    if(copied <= 0) {
+                        success = false;
+                    } else {
+                        remaining -= copied;
+                    }
+                }
+            }
+
+            ::close(fdIn);
+            ::close(fdOut);
+            return success;
+            #else
+            return false;
+            #endif
+        }
+
         inline void write(const fs::path & path, const std::vector<char> & buffer) const {
             #ifdef WITH_BOOST_FS
             fs::ofstream file(path, std::ios::binary);
@@ -266,6 +502,7 @@ namespace filesystem {
 
     private:
         handle::Dataset handle_;
+        mutable std::unique_ptr<ChunkSummaryFile> summaries_;
     };
 
 
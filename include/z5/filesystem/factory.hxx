@@ -2,6 +2,8 @@
 
 #include "z5/filesystem/metadata.hxx"
 #include "z5/filesystem/dataset.hxx"
+#include "z5/filesystem/hierarchy.hxx"
+#include "z5/util/threadpool.hxx"
 
 
 namespace z5 {
@@ -98,6 +100,65 @@ namespace filesystem {
     }
 
 
+    // move the chunks of a zarr dataset between the flat ('.') and nested ('/') layout in parallel;
+    // chunks are renamed and not rewritten, and the metadata is only updated once all chunks were moved
+    inline void setDimensionSeparator(const handle::Dataset & dataset,
+                                      const std::string & dimensionSeparator,
+                                      const int nThreads=1) {
+        if(!dataset.mode().canWrite()) {
+            const std::string err = "Cannot change the chunk layout in file mode " + dataset.mode().printMode();
+            throw std::invalid_argument(err.c_str());
+        }
+        if(dimensionSeparator != "." && dimensionSeparator != "/") {
+            throw std::invalid_argument("Invalid dimension separator: must be '.' or '/'");
+        }
+        DatasetMetadata metadata;
+        readMetadata(dataset, metadata);
+        if(!metadata.isZarr) {
+            throw std::invalid_argument("The chunk layout can only be changed for zarr datasets");
+        }
+        if(metadata.dimensionSeparator == dimensionSeparator) {
+            return;
+        }
+
+        // the chunk paths of both layouts agree for 1d datasets
+        if(metadata.shape.size() > 1) {
+            const util::Blocking chunking(metadata.shape, metadata.chunkShape);
+            util::parallel_foreach(nThreads, chunking.numberOfBlocks(), [&](const int tid, const std::size_t chunkIndex){
+                types::ShapeType chunkId;
+                chunking.blockIdToBlockCoordinate(chunkIndex, chunkId);
+                handle::Chunk src(dataset, chunkId, metadata.chunkShape, metadata.shape,
+                                  metadata.dimensionSeparator);
+                if(!src.exists()) {
+                    return;
+                }
+                handle::Chunk dst(dataset, chunkId, metadata.chunkShape, metadata.shape,
+                                  dimensionSeparator);
+                dst.create();
+                fs::rename(src.path(), dst.path());
+            });
+
+            // remove the (now empty) chunk directories of the nested layout
+            if(dimensionSeparator == ".") {
+                std::vector<fs::path> chunkDirs;
+                for(const auto & p : fs::directory_iterator(dataset.path())) {
+                    const std::string name = p.path().filename().string();
+                    if(fs::is_directory(p.path()) &&
+                       std::all_of(name.begin(), name.end(), [](const char c){return std::isdigit(c);})) {
+                        chunkDirs.emplace_back(p.path());
+                    }
+                }
+                for(const auto & dir : chunkDirs) {
+                    fs::remove_all(dir);
+                }
+            }
+        }
+
+        metadata.dimensionSeparator = dimensionSeparator;
+        writeMetadata(dataset, metadata);
+    }
+
+
     template<class GROUP1, class GROUP2>
     inline std::string relativePath(const z5::handle::Group<GROUP1> & g1,
                                     const GROUP2 & g2) {
@@ -81,6 +81,7 @@ namespace handle {
         // Implement th handle API
         inline bool isS3() const {return false;}
         inline bool isGcs() const {return false;}
+        inline bool isKeyValueStore() const {return false;}
         inline bool exists() const {return pathExists();}
         inline bool isZarr() const {return isZarrGroup();}
         inline const fs::path & path() const {return getPath();}
@@ -130,6 +131,7 @@ namespace handle {
         // Implement th handle API
         inline bool isS3() const {return false;}
         inline bool isGcs() const {return false;}
+        inline bool isKeyValueStore() const {return false;}
         inline bool exists() const {return pathExists();}
         inline bool isZarr() const {return isZarrGroup();}
         inline const fs::path & path() const {return getPath();}
@@ -180,6 +182,7 @@ namespace handle {
 
         inline bool isS3() const {return false;}
         inline bool isGcs() const {return false;}
+        inline bool isKeyValueStore() const {return false;}
         inline bool exists() const {return pathExists();}
         inline bool isZarr() const {return isZarrDataset();}
         inline const fs::path & path() const {return getPath();}
@@ -218,14 +221,16 @@ namespace handle {
         Chunk(const Dataset & ds,
               const types::ShapeType & chunkIndices,
               const types::ShapeType & chunkShape,
-              const types::ShapeType & shape) : BaseType(chunkIndices, chunkShape, shape, ds.mode()),
-                                                dsHandle_(ds),
-                                                path_(constructPath()){}
+              const types::ShapeType & shape,
+              const std::string & dimensionSeparator=".") : BaseType(chunkIndices, chunkShape, shape, ds.mode()),
+                                                            dsHandle_(ds),
+                                                            dimensionSeparator_(dimensionSeparator),
+                                                            path_(constructPath()){}
 
-        // make the top level directories for a n5 chunk
+        // make the top level directories for a n5 or nested zarr chunk
         inline void create() const {
-            // don't need to do anything for zarr format
-            if(dsHandle_.isZarr()) {
+            // don't need to do anything for flat zarr chunks
+            if(dimensionSeparator_ == "." && dsHandle_.isZarr()) {
                 return;
             }
 
@@ -261,6 +266,7 @@ namespace handle {
 
         inline bool isS3() const {return false;}
         inline bool isGcs() const {return false;}
+        inline bool isKeyValueStore() const {return false;}
 
     private:
 
@@ -272,11 +278,10 @@ namespace handle {
             const auto & indices = chunkIndices();
 
             // if we have the zarr-format, chunk indices
-            // are seperated by a '.'
+            // are seperated by the dimension separator ('.' or '/')
             if(dsHandle_.isZarr()) {
 				std::string name;
-                std::string delimiter = ".";
-                util::join(indices.begin(), indices.end(), name, delimiter);
+                util::join(indices.begin(), indices.end(), name, dimensionSeparator_);
                 ret /= name;
             }
 
@@ -292,6 +297,7 @@ namespace handle {
         }
 
         const Dataset & dsHandle_;
+        std::string dimensionSeparator_;
         fs::path path_;
     };
 
@@ -0,0 +1,102 @@
+#pragma once
+
+#include "z5/metadata.hxx"
+#include "z5/filesystem/handle.hxx"
+#include "z5/filesystem/attributes.hxx"
+
+
+namespace z5 {
+namespace filesystem {
+
+namespace hierarchy_detail {
+
+    inline std::string joinKey(const std::string & prefix, const std::string & name) {
+        return prefix.empty() ? name : prefix + "/" + name;
+    }
+
+    // read shape, dtype and chunks from the dataset metadata without opening the dataset
+    // (which would also need to set up the compressor)
+    inline void readDatasetSummary(const fs::path & path, const bool isZarr, HierarchyEntry & entry) {
+        nlohmann::json j;
+        attrs_detail::readAttributes(path / (isZarr ? ".zarray" : "attributes.json"), j);
+        if(isZarr) {
+            entry.shape = types::ShapeType(j["shape"].begin(), j["shape"].end());
+            entry.chunks = types::ShapeType(j["chunks"].begin(), j["chunks"].end());
+            const auto dtype = types::Datatypes::zarrToDtype().at(j["dtype"]);
+            entry.dtype = types::Datatypes::dtypeToN5().at(dtype);
+        } else {
+            // N5-Axis order: we need to reverse shape and chunks
+            entry.shape = types::ShapeType(j["dimensions"].rbegin(), j["dimensions"].rend());
+            entry.chunks = types::ShapeType(j["blockSize"].rbegin(), j["blockSize"].rend());
+            entry.dtype = j["dataType"].get<std::string>();
+        }
+    }
+
+
+    // classify the directory at path as group or dataset
+    // returns false if it is neither
+    inline bool classify(const fs::path & path, const bool isZarr, bool & isDataset) {
+        if(isZarr) {
+            if(fs::exists(path / ".zarray")) {
+                isDataset = true;
+                return true;
+            }
+            isDataset = false;
+            return fs::exists(path / ".zgroup");
+        }
+        const fs::path attrsPath = path / "attributes.json";
+        if(!fs::exists(attrsPath)) {
+            isDataset = false;
+            return true;
+        }
+        nlohmann::json j;
+        attrs_detail::readAttributes(attrsPath, j);
+        isDataset = z5::handle::hasAllN5DatasetAttributes(j);
+        return true;
+    }
+
+
+    inline void walk(const fs::path & path, const std::string & prefix,
+                     const bool isZarr, std::vector<HierarchyEntry> & out) {
+        // we sort the children to make the iteration order deterministic
+        std::vector<std::string> children;
+        for(const auto & p : fs::directory_iterator(path)) {
+            if(fs::is_directory(p.path())) {
+                children.emplace_back(p.path().filename().string());
+            }
+        }
+        std::sort(children.begin(), children.end());
+
+        bool isDataset;
+        for(const auto & name : children) {
+            const fs::path childPath = path / name;
+            if(!classify(childPath, isZarr, isDataset)) {
+                continue;
+            }
+            HierarchyEntry entry;
+            entry.path = joinKey(prefix, name);
+            entry.isDataset = isDataset;
+            if(isDataset) {
+                readDatasetSummary(childPath, isZarr, entry);
+                out.emplace_back(std::move(entry));
+            } else {
+                const std::string key = entry.path;
+                out.emplace_back(std::move(entry));
+                // datasets are leaves, so we only recurse into groups
+                walk(childPath, key, isZarr, out);
+            }
+        }
+    }
+}
+
+
+    // list all groups and datasets below the group in a single scan of the directory tree,
+    // paths are given relative to the group and groups are listed before their members
+    template<class GROUP>
+    inline void listHierarchy(const z5::handle::Group<GROUP> & group,
+                              std::vector<HierarchyEntry> & out) {
+        hierarchy_detail::walk(group.path(), "", group.isZarr(), out);
+    }
+
+}
+}
@@ -1,94 +0,0 @@
-#pragma once
-#include "z5/dataset.hxx"
-#include "z5/gcs/handle.hxx"
-
-
-namespace z5 {
-namespace gcs {
-
-    // TODO implement for gcs
-
-    template<typename T>
-    class Dataset : public z5::Dataset, private z5::MixinTyped<T> {
-
-    public:
-        typedef T value_type;
-        typedef types::ShapeType shape_type;
-        typedef z5::MixinTyped<T> Mixin;
-
-        // create a new array with metadata
-        Dataset(const handle::Dataset & handle,
-                const DatasetMetadata & metadata) : z5::Dataset(metadata),
-                                                    Mixin(metadata),
-                                                    handle_(handle){
-        }
-
-        //
-        // Implement Dataset API
-        //
-
-        inline void writeChunk(const types::ShapeType & chunkIndices, const void * dataIn,
-                               const bool isVarlen=false, const std::size_t varSize=0) const {
-            // check if we are allowed to write
-            if(!handle_.mode().canWrite()) {
-                const std::string err = "Cannot write data in file mode " + handle_.mode().printMode();
-                throw std::invalid_argument(err.c_str());
-            }
-        }
-
-
-        // read a chunk
-        // IMPORTANT we assume that the data pointer is already initialized up to chunkSize_
-        inline bool readChunk(const types::ShapeType & chunkIndices, void * dataOut) const {
-        }
-
-
-        inline void checkRequestType(const std::type_info & type) const {
-            if(type != typeid(T)) {
-                // TODO all in error message
-                std::cout << "Mytype: " << typeid(T).name() << " your type: " << type.name() << std::endl;
-                throw std::runtime_error("Request has wrong type");
-            }
-        }
-
-
-        inline bool chunkExists(const types::ShapeType & chunkId) const {
-        }
-        inline std::size_t getChunkSize(const types::ShapeType & chunkId) const {
-        }
-        inline void getChunkShape(const types::ShapeType & chunkId, types::ShapeType & chunkShape) const {
-        }
-        inline std::size_t getChunkShape(const types::ShapeType & chunkId, const unsigned dim) const {
-        }
-
-
-        // compression options
-        inline types::Compressor getCompressor() const {return Mixin::compressor_->type();}
-        inline void getCompressor(std::string & compressor) const {
-            auto compressorType = getCompressor();
-            compressor = isZarr_ ? types::Compressors::compressorToZarr()[compressorType] : types::Compressors::compressorToN5()[compressorType];
-        }
-
-        inline void getFillValue(void * fillValue) const {
-            *((T*) fillValue) = Mixin::fillValue_;
-        }
-
-
-        inline bool checkVarlenChunk(const types::ShapeType & chunkId, std::size_t & chunkSize) const {
-        }
-
-        // delete copy constructor and assignment operator
-        // because the compressor cannot be copied by default
-        // and we don't really need this to be copyable afaik
-        // if this changes at some point, we need to provide a proper
-        // implementation here
-        Dataset(const Dataset & that) = delete;
-        Dataset & operator=(const Dataset & that) = delete;
-
-    private:
-        handle::Dataset handle_;
-    };
-
-
-}
-}
@@ -0,0 +1,250 @@
+#pragma once
+
+#include <map>
+#include <mutex>
+#include <memory>
+#include <iterator>
+
+#include <google/cloud/credentials.h>
+#include <google/cloud/storage/client.h>
+
+#include "z5/kv/store.hxx"
+#include "z5/util/threadpool.hxx"
+
+
+namespace z5 {
+namespace gcs {
+
+    namespace gcs_sdk = google::cloud::storage;
+
+
+    // options to connect to google cloud storage or to an emulator (e.g. fake-gcs-server)
+    struct Options {
+        // endpoint of the storage api, e.g. "http://localhost:4443" for a local fake-gcs-server.
+        // if it is empty, the default google endpoint is used
+        std::string endpoint = "";
+        // project used for billing and bucket creation, if empty it is read from the environment
+        std::string project = "";
+        // don't authenticate requests, for public buckets and emulators
+        bool anonymous = false;
+        // maximal number of connections that are kept open by the client;
+        // set this to at least the number of threads used for reading or writing
+        unsigned maxConnections = 64;
+    };
+
+
+namespace store_detail {
+
+    // the client, which holds a pool of connections, is shared between all stores
+    // with the same connection options, so opening many containers does not open new connections
+    inline std::shared_ptr<gcs_sdk::Client> clientFromPool(const Options & options) {
+        static std::mutex mutex;
+        static std::map<std::string, std::weak_ptr<gcs_sdk::Client>> pool;
+        const std::string id = options.endpoint + "|" + options.project + "|" +
+                               std::to_string(options.anonymous) + "|" +
+                               std::to_string(options.maxConnections);
+        std::lock_guard<std::mutex> lock(mutex);
+        auto client = pool[id].lock();
+        if(client) {
+            return client;
+        }
+
+        google::cloud::Options config;
+        if(!options.endpoint.empty()) {
+            config.set<gcs_sdk::RestEndpointOption>(options.endpoint);
+        }
+        if(!options.project.empty()) {
+            config.set<gcs_sdk::ProjectIdOption>(options.project);
+        }
+        if(options.anonymous) {
+            config.set<google::cloud::UnifiedCredentialsOption>(google::cloud::MakeInsecureCredentials());
+        }
+        config.set<gcs_sdk::ConnectionPoolSizeOption>(options.maxConnections);
+
+        client = std::make_shared<gcs_sdk::Client>(std::move(config));
+        pool[id] = client;
+        return client;
+    }
+
+}
+
+
+    // store for the objects of a container in a gcs bucket, under the key prefix `prefix`
+    class Store : public kv::Store {
+    public:
+        Store(const std::string & bucket, const std::string & prefix="", const Options & options=Options())
+            : bucket_(bucket), prefix_(normalizePrefix(prefix)), options_(options),
+              client_(store_detail::clientFromPool(options)) {
+            if(bucket_.empty()) {
+                throw std::invalid_argument("Need a bucket name for the gcs store");
+            }
+        }
+
+        inline bool read(const std::string & key, std::vector<char> & value) const {
+            auto reader = client_->ReadObject(bucket_, objectKey(key));
+            return get(reader, key, value);
+        }
+
+        inline bool readRange(const std::string & key, const std::size_t offset,
+                              const std::size_t size, std::vector<char> & value) const {
+            if(size == 0) {
+                value.clear();
+                return exists(key);
+            }
+            // the end of the range is exclusive
+            auto reader = client_->ReadObject(bucket_, objectKey(key),
+                                              gcs_sdk::ReadRange(offset, offset + size));
+            return get(reader, key, value);
+        }
+
+        inline void write(const std::string & key, const std::vector<char> & value) const {
+            checkWritable();
+            const auto metadata = client_->InsertObject(bucket_, objectKey(key),
+                                                        std::string(value.begin(), value.end()));
+            if(!metadata) {
+                throwError("writing", key, metadata.status());
+            }
+        }
+
+        inline bool exists(const std::string & key) const {
+            const auto metadata = client_->GetObjectMetadata(bucket_, objectKey(key));
+            if(metadata) {
+                return true;
+            }
+            if(metadata.status().code() == google::cloud::StatusCode::kNotFound) {
+                return false;
+            }
+            throwError("checking", key, metadata.status());
+        }
+
+        inline bool objectSize(const std::string & key, std::size_t & size) const {
+            const auto metadata = client_->GetObjectMetadata(bucket_, objectKey(key));
+            if(metadata) {
+                size = metadata->size();
+                return true;
+            }
+            if(metadata.status().code() == google::cloud::StatusCode::kNotFound) {
+                return false;
+            }
+            throwError("checking", key, metadata.status());
+        }
+
+        inline void remove(const std::string & key) const {
+            checkWritable();
+            const auto status = client_->DeleteObject(bucket_, objectKey(key));
+            if(!status.ok() && status.code() != google::cloud::StatusCode::kNotFound) {
+                throwError("removing", key, status);
+            }
+        }
+
+        inline void listChildren(const std::string & prefix, std::vector<std::string> & out) const {
+            const std::string listPrefix = directoryKey(prefix);
+            for(auto && item : client_->ListObjectsAndPrefixes(bucket_, gcs_sdk::Prefix(listPrefix),
+                                                               gcs_sdk::Delimiter("/"))) {
+                if(!item) {
+                    throwError("listing", prefix, item.status());
+                }
+                // we only list the prefixes, objects directly below the prefix are not children
+                if(!absl::holds_alternative<std::string>(*item)) {
+                    continue;
+                }
+                const std::string & child = absl::get<std::string>(*item);
+                // strip the list prefix and the trailing '/'
+                out.emplace_back(child.substr(listPrefix.size(), child.size() - listPrefix.size() - 1));
+            }
+        }
+
+        inline bool existsPrefix(const std::string & prefix) const {
+            for(auto && object : client_->ListObjects(bucket_, gcs_sdk::Prefix(directoryKey(prefix)),
+                                                      gcs_sdk::MaxResults(1))) {
+                if(!object) {
+                    throwError("listing", prefix, object.status());
+                }
+                return true;
+            }
+            return false;
+        }
+
+        // gcs has no batch delete in the client library, so we delete the objects concurrently,
+        // using the connections of the pool
+        inline void removePrefix(const std::string & prefix) const {
+            checkWritable();
+            std::vector<std::string> keys;
+            for(auto && object : client_->ListObjects(bucket_, gcs_sdk::Prefix(directoryKey(prefix)))) {
+                if(!object) {
+                    throwError("listing", prefix, object.status());
+                }
+                keys.emplace_back(object->name());
+            }
+            if(keys.empty()) {
+                return;
+            }
+
+            const int nThreads = std::min<std::size_t>(std::min(options_.maxConnections, 16u), keys.size());
+            util::parallel_foreach(nThreads, keys.size(), [&](const int tid, const std::size_t keyId){
+                const auto status = client_->DeleteObject(bucket_, keys[keyId]);
+                if(!status.ok() && status.code() != google::cloud::StatusCode::kNotFound) {
+                    throw std::runtime_error("Failed removing " + keys[keyId] + " in gcs bucket " + bucket_ +
+                                             ": " + status.message());
+                }
+            });
+        }
+
+        inline bool isGcs() const {return true;}
+
+        inline const std::string & bucket() const {return bucket_;}
+        inline const std::string & prefix() const {return prefix_;}
+
+    private:
+
+        static std::string normalizePrefix(const std::string & prefix) {
+            const std::size_t begin = prefix.find_first_not_of('/');
+            if(begin == std::string::npos) {
+                return "";
+            }
+            const std::size_t end = prefix.find_last_not_of('/');
+            return prefix.substr(begin, end - begin + 1);
+        }
+
+        inline std::string objectKey(const std::string & key) const {
+            return kv::joinKey(prefix_, key);
+        }
+
+        // the prefix of all objects below `prefix`, i.e. with a trailing '/'
+        inline std::string directoryKey(const std::string & prefix) const {
+            const std::string key = objectKey(prefix);
+            return key.empty() ? key : key + "/";
+        }
+
+        [[noreturn]] inline void throwError(const std::string & what, const std::string & key,
+                                            const google::cloud::Status & status) const {
+            throw std::runtime_error("Failed " + what + " " + objectKey(key) + " in gcs bucket " + bucket_ + ": " +
+                                     status.message());
+        }
+
+        inline bool get(gcs_sdk::ObjectReadStream & reader, const std::string & key,
+                        std::vector<char> & value) const {
+            value.assign(std::istreambuf_iterator<char>(reader), std::istreambuf_iterator<char>());
+            const auto & status = reader.status();
+            if(status.ok()) {
+                return true;
+            }
+            if(status.code() == google::cloud::StatusCode::kNotFound) {
+                return false;
+            }
+            // a range that starts after the end of the object
+            if(status.code() == google::cloud::StatusCode::kOutOfRange) {
+                value.clear();
+                return true;
+            }
+            throwError("reading", key, status);
+        }
+
+        std::string bucket_;
+        std::string prefix_;
+        Options options_;
+        std::shared_ptr<gcs_sdk::Client> client_;
+    };
+
+}
+}
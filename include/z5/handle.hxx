@@ -17,6 +17,8 @@ namespace handle {
         virtual bool isZarr() const = 0;
         virtual bool isS3() const = 0;
         virtual bool isGcs() const = 0;
+        // all backends except for the filesystem are implemented on top of a key-value store
+        virtual bool isKeyValueStore() const = 0;
 
         virtual bool exists() const = 0;
         virtual void create() const = 0;
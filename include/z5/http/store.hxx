@@ -0,0 +1,316 @@
+#pragma once
+
+#include <set>
+#include <mutex>
+#include <memory>
+#include <regex>
+
+#include <curl/curl.h>
+
+#include "z5/kv/store.hxx"
+
+
+namespace z5 {
+namespace http {
+
+
+    // options for the connections to the http server
+    struct Options {
+        long timeoutMs = 30000;
+        long connectTimeoutMs = 10000;
+        // verify the certificate of https servers
+        bool verifyPeer = true;
+    };
+
+
+namespace store_detail {
+
+    // libcurl must be initialized once before creating the first handle and cleaned up
+    // after the last handle was destroyed, so all handle pools hold a reference to it
+    class Curl {
+    public:
+        static std::shared_ptr<Curl> instance() {
+            static std::shared_ptr<Curl> curl(new Curl());
+            return curl;
+        }
+
+        ~Curl() {
+            curl_global_cleanup();
+        }
+
+    private:
+        Curl() {
+            curl_global_init(CURL_GLOBAL_DEFAULT);
+        }
+    };
+
+
+    // curl handles can't be used by more than one thread at a time, so each request
+    // takes a handle from the pool. the handles keep their connections open between
+    // requests, so the connections are reused (keep-alive) and the pool grows
+    // to the number of concurrent requests
+    class HandlePool {
+    public:
+        HandlePool() : curl_(Curl::instance()) {
+        }
+
+        ~HandlePool() {
+            for(CURL * handle : handles_) {
+                curl_easy_cleanup(handle);
+            }
+        }
+
+        inline CURL * acquire() {
+            {
+                std::lock_guard<std::mutex> lock(mutex_);
+                if(!handles_.empty()) {
+                    CURL * handle = handles_.back();
+                    handles_.pop_back();
+                    return handle;
+                }
+            }
+            CURL * handle = curl_easy_init();
+            if(handle == nullptr) {
+                throw std::runtime_error("Failed to initialize curl");
+            }
+            return handle;
+        }
+
+        inline void release(CURL * handle) {
+            std::lock_guard<std::mutex> lock(mutex_);
+            handles_.push_back(handle);
+        }
+
+    private:
+        // declared first, so that it is destroyed after the handles
+        std::shared_ptr<Curl> curl_;
+        std::mutex mutex_;
+        std::vector<CURL *> handles_;
+    };
+
+
+    // return the handle to the pool when the request is done
+    class HandleLease {
+    public:
+        HandleLease(HandlePool & pool) : pool_(pool), handle_(pool.acquire()) {
+        }
+
+        ~HandleLease() {
+            pool_.release(handle_);
+        }
+
+        inline CURL * get() const {
+            return handle_;
+        }
+
+    private:
+        HandlePool & pool_;
+        CURL * handle_;
+    };
+
+
+    inline std::size_t writeBody(char * data, std::size_t size, std::size_t nmemb, void * userdata) {
+        auto * body = static_cast<std::vector<char> *>(userdata);
+        body->insert(body->end(), data, data + size * nmemb);
+        return size * nmemb;
+    }
+
+
+    // decode the percent-encoded characters of a link
+    inline std::string decodeLink(const std::string & link) {
+        std::string out;
+        for(std::size_t i = 0; i < link.size(); ++i) {
+            if(link[i] == '%' && i + 2 < link.size()) {
+                out.push_back(static_cast<char>(std::stoi(link.substr(i + 1, 2), nullptr, 16)));
+                i += 2;
+            } else {
+                out.push_back(link[i]);
+            }
+        }
+        return out;
+    }
+
+}
+
+
+    // read-only store for containers that are served as static directories over http(s).
+    // http has no listing of objects, so listing the children of a group relies on the
+    // directory index of the server (e.g. python's http.server or nginx with autoindex)
+    class Store : public kv::Store {
+    public:
+        Store(const std::string & url, const Options & options=Options())
+            : url_(normalizeUrl(url)), options_(options), pool_(new store_detail::HandlePool()) {
+            if(url_.empty()) {
+                throw std::invalid_argument("Need an url for the http store");
+            }
+        }
+
+        inline bool read(const std::string & key, std::vector<char> & value) const {
+            const long status = request(objectUrl(key), false, "", value);
+            if(status == 404) {
+                return false;
+            }
+            if(status != 200) {
+                throwError("reading", key, status);
+            }
+            return true;
+        }
+
+        inline bool readRange(const std::string & key, const std::size_t offset,
+                              const std::size_t size, std::vector<char> & value) const {
+            if(size == 0) {
+                value.clear();
+                return exists(key);
+            }
+            const std::string range = std::to_string(offset) + "-" + std::to_string(offset + size - 1);
+            const long status = request(objectUrl(key), false, range, value);
+            switch(status) {
+                case 206:
+                    return true;
+                // the server does not support ranges and sent the complete object
+                case 200: {
+                    const std::size_t begin = std::min(offset, value.size());
+                    const std::size_t end = std::min(offset + size, value.size());
+                    value = std::vector<char>(value.begin() + begin, value.begin() + end);
+                    return true;
+                }
+                // a range that starts after the end of the object
+                case 416:
+                    value.clear();
+                    return true;
+                case 404:
+                    return false;
+                default:
+                    throwError("reading", key, status);
+            }
+        }
+
+        inline bool exists(const std::string & key) const {
+            std::vector<char> body;
+            const long status = request(objectUrl(key), true, "", body);
+            if(status == 404) {
+                return false;
+            }
+            if(status != 200) {
+                throwError("checking", key, status);
+            }
+            return true;
+        }
+
+        inline void write(const std::string & key, const std::vector<char> & value) const {
+            checkWritable();
+        }
+
+        inline void remove(const std::string & key) const {
+            checkWritable();
+        }
+
+        inline void removePrefix(const std::string & prefix) const {
+            checkWritable();
+        }
+
+        // parse the links to sub-directories from the directory index of the server
+        inline void listChildren(const std::string & prefix, std::vector<std::string> & out) const {
+            std::vector<char> body;
+            const long status = request(directoryUrl(prefix), false, "", body);
+            if(status == 404) {
+                return;
+            }
+            if(status != 200) {
+                throwError("listing", prefix, status);
+            }
+
+            static const std::regex linkRegex("href=\"([^\"?#]+)/\"", std::regex::icase);
+            const std::string html(body.begin(), body.end());
+            std::set<std::string> children;
+            for(auto it = std::sregex_iterator(html.begin(), html.end(), linkRegex);
+                it != std::sregex_iterator(); ++it) {
+                const std::string name = store_detail::decodeLink((*it)[1].str());
+                // only keep links relative to the directory
+                if(name.empty() || name[0] == '.' || name.find('/') != std::string::npos ||
+                   name.find(':') != std::string::npos) {
+                    continue;
+                }
+                children.insert(name);
+            }
+            out.insert(out.end(), children.begin(), children.end());
+        }
+
+        // there are no directories in http, so we check for the metadata of groups and datasets
+        // and fall back to the directory index for n5 groups without attributes
+        inline bool existsPrefix(const std::string & prefix) const {
+            for(const std::string name : {".zgroup", ".zarray", "attributes.json"}) {
+                if(exists(kv::joinKey(prefix, name))) {
+                    return true;
+                }
+            }
+            std::vector<char> body;
+            return request(directoryUrl(prefix), true, "", body) == 200;
+        }
+
+        inline bool isReadOnly() const {return true;}
+
+        inline const std::string & url() const {return url_;}
+
+    private:
+
+        static std::string normalizeUrl(const std::string & url) {
+            const std::size_t end = url.find_last_not_of('/');
+            return end == std::string::npos ? "" : url.substr(0, end + 1);
+        }
+
+        inline std::string objectUrl(const std::string & key) const {
+            return key.empty() ? url_ : url_ + "/" + key;
+        }
+
+        inline std::string directoryUrl(const std::string & prefix) const {
+            return objectUrl(prefix) + "/";
+        }
+
+        [[noreturn]] inline void throwError(const std::string & what, const std::string & key,
+                                            const long status) const {
+            throw std::runtime_error("Failed " + what + " " + objectUrl(key) + ": http status " +
+                                     std::to_string(status));
+        }
+
+        // perform a GET (or HEAD) request and return the http status,
+        // throws if the request could not be performed
+        inline long request(const std::string & url, const bool headOnly, const std::string & range,
+                            std::vector<char> & body) const {
+            store_detail::HandleLease lease(*pool_);
+            CURL * handle = lease.get();
+            // resetting the handle keeps its open connections
+            curl_easy_reset(handle);
+            curl_easy_setopt(handle, CURLOPT_URL, url.c_str());
+            curl_easy_setopt(handle, CURLOPT_FOLLOWLOCATION, 1L);
+            curl_easy_setopt(handle, CURLOPT_NOSIGNAL, 1L);
+            curl_easy_setopt(handle, CURLOPT_TCP_KEEPALIVE, 1L);
+            curl_easy_setopt(handle, CURLOPT_TIMEOUT_MS, options_.timeoutMs);
+            curl_easy_setopt(handle, CURLOPT_CONNECTTIMEOUT_MS, options_.connectTimeoutMs);
+            curl_easy_setopt(handle, CURLOPT_SSL_VERIFYPEER, options_.verifyPeer ? 1L : 0L);
+            if(headOnly) {
+                curl_easy_setopt(handle, CURLOPT_NOBODY, 1L);
+            }
+            if(!range.empty()) {
+                curl_easy_setopt(handle, CURLOPT_RANGE, range.c_str());
+            }
+            body.clear();
+            curl_easy_setopt(handle, CURLOPT_WRITEFUNCTION, store_detail::writeBody);
+            curl_easy_setopt(handle, CURLOPT_WRITEDATA, &body);
+
+            const CURLcode code = curl_easy_perform(handle);
+            if(code != CURLE_OK) {
+                throw std::runtime_error("Request to " + url + " failed: " + curl_easy_strerror(code));
+            }
+            long status;
+            curl_easy_getinfo(handle, CURLINFO_RESPONSE_CODE, &status);
+            return status;
+        }
+
+        std::string url_;
+        Options options_;
+        std::unique_ptr<store_detail::HandlePool> pool_;
+    };
+
+}
+}
@@ -0,0 +1,107 @@
+#pragma once
+
+#include "z5/kv/handle.hxx"
+
+
+namespace z5 {
+namespace kv {
+
+
+namespace attrs_detail {
+
+    // read the json object stored under key, returns false if it does not exist
+    inline bool readJson(const Store & store, const std::string & key, nlohmann::json & j) {
+        std::vector<char> buffer;
+        if(!store.read(key, buffer)) {
+            return false;
+        }
+        j = nlohmann::json::parse(buffer.begin(), buffer.end());
+        return true;
+    }
+
+    inline void writeJson(const Store & store, const std::string & key,
+                          const nlohmann::json & j, const int indent=-1) {
+        const std::string serialized = j.dump(indent);
+        store.write(key, std::vector<char>(serialized.begin(), serialized.end()));
+    }
+
+    inline void readAttributes(const Store & store, const std::string & key, nlohmann::json & j) {
+        readJson(store, key, j);
+    }
+
+    inline void writeAttributes(const Store & store, const std::string & key, const nlohmann::json & j) {
+        nlohmann::json jOut;
+        // if we already have attributes, read them
+        readJson(store, key, jOut);
+        for(auto jIt = j.begin(); jIt != j.end(); ++jIt) {
+            jOut[jIt.key()] = jIt.value();
+        }
+        writeJson(store, key, jOut);
+    }
+
+    inline void removeAttribute(const Store & store, const std::string & key, const std::string & name) {
+        nlohmann::json jOut;
+        if(!readJson(store, key, jOut)) {
+            return;
+        }
+        jOut.erase(name);
+        writeJson(store, key, jOut);
+    }
+
+    inline std::string attributesKey(const z5::handle::Handle & handle) {
+        return handle::getImpl(handle).childKey(handle.isZarr() ? ".zattrs" : "attributes.json");
+    }
+}
+
+    template<class GROUP>
+    inline void readAttributes(const z5::handle::Group<GROUP> & group, nlohmann::json & j) {
+        attrs_detail::readAttributes(*handle::getImpl(group).store(), attrs_detail::attributesKey(group), j);
+    }
+
+    template<class GROUP>
+    inline void writeAttributes(const z5::handle::Group<GROUP> & group, const nlohmann::json & j) {
+        attrs_detail::writeAttributes(*handle::getImpl(group).store(), attrs_detail::attributesKey(group), j);
+    }
+
+    template<class GROUP>
+    inline void removeAttribute(const z5::handle::Group<GROUP> & group, const std::string & key) {
+        attrs_detail::removeAttribute(*handle::getImpl(group).store(), attrs_detail::attributesKey(group), key);
+    }
+
+
+    template<class DATASET>
+    inline void readAttributes(const z5::handle::Dataset<DATASET> & ds, nlohmann::json & j) {
+        attrs_detail::readAttributes(*handle::getImpl(ds).store(), attrs_detail::attributesKey(ds), j);
+    }
+
+    template<class DATASET>
+    inline void writeAttributes(const z5::handle::Dataset<DATASET> & ds, const nlohmann::json & j) {
+        attrs_detail::writeAttributes(*handle::getImpl(ds).store(), attrs_detail::attributesKey(ds), j);
+    }
+
+    template<class DATASET>
+    inline void removeAttribute(const z5::handle::Dataset<DATASET> & ds, const std::string & key) {
+        attrs_detail::removeAttribute(*handle::getImpl(ds).store(), attrs_detail::attributesKey(ds), key);
+    }
+
+
+    template<class GROUP>
+    inline bool isSubGroup(const z5::handle::Group<GROUP> & group, const std::string & key){
+        const auto & impl = handle::getImpl(group);
+        const auto & store = *impl.store();
+        const std::string childKey = impl.childKey(key);
+        if(!store.existsPrefix(childKey)) {
+            return false;
+        }
+        if(group.isZarr()) {
+            return store.exists(joinKey(childKey, ".zgroup"));
+        }
+        nlohmann::json j;
+        if(!attrs_detail::readJson(store, joinKey(childKey, "attributes.json"), j)) {
+            return true;
+        }
+        return !z5::handle::hasAllN5DatasetAttributes(j);
+    }
+
+}
+}
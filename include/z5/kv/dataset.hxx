@@ -0,0 +1,254 @@
+#pragma once
+
+#include <cstring>
+
+#include "z5/dataset.hxx"
+#include "z5/kv/handle.hxx"
+
+
+namespace z5 {
+namespace kv {
+
+
+    template<typename T>
+    class Dataset : public z5::Dataset, private z5::MixinTyped<T> {
+
+    public:
+
+        typedef T value_type;
+        typedef types::ShapeType shape_type;
+        typedef z5::MixinTyped<T> Mixin;
+        typedef z5::Dataset BaseType;
+
+        // create a new array with metadata
+        Dataset(const handle::Dataset & handle,
+                const DatasetMetadata & metadata) : BaseType(metadata),
+                                                    Mixin(metadata),
+                                                    handle_(handle),
+                                                    store_(*handle.store()){
+        }
+
+        //
+        // Implement Dataset API
+        //
+
+        inline void writeChunk(const types::ShapeType & chunkIndices, const void * dataIn,
+                               const bool isVarlen=false, const std::size_t varSize=0) const {
+
+            // check if we are allowed to write
+            if(!handle_.mode().canWrite()) {
+                const std::string err = "Cannot write data in file mode " + handle_.mode().printMode();
+                throw std::invalid_argument(err.c_str());
+            }
+
+            // create chunk handle and check if this chunk is valid
+            handle::Chunk chunk(handle_, isZarr_, chunkIndices, defaultChunkShape(), shape(), dimensionSeparator_);
+            checkChunk(chunk, isVarlen);
+
+            // create the output buffer and format the data
+            std::vector<char> buffer;
+            // data_to_buffer will return false if there's nothing to write
+            if(!util::data_to_buffer(chunk, dataIn, buffer, Mixin::compressor_, Mixin::filters_, Mixin::fillValue_, isVarlen, varSize)) {
+                // if we have data in the store for the chunk, delete it
+                store_.remove(chunk.key());
+                return;
+            }
+            store_.write(chunk.key(), buffer);
+        }
+
+
+        // read a chunk
+        // IMPORTANT we assume that the data pointer is already initialized up to chunkSize_
+        inline bool readChunk(const types::ShapeType & chunkIndices, void * dataOut) const {
+            bool isVarlen;
+            if(!readChunkIfExists(chunkIndices, dataOut, isVarlen)) {
+                throw std::runtime_error("Trying to read a chunk that does not exist");
+            }
+            return isVarlen;
+        }
+
+
+        // we don't check for existence separately to save a request
+        inline bool readChunkIfExists(const types::ShapeType & chunkIndices, void * dataOut, bool & isVarlen) const {
+            handle::Chunk chunk(handle_, isZarr_, chunkIndices, defaultChunkShape(), shape(), dimensionSeparator_);
+            checkChunk(chunk);
+
+            std::vector<char> buffer;
+            if(!store_.read(chunk.key(), buffer)) {
+                return false;
+            }
+
+            // format the data
+            isVarlen = util::buffer_to_data<T>(chunk, buffer, dataOut, Mixin::compressor_, Mixin::filters_);
+            return true;
+        }
+
+
+        inline bool readRawChunk(const types::ShapeType & chunkIndices, std::vector<char> & buffer) const {
+            handle::Chunk chunk(handle_, isZarr_, chunkIndices, defaultChunkShape(), shape(), dimensionSeparator_);
+            checkChunk(chunk);
+            return store_.read(chunk.key(), buffer);
+        }
+
+
+        inline bool getRawChunkSize(const types::ShapeType & chunkIndices, std::size_t & size) const {
+            handle::Chunk chunk(handle_, isZarr_, chunkIndices, defaultChunkShape(), shape(), dimensionSeparator_);
+            checkChunk(chunk);
+            return store_.objectSize(chunk.key(), size);
+        }
+
+
+        inline void writeRawChunk(const types::ShapeType & chunkIndices, const std::vector<char> & buffer) const {
+            // check if we are allowed to write
+            if(!handle_.mode().canWrite()) {
+                const std::string err = "Cannot write data in file mode " + handle_.mode().printMode();
+                throw std::invalid_argument(err.c_str());
+            }
+            handle::Chunk chunk(handle_, isZarr_, chunkIndices, defaultChunkShape(), shape(), dimensionSeparator_);
+            checkChunk(chunk);
+            store_.write(chunk.key(), buffer);
+        }
+
+
+        inline void checkRequestType(const std::type_info & type) const {
+            if(type != typeid(T)) {
+                // TODO all in error message
+                std::cout << "Mytype: " << typeid(T).name() << " your type: " << type.name() << std::endl;
+                throw std::runtime_error("Request has wrong type");
+            }
+        }
+
+        inline bool chunkExists(const types::ShapeType & chunkId) const {
+            handle::Chunk chunk(handle_, isZarr_, chunkId, defaultChunkShape(), shape(), dimensionSeparator_);
+            return chunk.exists();
+        }
+
+
+        inline std::size_t getChunkSize(const types::ShapeType & chunkId) const {
+            handle::Chunk chunk(handle_, isZarr_, chunkId, defaultChunkShape(), shape(), dimensionSeparator_);
+            return chunk.size();
+        }
+
+
+        inline void getChunkShape(const types::ShapeType & chunkId, types::ShapeType & chunkShape) const {
+            handle::Chunk chunk(handle_, isZarr_, chunkId, defaultChunkShape(), shape(), dimensionSeparator_);
+            const auto & cshape = chunk.shape();
+            chunkShape.resize(cshape.size());
+            std::copy(cshape.begin(), cshape.end(), chunkShape.begin());
+        }
+
+
+        inline std::size_t getChunkShape(const types::ShapeType & chunkId, const unsigned dim) const {
+            handle::Chunk chunk(handle_, isZarr_, chunkId, defaultChunkShape(), shape(), dimensionSeparator_);
+            const auto & cshape = chunk.shape();
+            return cshape[dim];
+        }
+
+
+        // compression options
+        inline types::Compressor getCompressor() const {return Mixin::compressor_->type();}
+        inline void getCompressor(std::string & compressor) const {
+            auto compressorType = getCompressor();
+            if(compressorType == types::plugin) {
+                types::CompressionOptions opts;
+                getCompressionOptions(opts);
+                compressor = boost::get<std::string>(opts["id"]);
+                return;
+            }
+            compressor = isZarr_ ? types::Compressors::compressorToZarr()[compressorType] : types::Compressors::compressorToN5()[compressorType];
+        }
+        inline void getCompressionOptions(types::CompressionOptions & opts) const {
+            Mixin::compressor_->getOptions(opts);
+        }
+
+
+        inline void getFillValue(void * fillValue) const {
+            *((T*) fillValue) = Mixin::fillValue_;
+        }
+
+
+        inline bool checkVarlenChunk(const types::ShapeType & chunkId, std::size_t & chunkSize) const {
+            handle::Chunk chunk(handle_, isZarr_, chunkId, defaultChunkShape(), shape(), dimensionSeparator_);
+            if(isZarr_) {
+                chunkSize = chunk.size();
+                return false;
+            }
+
+            // we only need the header: mode, number of dimensions, shape and varlength
+            std::vector<char> header;
+            const std::size_t headerSize = 4 + 4 * dimension() + 4;
+            if(!store_.readRange(chunk.key(), 0, headerSize, header) || header.size() < headerSize) {
+                chunkSize = chunk.size();
+                return false;
+            }
+
+            uint16_t mode;
+            std::memcpy(&mode, &header[0], 2);
+            util::reverseEndiannessInplace(mode);
+            if(mode == 0) {
+                chunkSize = chunk.size();
+                return false;
+            }
+
+            uint32_t varlength;
+            std::memcpy(&varlength, &header[headerSize - 4], 4);
+            util::reverseEndiannessInplace(varlength);
+            chunkSize = varlength;
+            return true;
+        }
+
+        inline const FileMode & mode() const {
+            return handle_.mode();
+        }
+        // datasets in a key-value store have no path on the filesystem
+        inline const fs::path & path() const {
+            throw std::runtime_error("Datasets in a key-value store don't have a filesystem path");
+        }
+        inline void chunkPath(const types::ShapeType & chunkId, fs::path & path) const {
+            throw std::runtime_error("Chunks in a key-value store don't have a filesystem path");
+        }
+        inline void removeChunk(const types::ShapeType & chunkId) const {
+            handle::Chunk chunk(handle_, isZarr_, chunkId, defaultChunkShape(), shape(), dimensionSeparator_);
+            chunk.remove();
+        }
+        inline void remove() const {
+            handle_.remove();
+        }
+
+        // the key of the dataset relative to the root of the store
+        inline const std::string & key() const {
+            return handle_.key();
+        }
+
+        // delete copy constructor and assignment operator
+        // because the compressor cannot be copied by default
+        // and we don't really need this to be copyable afaik
+        // if this changes at some point, we need to provide a proper
+        // implementation here
+        Dataset(const Dataset & that) = delete;
+        Dataset & operator=(const Dataset & that) = delete;
+
+    private:
+
+        // check that the chunk handle is valid
+        inline void checkChunk(const handle::Chunk & chunk,
+                               const bool isVarlen=false) const {
+            // check dimension
+            const auto & chunkIndices = chunk.chunkIndices();
+            if(!chunking_.checkBlockCoordinate(chunkIndices)) {
+                throw std::runtime_error("Invalid chunk");
+            }
+            // varlen chunks are only supported in n5
+            if(isVarlen && isZarr_) {
+                throw std::runtime_error("Varlength chunks are not supported in zarr");
+            }
+        }
+
+    private:
+        handle::Dataset handle_;
+        const Store & store_;
+    };
+
+
+}
+}
@@ -0,0 +1,73 @@
+#pragma once
+
+#include <fstream>
+#include <iterator>
+
+#include "z5/common.hxx"
+#include "z5/kv/store.hxx"
+
+
+// helpers to convert between the objects of a key-value store and the files of a
+// filesystem container: the keys of the key-value layout are the paths of the files
+// relative to the root of the container
+namespace z5 {
+namespace kv {
+
+
+    // list the keys of all files below `root`, in sorted order
+    inline void listDirectoryKeys(const fs::path & root, std::vector<std::string> & keys) {
+        if(!fs::is_directory(root)) {
+            throw std::invalid_argument(root.string() + " is not a directory");
+        }
+        const std::string rootStr = root.string();
+        for(auto it = fs::recursive_directory_iterator(root); it != fs::recursive_directory_iterator(); ++it) {
+            if(!fs::is_regular_file(it->path())) {
+                continue;
+            }
+            std::string key = it->path().string().substr(rootStr.size());
+            std::replace(key.begin(), key.end(), '\\', '/');
+            keys.emplace_back(key.substr(key.find_first_not_of('/')));
+        }
+        std::sort(keys.begin(), keys.end());
+    }
+
+
+    inline void readFile(const fs::path & path, std::vector<char> & value) {
+        std::ifstream file(path.string(), std::ios::binary);
+        if(!file) {
+            throw std::runtime_error("Failed to open " + path.string());
+        }
+        value.assign(std::istreambuf_iterator<char>(file), std::istreambuf_iterator<char>());
+    }
+
+
+    // check that the file for `key` stays below the root: the keys can come from archives
+    // written by other tools, which must not overwrite files outside of the container
+    inline void checkKey(const std::string & key) {
+        const fs::path keyPath(key);
+        if(key.empty() || keyPath.has_root_path()) {
+            throw std::runtime_error("Invalid key \"" + key + "\", keys must be relative paths");
+        }
+        for(const auto & part : keyPath) {
+            if(part.string() == "..") {
+                throw std::runtime_error("Invalid key \"" + key + "\", keys must not refer to parent directories");
+            }
+        }
+    }
+
+
+    // write the file for `key` below `root`, creating the parent directories
+    inline void writeFile(const fs::path & root, const std::string & key,
+                          const char * data, const std::size_t size) {
+        checkKey(key);
+        const fs::path path = root / key;
+        fs::create_directories(path.parent_path());
+        std::ofstream file(path.string(), std::ios::binary);
+        if(!file) {
+            throw std::runtime_error("Failed to open " + path.string());
+        }
+        file.write(data, size);
+    }
+
+}
+}
@@ -0,0 +1,177 @@
+#pragma once
+
+#include "z5/kv/metadata.hxx"
+#include "z5/kv/dataset.hxx"
+#include "z5/kv/hierarchy.hxx"
+#include "z5/util/threadpool.hxx"
+
+
+namespace z5 {
+namespace kv {
+
+
+    // factory function to open an existing dataset
+    inline std::unique_ptr<z5::Dataset> openDataset(const handle::Dataset & dataset) {
+
+        // make sure that the dataset exists
+        if(!dataset.exists()) {
+            throw std::runtime_error("Opening dataset failed because it does not exists.");
+        }
+
+        DatasetMetadata metadata;
+        readMetadata(dataset, metadata);
+
+        // make the ptr to the DatasetTyped of appropriate dtype
+        std::unique_ptr<z5::Dataset> ptr;
+        switch(metadata.dtype) {
+            case types::int8:
+                ptr.reset(new Dataset<int8_t>(dataset, metadata)); break;
+            case types::int16:
+                ptr.reset(new Dataset<int16_t>(dataset, metadata)); break;
+            case types::int32:
+                ptr.reset(new Dataset<int32_t>(dataset, metadata)); break;
+            case types::int64:
+                ptr.reset(new Dataset<int64_t>(dataset, metadata)); break;
+            case types::uint8:
+                ptr.reset(new Dataset<uint8_t>(dataset, metadata)); break;
+            case types::uint16:
+                ptr.reset(new Dataset<uint16_t>(dataset, metadata)); break;
+            case types::uint32:
+                ptr.reset(new Dataset<uint32_t>(dataset, metadata)); break;
+            case types::uint64:
+                ptr.reset(new Dataset<uint64_t>(dataset, metadata)); break;
+            case types::float32:
+                ptr.reset(new Dataset<float>(dataset, metadata)); break;
+            case types::float64:
+                ptr.reset(new Dataset<double>(dataset, metadata)); break;
+        }
+        return ptr;
+    }
+
+
+    // factory function to create a dataset
+    inline std::unique_ptr<z5::Dataset> createDataset(
+        const handle::Dataset & dataset,
+        const DatasetMetadata & metadata
+    ) {
+        dataset.create();
+        writeMetadata(dataset, metadata);
+
+        // make the ptr to the DatasetTyped of appropriate dtype
+        std::unique_ptr<z5::Dataset> ptr;
+        switch(metadata.dtype) {
+            case types::int8:
+                ptr.reset(new Dataset<int8_t>(dataset, metadata)); break;
+            case types::int16:
+                ptr.reset(new Dataset<int16_t>(dataset, metadata)); break;
+            case types::int32:
+                ptr.reset(new Dataset<int32_t>(dataset, metadata)); break;
+            case types::int64:
+                ptr.reset(new Dataset<int64_t>(dataset, metadata)); break;
+            case types::uint8:
+                ptr.reset(new Dataset<uint8_t>(dataset, metadata)); break;
+            case types::uint16:
+                ptr.reset(new Dataset<uint16_t>(dataset, metadata)); break;
+            case types::uint32:
+                ptr.reset(new Dataset<uint32_t>(dataset, metadata)); break;
+            case types::uint64:
+                ptr.reset(new Dataset<uint64_t>(dataset, metadata)); break;
+            case types::float32:
+                ptr.reset(new Dataset<float>(dataset, metadata)); break;
+            case types::float64:
+                ptr.reset(new Dataset<double>(dataset, metadata)); break;
+        }
+        return ptr;
+    }
+
+
+    template<class GROUP>
+    inline void createFile(const z5::handle::File<GROUP> & file, const bool isZarr) {
+        file.create();
+        Metadata fmeta(isZarr);
+        writeMetadata(file, fmeta);
+    }
+
+
+    inline void createGroup(const handle::Group & group, const bool isZarr) {
+        group.create();
+        Metadata fmeta(isZarr);
+        writeMetadata(group, fmeta);
+    }
+
+
+    // move the chunks of a zarr dataset between the flat ('.') and nested ('/') layout in parallel;
+    // the metadata is only updated once all chunks were moved
+    inline void setDimensionSeparator(const handle::Dataset & dataset,
+                                      const std::string & dimensionSeparator,
+                                      const int nThreads=1) {
+        if(!dataset.mode().canWrite()) {
+            const std::string err = "Cannot change the chunk layout in file mode " + dataset.mode().printMode();
+            throw std::invalid_argument(err.c_str());
+        }
+        if(dimensionSeparator != "." && dimensionSeparator != "/") {
+            throw std::invalid_argument("Invalid dimension separator: must be '.' or '/'");
+        }
+        DatasetMetadata metadata;
+        readMetadata(dataset, metadata);
+        if(!metadata.isZarr) {
+            throw std::invalid_argument("The chunk layout can only be changed for zarr datasets");
+        }
+        if(metadata.dimensionSeparator == dimensionSeparator) {
+            return;
+        }
+
+        // the chunk keys of both layouts agree for 1d datasets
+        if(metadata.shape.size() > 1) {
+            const auto & store = dataset.store();
+            const util::Blocking chunking(metadata.shape, metadata.chunkShape);
+            util::parallel_foreach(nThreads, chunking.numberOfBlocks(), [&](const int tid, const std::size_t chunkIndex){
+                types::ShapeType chunkId;
+                chunking.blockIdToBlockCoordinate(chunkIndex, chunkId);
+                handle::Chunk src(dataset, true, chunkId, metadata.chunkShape, metadata.shape,
+                                  metadata.dimensionSeparator);
+                std::vector<char> value;
+                if(!store->read(src.key(), value)) {
+                    return;
+                }
+                handle::Chunk dst(dataset, true, chunkId, metadata.chunkShape, metadata.shape,
+                                  dimensionSeparator);
+                store->write(dst.key(), value);
+                store->remove(src.key());
+            });
+        }
+
+        metadata.dimensionSeparator = dimensionSeparator;
+        writeMetadata(dataset, metadata);
+    }
+
+
+    // keys are relative to the root of the store, so the relative path is purely lexical
+    template<class GROUP1, class GROUP2>
+    inline std::string relativePath(const z5::handle::Group<GROUP1> & g1,
+                                    const GROUP2 & g2) {
+        const std::string & key1 = handle::getImpl(g1).key();
+        const std::string & key2 = handle::getImpl(g2).key();
+        std::vector<std::string> parts1, parts2;
+        if(!key1.empty()) {
+            util::split(key1, parts1, "/");
+        }
+        if(!key2.empty()) {
+            util::split(key2, parts2, "/");
+        }
+        const auto mismatch = std::mismatch(parts1.begin(), parts1.end(), parts2.begin(), parts2.end());
+
+        std::vector<std::string> relative(std::distance(mismatch.second, parts2.end()), "..");
+        relative.insert(relative.end(), mismatch.first, parts1.end());
+        if(relative.empty()) {
+            return ".";
+        }
+        std::string out;
+        for(const auto & part : relative) {
+            out = joinKey(out, part);
+        }
+        return out;
+    }
+
+}
+}
@@ -0,0 +1,318 @@
+#pragma once
+
+#include <memory>
+#include <string>
+
+#include "z5/handle.hxx"
+#include "z5/util/util.hxx"
+#include "z5/types/types.hxx"
+#include "z5/kv/store.hxx"
+
+
+namespace z5 {
+namespace kv {
+namespace handle {
+
+
+    class HandleImpl {
+
+    public:
+        HandleImpl(const std::shared_ptr<Store> & store, const std::string & key)
+            : store_(store), key_(key), path_(key) {
+            if(!store_) {
+                throw std::invalid_argument("Invalid store");
+            }
+        }
+
+        inline const std::shared_ptr<Store> & store() const {
+            return store_;
+        }
+
+        // key of this object relative to the root of the store
+        inline const std::string & key() const {
+            return key_;
+        }
+
+        inline std::string childKey(const std::string & name) const {
+            return joinKey(key_, name);
+        }
+
+        inline bool prefixExists() const {
+            return store_->existsPrefix(key_);
+        }
+
+        inline const fs::path & getPath() const {
+            return path_;
+        }
+
+        inline bool isZarrDataset() const {
+            if(!prefixExists()) {
+               throw std::runtime_error("Cannot infer zarr format because the dataset has not been created yet.");
+            }
+            return store_->exists(childKey(".zarray"));
+        }
+
+        inline bool isZarrGroup() const {
+            if(!prefixExists()) {
+               throw std::runtime_error("Cannot infer zarr format because the group has not been created yet.");
+            }
+            return store_->exists(childKey(".zgroup"));
+        }
+
+        inline void listSubDirs(std::vector<std::string> & out) const {
+            store_->listChildren(key_, out);
+        }
+
+        inline bool elementExists(const std::string & name) const {
+            return store_->existsPrefix(childKey(name));
+        }
+
+        inline void removePrefix() const {
+            store_->removePrefix(key_);
+        }
+
+    private:
+        std::shared_ptr<Store> store_;
+        std::string key_;
+        // the key as path, so that we can implement the handle API
+        fs::path path_;
+    };
+
+
+    // get the key-value store implementation of a handle, throws if the
+    // handle belongs to a different backend
+    inline const HandleImpl & getImpl(const z5::handle::Handle & handle) {
+        const auto * impl = dynamic_cast<const HandleImpl *>(&handle);
+        if(impl == nullptr) {
+            throw std::runtime_error("Expected a handle of a key-value store");
+        }
+        return *impl;
+    }
+
+
+    class Group : public z5::handle::Group<Group>, public HandleImpl {
+    public:
+        typedef z5::handle::Group<Group> BaseType;
+        typedef Group GroupType;
+
+        template<class GROUP>
+        Group(const z5::handle::Group<GROUP> & group, const std::string & key)
+            : BaseType(group.mode()), HandleImpl(getImpl(group).store(), getImpl(group).childKey(key)) {
+        }
+
+        // Implement th handle API
+        inline bool isS3() const {return store()->isS3();}
+        inline bool isGcs() const {return store()->isGcs();}
+        inline bool isKeyValueStore() const {return true;}
+        inline bool exists() const {return prefixExists();}
+        inline bool isZarr() const {return isZarrGroup();}
+        inline const fs::path & path() const {return getPath();}
+
+        // there are no directories in a key-value store, so the group
+        // only comes into existence when its metadata is written
+        inline void create() const {
+            if(mode().mode() == FileMode::modes::r) {
+                const std::string err = "Cannot create new group in file mode " + mode().printMode();
+                throw std::invalid_argument(err.c_str());
+            }
+            if(exists()) {
+                throw std::invalid_argument("Creating new group failed because it already exists.");
+            }
+        }
+
+        inline void remove() const {
+            if(!mode().canWrite()) {
+                const std::string err = "Cannot remove group in file mode " + mode().printMode();
+                throw std::invalid_argument(err.c_str());
+            }
+            if(!exists()) {
+                throw std::invalid_argument("Cannot remove non-existing group.");
+            }
+            removePrefix();
+        }
+
+        // Implement the group handle API
+        inline void keys(std::vector<std::string> & out) const {
+            listSubDirs(out);
+        }
+        inline bool in(const std::string & key) const {
+            return elementExists(key);
+        }
+    };
+
+
+    // the file corresponds to the root of the store
+    class File : public z5::handle::File<File>, public HandleImpl {
+    public:
+        typedef z5::handle::File<File> BaseType;
+        typedef Group GroupType;
+
+        File(const std::shared_ptr<Store> & store, const FileMode mode=FileMode())
+            : BaseType(mode), HandleImpl(store, "") {
+        }
+
+        // Implement th handle API
+        inline bool isS3() const {return store()->isS3();}
+        inline bool isGcs() const {return store()->isGcs();}
+        inline bool isKeyValueStore() const {return true;}
+        inline bool exists() const {return prefixExists();}
+        inline bool isZarr() const {return isZarrGroup();}
+        inline const fs::path & path() const {return getPath();}
+
+        inline void create() const {
+            if(!mode().canCreate()) {
+                const std::string err = "Cannot create new file in file mode " + mode().printMode();
+                throw std::invalid_argument(err.c_str());
+            }
+            if(exists()) {
+                throw std::invalid_argument("Creating new file failed because it already exists.");
+            }
+        }
+
+        inline void remove() const {
+            if(!mode().canWrite()) {
+                const std::string err = "Cannot remove file in file mode " + mode().printMode();
+                throw std::invalid_argument(err.c_str());
+            }
+            if(!exists()) {
+                throw std::invalid_argument("Cannot remove non-existing file.");
+            }
+            removePrefix();
+        }
+
+        // Implement the group handle API
+        inline void keys(std::vector<std::string> & out) const {
+            listSubDirs(out);
+        }
+        inline bool in(const std::string & key) const {
+            return elementExists(key);
+        }
+    };
+
+
+    class Dataset : public z5::handle::Dataset<Dataset>, public HandleImpl {
+    public:
+        typedef z5::handle::Dataset<Dataset> BaseType;
+
+        template<class GROUP>
+        Dataset(const z5::handle::Group<GROUP> & group, const std::string & key)
+            : BaseType(group.mode()), HandleImpl(getImpl(group).store(), getImpl(group).childKey(key)) {
+        }
+
+        Dataset(const std::shared_ptr<Store> & store, const std::string & key, const FileMode & mode)
+            : BaseType(mode), HandleImpl(store, key) {}
+
+        inline bool isS3() const {return store()->isS3();}
+        inline bool isGcs() const {return store()->isGcs();}
+        inline bool isKeyValueStore() const {return true;}
+        inline bool exists() const {return prefixExists();}
+        inline bool isZarr() const {return isZarrDataset();}
+        inline const fs::path & path() const {return getPath();}
+
+        inline void create() const {
+            // check if we have permissions to create a new dataset
+            if(mode().mode() == FileMode::modes::r) {
+                const std::string err = "Cannot create new dataset in mode " + mode().printMode();
+                throw std::invalid_argument(err.c_str());
+            }
+            // make sure that the file does not exist already
+            if(exists()) {
+                throw std::invalid_argument("Creating new dataset failed because it already exists.");
+            }
+        }
+
+        inline void remove() const {
+            if(!mode().canWrite()) {
+                const std::string err = "Cannot remove dataset in dataset mode " + mode().printMode();
+                throw std::invalid_argument(err.c_str());
+            }
+            if(!exists()) {
+                throw std::invalid_argument("Cannot remove non-existing dataset.");
+            }
+            removePrefix();
+        }
+
+    };
+
+
+    class Chunk : public z5::handle::Chunk<Chunk> {
+    public:
+        typedef z5::handle::Chunk<Chunk> BaseType;
+
+        Chunk(const Dataset & ds,
+              const bool isZarr,
+              const types::ShapeType & chunkIndices,
+              const types::ShapeType & chunkShape,
+              const types::ShapeType & shape,
+              const std::string & dimensionSeparator=".") : BaseType(chunkIndices, chunkShape, shape, ds.mode()),
+                                                            dsHandle_(ds),
+                                                            isZarr_(isZarr),
+                                                            dimensionSeparator_(dimensionSeparator),
+                                                            key_(constructKey()),
+                                                            path_(key_){}
+
+        // there are no directories in a key-value store, so we don't need to do anything
+        inline void create() const {
+        }
+
+        inline const Dataset & datasetHandle() const {
+            return dsHandle_;
+        }
+
+        inline bool isZarr() const {
+            return isZarr_;
+        }
+
+        inline const std::string & key() const {
+            return key_;
+        }
+
+        inline const fs::path & path() const {
+            return path_;
+        }
+
+        inline bool exists() const {
+            return dsHandle_.store()->exists(key_);
+        }
+
+        inline void remove() const {
+            if(!mode().canWrite()) {
+                const std::string err = "Cannot remove chunk in mode " + mode().printMode();
+                throw std::invalid_argument(err.c_str());
+            }
+            dsHandle_.store()->remove(key_);
+        }
+
+        inline bool isS3() const {return dsHandle_.isS3();}
+        inline bool isGcs() const {return dsHandle_.isGcs();}
+        inline bool isKeyValueStore() const {return true;}
+
+    private:
+
+        // produce the key from the dataset key, chunk indices and the format
+        // (the format is passed in to avoid querying the store for every chunk)
+        inline std::string constructKey() const {
+            const auto & indices = chunkIndices();
+            std::string name;
+            // if we have the zarr-format, chunk indices are seperated by the dimension separator
+            if(isZarr_) {
+                util::join(indices.begin(), indices.end(), name, dimensionSeparator_);
+            }
+            // otherwise (n5-format), each chunk index has its own prefix in reverse order
+            else {
+                std::string delimiter = "/";
+                util::join(indices.rbegin(), indices.rend(), name, delimiter);
+            }
+            return dsHandle_.childKey(name);
+        }
+
+        const Dataset & dsHandle_;
+        bool isZarr_;
+        std::string dimensionSeparator_;
+        std::string key_;
+        fs::path path_;
+    };
+
+} // namespace::handle
+} // namespace::kv
+} // namespace::z5
@@ -0,0 +1,87 @@
+#pragma once
+
+#include "z5/metadata.hxx"
+#include "z5/kv/handle.hxx"
+#include "z5/kv/attributes.hxx"
+
+
+namespace z5 {
+namespace kv {
+
+namespace hierarchy_detail {
+
+    // read shape, dtype and chunks from the dataset metadata without opening the dataset
+    inline void readDatasetSummary(const nlohmann::json & j, const bool isZarr, HierarchyEntry & entry) {
+        if(isZarr) {
+            entry.shape = types::ShapeType(j["shape"].begin(), j["shape"].end());
+            entry.chunks = types::ShapeType(j["chunks"].begin(), j["chunks"].end());
+            const auto dtype = types::Datatypes::zarrToDtype().at(j["dtype"]);
+            entry.dtype = types::Datatypes::dtypeToN5().at(dtype);
+        } else {
+            // N5-Axis order: we need to reverse shape and chunks
+            entry.shape = types::ShapeType(j["dimensions"].rbegin(), j["dimensions"].rend());
+            entry.chunks = types::ShapeType(j["blockSize"].rbegin(), j["blockSize"].rend());
+            entry.dtype = j["dataType"].get<std::string>();
+        }
+    }
+
+
+    // classify the object at key as group or dataset and read the metadata of datasets,
+    // returns false if it is neither
+    inline bool classify(const Store & store, const std::string & key, const bool isZarr,
+                         bool & isDataset, nlohmann::json & j) {
+        if(isZarr) {
+            isDataset = attrs_detail::readJson(store, joinKey(key, ".zarray"), j);
+            return isDataset || store.exists(joinKey(key, ".zgroup"));
+        }
+        if(!attrs_detail::readJson(store, joinKey(key, "attributes.json"), j)) {
+            isDataset = false;
+            return true;
+        }
+        isDataset = z5::handle::hasAllN5DatasetAttributes(j);
+        return true;
+    }
+
+
+    inline void walk(const Store & store, const std::string & key, const std::string & prefix,
+                     const bool isZarr, std::vector<HierarchyEntry> & out) {
+        // we sort the children to make the iteration order deterministic
+        std::vector<std::string> children;
+        store.listChildren(key, children);
+        std::sort(children.begin(), children.end());
+
+        bool isDataset;
+        nlohmann::json j;
+        for(const auto & name : children) {
+            const std::string childKey = joinKey(key, name);
+            if(!classify(store, childKey, isZarr, isDataset, j)) {
+                continue;
+            }
+            HierarchyEntry entry;
+            entry.path = joinKey(prefix, name);
+            entry.isDataset = isDataset;
+            if(isDataset) {
+                readDatasetSummary(j, isZarr, entry);
+                out.emplace_back(std::move(entry));
+            } else {
+                const std::string path = entry.path;
+                out.emplace_back(std::move(entry));
+                // datasets are leaves, so we only recurse into groups
+                walk(store, childKey, path, isZarr, out);
+            }
+        }
+    }
+}
+
+
+    // list all groups and datasets below the group,
+    // paths are given relative to the group and groups are listed before their members
+    template<class GROUP>
+    inline void listHierarchy(const z5::handle::Group<GROUP> & group,
+                              std::vector<HierarchyEntry> & out) {
+        const auto & impl = handle::getImpl(group);
+        hierarchy_detail::walk(*impl.store(), impl.key(), "", group.isZarr(), out);
+    }
+
+}
+}
@@ -0,0 +1,103 @@
+#pragma once
+
+#include "z5/metadata.hxx"
+#include "z5/kv/attributes.hxx"
+
+namespace z5 {
+namespace kv {
+
+namespace metadata_detail {
+
+    inline bool getMetadataKey(const handle::Dataset & handle, std::string & key) {
+        const auto & store = *handle.store();
+        const std::string zarrKey = handle.childKey(".zarray");
+        const std::string n5Key = handle.childKey("attributes.json");
+        const bool zarrExists = store.exists(zarrKey);
+        const bool n5Exists = store.exists(n5Key);
+        if(zarrExists && n5Exists) {
+            throw std::runtime_error("Zarr and N5 specification are not both supported");
+        }
+        if(!zarrExists && !n5Exists){
+            throw std::runtime_error("Invalid path: no metadata existing");
+        }
+        key = zarrExists ? zarrKey : n5Key;
+        return zarrExists;
+    }
+}
+
+    template<class GROUP>
+    inline void writeMetadata(const z5::handle::File<GROUP> & handle, const Metadata & metadata) {
+        const auto & impl = handle::getImpl(handle);
+        const bool isZarr = metadata.isZarr;
+        const std::string key = impl.childKey(isZarr ? ".zgroup" : "attributes.json");
+        nlohmann::json j;
+        if(isZarr) {
+            j["zarr_format"] = metadata.zarrFormat;
+        } else {
+            // n5 stores attributes and metadata in the same object,
+            // so we need to make sure that we don't ovewrite attributes
+            attrs_detail::readJson(*impl.store(), key, j);
+            j["n5"] = metadata.n5Format();
+        }
+        attrs_detail::writeJson(*impl.store(), key, j, 4);
+    }
+
+
+    template<class GROUP>
+    inline void writeMetadata(const z5::handle::Group<GROUP> & handle, const Metadata & metadata) {
+        const auto & impl = handle::getImpl(handle);
+        const bool isZarr = metadata.isZarr;
+        const std::string key = impl.childKey(isZarr ? ".zgroup" : "attributes.json");
+        nlohmann::json j;
+        if(isZarr) {
+            j["zarr_format"] = metadata.zarrFormat;
+        } else {
+            // n5 groups don't need metadata, but a group only exists in the store
+            // if there is an object below it, so we write empty attributes
+            if(impl.store()->exists(key)) {
+                return;
+            }
+            j = nlohmann::json::object();
+        }
+        attrs_detail::writeJson(*impl.store(), key, j, 4);
+    }
+
+
+    inline void writeMetadata(const handle::Dataset & handle, const DatasetMetadata & metadata) {
+        const std::string key = handle.childKey(metadata.isZarr ? ".zarray" : "attributes.json");
+        nlohmann::json j;
+        metadata.toJson(j);
+        attrs_detail::writeJson(*handle.store(), key, j, 4);
+    }
+
+
+    template<class GROUP>
+    inline void readMetadata(const z5::handle::Group<GROUP> & handle, nlohmann::json & j) {
+        const auto & impl = handle::getImpl(handle);
+        const bool isZarr = handle.isZarr();
+        const std::string key = impl.childKey(isZarr ? ".zgroup" : "attributes.json");
+        nlohmann::json jTmp;
+        if(!attrs_detail::readJson(*impl.store(), key, jTmp)) {
+            throw std::runtime_error("Invalid path: no metadata existing");
+        }
+        if(isZarr) {
+            j["zarr_format"] = jTmp["zarr_format"];
+        } else {
+            auto jIt = jTmp.find("n5");
+            if(jIt != jTmp.end()) {
+                j["n5"] = jIt.value();
+            }
+        }
+    }
+
+
+    inline void readMetadata(const handle::Dataset & handle, DatasetMetadata & metadata) {
+        nlohmann::json j;
+        std::string key;
+        const bool isZarr = metadata_detail::getMetadataKey(handle, key);
+        attrs_detail::readJson(*handle.store(), key, j);
+        metadata.fromJson(j, isZarr);
+    }
+
+}
+}
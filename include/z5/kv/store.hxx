@@ -0,0 +1,93 @@
+#pragma once
+
+#include <string>
+#include <vector>
+#include <algorithm>
+#include <stdexcept>
+
+
+namespace z5 {
+namespace kv {
+
+
+    // abstract key-value store that holds all objects (metadata, attributes and chunks) of a container.
+    // keys are relative to the root of the store and use '/' as separator, the prefixes
+    // of keys take the role of directories. implementations must be safe to use from multiple threads.
+    class Store {
+    public:
+        virtual ~Store() {}
+
+        // read the object stored under `key`, returns false if it does not exist
+        virtual bool read(const std::string & key, std::vector<char> & value) const = 0;
+
+        // write the object stored under `key`, existing objects are overwritten
+        virtual void write(const std::string & key, const std::vector<char> & value) const = 0;
+
+        // check if an object is stored under `key`
+        virtual bool exists(const std::string & key) const = 0;
+
+        // remove the object stored under `key`, does nothing if it does not exist
+        virtual void remove(const std::string & key) const = 0;
+
+        // list the names of the prefixes directly below `prefix`, i.e. the analogue of sub-directories
+        virtual void listChildren(const std::string & prefix, std::vector<std::string> & out) const = 0;
+
+        // check if there is any object below `prefix`, i.e. the analogue of an existing directory.
+        // the empty prefix refers to the root of the store
+        virtual bool existsPrefix(const std::string & prefix) const = 0;
+
+        // remove all objects below `prefix`
+        virtual void removePrefix(const std::string & prefix) const = 0;
+
+        // read `size` bytes starting at `offset` of the object stored under `key`,
+        // returns false if it does not exist. the result is shorter than `size`
+        // if the object ends before. stores that support ranged reads should override this
+        virtual bool readRange(const std::string & key, const std::size_t offset,
+                               const std::size_t size, std::vector<char> & value) const {
+            std::vector<char> buffer;
+            if(!read(key, buffer)) {
+                return false;
+            }
+            const std::size_t begin = std::min(offset, buffer.size());
+            const std::size_t end = std::min(offset + size, buffer.size());
+            value.assign(buffer.begin() + begin, buffer.begin() + end);
+            return true;
+        }
+
+        // get the number of bytes of the object stored under `key`, returns false if it does not exist.
+        // stores that keep the sizes in their metadata should override this to avoid reading the object
+        virtual bool objectSize(const std::string & key, std::size_t & size) const {
+            std::vector<char> buffer;
+            if(!read(key, buffer)) {
+                return false;
+            }
+            size = buffer.size();
+            return true;
+        }
+
+        virtual bool isReadOnly() const {return false;}
+        virtual bool isS3() const {return false;}
+        virtual bool isGcs() const {return false;}
+
+    protected:
+        inline void checkWritable() const {
+            if(isReadOnly()) {
+                throw std::invalid_argument("Cannot write to a read-only store");
+            }
+        }
+    };
+
+
+    // join key parts with the key separator, empty parts are skipped
+    inline std::string joinKey(const std::string & prefix, const std::string & name) {
+        if(prefix.empty()) {
+            return name;
+        }
+        if(name.empty()) {
+            return prefix;
+        }
+        return prefix + "/" + name;
+    }
+
+}
+}
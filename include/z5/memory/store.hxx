@@ -0,0 +1,228 @@
+#pragma once
+
+#include <set>
+#include <array>
+#include <atomic>
+#include <functional>
+#include <shared_mutex>
+#include <unordered_map>
+
+#include "z5/kv/store.hxx"
+#include "z5/kv/directory.hxx"
+
+
+namespace z5 {
+namespace memory {
+
+
+    // store that holds all objects of a container in memory, e.g. for scratch datasets
+    // and test fixtures. the objects are distributed over shards that are locked
+    // independently, so concurrent chunk reads and writes don't block each other.
+    // if `maxBytes` is not zero, writes that would exceed it throw.
+    class Store : public kv::Store {
+    public:
+        Store(const std::size_t maxBytes=0) : maxBytes_(maxBytes), nBytes_(0) {
+        }
+
+        inline bool read(const std::string & key, std::vector<char> & value) const {
+            const auto & shard = getShard(key);
+            std::shared_lock<std::shared_timed_mutex> lock(shard.mutex);
+            auto it = shard.objects.find(key);
+            if(it == shard.objects.end()) {
+                return false;
+            }
+            value = it->second;
+            return true;
+        }
+
+        inline bool readRange(const std::string & key, const std::size_t offset,
+                              const std::size_t size, std::vector<char> & value) const {
+            const auto & shard = getShard(key);
+            std::shared_lock<std::shared_timed_mutex> lock(shard.mutex);
+            auto it = shard.objects.find(key);
+            if(it == shard.objects.end()) {
+                return false;
+            }
+            const auto & object = it->second;
+            const std::size_t begin = std::min(offset, object.size());
+            const std::size_t end = std::min(offset + size, object.size());
+            value.assign(object.begin() + begin, object.begin() + end);
+            return true;
+        }
+
+        inline bool objectSize(const std::string & key, std::size_t & size) const {
+            const auto & shard = getShard(key);
+            std::shared_lock<std::shared_timed_mutex> lock(shard.mutex);
+            auto it = shard.objects.find(key);
+            if(it == shard.objects.end()) {
+                return false;
+            }
+            size = it->second.size();
+            return true;
+        }
+
+        inline void write(const std::string & key, const std::vector<char> & value) const {
+            auto & shard = getShard(key);
+            std::unique_lock<std::shared_timed_mutex> lock(shard.mutex);
+            auto it = shard.objects.find(key);
+            const std::size_t oldSize = it == shard.objects.end() ? 0 : it->second.size();
+            reserve(oldSize, value.size());
+            if(it == shard.objects.end()) {
+                shard.objects.emplace(key, value);
+            } else {
+                it->second = value;
+            }
+        }
+
+        inline bool exists(const std::string & key) const {
+            const auto & shard = getShard(key);
+            std::shared_lock<std::shared_timed_mutex> lock(shard.mutex);
+            return shard.objects.find(key) != shard.objects.end();
+        }
+
+        inline void remove(const std::string & key) const {
+            auto & shard = getShard(key);
+            std::unique_lock<std::shared_timed_mutex> lock(shard.mutex);
+            auto it = shard.objects.find(key);
+            if(it != shard.objects.end()) {
+                nBytes_ -= it->second.size();
+                shard.objects.erase(it);
+            }
+        }
+
+        // listing needs to visit all objects, which is fine for the metadata operations it is used for
+        inline void listChildren(const std::string & prefix, std::vector<std::string> & out) const {
+            const std::string dir = directoryKey(prefix);
+            std::set<std::string> children;
+            forEachKey([&](const std::string & key){
+                if(key.compare(0, dir.size(), dir) != 0) {
+                    return;
+                }
+                const std::size_t sep = key.find('/', dir.size());
+                if(sep != std::string::npos) {
+                    children.insert(key.substr(dir.size(), sep - dir.size()));
+                }
+            });
+            out.insert(out.end(), children.begin(), children.end());
+        }
+
+        inline bool existsPrefix(const std::string & prefix) const {
+            const std::string dir = directoryKey(prefix);
+            for(const auto & shard : shards_) {
+                std::shared_lock<std::shared_timed_mutex> lock(shard.mutex);
+                for(const auto & object : shard.objects) {
+                    if(object.first.compare(0, dir.size(), dir) == 0) {
+                        return true;
+                    }
+                }
+            }
+            return false;
+        }
+
+        inline void removePrefix(const std::string & prefix) const {
+            const std::string dir = directoryKey(prefix);
+            for(auto & shard : shards_) {
+                std::unique_lock<std::shared_timed_mutex> lock(shard.mutex);
+                for(auto it = shard.objects.begin(); it != shard.objects.end();) {
+                    if(it->first.compare(0, dir.size(), dir) == 0) {
+                        nBytes_ -= it->second.size();
+                        it = shard.objects.erase(it);
+                    } else {
+                        ++it;
+                    }
+                }
+            }
+        }
+
+        // all keys of the store, in sorted order
+        inline void keys(std::vector<std::string> & out) const {
+            forEachKey([&](const std::string & key){
+                out.push_back(key);
+            });
+            std::sort(out.begin(), out.end());
+        }
+
+        // number of bytes held by the objects of the store
+        inline std::size_t nBytes() const {return nBytes_;}
+        inline std::size_t maxBytes() const {return maxBytes_;}
+
+    private:
+        static const std::size_t nShards = 32;
+
+        struct Shard {
+            mutable std::shared_timed_mutex mutex;
+            std::unordered_map<std::string, std::vector<char>> objects;
+        };
+
+        inline Shard & getShard(const std::string & key) const {
+            return shards_[std::hash<std::string>()(key) % nShards];
+        }
+
+        static std::string directoryKey(const std::string & prefix) {
+            return prefix.empty() ? prefix : prefix + "/";
+        }
+
+        template<class F>
+        inline void forEachKey(F && f) const {
+            for(const auto & shard : shards_) {
+                std::shared_lock<std::shared_timed_mutex> lock(shard.mutex);
+                for(const auto & object : shard.objects) {
+                    f(object.first);
+                }
+            }
+        }
+
+        // account for replacing an object of `oldSize` bytes by one of `newSize` bytes,
+        // throws if this exceeds the byte limit
+        inline void reserve(const std::size_t oldSize, const std::size_t newSize) const {
+            if(newSize <= oldSize) {
+                nBytes_ -= oldSize - newSize;
+                return;
+            }
+            const std::size_t delta = newSize - oldSize;
+            std::size_t current = nBytes_.load();
+            do {
+                if(maxBytes_ > 0 && current + delta > maxBytes_) {
+                    throw std::runtime_error("Writing to the memory store exceeds its limit of " +
+                                             std::to_string(maxBytes_) + " bytes");
+                }
+            } while(!nBytes_.compare_exchange_weak(current, current + delta));
+        }
+
+        std::size_t maxBytes_;
+        mutable std::atomic<std::size_t> nBytes_;
+        mutable std::array<Shard, nShards> shards_;
+    };
+
+
+    // write all objects of the store to a filesystem container at `path`,
+    // which can then be opened with the filesystem backend
+    inline void persist(const Store & store, const fs::path & path) {
+        if(fs::exists(path)) {
+            throw std::invalid_argument("Cannot persist the memory store, " + path.string() + " exists already");
+        }
+        // an empty store still corresponds to a (not yet initialized) container
+        fs::create_directories(path);
+        std::vector<std::string> keys;
+        store.keys(keys);
+        std::vector<char> value;
+        for(const auto & key : keys) {
+            store.read(key, value);
+            kv::writeFile(path, key, value.data(), value.size());
+        }
+    }
+
+
+    // read all files of the filesystem container at `path` into the store
+    inline void load(const fs::path & path, const Store & store) {
+        std::vector<std::string> keys;
+        kv::listDirectoryKeys(path, keys);
+        std::vector<char> value;
+        for(const auto & key : keys) {
+            kv::readFile(path / key, value);
+            store.write(key, value);
+        }
+    }
+
+}
+}
@@ -5,6 +5,7 @@
 #include <iomanip>
 
 #include "z5/types/types.hxx"
+#include "z5/compression/plugins.hxx"
 
 
 namespace z5 {
@@ -34,21 +35,26 @@ namespace z5 {
             const bool isZarr,
             const types::Compressor compressor=types::raw,
             const types::CompressionOptions & compressionOptions=types::CompressionOptions(),
-            const double fillValue=0
+            const double fillValue=0,
+            const std::string & dimensionSeparator=".",
+            const types::FilterChain & filters=types::FilterChain()
             ) : Metadata(isZarr),
                 dtype(dtype),
                 shape(shape),
                 chunkShape(chunkShape),
                 compressor(compressor),
                 compressionOptions(compressionOptions),
-                fillValue(fillValue)
+                fillValue(fillValue),
+                dimensionSeparator(dimensionSeparator),
+                filters(filters)
         {
             checkShapes();
+            checkDimensionSeparator();
         }
 
 
         // empty constructur
-        DatasetMetadata() : Metadata(true)
+        DatasetMetadata() : Metadata(true), dimensionSeparator(".")
         {}
 
 
@@ -82,9 +88,14 @@ namespace z5 {
 
             j["fill_value"] = fillValue;
 
-            j["filters"] = nullptr;
+            types::writeZarrFiltersToJson(filters, types::Datatypes::dtypeToZarr().at(dtype), j["filters"]);
             j["order"] = "C";
             j["zarr_format"] = zarrFormat;
+
+            // the default separator is omitted, so that flat datasets can be read by older readers
+            if(dimensionSeparator != ".") {
+                j["dimension_separator"] = dimensionSeparator;
+            }
         }
 
         void toJsonN5(nlohmann::json & j) const {
@@ -115,14 +126,29 @@ namespace z5 {
             const auto & compressionOpts = j["compressor"];
 
             std::string zarrCompressorId = compressionOpts.is_null() ? "raw" : compressionOpts["id"];
-            try {
-                compressor = types::Compressors::zarrToCompressor().at(zarrCompressorId);
-            } catch(std::out_of_range) {
+            auto cIt = types::Compressors::zarrToCompressor().find(zarrCompressorId);
+            if(cIt != types::Compressors::zarrToCompressor().end()) {
+                compressor = cIt->second;
+            } else if(compression::PluginCodecs::isRegistered(zarrCompressorId)) {
+                // codecs z5 was built with take precedence over registered codecs
+                compressor = types::plugin;
+            } else {
                 throw std::runtime_error("z5.DatasetMetadata.fromJsonZarr: wrong compressor for zarr format");
             }
 
             types::readZarrCompressionOptionsFromJson(compressor, compressionOpts,
                                                       compressionOptions);
+
+            auto jIt = j.find("dimension_separator");
+            dimensionSeparator = jIt == j.end() ? "." : jIt->get<std::string>();
+            checkDimensionSeparator();
+
+            jIt = j.find("filters");
+            if(jIt == j.end()) {
+                filters.clear();
+            } else {
+                types::readZarrFiltersFromJson(*jIt, j["dtype"].get<std::string>(), filters);
+            }
         }
 
 
@@ -184,6 +210,8 @@ namespace z5 {
             }
 
             fillValue = 0;
+            dimensionSeparator = ".";
+            filters.clear();
         }
 
     public:
@@ -198,10 +226,17 @@ namespace z5 {
 
         double fillValue;
 
+        // separator of the chunk indices in the chunk keys of zarr datasets:
+        // '.' stores all chunks in the dataset directory (0.0.0),
+        // '/' stores them in nested directories (0/0/0)
+        std::string dimensionSeparator;
+
+        // filters that are applied to the data of zarr chunks before compression, in order
+        types::FilterChain filters;
+
         // metadata values that are fixed for now
         // zarr format is fixed to 2
         // const std::string order = "C";
-        // const std::nullptr_t filters = nullptr;
 
     private:
 
@@ -219,6 +254,13 @@ namespace z5 {
         }
 
 
+        void checkDimensionSeparator() const {
+            if(dimensionSeparator != "." && dimensionSeparator != "/") {
+                throw std::runtime_error("Invalid dimension separator: must be '.' or '/'");
+            }
+        }
+
+
         // make sure that fixed metadata values agree
         void checkJson(const nlohmann::json & j) {
 
@@ -240,19 +282,21 @@ namespace z5 {
                     );
                 }
             }
-
-            jIt = j.find("filters");
-            if(jIt != j.end()) {
-                if(!j["filters"].is_null()) {
-                    throw std::runtime_error(
-                        "Invalid Filters: Z5 does not support filters"
-                    );
-                }
-            }
         }
     };
 
 
+    // summary of a group or dataset found when walking the hierarchy
+    // groups have empty shape and chunks and an empty dtype
+    struct HierarchyEntry {
+        std::string path;
+        bool isDataset;
+        types::ShapeType shape;
+        std::string dtype;
+        types::ShapeType chunks;
+    };
+
+
     inline void createDatasetMetadata(
         const std::string & dtype,
         const types::ShapeType & shape,
@@ -261,7 +305,9 @@ namespace z5 {
         const std::string & compressor,
         const types::CompressionOptions & compressionOptions,
         const double fillValue,
-        DatasetMetadata & metadata)
+        DatasetMetadata & metadata,
+        const std::string & dimensionSeparator=".",
+        const std::vector<types::CompressionOptions> & filters=std::vector<types::CompressionOptions>())
     {
         // get the internal data type
         types::Datatype internalDtype;
@@ -273,21 +319,77 @@ namespace z5 {
 
         // get the compressor
         types::Compressor internalCompressor;
-        try {
-            internalCompressor = types::Compressors::stringToCompressor().at(compressor);
-        } catch(const std::out_of_range & e) {
+        auto internalCompressionOptions = compressionOptions;
+        auto cIt = types::Compressors::stringToCompressor().find(compressor);
+        if(cIt != types::Compressors::stringToCompressor().end()) {
+            internalCompressor = cIt->second;
+        } else if(createAsZarr && compression::PluginCodecs::isRegistered(compressor)) {
+            // registered codecs are configured by their zarr json, which is either
+            // given as "config" or built from the other compression options
+            internalCompressor = types::plugin;
+            auto configIt = compressionOptions.find("config");
+            nlohmann::json config;
+            if(configIt != compressionOptions.end()) {
+                config = nlohmann::json::parse(boost::get<std::string>(configIt->second));
+            } else {
+                for(const auto & opt : compressionOptions) {
+                    if(opt.second.type() == typeid(int)) {
+                        config[opt.first] = boost::get<int>(opt.second);
+                    } else if(opt.second.type() == typeid(bool)) {
+                        config[opt.first] = boost::get<bool>(opt.second);
+                    } else {
+                        config[opt.first] = boost::get<std::string>(opt.second);
+                    }
+                }
+            }
+            config["id"] = compressor;
+            internalCompressionOptions.clear();
+            internalCompressionOptions["id"] = compressor;
+            internalCompressionOptions["config"] = config.dump();
+        } else {
             throw std::runtime_error("z5::createDatasetMetadata: Invalid compressor for dataset");
         }
 
+        // n5 always stores chunks in nested directories
+        if(!createAsZarr && dimensionSeparator != ".") {
+            throw std::runtime_error("z5::createDatasetMetadata: Dimension separator is only supported for zarr");
+        }
+
+        // get the filters, which are given by their zarr id and options
+        if(!createAsZarr && !filters.empty()) {
+            throw std::runtime_error("z5::createDatasetMetadata: Filters are only supported for zarr");
+        }
+        const std::string & zarrDtype = types::Datatypes::dtypeToZarr().at(internalDtype);
+        types::FilterChain internalFilters;
+        for(auto filterOptions : filters) {
+            auto idIt = filterOptions.find("id");
+            if(idIt == filterOptions.end()) {
+                throw std::runtime_error("z5::createDatasetMetadata: Filter without id");
+            }
+            types::Filter internalFilter;
+            try {
+                internalFilter = types::Filters::zarrToFilter().at(boost::get<std::string>(idIt->second));
+            } catch(const std::out_of_range & e) {
+                throw std::runtime_error("z5::createDatasetMetadata: Invalid filter for dataset");
+            }
+            filterOptions.erase(idIt);
+            types::defaultFilterOptions(internalFilter, filterOptions, zarrDtype);
+            internalFilters.emplace_back(internalFilter, filterOptions);
+        }
+
         // add the default compression options if necessary
-        // we need to make a copy of the compression options, because they are const
-        auto internalCompressionOptions = compressionOptions;
         types::defaultCompressionOptions(internalCompressor, internalCompressionOptions, createAsZarr);
+        #ifdef WITH_BLOSC2
+        // store the actual element size, so that other blosc2 readers don't need to know the default
+        if(internalCompressor == types::blosc2 && boost::get<int>(internalCompressionOptions["typesize"]) == 0) {
+            internalCompressionOptions["typesize"] = types::zarrDtypeSize(zarrDtype);
+        }
+        #endif
 
         metadata = DatasetMetadata(internalDtype, shape,
                                    chunkShape, createAsZarr,
                                    internalCompressor, internalCompressionOptions,
-                                   fillValue);
+                                   fillValue, dimensionSeparator, internalFilters);
     }
 
 
@@ -55,12 +55,6 @@ namespace multiarray {
             sliceFromRoi(offsetSlice, offsetInRequest, requestShape);
             auto view = xt::strided_view(out, offsetSlice);
 
-            // check if this chunk exists, if not fill output with fill value
-            if(!ds.chunkExists(chunkId)) {
-                view = fillValue;;
-                continue;
-            }
-
             // get the current chunk-shape
             ds.getChunkShape(chunkId, chunkShape);
             chunkSize = std::accumulate(chunkShape.begin(), chunkShape.end(),
@@ -80,8 +74,14 @@ namespace multiarray {
                 buffer.resize(chunkSize);
             }
 
-            // read the current chunk into the buffer
-            if(ds.readChunk(chunkId, &buffer[0])) {
+            // read the current chunk into the buffer, if it does not exist fill output with fill value
+            // (we don't check for existence first, because this costs an extra request for object stores)
+            bool isVarlen;
+            if(!ds.readChunkIfExists(chunkId, &buffer[0], isVarlen)) {
+                view = fillValue;
+                continue;
+            }
+            if(isVarlen) {
                 throw std::runtime_error("Can't read from varlen chunks to multiarray");
             }
 
@@ -156,12 +156,6 @@ namespace multiarray {
             sliceFromRoi(offsetSlice, offsetInRequest, requestShape);
             auto view = xt::strided_view(out, offsetSlice);
 
-            // check if this chunk exists, if not fill output with fill value
-            if(!ds.chunkExists(chunkId)) {
-                view = fillValue;;
-                return;
-            }
-
             // get the current chunk-shape
             ds.getChunkShape(chunkId, chunkShape);
             std::size_t chunkSize = std::accumulate(chunkShape.begin(), chunkShape.end(),
@@ -181,8 +175,14 @@ namespace multiarray {
                 buffer.resize(chunkSize);
             }
 
-            // read the current chunk into the buffer
-            if(ds.readChunk(chunkId, &buffer[0])){
+            // read the current chunk into the buffer, if it does not exist fill output with fill value
+            // (we don't check for existence first, because this costs an extra request for object stores)
+            bool isVarlen;
+            if(!ds.readChunkIfExists(chunkId, &buffer[0], isVarlen)) {
+                view = fillValue;
+                return;
+            }
+            if(isVarlen) {
                 throw std::runtime_error("Can't read from varlen chunks to multiarray");
             }
             // request and chunk overlap completely
@@ -0,0 +1,446 @@
+#pragma once
+
+#include <map>
+#include <mutex>
+#include <memory>
+
+#include <aws/core/Aws.h>
+#include <aws/core/auth/AWSAuthSigner.h>
+#include <aws/core/auth/AWSCredentials.h>
+#include <aws/core/client/ClientConfiguration.h>
+#include <aws/s3/S3Client.h>
+#include <aws/s3/model/GetObjectRequest.h>
+#include <aws/s3/model/PutObjectRequest.h>
+#include <aws/s3/model/HeadObjectRequest.h>
+#include <aws/s3/model/DeleteObjectRequest.h>
+#include <aws/s3/model/DeleteObjectsRequest.h>
+#include <aws/s3/model/ListObjectsV2Request.h>
+#include <aws/s3/model/CreateMultipartUploadRequest.h>
+#include <aws/s3/model/UploadPartRequest.h>
+#include <aws/s3/model/CompleteMultipartUploadRequest.h>
+#include <aws/s3/model/AbortMultipartUploadRequest.h>
+
+#include "z5/kv/store.hxx"
+
+
+namespace z5 {
+namespace s3 {
+
+
+    // options to connect to s3 or to a s3 compatible object store (e.g. minio)
+    struct Options {
+        // endpoint of the object store, e.g. "http://localhost:9000" for a local minio server.
+        // if it is empty, the default aws endpoint of the region is used
+        std::string endpoint = "";
+        std::string region = "";
+        // don't sign requests, for public buckets
+        bool anonymous = false;
+        // maximal number of connections that are kept open by the client;
+        // set this to at least the number of threads used for reading or writing
+        unsigned maxConnections = 64;
+        long requestTimeoutMs = 30000;
+        // objects larger than the threshold are uploaded in parts of `partSize` bytes,
+        // s3 requires parts to be at least 5 MB
+        std::size_t multipartThreshold = 16 * 1024 * 1024;
+        std::size_t partSize = 8 * 1024 * 1024;
+    };
+
+
+namespace store_detail {
+
+    // the sdk must be initialized before creating the first client and shut down
+    // after the last client was destroyed, so all clients hold a reference to it
+    class Sdk {
+    public:
+        static std::shared_ptr<Sdk> instance() {
+            static std::shared_ptr<Sdk> sdk(new Sdk());
+            return sdk;
+        }
+
+        ~Sdk() {
+            Aws::ShutdownAPI(options_);
+        }
+
+    private:
+        Sdk() {
+            Aws::InitAPI(options_);
+        }
+        Aws::SDKOptions options_;
+    };
+
+
+    // the client, which holds a pool of connections, is shared between all stores
+    // with the same connection options, so opening many containers does not open new connections
+    class Client {
+    public:
+        Client(const Options & options) : sdk_(Sdk::instance()) {
+            Aws::Client::ClientConfiguration config;
+            if(!options.region.empty()) {
+                config.region = options.region.c_str();
+            }
+            std::string endpoint = options.endpoint;
+            const std::string http = "http://";
+            const std::string https = "https://";
+            if(endpoint.compare(0, http.size(), http) == 0) {
+                config.scheme = Aws::Http::Scheme::HTTP;
+                endpoint = endpoint.substr(http.size());
+            } else if(endpoint.compare(0, https.size(), https) == 0) {
+                config.scheme = Aws::Http::Scheme::HTTPS;
+                endpoint = endpoint.substr(https.size());
+            }
+            if(!endpoint.empty()) {
+                config.endpointOverride = endpoint.c_str();
+            }
+            config.maxConnections = options.maxConnections;
+            config.requestTimeoutMs = options.requestTimeoutMs;
+
+            // custom endpoints (minio, moto) usually don't support virtual host addressing
+            const bool useVirtualAddressing = endpoint.empty();
+            const auto signing = Aws::Client::AWSAuthV4Signer::PayloadSigningPolicy::Never;
+            if(options.anonymous) {
+                client_.reset(new Aws::S3::S3Client(Aws::Auth::AWSCredentials(), config,
+                                                    signing, useVirtualAddressing));
+            } else {
+                client_.reset(new Aws::S3::S3Client(config, signing, useVirtualAddressing));
+            }
+        }
+
+        inline const Aws::S3::S3Client & get() const {
+            return *client_;
+        }
+
+        static std::shared_ptr<Client> fromPool(const Options & options) {
+            static std::mutex mutex;
+            static std::map<std::string, std::weak_ptr<Client>> pool;
+            const std::string id = options.endpoint + "|" + options.region + "|" +
+                                   std::to_string(options.anonymous) + "|" +
+                                   std::to_string(options.maxConnections) + "|" +
+                                   std::to_string(options.requestTimeoutMs);
+            std::lock_guard<std::mutex> lock(mutex);
+            auto client = pool[id].lock();
+            if(!client) {
+                client = std::make_shared<Client>(options);
+                pool[id] = client;
+            }
+            return client;
+        }
+
+    private:
+        // declared first, so that it is destroyed after the client
+        std::shared_ptr<Sdk> sdk_;
+        std::unique_ptr<Aws::S3::S3Client> client_;
+    };
+
+
+    template<class ERROR>
+    inline bool isNotFound(const ERROR & error) {
+        return error.GetErrorType() == Aws::S3::S3Errors::NO_SUCH_KEY ||
+               error.GetResponseCode() == Aws::Http::HttpResponseCode::NOT_FOUND;
+    }
+
+
+    inline std::shared_ptr<Aws::IOStream> makeBody(const char * data, const std::size_t size) {
+        auto body = Aws::MakeShared<Aws::StringStream>("z5");
+        body->write(data, size);
+        return body;
+    }
+}
+
+
+    // store for the objects of a container in a s3 bucket, under the key prefix `prefix`
+    class Store : public kv::Store {
+    public:
+        Store(const std::string & bucket, const std::string & prefix="", const Options & options=Options())
+            : bucket_(bucket), prefix_(normalizePrefix(prefix)), options_(options),
+              client_(store_detail::Client::fromPool(options)) {
+            if(bucket_.empty()) {
+                throw std::invalid_argument("Need a bucket name for the s3 store");
+            }
+            if(options_.partSize < 5 * 1024 * 1024) {
+                throw std::invalid_argument("The part size for multipart uploads must be at least 5 MB");
+            }
+        }
+
+        inline bool read(const std::string & key, std::vector<char> & value) const {
+            Aws::S3::Model::GetObjectRequest request;
+            request.SetBucket(bucket_.c_str());
+            request.SetKey(objectKey(key).c_str());
+            return get(request, key, value);
+        }
+
+        inline bool readRange(const std::string & key, const std::size_t offset,
+                              const std::size_t size, std::vector<char> & value) const {
+            if(size == 0) {
+                value.clear();
+                return exists(key);
+            }
+            Aws::S3::Model::GetObjectRequest request;
+            request.SetBucket(bucket_.c_str());
+            request.SetKey(objectKey(key).c_str());
+            const std::string range = "bytes=" + std::to_string(offset) + "-" + std::to_string(offset + size - 1);
+            request.SetRange(range.c_str());
+            return get(request, key, value);
+        }
+
+        inline void write(const std::string & key, const std::vector<char> & value) const {
+            checkWritable();
+            if(value.size() > options_.multipartThreshold) {
+                writeMultipart(key, value);
+                return;
+            }
+            Aws::S3::Model::PutObjectRequest request;
+            request.SetBucket(bucket_.c_str());
+            request.SetKey(objectKey(key).c_str());
+            request.SetBody(store_detail::makeBody(value.data(), value.size()));
+            request.SetContentLength(value.size());
+            const auto outcome = client().PutObject(request);
+            if(!outcome.IsSuccess()) {
+                throwError("writing", key, outcome.GetError());
+            }
+        }
+
+        inline bool exists(const std::string & key) const {
+            Aws::S3::Model::HeadObjectRequest request;
+            request.SetBucket(bucket_.c_str());
+            request.SetKey(objectKey(key).c_str());
+            const auto outcome = client().HeadObject(request);
+            if(outcome.IsSuccess()) {
+                return true;
+            }
+            if(store_detail::isNotFound(outcome.GetError())) {
+                return false;
+            }
+            throwError("checking", key, outcome.GetError());
+        }
+
+        inline bool objectSize(const std::string & key, std::size_t & size) const {
+            Aws::S3::Model::HeadObjectRequest request;
+            request.SetBucket(bucket_.c_str());
+            request.SetKey(objectKey(key).c_str());
+            const auto outcome = client().HeadObject(request);
+            if(outcome.IsSuccess()) {
+                size = outcome.GetResult().GetContentLength();
+                return true;
+            }
+            if(store_detail::isNotFound(outcome.GetError())) {
+                return false;
+            }
+            throwError("checking", key, outcome.GetError());
+        }
+
+        // s3 doesn't report an error when deleting objects that don't exist
+        inline void remove(const std::string & key) const {
+            checkWritable();
+            Aws::S3::Model::DeleteObjectRequest request;
+            request.SetBucket(bucket_.c_str());
+            request.SetKey(objectKey(key).c_str());
+            const auto outcome = client().DeleteObject(request);
+            if(!outcome.IsSuccess()) {
+                throwError("removing", key, outcome.GetError());
+            }
+        }
+
+        inline void listChildren(const std::string & prefix, std::vector<std::string> & out) const {
+            const std::string listPrefix = directoryKey(prefix);
+            listObjects(prefix, true, [&](const Aws::S3::Model::ListObjectsV2Result & result){
+                for(const auto & commonPrefix : result.GetCommonPrefixes()) {
+                    const std::string child(commonPrefix.GetPrefix().c_str());
+                    // strip the list prefix and the trailing '/'
+                    out.emplace_back(child.substr(listPrefix.size(), child.size() - listPrefix.size() - 1));
+                }
+                return true;
+            });
+        }
+
+        inline bool existsPrefix(const std::string & prefix) const {
+            bool found = false;
+            listObjects(prefix, false, [&](const Aws::S3::Model::ListObjectsV2Result & result){
+                found = !result.GetContents().empty();
+                return false;
+            }, 1);
+            return found;
+        }
+
+        // s3 can delete up to 1000 objects per request
+        inline void removePrefix(const std::string & prefix) const {
+            checkWritable();
+            std::vector<std::string> keys;
+            listObjects(prefix, false, [&](const Aws::S3::Model::ListObjectsV2Result & result){
+                for(const auto & object : result.GetContents()) {
+                    keys.emplace_back(object.GetKey().c_str());
+                }
+                return true;
+            });
+
+            const std::size_t batchSize = 1000;
+            for(std::size_t batchBegin = 0; batchBegin < keys.size(); batchBegin += batchSize) {
+                const std::size_t batchEnd = std::min(batchBegin + batchSize, keys.size());
+                Aws::S3::Model::Delete toDelete;
+                for(std::size_t i = batchBegin; i < batchEnd; ++i) {
+                    Aws::S3::Model::ObjectIdentifier object;
+                    object.SetKey(keys[i].c_str());
+                    toDelete.AddObjects(object);
+                }
+                toDelete.SetQuiet(true);
+                Aws::S3::Model::DeleteObjectsRequest request;
+                request.SetBucket(bucket_.c_str());
+                request.SetDelete(toDelete);
+                const auto outcome = client().DeleteObjects(request);
+                if(!outcome.IsSuccess()) {
+                    throwError("removing", prefix, outcome.GetError());
+                }
+            }
+        }
+
+        inline bool isS3() const {return true;}
+
+        inline const std::string & bucket() const {return bucket_;}
+        inline const std::string & prefix() const {return prefix_;}
+
+    private:
+
+        static std::string normalizePrefix(const std::string & prefix) {
+            const std::size_t begin = prefix.find_first_not_of('/');
+            if(begin == std::string::npos) {
+                return "";
+            }
+            const std::size_t end = prefix.find_last_not_of('/');
+            return prefix.substr(begin, end - begin + 1);
+        }
+
+        inline const Aws::S3::S3Client & client() const {
+            return client_->get();
+        }
+
+        inline std::string objectKey(const std::string & key) const {
+            return kv::joinKey(prefix_, key);
+        }
+
+        // the prefix of all objects below `prefix`, i.e. with a trailing '/'
+        inline std::string directoryKey(const std::string & prefix) const {
+            const std::string key = objectKey(prefix);
+            return key.empty() ? key : key + "/";
+        }
+
+        template<class ERROR>
+        [[noreturn]] inline void throwError(const std::string & what, const std::string & key,
+                                            const ERROR & error) const {
+            throw std::runtime_error("Failed " + what + " " + objectKey(key) + " in s3 bucket " + bucket_ + ": " +
+                                     std::string(error.GetMessage().c_str()));
+        }
+
+        inline bool get(Aws::S3::Model::GetObjectRequest & request, const std::string & key,
+                        std::vector<char> & value) const {
+            auto outcome = client().GetObject(request);
+            if(!outcome.IsSuccess()) {
+                const auto & error = outcome.GetError();
+                if(store_detail::isNotFound(error)) {
+                    return false;
+                }
+                // a range that starts after the end of the object
+                if(error.GetResponseCode() == Aws::Http::HttpResponseCode::REQUESTED_RANGE_NOT_SATISFIABLE) {
+                    value.clear();
+                    return true;
+                }
+                throwError("reading", key, error);
+            }
+            auto result = outcome.GetResultWithOwnership();
+            auto & body = result.GetBody();
+            value.resize(result.GetContentLength());
+            body.read(value.data(), value.size());
+            if(static_cast<std::size_t>(body.gcount()) != value.size()) {
+                throw std::runtime_error("Incomplete read of " + objectKey(key) + " in s3 bucket " + bucket_);
+            }
+            return true;
+        }
+
+        // list the objects below `prefix` page by page and call `f` for each page
+        // until it returns false; if `delimited` is true, only the direct children are listed
+        template<class F>
+        inline void listObjects(const std::string & prefix, const bool delimited, F && f,
+                                const int maxKeys=1000) const {
+            Aws::S3::Model::ListObjectsV2Request request;
+            request.SetBucket(bucket_.c_str());
+            request.SetPrefix(directoryKey(prefix).c_str());
+            request.SetMaxKeys(maxKeys);
+            if(delimited) {
+                request.SetDelimiter("/");
+            }
+            while(true) {
+                const auto outcome = client().ListObjectsV2(request);
+                if(!outcome.IsSuccess()) {
+                    throwError("listing", prefix, outcome.GetError());
+                }
+                const auto & result = outcome.GetResult();
+                if(!f(result) || !result.GetIsTruncated()) {
+                    break;
+                }
+                request.SetContinuationToken(result.GetNextContinuationToken());
+            }
+        }
+
+        // upload the parts sequentially, large writes are parallelized over the chunks already
+        inline void writeMultipart(const std::string & key, const std::vector<char> & value) const {
+            const Aws::String objKey = objectKey(key).c_str();
+
+            Aws::S3::Model::CreateMultipartUploadRequest createRequest;
+            createRequest.SetBucket(bucket_.c_str());
+            createRequest.SetKey(objKey);
+            const auto createOutcome = client().CreateMultipartUpload(createRequest);
+            if(!createOutcome.IsSuccess()) {
+                throwError("writing", key, createOutcome.GetError());
+            }
+            const Aws::String uploadId = createOutcome.GetResult().GetUploadId();
+
+            Aws::S3::Model::CompletedMultipartUpload completed;
+            const std::size_t partSize = options_.partSize;
+            const std::size_t nParts = (value.size() + partSize - 1) / partSize;
+            for(std::size_t part = 0; part < nParts; ++part) {
+                const std::size_t offset = part * partSize;
+                const std::size_t size = std::min(partSize, value.size() - offset);
+                Aws::S3::Model::UploadPartRequest partRequest;
+                partRequest.SetBucket(bucket_.c_str());
+                partRequest.SetKey(objKey);
+                partRequest.SetUploadId(uploadId);
+                partRequest.SetPartNumber(part + 1);
+                partRequest.SetBody(store_detail::makeBody(value.data() + offset, size));
+                partRequest.SetContentLength(size);
+                const auto partOutcome = client().UploadPart(partRequest);
+                if(!partOutcome.IsSuccess()) {
+                    abortMultipart(objKey, uploadId);
+                    throwError("writing", key, partOutcome.GetError());
+                }
+                Aws::S3::Model::CompletedPart completedPart;
+                completedPart.SetPartNumber(part + 1);
+                completedPart.SetETag(partOutcome.GetResult().GetETag());
+                completed.AddParts(completedPart);
+            }
+
+            Aws::S3::Model::CompleteMultipartUploadRequest completeRequest;
+            completeRequest.SetBucket(bucket_.c_str());
+            completeRequest.SetKey(objKey);
+            completeRequest.SetUploadId(uploadId);
+            completeRequest.SetMultipartUpload(completed);
+            const auto completeOutcome = client().CompleteMultipartUpload(completeRequest);
+            if(!completeOutcome.IsSuccess()) {
+                abortMultipart(objKey, uploadId);
+                throwError("writing", key, completeOutcome.GetError());
+            }
+        }
+
+        inline void abortMultipart(const Aws::String & objKey, const Aws::String & uploadId) const {
+            Aws::S3::Model::AbortMultipartUploadRequest request;
+            request.SetBucket(bucket_.c_str());
+            request.SetKey(objKey);
+            request.SetUploadId(uploadId);
+            client().AbortMultipartUpload(request);
+        }
+
+        std::string bucket_;
+        std::string prefix_;
+        Options options_;
+        std::shared_ptr<store_detail::Client> client_;
+    };
+
+}
+}
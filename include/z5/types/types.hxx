@@ -3,6 +3,7 @@
 #include <vector>
 #include <string>
 #include <map>
+#include <sstream>
 #include <boost/variant.hpp>
 //#include <boost/optional.hpp>
 
@@ -79,6 +80,9 @@ namespace types {
         #ifdef WITH_BLOSC
         blosc,
         #endif
+        #ifdef WITH_BLOSC2
+        blosc2,
+        #endif
         #ifdef WITH_ZLIB
         zlib,
         #endif
@@ -89,8 +93,11 @@ namespace types {
         lz4,
         #endif
         #ifdef WITH_XZ
-        xz
+        xz,
         #endif
+        // zarr codec that is provided by the plugin registry (see compression/plugins.hxx),
+        // the options hold its "id" and json encoded "config"
+        plugin
     };
 
 
@@ -105,6 +112,9 @@ namespace types {
                 #ifdef WITH_BLOSC
                 {"blosc", blosc},
                 #endif
+                #ifdef WITH_BLOSC2
+                {"blosc2", blosc2},
+                #endif
                 #ifdef WITH_ZLIB
                 {"zlib", zlib},
                 {"gzip", zlib},
@@ -128,6 +138,9 @@ namespace types {
                 #ifdef WITH_BLOSC
                 {"blosc", blosc},
                 #endif
+                #ifdef WITH_BLOSC2
+                {"blosc2", blosc2},
+                #endif
                 #ifdef WITH_ZLIB
                 {"zlib", zlib},
                 {"gzip", zlib},
@@ -147,6 +160,9 @@ namespace types {
                 #ifdef WITH_BLOSC
                 {blosc, "blosc"},
                 #endif
+                #ifdef WITH_BLOSC2
+                {blosc2, "blosc2"},
+                #endif
                 #ifdef WITH_ZLIB
                 {zlib, "zlib"},
                 #endif
@@ -225,6 +241,21 @@ namespace types {
                         options["shuffle"] = jOpts["shuffle"].get<int>();
                         break;
             #endif
+            #ifdef WITH_BLOSC2
+            // the filters are stored as list in the json and as comma separated names in the options
+            case blosc2: {
+                options["codec"] = jOpts["cname"].get<std::string>();
+                options["level"] = jOpts["clevel"].get<int>();
+                options["typesize"] = jOpts["typesize"].get<int>();
+                options["nthreads"] = jOpts.value("nthreads", 1);
+                std::string filters;
+                for(const auto & filter : jOpts["filters"]) {
+                    filters += (filters.empty() ? "" : ",") + filter.get<std::string>();
+                }
+                options["filters"] = filters;
+                break;
+            }
+            #endif
             #ifdef WITH_ZLIB
             case zlib: options["level"] = jOpts["level"].get<int>();
                        options["useZlib"] = jOpts["id"].get<std::string>() == "zlib";
@@ -233,6 +264,9 @@ namespace types {
             #ifdef WITH_BZIP2
             case bzip2: options["level"] = jOpts["level"].get<int>(); break;
             #endif
+            case plugin: options["id"] = jOpts["id"].get<std::string>();
+                         options["config"] = jOpts.dump();
+                         break;
             // raw compression has no parameters
             default: break;
         }
@@ -245,6 +279,8 @@ namespace types {
         try {
             if(compressor == types::raw) {
                 jOpts = nullptr;
+            } else if(compressor == types::plugin) {
+                jOpts = nlohmann::json::parse(boost::get<std::string>(options.at("config")));
             } else {
                 jOpts["id"] = types::Compressors::compressorToZarr().at(compressor);
             }
@@ -259,6 +295,23 @@ namespace types {
                         jOpts["shuffle"] = boost::get<int>(options.at("shuffle"));
                         break;
             #endif
+            #ifdef WITH_BLOSC2
+            case blosc2: {
+                jOpts["cname"] = boost::get<std::string>(options.at("codec"));
+                jOpts["clevel"] = boost::get<int>(options.at("level"));
+                jOpts["typesize"] = boost::get<int>(options.at("typesize"));
+                jOpts["nthreads"] = boost::get<int>(options.at("nthreads"));
+                jOpts["filters"] = nlohmann::json::array();
+                std::stringstream filters(boost::get<std::string>(options.at("filters")));
+                std::string filter;
+                while(std::getline(filters, filter, ',')) {
+                    if(!filter.empty()) {
+                        jOpts["filters"].push_back(filter);
+                    }
+                }
+                break;
+            }
+            #endif
             #ifdef WITH_ZLIB
             case zlib: jOpts["id"] = boost::get<bool>(options.at("useZlib")) ? "zlib" : "gzip";
                        jOpts["level"] = boost::get<int>(options.at("level"));
@@ -339,6 +392,15 @@ namespace types {
                         if(options.find("shuffle") == options.end()){options["shuffle"] = 1;}
                         break;
             #endif
+            #ifdef WITH_BLOSC2
+            // a typesize of 0 stands for the size of the datatype
+            case blosc2: if(options.find("codec") == options.end()){options["codec"] = std::string("zstd");}
+                         if(options.find("level") == options.end()){options["level"] = 5;}
+                         if(options.find("filters") == options.end()){options["filters"] = std::string("shuffle");}
+                         if(options.find("typesize") == options.end()){options["typesize"] = 0;}
+                         if(options.find("nthreads") == options.end()){options["nthreads"] = 1;}
+                         break;
+            #endif
             #ifdef WITH_ZLIB
             case zlib: if(options.find("level") == options.end()){options["level"] = 5;}
                        if(options.find("useZlib") == options.end()){options["useZlib"] = isZarr;}
@@ -353,6 +415,134 @@ namespace types {
         }
     }
 
+
+    //
+    // Filters
+    //
+
+    // the filters that can be applied to the data of zarr chunks before compression,
+    // following the numcodecs filters with the same id
+    enum Filter {
+        delta,
+        shuffle,
+        quantize
+    };
+
+
+    struct Filters {
+
+        typedef std::map<std::string, Filter> FilterMap;
+        typedef std::map<Filter, std::string> InverseFilterMap;
+
+        static FilterMap & zarrToFilter() {
+            static FilterMap fMap({{
+                {"delta", delta},
+                {"shuffle", shuffle},
+                {"quantize", quantize}
+            }});
+            return fMap;
+        }
+
+        static InverseFilterMap & filterToZarr() {
+            static InverseFilterMap fMap({{
+                {delta, "delta"},
+                {shuffle, "shuffle"},
+                {quantize, "quantize"}
+            }});
+            return fMap;
+        }
+    };
+
+
+    // ordered chain of filters and their options, the first filter is applied first when encoding
+    typedef std::vector<std::pair<Filter, CompressionOptions>> FilterChain;
+
+
+    // size in bytes of the zarr dtype (e.g. 4 for '<i4')
+    inline int zarrDtypeSize(const std::string & zarrDtype) {
+        return std::stoi(zarrDtype.substr(2));
+    }
+
+
+    inline void readZarrFiltersFromJson(const nlohmann::json & jFilters,
+                                        const std::string & zarrDtype,
+                                        FilterChain & filters) {
+        filters.clear();
+        if(jFilters.is_null()) {
+            return;
+        }
+        for(const auto & jOpts : jFilters) {
+            Filter filter;
+            try {
+                filter = Filters::zarrToFilter().at(jOpts["id"].get<std::string>());
+            } catch(std::out_of_range) {
+                throw std::runtime_error("z5.DatasetMetadata.fromJsonZarr: unsupported filter " + jOpts["id"].dump());
+            }
+            // we only support filters that don't change the data type
+            for(const auto & key : {"dtype", "astype"}) {
+                auto jIt = jOpts.find(key);
+                if(jIt != jOpts.end() && *jIt != zarrDtype) {
+                    throw std::runtime_error("z5.DatasetMetadata.fromJsonZarr: filters that change the dtype are not supported");
+                }
+            }
+
+            CompressionOptions options;
+            switch(filter) {
+                case shuffle: options["elementsize"] = jOpts["elementsize"].get<int>(); break;
+                case quantize: options["digits"] = jOpts["digits"].get<int>(); break;
+                // delta has no parameters
+                default: break;
+            }
+            filters.emplace_back(filter, options);
+        }
+    }
+
+
+    inline void writeZarrFiltersToJson(const FilterChain & filters,
+                                       const std::string & zarrDtype,
+                                       nlohmann::json & jFilters) {
+        if(filters.empty()) {
+            jFilters = nullptr;
+            return;
+        }
+        jFilters = nlohmann::json::array();
+        for(const auto & filter : filters) {
+            const auto & options = filter.second;
+            nlohmann::json jOpts;
+            jOpts["id"] = Filters::filterToZarr().at(filter.first);
+            switch(filter.first) {
+                case delta: jOpts["dtype"] = zarrDtype;
+                            jOpts["astype"] = zarrDtype;
+                            break;
+                case shuffle: jOpts["elementsize"] = boost::get<int>(options.at("elementsize")); break;
+                case quantize: jOpts["digits"] = boost::get<int>(options.at("digits"));
+                               jOpts["dtype"] = zarrDtype;
+                               jOpts["astype"] = zarrDtype;
+                               break;
+            }
+            jFilters.push_back(jOpts);
+        }
+    }
+
+
+    inline void defaultFilterOptions(Filter filter,
+                                     CompressionOptions & options,
+                                     const std::string & zarrDtype) {
+        switch(filter) {
+            case shuffle: if(options.find("elementsize") == options.end()){options["elementsize"] = zarrDtypeSize(zarrDtype);}
+                          break;
+            case quantize: if(options.find("digits") == options.end()) {
+                               throw std::runtime_error("The quantize filter needs the number of digits");
+                           }
+                           if(zarrDtype[1] != 'f') {
+                               throw std::runtime_error("The quantize filter is only supported for floating point data");
+                           }
+                           break;
+            // delta has no parameters
+            default: break;
+        }
+    }
+
 } // namespace::types
     // overload ostream operator for ShapeType (a.k.a) vector for convinience
     inline std::ostream & operator << (std::ostream & os, const types::ShapeType & coord) {
@@ -0,0 +1,217 @@
+#pragma once
+
+#include <cmath>
+
+#include "z5/util/for_each.hxx"
+#include "z5/util/region.hxx"
+
+
+namespace z5 {
+namespace util {
+
+namespace downscale_detail {
+
+    template<class T>
+    inline T windowMean(const std::vector<T> & window) {
+        const double mean = std::accumulate(window.begin(), window.end(), 0.) / window.size();
+        return std::is_integral<T>::value ? static_cast<T>(std::round(mean)) : static_cast<T>(mean);
+    }
+
+
+    // most frequent value in the window, ties are broken in favour of the smaller value
+    template<class T>
+    inline T windowMode(std::vector<T> & window) {
+        std::sort(window.begin(), window.end());
+        T mode = window[0];
+        std::size_t maxCount = 0;
+        for(auto it = window.begin(); it != window.end();) {
+            const auto next = std::upper_bound(it, window.end(), *it);
+            const std::size_t count = std::distance(it, next);
+            if(count > maxCount) {
+                maxCount = count;
+                mode = *it;
+            }
+            it = next;
+        }
+        return mode;
+    }
+
+
+    // downscale `in` by `factor`, windows at the upper border may be smaller than the factor
+    template<class T>
+    inline void downscaleBlock(const std::vector<T> & in, const types::ShapeType & inShape,
+                               const types::ShapeType & factor, const bool useMode,
+                               std::vector<T> & out) {
+        const int ndim = inShape.size();
+        types::ShapeType outShape(ndim);
+        for(int d = 0; d < ndim; ++d) {
+            outShape[d] = (inShape[d] + factor[d] - 1) / factor[d];
+        }
+        out.resize(std::accumulate(outShape.begin(), outShape.end(), 1, std::multiplies<std::size_t>()));
+
+        types::ShapeType inStrides;
+        region_detail::getStrides(inShape, inStrides);
+
+        std::vector<T> window;
+        types::ShapeType outPos(ndim, 0), windowBegin(ndim), windowShape(ndim);
+        for(std::size_t outIndex = 0; outIndex < out.size(); ++outIndex) {
+            for(int d = 0; d < ndim; ++d) {
+                windowBegin[d] = outPos[d] * factor[d];
+                windowShape[d] = std::min(factor[d], inShape[d] - windowBegin[d]);
+            }
+
+            window.clear();
+            const std::size_t rowLength = windowShape[ndim - 1];
+            region_detail::forEachRow(inStrides, windowBegin, windowShape, [&](const std::size_t row){
+                window.insert(window.end(), in.begin() + row, in.begin() + row + rowLength);
+            });
+            out[outIndex] = useMode ? windowMode(window) : windowMean(window);
+
+            for(int d = ndim - 1; d >= 0; --d) {
+                if(++outPos[d] < outShape[d]) {
+                    break;
+                }
+                outPos[d] = 0;
+            }
+        }
+    }
+
+
+    // compute the chunk `chunkId` of the level `level` from the level below;
+    // the level below is read from disc if it is the `baseLevel`, otherwise
+    // its chunks are computed recursively and written on the way
+    template<class T>
+    inline void computeChunk(const std::vector<const Dataset *> & levels,
+                             const std::vector<types::ShapeType> & factors,
+                             const unsigned baseLevel, const unsigned level,
+                             const types::ShapeType & chunkId, const bool useMode,
+                             std::vector<T> & out) {
+        const Dataset & ds = *levels[level];
+        const Dataset & dsIn = *levels[level - 1];
+        const auto & factor = factors[level - 1];
+        const unsigned ndim = ds.dimension();
+
+        types::ShapeType chunkBegin, chunkShape;
+        ds.chunking().getBlockBeginAndShape(chunkId, chunkBegin, chunkShape);
+
+        types::ShapeType inBegin(ndim), inShape(ndim);
+        for(unsigned d = 0; d < ndim; ++d) {
+            inBegin[d] = chunkBegin[d] * factor[d];
+            inShape[d] = std::min((chunkBegin[d] + chunkShape[d]) * factor[d], dsIn.shape(d)) - inBegin[d];
+        }
+
+        std::vector<T> in;
+        if(level - 1 == baseLevel) {
+            readRegion(dsIn, inBegin, inShape, in);
+        } else {
+            // the region is aligned with the chunks of the level below,
+            // so we can assemble it from complete chunks
+            in.resize(std::accumulate(inShape.begin(), inShape.end(), 1, std::multiplies<std::size_t>()));
+            std::vector<types::ShapeType> children;
+            dsIn.chunking().getBlocksOverlappingRoi(inBegin, inShape, children);
+
+            std::vector<T> childData;
+            types::ShapeType childBegin, childShape, offset(ndim);
+            const types::ShapeType zeros(ndim, 0);
+            for(const auto & childId : children) {
+                computeChunk(levels, factors, baseLevel, level - 1, childId, useMode, childData);
+                writeCompleteChunk(dsIn, childId, childData);
+
+                dsIn.chunking().getBlockBeginAndShape(childId, childBegin, childShape);
+                for(unsigned d = 0; d < ndim; ++d) {
+                    offset[d] = childBegin[d] - inBegin[d];
+                }
+                copyRegion(&childData[0], childShape, zeros, &in[0], inShape, offset, childShape);
+            }
+        }
+        downscaleBlock(in, inShape, factor, useMode, out);
+    }
+
+}
+
+
+    // compute the downscaled levels `outLevels` of the dataset `in` with the method `mean` or `mode`.
+    // the output datasets must exist already, `factors[i]` is the scale factor of
+    // `outLevels[i]` relative to the level before.
+    // all levels are computed in a single pass that reads every chunk of `in` once,
+    // so the chunks of each level times its factor must be a multiple of the chunks of the level before.
+    template<class T>
+    void downscale(const Dataset & in, const std::vector<const Dataset *> & outLevels,
+                   const std::vector<types::ShapeType> & factors, const std::string & method,
+                   const int nThreads) {
+
+        if(method != "mean" && method != "mode") {
+            throw std::runtime_error("Invalid downscaling method " + method + ", expected mean or mode");
+        }
+        const bool useMode = method == "mode";
+
+        const unsigned nLevels = outLevels.size();
+        if(factors.size() != nLevels) {
+            throw std::runtime_error("Need one downscaling factor per level");
+        }
+
+        std::vector<const Dataset *> levels = {&in};
+        levels.insert(levels.end(), outLevels.begin(), outLevels.end());
+
+        // check that the levels are consistent
+        const unsigned ndim = in.dimension();
+        for(unsigned level = 1; level <= nLevels; ++level) {
+            const Dataset & ds = *levels[level];
+            const Dataset & dsIn = *levels[level - 1];
+            if(!ds.mode().canWrite()) {
+                throw std::invalid_argument("Cannot write downscaled data to a dataset opened without write permissions.");
+            }
+            ds.checkRequestType(typeid(T));
+            const auto & factor = factors[level - 1];
+            if(ds.dimension() != ndim || factor.size() != ndim) {
+                throw std::runtime_error("Downscaling levels and factors must have the same dimension as the input");
+            }
+            for(unsigned d = 0; d < ndim; ++d) {
+                if(factor[d] == 0) {
+                    throw std::runtime_error("Downscaling factors must be positive");
+                }
+                if(ds.shape(d) != (dsIn.shape(d) + factor[d] - 1) / factor[d]) {
+                    throw std::runtime_error("Shape of downscaling level does not match the factor");
+                }
+                // a single chunk along the dimension is always aligned; otherwise the chunks
+                // of the level before that are shared by several chunks would be read several times
+                const bool aligned = ds.chunksPerDimension(d) == 1 ||
+                                     (ds.defaultChunkShape(d) * factor[d]) % dsIn.defaultChunkShape(d) == 0;
+                if(!aligned) {
+                    throw std::runtime_error("Chunks of downscaling levels are not aligned");
+                }
+            }
+        }
+        if(nLevels == 0) {
+            return;
+        }
+
+        // we parallelize over the chunks of the highest level that still has enough chunks
+        // to keep all threads busy and compute all the levels below it recursively for each chunk.
+        // the remaining levels are computed from this level, which is small.
+        const int nActualThreads = ParallelOptions(nThreads).getActualNumThreads();
+        unsigned splitLevel = 1;
+        for(unsigned level = 2; level <= nLevels; ++level) {
+            if(levels[level]->numberOfChunks() >= nActualThreads) {
+                splitLevel = level;
+            }
+        }
+
+        auto computeLevel = [&](const unsigned baseLevel, const unsigned level) {
+            parallel_for_each_chunk(*levels[level], nThreads, [&](const int tid,
+                                                                   const Dataset & ds,
+                                                                   const types::ShapeType & chunkId) {
+                std::vector<T> data;
+                downscale_detail::computeChunk(levels, factors, baseLevel, level, chunkId, useMode, data);
+                writeCompleteChunk(ds, chunkId, data);
+            });
+        };
+
+        computeLevel(0, splitLevel);
+        if(splitLevel < nLevels) {
+            computeLevel(splitLevel, nLevels);
+        }
+    }
+
+}
+}
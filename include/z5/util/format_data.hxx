@@ -19,6 +19,35 @@ namespace util {
     }
 
 
+    // apply the filters in order to the data, the result is stored in `buffer`
+    // and the data itself is returned if there are no filters
+    template<class T, class FILTERS>
+    inline const T * encode_filters(const T * dataIn, const std::size_t dataSize,
+                                    std::vector<T> & buffer, const FILTERS & filters) {
+        if(filters.empty()) {
+            return dataIn;
+        }
+        buffer.resize(dataSize);
+        filters[0]->encode(dataIn, &buffer[0], dataSize);
+        std::vector<T> tmp;
+        for(std::size_t i = 1; i < filters.size(); ++i) {
+            tmp.resize(dataSize);
+            filters[i]->encode(&buffer[0], &tmp[0], dataSize);
+            buffer.swap(tmp);
+        }
+        return &buffer[0];
+    }
+
+
+    // revert the filters in reverse order
+    template<class T, class FILTERS>
+    inline void decode_filters(T * data, const std::size_t dataSize, const FILTERS & filters) {
+        for(auto it = filters.rbegin(); it != filters.rend(); ++it) {
+            (*it)->decode(data, dataSize);
+        }
+    }
+
+
     inline void write_n5_header(std::vector<char> & buffer, const types::ShapeType & shape,
                                 const bool isVarlen, const uint32_t varlen) {
 
@@ -91,11 +120,12 @@ namespace util {
     }
 
 
-    template<class CHUNK, class T, class COMPRESSOR>
+    template<class CHUNK, class T, class COMPRESSOR, class FILTERS>
     inline bool data_to_buffer(const z5::handle::Chunk<CHUNK> & chunk,
                                const void * dataIn,
                                std::vector<char> & buffer,
                                const COMPRESSOR & compressor,
+                               const FILTERS & filters,
                                const T fillValue,
                                const bool isVarlen=false,
                                const std::size_t varSize=0) {
@@ -125,10 +155,12 @@ namespace util {
             return false;
         }
 
-        // for zarr format, we only need to compress the data.
+        // for zarr format, we only need to filter and compress the data.
         // for n5, we need to also reverse the endianness and add the header
         if(isZarr) {
-            compress((const T *) dataIn, dataSize, buffer, compressor);
+            std::vector<T> filtered;
+            compress(encode_filters((const T *) dataIn, dataSize, filtered, filters),
+                     dataSize, buffer, compressor);
         } else {
             data_to_n5_format<T>(dataIn, dataSize,
                                  chunk_shape, buffer,
@@ -228,11 +260,12 @@ namespace util {
     }
 
 
-    template<class T, class CHUNK, class COMPRESSOR>
+    template<class T, class CHUNK, class COMPRESSOR, class FILTERS>
     inline bool buffer_to_data(const z5::handle::Chunk<CHUNK> & chunk,
                                std::vector<char> & buffer,
                                void * dataOut,
-                               const COMPRESSOR & compressor) {
+                               const COMPRESSOR & compressor,
+                               const FILTERS & filters) {
 
         const bool is_zarr = chunk.isZarr();
         std::size_t chunk_size = is_zarr ? chunk.defaultSize() : chunk.size();
@@ -251,6 +284,9 @@ namespace util {
         }
 
         decompress<T>(buffer, dataOut, chunk_size, compressor);
+        if(is_zarr) {
+            decode_filters(static_cast<T*>(dataOut), chunk_size, filters);
+        }
 
         // reverse the endianness for N5 data (unless datatype is byte)
         if(!is_zarr && sizeof(T) > 1) {
@@ -1,146 +1,753 @@
 #pragma once
 
+#include <cmath>
+#include <functional>
+#include <unordered_map>
+
 #include "z5/common.hxx"
 #include "z5/util/for_each.hxx"
+#include "z5/util/region.hxx"
 
 
 namespace z5 {
 namespace util {
 
 
-    // remove chunks which contain only a single value
-    // -> this is often some background value, that might`
-    // be different from the global background value
-    template<class T>
-    void removeTrivialChunks(const Dataset & dataset, const int nThreads,
-                             const bool removeSpecificValue=false, const T value=0) {
+    // remove dataset multithreaded
+    inline void removeDataset(const Dataset & dataset, const int nThreads) {
 
         // check if we are allowed to delete
         if(!dataset.mode().canWrite()) {
-            const std::string err = "Cannot delete chunks in a dataset that was not opened with write permissions.";
+            const std::string err = "Cannot delete dataset that was not opened with write permissions.";
             throw std::invalid_argument(err.c_str());
         }
 
-        // delete trivial chunks in parallel
-        parallel_for_each_chunk(dataset, nThreads, [removeSpecificValue,
-                                                    value](const int tid,
-                                                           const Dataset & ds,
-                                                           const types::ShapeType & chunk) {
+        // delete chunks in parallel
+        parallel_for_each_chunk(dataset, nThreads, [](const int tid,
+                                                      const Dataset & ds,
+                                                      const types::ShapeType & chunk) {
             if(!ds.chunkExists(chunk)) {
                 return;
             }
-            const size_t chunkSize = ds.getChunkSize(chunk);
-            std::vector<T> data(chunkSize);
-            ds.readChunk(chunk, &data[0]);
-            // check vector for number of uniques and if we only have a single unique, remove it
-            const auto uniques = std::set<T>(data.begin(), data.end());
-            const bool remove = (uniques.size() == 1) ? (removeSpecificValue ? (*uniques.begin() == value ? true : false) : true) : false;
-            if(remove) {
-                ds.removeChunk(chunk);
+            ds.removeChunk(chunk);
+        });
+
+        // delete all empty directories
+        dataset.remove();
+    }
+
+
+namespace functions_detail {
+
+    // call f(begin, end) for all rows of the chunk's data inside of the roi,
+    // or fMissing(nValues) with the number of values in the roi if the chunk does not exist
+    template<class T, class F, class F_MISSING>
+    inline void visitChunkInRoi(const Dataset & ds, const types::ShapeType & chunkId,
+                                const types::ShapeType & roiBegin, const types::ShapeType & roiShape,
+                                std::vector<T> & buffer, F && f, F_MISSING && fMissing) {
+        types::ShapeType offsetInRoi, shapeInRoi, offsetInChunk;
+        ds.chunking().getCoordinatesInRoi(chunkId, roiBegin, roiShape,
+                                          offsetInRoi, shapeInRoi, offsetInChunk);
+        if(!ds.chunkExists(chunkId)) {
+            fMissing(std::accumulate(shapeInRoi.begin(), shapeInRoi.end(), 1, std::multiplies<std::size_t>()));
+            return;
+        }
+
+        // zarr stores edge chunks with the full chunk shape
+        types::ShapeType chunkShape;
+        if(ds.isZarr()) {
+            chunkShape = ds.defaultChunkShape();
+        } else {
+            ds.getChunkShape(chunkId, chunkShape);
+        }
+        buffer.resize(std::accumulate(chunkShape.begin(), chunkShape.end(), 1, std::multiplies<std::size_t>()));
+        if(ds.readChunk(chunkId, &buffer[0])) {
+            throw std::runtime_error("Reductions over varlen chunks are not supported");
+        }
+
+        types::ShapeType strides;
+        region_detail::getStrides(chunkShape, strides);
+        const std::size_t rowLength = shapeInRoi.back();
+        region_detail::forEachRow(strides, offsetInChunk, shapeInRoi, [&](const std::size_t row){
+            f(&buffer[row], &buffer[row] + rowLength);
+        });
+    }
+
+    // check whether all values of the chunk that lie inside of the dataset are equal,
+    // and return the value via `value`; the scan stops at the first differing value.
+    // if `maxCompressedSize` is not zero, chunks that take more bytes on disc are
+    // assumed to be non-trivial without decompressing them
+    template<class T>
+    inline bool isTrivialChunk(const Dataset & ds, const types::ShapeType & chunkId,
+                               const std::size_t maxCompressedSize,
+                               std::vector<T> & buffer, T & value) {
+        if(maxCompressedSize > 0) {
+            std::size_t rawSize;
+            if(!ds.getRawChunkSize(chunkId, rawSize) || rawSize > maxCompressedSize) {
+                return false;
+            }
+        }
+
+        // zarr stores edge chunks with the full chunk shape
+        types::ShapeType chunkShape;
+        ds.getChunkShape(chunkId, chunkShape);
+        const bool isPadded = ds.isZarr() && chunkShape != ds.defaultChunkShape();
+        buffer.resize(isPadded ? ds.defaultChunkSize() : ds.getChunkSize(chunkId));
+        ds.readChunk(chunkId, &buffer[0]);
+        value = buffer[0];
+        const T first = value;
+
+        if(!isPadded) {
+            return std::all_of(buffer.begin(), buffer.end(), [first](const T val){return val == first;});
+        }
+
+        bool trivial = true;
+        types::ShapeType strides;
+        region_detail::getStrides(ds.defaultChunkShape(), strides);
+        const std::size_t rowLength = chunkShape.back();
+        region_detail::forEachRow(strides, types::ShapeType(chunkShape.size(), 0), chunkShape,
+                                  [&](const std::size_t row){
+            if(trivial) {
+                trivial = std::all_of(buffer.begin() + row, buffer.begin() + row + rowLength,
+                                      [first](const T val){return val == first;});
             }
         });
+        return trivial;
     }
 
 
-    // remove dataset multithreaded
-    inline void removeDataset(const Dataset & dataset, const int nThreads) {
+    template<class T>
+    using CountMap = std::unordered_map<T, std::size_t>;
 
-        // check if we are allowed to delete
-        if(!dataset.mode().canWrite()) {
-            const std::string err = "Cannot delete dataset that was not opened with write permissions.";
-            throw std::invalid_argument(err.c_str());
+
+    // small integer types are counted densely
+    template<class T>
+    inline constexpr bool useBincount() {
+        return std::is_integral<T>::value && sizeof(T) <= 2;
+    }
+
+
+    template<class T>
+    inline void mergeInto(CountMap<T> & target, const CountMap<T> & source) {
+        for(const auto & elem : source) {
+            target[elem.first] += elem.second;
         }
+    }
 
-        // delete chunks in parallel
-        parallel_for_each_chunk(dataset, nThreads, [](const int tid,
-                                                      const Dataset & ds,
-                                                      const types::ShapeType & chunk) {
+
+    // statistics of the labels (= values) seen by one thread, the statistics
+    // of a label are stored at its index in the flat arrays, with `ndim` entries
+    // per label for the bounding box and the coordinate sums
+    template<class T>
+    struct LabelAccumulator {
+        LabelAccumulator(const unsigned ndim=0, const bool computeCentroids=false)
+            : ndim(ndim), computeCentroids(computeCentroids) {}
+
+        inline std::size_t labelIndex(const T label) {
+            const auto it = index.find(label);
+            if(it != index.end()) {
+                return it->second;
+            }
+            const std::size_t id = counts.size();
+            index.emplace(label, id);
+            counts.push_back(0);
+            bbBegin.insert(bbBegin.end(), ndim, std::numeric_limits<std::size_t>::max());
+            bbEnd.insert(bbEnd.end(), ndim, 0);
+            if(computeCentroids) {
+                coordSums.insert(coordSums.end(), ndim, 0.);
+            }
+            return id;
+        }
+
+        // add `length` voxels of `label` starting at `coord` along the last axis
+        inline void addRun(const T label, const types::ShapeType & coord, const std::size_t length) {
+            const std::size_t id = labelIndex(label);
+            counts[id] += length;
+            std::size_t * begin = &bbBegin[id * ndim];
+            std::size_t * end = &bbEnd[id * ndim];
+            for(unsigned d = 0; d < ndim; ++d) {
+                const std::size_t runLength = (d == ndim - 1) ? length : 1;
+                begin[d] = std::min(begin[d], coord[d]);
+                end[d] = std::max(end[d], coord[d] + runLength);
+            }
+            if(computeCentroids) {
+                double * sums = &coordSums[id * ndim];
+                for(unsigned d = 0; d < ndim - 1; ++d) {
+                    sums[d] += static_cast<double>(coord[d]) * length;
+                }
+                // sum of coord, coord + 1, ..., coord + length - 1
+                sums[ndim - 1] += static_cast<double>(coord[ndim - 1]) * length + 0.5 * length * (length - 1.);
+            }
+        }
+
+        unsigned ndim;
+        bool computeCentroids;
+        std::unordered_map<T, std::size_t> index;
+        std::vector<std::size_t> counts;
+        std::vector<std::size_t> bbBegin;
+        std::vector<std::size_t> bbEnd;
+        std::vector<double> coordSums;
+    };
+
+
+    template<class T>
+    inline void mergeInto(LabelAccumulator<T> & target, const LabelAccumulator<T> & source) {
+        const unsigned ndim = target.ndim;
+        for(const auto & elem : source.index) {
+            const std::size_t id = target.labelIndex(elem.first);
+            const std::size_t sourceId = elem.second;
+            target.counts[id] += source.counts[sourceId];
+            for(unsigned d = 0; d < ndim; ++d) {
+                target.bbBegin[id * ndim + d] = std::min(target.bbBegin[id * ndim + d],
+                                                         source.bbBegin[sourceId * ndim + d]);
+                target.bbEnd[id * ndim + d] = std::max(target.bbEnd[id * ndim + d],
+                                                       source.bbEnd[sourceId * ndim + d]);
+                if(target.computeCentroids) {
+                    target.coordSums[id * ndim + d] += source.coordSums[sourceId * ndim + d];
+                }
+            }
+        }
+    }
+
+
+    // merge the per thread data pairwise in parallel, the result ends up in the first element
+    template<class MAP>
+    inline void treeMerge(std::vector<MAP> & maps, const int nThreads) {
+        const std::size_t nMaps = maps.size();
+        for(std::size_t stride = 1; stride < nMaps; stride *= 2) {
+            const std::size_t nPairs = (nMaps + 2 * stride - 1) / (2 * stride);
+            parallel_foreach(nThreads, nPairs, [&](const int tid, const std::size_t pairId){
+                const std::size_t target = 2 * stride * pairId;
+                const std::size_t source = target + stride;
+                if(source >= nMaps) {
+                    return;
+                }
+                mergeInto(maps[target], maps[source]);
+                maps[source] = MAP();
+            });
+        }
+    }
+
+}
+
+
+    // find the chunks which contain only a single value
+    // (or only `value` if `removeSpecificValue` is true).
+    // if `maxCompressedSize` is not zero, only chunks that take at most this many bytes
+    // on disc are decompressed and checked; this is a cheap way to skip most
+    // non-trivial chunks of compressed datasets, because constant chunks compress very well
+    template<class T>
+    void findTrivialChunks(const Dataset & dataset, const int nThreads,
+                           std::vector<types::ShapeType> & trivialChunks,
+                           const bool removeSpecificValue=false, const T value=0,
+                           const std::size_t maxCompressedSize=0) {
+        dataset.checkRequestType(typeid(T));
+
+        const int nActualThreads = ParallelOptions(nThreads).getActualNumThreads();
+        std::vector<std::vector<types::ShapeType>> threadChunks(nActualThreads);
+        std::vector<std::vector<T>> threadBuffer(nActualThreads);
+
+        parallel_for_each_chunk(dataset, nThreads, [&](const int tid,
+                                                       const Dataset & ds,
+                                                       const types::ShapeType & chunk) {
             if(!ds.chunkExists(chunk)) {
                 return;
             }
-            ds.removeChunk(chunk);
+            T chunkValue;
+            if(!functions_detail::isTrivialChunk(ds, chunk, maxCompressedSize,
+                                                 threadBuffer[tid], chunkValue)) {
+                return;
+            }
+            if(!removeSpecificValue || chunkValue == value) {
+                threadChunks[tid].push_back(chunk);
+            }
         });
 
-        // delete all empty directories
-        dataset.remove();
+        trivialChunks.clear();
+        for(const auto & chunks : threadChunks) {
+            trivialChunks.insert(trivialChunks.end(), chunks.begin(), chunks.end());
+        }
+        std::sort(trivialChunks.begin(), trivialChunks.end());
     }
 
 
-    // TODO add option to ignore fill value
-    // TODO maybe it would be benefitial to have intermediate unordered sets
+    // remove chunks which contain only a single value
+    // -> this is often some background value, that might
+    // be different from the global background value.
+    // returns the removed chunks via `removedChunks`; if `dryRun` is true, nothing is removed
     template<class T>
-    void unique(const Dataset & dataset, const int nThreads, std::set<T> & uniques) {
+    void removeTrivialChunks(const Dataset & dataset, const int nThreads,
+                             std::vector<types::ShapeType> & removedChunks,
+                             const bool removeSpecificValue=false, const T value=0,
+                             const bool dryRun=false, const std::size_t maxCompressedSize=0) {
+
+        // check if we are allowed to delete
+        if(!dryRun && !dataset.mode().canWrite()) {
+            const std::string err = "Cannot delete chunks in a dataset that was not opened with write permissions.";
+            throw std::invalid_argument(err.c_str());
+        }
+
+        findTrivialChunks(dataset, nThreads, removedChunks, removeSpecificValue, value, maxCompressedSize);
+        if(dryRun) {
+            return;
+        }
+
+        // delete trivial chunks in parallel
+        parallel_foreach(nThreads, removedChunks.size(), [&](const int tid, const std::size_t chunkIndex){
+            dataset.removeChunk(removedChunks[chunkIndex]);
+        });
+    }
+
+
+    template<class T>
+    void removeTrivialChunks(const Dataset & dataset, const int nThreads,
+                             const bool removeSpecificValue=false, const T value=0) {
+        std::vector<types::ShapeType> removedChunks;
+        removeTrivialChunks(dataset, nThreads, removedChunks, removeSpecificValue, value);
+    }
+
+
+    // find the unique values and their counts in all chunks that exist, sorted by value.
+    // the counts of each chunk are computed by sort and run-length encoding and accumulated per thread
+    // in hash maps, which are merged in parallel. small integer types are counted with a dense histogram.
+    template<class T>
+    void uniqueWithCounts(const Dataset & dataset, const int nThreads,
+                          std::vector<T> & uniques, std::vector<std::size_t> & counts,
+                          const bool ignoreFillValue=false) {
+        dataset.checkRequestType(typeid(T));
+        T fillValue;
+        dataset.getFillValue(&fillValue);
 
         // allocate the per thread data
         // need to get actual number of threads here
         ParallelOptions pOpts(nThreads);
         const int nActualThreads = pOpts.getActualNumThreads();
-        std::vector<std::set<T>> threadData(nActualThreads - 1);
+        std::vector<std::vector<T>> threadBuffer(nActualThreads);
 
-        // iterate over all chunks
-        parallel_for_each_chunk(dataset, nThreads, [&threadData, &uniques](const int tid,
-                                                                           const Dataset & ds,
-                                                                           const types::ShapeType & chunk) {
-            // skip empty chunks, don't count them in unique values
-            if(!ds.chunkExists(chunk)) {
+        const types::ShapeType roiBegin(dataset.dimension(), 0);
+        const auto & roiShape = dataset.shape();
+        // empty chunks are skipped, they don't count in the unique values
+        auto skipMissing = [](const std::size_t nValues){};
+
+        uniques.clear();
+        counts.clear();
+
+        if(functions_detail::useBincount<T>()) {
+            const int64_t minVal = std::numeric_limits<T>::min();
+            const std::size_t nBins = static_cast<int64_t>(std::numeric_limits<T>::max()) - minVal + 1;
+            std::vector<std::vector<std::size_t>> threadCounts(nActualThreads);
+
+            parallel_for_each_chunk(dataset, nThreads, [&](const int tid,
+                                                           const Dataset & ds,
+                                                           const types::ShapeType & chunk) {
+                auto & hist = threadCounts[tid];
+                if(hist.empty()) {
+                    hist.resize(nBins, 0);
+                }
+                functions_detail::visitChunkInRoi(ds, chunk, roiBegin, roiShape, threadBuffer[tid],
+                                                  [&](const T * begin, const T * end){
+                    for(auto it = begin; it != end; ++it) {
+                        ++hist[static_cast<int64_t>(*it) - minVal];
+                    }
+                }, skipMissing);
+            });
+
+            // merge the per thread data
+            std::vector<std::size_t> hist(nBins, 0);
+            for(const auto & threadHist : threadCounts) {
+                if(threadHist.empty()) {
+                    continue;
+                }
+                for(std::size_t bin = 0; bin < nBins; ++bin) {
+                    hist[bin] += threadHist[bin];
+                }
+            }
+            for(std::size_t bin = 0; bin < nBins; ++bin) {
+                const T val = static_cast<T>(static_cast<int64_t>(bin) + minVal);
+                if(hist[bin] == 0 || (ignoreFillValue && val == fillValue)) {
+                    continue;
+                }
+                uniques.push_back(val);
+                counts.push_back(hist[bin]);
+            }
+            return;
+        }
+
+        std::vector<functions_detail::CountMap<T>> threadMaps(nActualThreads);
+        std::vector<std::vector<T>> threadValues(nActualThreads);
+        parallel_for_each_chunk(dataset, nThreads, [&](const int tid,
+                                                       const Dataset & ds,
+                                                       const types::ShapeType & chunk) {
+            // collect the values of the chunk without the zarr padding
+            auto & values = threadValues[tid];
+            values.clear();
+            functions_detail::visitChunkInRoi(ds, chunk, roiBegin, roiShape, threadBuffer[tid],
+                                              [&values](const T * begin, const T * end){
+                values.insert(values.end(), begin, end);
+            }, skipMissing);
+            if(values.empty()) {
                 return;
             }
-            const size_t chunkSize = ds.getChunkSize(chunk);
-            std::vector<T> data(chunkSize);
-            ds.readChunk(chunk, &data[0]);
-            auto & threadSet = (tid == 0) ? uniques : threadData[tid - 1];
-            threadSet.insert(data.begin(), data.end());
+
+            // sort and run-length encode to only insert each value of the chunk once
+            std::sort(values.begin(), values.end());
+            auto & threadMap = threadMaps[tid];
+            for(auto it = values.begin(); it != values.end();) {
+                const auto next = std::upper_bound(it, values.end(), *it);
+                threadMap[*it] += std::distance(it, next);
+                it = next;
+            }
         });
 
         // merge the per thread data
-        // TODO can we parallelize ?
-        for(const auto & threadSet : threadData) {
-            uniques.insert(threadSet.begin(), threadSet.end());
+        functions_detail::treeMerge(threadMaps, nThreads);
+        const auto & merged = threadMaps[0];
+        std::vector<std::pair<T, std::size_t>> sorted(merged.begin(), merged.end());
+        std::sort(sorted.begin(), sorted.end());
+        uniques.reserve(sorted.size());
+        counts.reserve(sorted.size());
+        for(const auto & elem : sorted) {
+            if(ignoreFillValue && elem.first == fillValue) {
+                continue;
+            }
+            uniques.push_back(elem.first);
+            counts.push_back(elem.second);
         }
     }
 
 
-    // TODO add option to ignore fill value
-    // TODO maybe it would be benefitial to have intermediate unordered maps
+    template<class T>
+    void unique(const Dataset & dataset, const int nThreads, std::vector<T> & uniques,
+                const bool ignoreFillValue=false) {
+        std::vector<std::size_t> counts;
+        uniqueWithCounts(dataset, nThreads, uniques, counts, ignoreFillValue);
+    }
+
+
+    template<class T>
+    void unique(const Dataset & dataset, const int nThreads, std::set<T> & uniques) {
+        std::vector<T> uniqueVec;
+        unique(dataset, nThreads, uniqueVec);
+        uniques.insert(uniqueVec.begin(), uniqueVec.end());
+    }
+
+
     template<class T>
     void uniqueWithCounts(const Dataset & dataset, const int nThreads, std::map<T, size_t> & uniques) {
-        // allocate the per thread data
-        ParallelOptions pOpts(nThreads);
-        const int nActualThreads = pOpts.getActualNumThreads();
-        std::vector<std::map<T, size_t>> threadData(nActualThreads - 1);
+        std::vector<T> uniqueVec;
+        std::vector<std::size_t> counts;
+        uniqueWithCounts(dataset, nThreads, uniqueVec, counts);
+        for(std::size_t i = 0; i < uniqueVec.size(); ++i) {
+            uniques.emplace(uniqueVec[i], counts[i]);
+        }
+    }
+
 
-        // iterate over all chunks
-        parallel_for_each_chunk(dataset, nThreads, [&threadData, &uniques](const int tid,
-                                                                           const Dataset & ds,
-                                                                           const types::ShapeType & chunk) {
-            // skip empty chunks, don't count them in unique values
+    // compute the number of voxels, the bounding box and optionally the centroid of all labels
+    // (= values) in the chunks that exist, sorted by label. the statistics are accumulated per thread
+    // over runs of equal labels along the last axis and merged in parallel like in uniqueWithCounts.
+    // `bbBegin`, `bbEnd` and `centroids` hold `ndim` values per label, the bounding box end is exclusive.
+    template<class T>
+    void labelStatistics(const Dataset & dataset, const int nThreads,
+                         std::vector<T> & labels, std::vector<std::size_t> & counts,
+                         std::vector<std::size_t> & bbBegin, std::vector<std::size_t> & bbEnd,
+                         std::vector<double> & centroids,
+                         const bool computeCentroids=false, const bool ignoreFillValue=false) {
+        dataset.checkRequestType(typeid(T));
+        T fillValue;
+        dataset.getFillValue(&fillValue);
+        const unsigned ndim = dataset.dimension();
+
+        const int nActualThreads = ParallelOptions(nThreads).getActualNumThreads();
+        std::vector<functions_detail::LabelAccumulator<T>> threadAccumulators(nActualThreads,
+                                                                               functions_detail::LabelAccumulator<T>(ndim, computeCentroids));
+        std::vector<std::vector<T>> threadBuffer(nActualThreads);
+
+        parallel_for_each_chunk(dataset, nThreads, [&](const int tid,
+                                                       const Dataset & ds,
+                                                       const types::ShapeType & chunk) {
+            // empty chunks are skipped
             if(!ds.chunkExists(chunk)) {
                 return;
             }
-            const size_t chunkSize = ds.getChunkSize(chunk);
-            std::vector<T> data(chunkSize);
-            ds.readChunk(chunk, &data[0]);
-            auto & threadMap = (tid == 0) ? uniques : threadData[tid - 1];
-            for(const T val : data) {
-                auto mIt = threadMap.find(val);
-                if(mIt == threadMap.end()) {
-                    threadMap.emplace(std::make_pair(val, 1));
-                } else {
-                    ++mIt->second;
+
+            // zarr stores edge chunks with the full chunk shape
+            types::ShapeType chunkBegin, chunkShape;
+            ds.chunking().getBlockBeginAndShape(chunk, chunkBegin, chunkShape);
+            const auto & bufferShape = ds.isZarr() ? ds.defaultChunkShape() : chunkShape;
+            auto & buffer = threadBuffer[tid];
+            buffer.resize(std::accumulate(bufferShape.begin(), bufferShape.end(), 1, std::multiplies<std::size_t>()));
+            if(ds.readChunk(chunk, &buffer[0])) {
+                throw std::runtime_error("Label statistics over varlen chunks are not supported");
+            }
+
+            auto & acc = threadAccumulators[tid];
+            types::ShapeType strides;
+            region_detail::getStrides(bufferShape, strides);
+            const std::size_t rowLength = chunkShape.back();
+            // the coordinate of the current row in the dataset
+            types::ShapeType coord(chunkBegin);
+            region_detail::forEachRow(strides, types::ShapeType(ndim, 0), chunkShape, [&](const std::size_t row){
+                const T * rowBegin = &buffer[row];
+                const T * rowEnd = rowBegin + rowLength;
+                for(const T * it = rowBegin; it != rowEnd;) {
+                    const T label = *it;
+                    const T * runEnd = std::find_if(it, rowEnd, [label](const T val){return val != label;});
+                    if(!(ignoreFillValue && label == fillValue)) {
+                        coord[ndim - 1] = chunkBegin[ndim - 1] + std::distance(rowBegin, it);
+                        acc.addRun(label, coord, std::distance(it, runEnd));
+                    }
+                    it = runEnd;
+                }
+                // advance to the next row
+                for(int d = ndim - 2; d >= 0; --d) {
+                    if(++coord[d] < chunkBegin[d] + chunkShape[d]) {
+                        break;
+                    }
+                    coord[d] = chunkBegin[d];
+                }
+            });
+        });
+
+        // merge the per thread data and sort by label
+        functions_detail::treeMerge(threadAccumulators, nThreads);
+        const auto & merged = threadAccumulators[0];
+        std::vector<std::pair<T, std::size_t>> sorted(merged.index.begin(), merged.index.end());
+        std::sort(sorted.begin(), sorted.end());
+
+        const std::size_t nLabels = sorted.size();
+        labels.resize(nLabels);
+        counts.resize(nLabels);
+        bbBegin.resize(nLabels * ndim);
+        bbEnd.resize(nLabels * ndim);
+        centroids.resize(computeCentroids ? nLabels * ndim : 0);
+        for(std::size_t i = 0; i < nLabels; ++i) {
+            const std::size_t id = sorted[i].second;
+            labels[i] = sorted[i].first;
+            counts[i] = merged.counts[id];
+            for(unsigned d = 0; d < ndim; ++d) {
+                bbBegin[i * ndim + d] = merged.bbBegin[id * ndim + d];
+                bbEnd[i * ndim + d] = merged.bbEnd[id * ndim + d];
+                if(computeCentroids) {
+                    centroids[i * ndim + d] = merged.coordSums[id * ndim + d] / counts[i];
                 }
             }
+        }
+    }
+
+
+    // map the values of all chunks that exist through the table `keys` -> `values` and write
+    // the result to the same chunks of `out`, which may be the input dataset itself.
+    // values without a key are not changed, chunks that don't exist are skipped.
+    // small integer types are mapped with a dense lookup table, other types with a hash map.
+    template<class T>
+    void applyMapping(const Dataset & in, const Dataset & out,
+                      const std::vector<T> & keys, const std::vector<T> & values,
+                      const int nThreads) {
+        in.checkRequestType(typeid(T));
+        out.checkRequestType(typeid(T));
+        if(!out.mode().canWrite()) {
+            throw std::invalid_argument("Cannot write mapped data to a dataset opened without write permissions.");
+        }
+        if(keys.size() != values.size()) {
+            throw std::runtime_error("Need the same number of keys and values for the mapping");
+        }
+        if(in.shape() != out.shape() || in.defaultChunkShape() != out.defaultChunkShape() ||
+           in.isZarr() != out.isZarr()) {
+            throw std::runtime_error("Input and output of the mapping must have the same shape, chunks and format");
+        }
+
+        std::function<T (const T)> lookup;
+        std::vector<T> lut;
+        std::unordered_map<T, T> mapping;
+        if(functions_detail::useBincount<T>()) {
+            const int64_t minVal = std::numeric_limits<T>::min();
+            const std::size_t nValues = static_cast<int64_t>(std::numeric_limits<T>::max()) - minVal + 1;
+            lut.resize(nValues);
+            for(std::size_t i = 0; i < nValues; ++i) {
+                lut[i] = static_cast<T>(static_cast<int64_t>(i) + minVal);
+            }
+            std::vector<bool> isMapped(nValues, false);
+            for(std::size_t i = 0; i < keys.size(); ++i) {
+                const std::size_t index = static_cast<int64_t>(keys[i]) - minVal;
+                if(isMapped[index]) {
+                    throw std::runtime_error("The keys of the mapping must be unique");
+                }
+                isMapped[index] = true;
+                lut[index] = values[i];
+            }
+            lookup = [&lut, minVal](const T val){return lut[static_cast<int64_t>(val) - minVal];};
+        } else {
+            mapping.reserve(keys.size());
+            for(std::size_t i = 0; i < keys.size(); ++i) {
+                if(!mapping.emplace(keys[i], values[i]).second) {
+                    throw std::runtime_error("The keys of the mapping must be unique");
+                }
+            }
+            lookup = [&mapping](const T val){
+                const auto it = mapping.find(val);
+                return it == mapping.end() ? val : it->second;
+            };
+        }
+
+        const int nActualThreads = ParallelOptions(nThreads).getActualNumThreads();
+        std::vector<std::vector<T>> threadBuffer(nActualThreads);
+        parallel_for_each_chunk(in, nThreads, [&](const int tid,
+                                                  const Dataset & ds,
+                                                  const types::ShapeType & chunk) {
+            if(!ds.chunkExists(chunk)) {
+                return;
+            }
+            // zarr stores edge chunks with the full chunk shape
+            auto & buffer = threadBuffer[tid];
+            buffer.resize(ds.isZarr() ? ds.defaultChunkSize() : ds.getChunkSize(chunk));
+            if(ds.readChunk(chunk, &buffer[0])) {
+                throw std::runtime_error("Mapping varlen chunks is not supported");
+            }
+
+            // neighbouring values are often the same, so we only look up
+            // the value if it differs from the previous one
+            T prevKey = buffer[0];
+            T prevVal = lookup(prevKey);
+            for(auto & val : buffer) {
+                if(val != prevKey) {
+                    prevKey = val;
+                    prevVal = lookup(val);
+                }
+                val = prevVal;
+            }
+            out.writeChunk(chunk, &buffer[0]);
+        });
+    }
+
+
+    // compute minimum, maximum, sum and number of values in the roi [roiBegin, roiEnd),
+    // chunks that don't exist contribute the fill value, weighted by their size in the roi.
+    // NaN is ignored by the minimum and maximum, which are NaN only if all values are NaN,
+    // but it propagates to the sum
+    template<class T>
+    void minMaxSum(const Dataset & dataset, const int nThreads,
+                   const types::ShapeType & roiBegin, const types::ShapeType & roiEnd,
+                   T & minVal, T & maxVal, double & sum, std::size_t & count) {
+        dataset.checkRequestType(typeid(T));
+        types::ShapeType roiShape(roiEnd);
+        for(unsigned d = 0; d < roiShape.size(); ++d) {
+            roiShape[d] -= roiBegin[d];
+        }
+        dataset.checkRequestShape(roiBegin, roiShape);
+
+        T fillValue;
+        dataset.getFillValue(&fillValue);
+
+        // allocate the per thread data
+        ParallelOptions pOpts(nThreads);
+        const int nActualThreads = pOpts.getActualNumThreads();
+        std::vector<T> threadMin(nActualThreads, std::numeric_limits<T>::max());
+        std::vector<T> threadMax(nActualThreads, std::numeric_limits<T>::lowest());
+        std::vector<double> threadSum(nActualThreads, 0.);
+        std::vector<std::size_t> threadCount(nActualThreads, 0);
+        std::vector<std::vector<T>> threadBuffer(nActualThreads);
+
+        parallel_for_each_chunk_in_roi(dataset, roiBegin, roiEnd, nThreads, [&](const int tid,
+                                                                                const Dataset & ds,
+                                                                                const types::ShapeType & chunk) {
+            auto & tMin = threadMin[tid];
+            auto & tMax = threadMax[tid];
+            auto & tSum = threadSum[tid];
+            auto & tCount = threadCount[tid];
+            functions_detail::visitChunkInRoi(ds, chunk, roiBegin, roiShape, threadBuffer[tid],
+                                              [&](const T * begin, const T * end){
+                // std::min / std::max depend on the order of the values if one of them is NaN,
+                // so NaN needs to be skipped explicitly
+                for(auto it = begin; it != end; ++it) {
+                    if(std::isnan(*it)) {
+                        continue;
+                    }
+                    tMin = std::min(tMin, *it);
+                    tMax = std::max(tMax, *it);
+                }
+                tSum = std::accumulate(begin, end, tSum);
+                tCount += std::distance(begin, end);
+            }, [&](const std::size_t nValues){
+                if(!std::isnan(fillValue)) {
+                    tMin = std::min(tMin, fillValue);
+                    tMax = std::max(tMax, fillValue);
+                }
+                tSum += nValues * static_cast<double>(fillValue);
+                tCount += nValues;
+            });
         });
 
         // merge the per thread data
-        // TODO can we parallelize ?
-        for(const auto & threadMap : threadData) {
-            for(auto tIt = threadMap.begin(); tIt != threadMap.end(); ++tIt) {
-                auto uIt = uniques.find(tIt->first);
-                if(uIt == uniques.end()) {
-                    uniques.emplace(std::make_pair(tIt->first, tIt->second));
-                } else {
-                    uIt->second += tIt->second;
+        minVal = *std::min_element(threadMin.begin(), threadMin.end());
+        maxVal = *std::max_element(threadMax.begin(), threadMax.end());
+        // all values are NaN
+        if(minVal > maxVal) {
+            minVal = maxVal = std::numeric_limits<T>::quiet_NaN();
+        }
+        sum = std::accumulate(threadSum.begin(), threadSum.end(), 0.);
+        count = std::accumulate(threadCount.begin(), threadCount.end(), std::size_t(0));
+    }
+
+
+    // compute the histogram of the values in the roi [roiBegin, roiEnd) with `nBins` bins
+    // of equal width in the range [minVal, maxVal]. the last bin includes maxVal, values
+    // outside of the range and NaN are ignored. chunks that don't exist contribute the fill value,
+    // weighted by their size in the roi
+    template<class T>
+    void histogram(const Dataset & dataset, const int nThreads,
+                   const types::ShapeType & roiBegin, const types::ShapeType & roiEnd,
+                   const double minVal, const double maxVal, const std::size_t nBins,
+                   std::vector<std::size_t> & counts) {
+        dataset.checkRequestType(typeid(T));
+        if(nBins == 0 || !(maxVal > minVal)) {
+            throw std::runtime_error("Invalid histogram range or number of bins");
+        }
+        types::ShapeType roiShape(roiEnd);
+        for(unsigned d = 0; d < roiShape.size(); ++d) {
+            roiShape[d] -= roiBegin[d];
+        }
+        dataset.checkRequestShape(roiBegin, roiShape);
+
+        T fillValue;
+        dataset.getFillValue(&fillValue);
+
+        const double norm = nBins / (maxVal - minVal);
+        auto addValue = [minVal, maxVal, norm, nBins](const double val, const std::size_t weight,
+                                                      std::vector<std::size_t> & hist) {
+            // NaN compares false with everything, so it needs to be skipped explicitly
+            if(std::isnan(val) || val < minVal || val > maxVal) {
+                return;
+            }
+            const std::size_t bin = std::min(static_cast<std::size_t>((val - minVal) * norm), nBins - 1);
+            hist[bin] += weight;
+        };
+
+        // allocate the per thread data
+        ParallelOptions pOpts(nThreads);
+        const int nActualThreads = pOpts.getActualNumThreads();
+        std::vector<std::vector<std::size_t>> threadCounts(nActualThreads, std::vector<std::size_t>(nBins, 0));
+        std::vector<std::vector<T>> threadBuffer(nActualThreads);
+
+        parallel_for_each_chunk_in_roi(dataset, roiBegin, roiEnd, nThreads, [&](const int tid,
+                                                                                const Dataset & ds,
+                                                                                const types::ShapeType & chunk) {
+            auto & hist = threadCounts[tid];
+            functions_detail::visitChunkInRoi(ds, chunk, roiBegin, roiShape, threadBuffer[tid],
+                                              [&](const T * begin, const T * end){
+                for(auto it = begin; it != end; ++it) {
+                    addValue(static_cast<double>(*it), 1, hist);
                 }
+            }, [&](const std::size_t nValues){
+                addValue(static_cast<double>(fillValue), nValues, hist);
+            });
+        });
+
+        // merge the per thread data
+        counts.assign(nBins, 0);
+        for(const auto & hist : threadCounts) {
+            for(std::size_t bin = 0; bin < nBins; ++bin) {
+                counts[bin] += hist[bin];
             }
         }
     }
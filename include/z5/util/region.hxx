@@ -0,0 +1,179 @@
+#pragma once
+
+#include "z5/dataset.hxx"
+
+
+namespace z5 {
+namespace util {
+
+    // helper functions to read and write regions of datasets
+    // to and from flat buffers in c-order, without going through a multiarray library
+
+
+namespace region_detail {
+
+    inline void getStrides(const types::ShapeType & shape, types::ShapeType & strides) {
+        const int ndim = shape.size();
+        strides.resize(ndim);
+        if(ndim == 0) {
+            return;
+        }
+        strides[ndim - 1] = 1;
+        for(int d = ndim - 2; d >= 0; --d) {
+            strides[d] = strides[d + 1] * shape[d + 1];
+        }
+    }
+
+    // call f(rowBegin) for the flat begin index of all rows (= innermost dimension)
+    // of the region of shape `regionShape` starting at `offset` in an array with `strides`
+    template<class F>
+    inline void forEachRow(const types::ShapeType & strides, const types::ShapeType & offset,
+                           const types::ShapeType & regionShape, F && f) {
+        const int ndim = regionShape.size();
+        if(ndim == 0 || std::find(regionShape.begin(), regionShape.end(), 0) != regionShape.end()) {
+            return;
+        }
+        types::ShapeType pos(ndim - 1, 0);
+        while(true) {
+            std::size_t rowBegin = offset[ndim - 1];
+            for(int d = 0; d < ndim - 1; ++d) {
+                rowBegin += (offset[d] + pos[d]) * strides[d];
+            }
+            f(rowBegin);
+
+            int d = ndim - 2;
+            for(; d >= 0; --d) {
+                if(++pos[d] < regionShape[d]) {
+                    break;
+                }
+                pos[d] = 0;
+            }
+            if(d < 0) {
+                break;
+            }
+        }
+    }
+}
+
+
+    // copy the region of shape `regionShape` starting at `srcOffset` in `src`
+    // to the region starting at `dstOffset` in `dst`
+    template<class T>
+    inline void copyRegion(const T * src, const types::ShapeType & srcShape, const types::ShapeType & srcOffset,
+                           T * dst, const types::ShapeType & dstShape, const types::ShapeType & dstOffset,
+                           const types::ShapeType & regionShape) {
+        const int ndim = regionShape.size();
+        if(ndim == 0) {
+            return;
+        }
+        types::ShapeType srcStrides, dstStrides;
+        region_detail::getStrides(srcShape, srcStrides);
+        region_detail::getStrides(dstShape, dstStrides);
+
+        std::size_t srcBase = 0;
+        for(int d = 0; d < ndim; ++d) {
+            srcBase += srcOffset[d] * srcStrides[d];
+        }
+
+        const std::size_t rowLength = regionShape[ndim - 1];
+        // iterate over the rows of the region in the destination and keep track
+        // of the position in the region to find the corresponding source row
+        types::ShapeType pos(ndim, 0);
+        region_detail::forEachRow(dstStrides, dstOffset, regionShape, [&](const std::size_t dstRow){
+            std::size_t srcRow = srcBase;
+            for(int d = 0; d < ndim - 1; ++d) {
+                srcRow += pos[d] * srcStrides[d];
+            }
+            std::copy(src + srcRow, src + srcRow + rowLength, dst + dstRow);
+            // advance the position in the region
+            for(int d = ndim - 2; d >= 0; --d) {
+                if(++pos[d] < regionShape[d]) {
+                    break;
+                }
+                pos[d] = 0;
+            }
+        });
+    }
+
+
+    // fill the region of shape `regionShape` starting at `offset` in `dst` with `val`
+    template<class T>
+    inline void fillRegion(T * dst, const types::ShapeType & dstShape, const types::ShapeType & offset,
+                           const types::ShapeType & regionShape, const T val) {
+        if(regionShape.empty()) {
+            return;
+        }
+        types::ShapeType strides;
+        region_detail::getStrides(dstShape, strides);
+        const std::size_t rowLength = regionShape.back();
+        region_detail::forEachRow(strides, offset, regionShape, [&](const std::size_t row){
+            std::fill(dst + row, dst + row + rowLength, val);
+        });
+    }
+
+
+    // read the region [begin, begin + shape) of the dataset to `out`;
+    // chunks that don't exist are filled with the fill value
+    template<class T>
+    inline void readRegion(const Dataset & ds, const types::ShapeType & begin,
+                           const types::ShapeType & shape, std::vector<T> & out) {
+        ds.checkRequestType(typeid(T));
+        const std::size_t size = std::accumulate(shape.begin(), shape.end(), 1, std::multiplies<std::size_t>());
+        out.resize(size);
+
+        T fillValue;
+        ds.getFillValue(&fillValue);
+
+        std::vector<types::ShapeType> chunkRequests;
+        const auto & chunking = ds.chunking();
+        chunking.getBlocksOverlappingRoi(begin, shape, chunkRequests);
+
+        const bool isZarr = ds.isZarr();
+        types::ShapeType offsetInRequest, requestShape, offsetInChunk, chunkShape;
+        std::vector<T> buffer;
+        for(const auto & chunkId : chunkRequests) {
+            chunking.getCoordinatesInRoi(chunkId, begin, shape,
+                                         offsetInRequest, requestShape, offsetInChunk);
+            if(!ds.chunkExists(chunkId)) {
+                fillRegion(&out[0], shape, offsetInRequest, requestShape, fillValue);
+                continue;
+            }
+
+            // zarr stores edge chunks with the full chunk shape
+            if(isZarr) {
+                chunkShape = ds.defaultChunkShape();
+            } else {
+                ds.getChunkShape(chunkId, chunkShape);
+            }
+            buffer.resize(std::accumulate(chunkShape.begin(), chunkShape.end(), 1, std::multiplies<std::size_t>()));
+            if(ds.readChunk(chunkId, &buffer[0])) {
+                throw std::runtime_error("Can't read regions from varlen chunks");
+            }
+            copyRegion(&buffer[0], chunkShape, offsetInChunk,
+                       &out[0], shape, offsetInRequest, requestShape);
+        }
+    }
+
+
+    // write a complete chunk from a buffer with the actual shape of the chunk;
+    // takes care of padding edge chunks for zarr
+    template<class T>
+    inline void writeCompleteChunk(const Dataset & ds, const types::ShapeType & chunkId,
+                                   const std::vector<T> & data) {
+        types::ShapeType chunkShape;
+        ds.getChunkShape(chunkId, chunkShape);
+        const auto & defaultShape = ds.defaultChunkShape();
+        if(!ds.isZarr() || chunkShape == defaultShape) {
+            ds.writeChunk(chunkId, &data[0]);
+            return;
+        }
+        T fillValue;
+        ds.getFillValue(&fillValue);
+        std::vector<T> padded(ds.defaultChunkSize(), fillValue);
+        const types::ShapeType zeros(chunkShape.size(), 0);
+        copyRegion(&data[0], chunkShape, zeros, &padded[0], defaultShape, zeros, chunkShape);
+        ds.writeChunk(chunkId, &padded[0]);
+    }
+
+}
+}
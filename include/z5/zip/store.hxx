@@ -0,0 +1,581 @@
+#pragma once
+
+#include <map>
+#include <mutex>
+#include <array>
+#include <fstream>
+#include <cstdint>
+
+#ifdef _WIN32
+#include <io.h>
+#include <fcntl.h>
+#else
+#include <fcntl.h>
+#include <unistd.h>
+#endif
+
+#include "z5/kv/store.hxx"
+#include "z5/kv/directory.hxx"
+#include "z5/util/threadpool.hxx"
+
+
+// single-file archive of a container in the zip format. the entries are stored
+// without compression (the chunks are compressed already), so chunks can be
+// read directly at the offsets given by the central directory.
+// we support zip64, so archives may hold more than 65535 entries and more than 4 GB
+namespace z5 {
+namespace zip {
+
+namespace zip_detail {
+
+    const uint32_t localHeaderSignature = 0x04034b50;
+    const uint32_t centralHeaderSignature = 0x02014b50;
+    const uint32_t endOfCentralDirSignature = 0x06054b50;
+    const uint32_t zip64EndOfCentralDirSignature = 0x06064b50;
+    const uint32_t zip64LocatorSignature = 0x07064b50;
+
+    const std::size_t localHeaderSize = 30;
+    const std::size_t centralHeaderSize = 46;
+    const std::size_t endOfCentralDirSize = 22;
+    const std::size_t zip64EndOfCentralDirSize = 56;
+    const std::size_t zip64LocatorSize = 20;
+
+    const uint16_t zip64ExtraId = 0x0001;
+    const uint16_t version = 20;
+    const uint16_t zip64Version = 45;
+    // 1980-01-01, the earliest date that can be represented
+    const uint16_t dosDate = (1 << 5) | 1;
+    const uint32_t max32 = 0xffffffff;
+    const uint16_t max16 = 0xffff;
+
+
+    inline uint32_t crc32(const char * data, const std::size_t size) {
+        static const std::array<uint32_t, 256> table = [](){
+            std::array<uint32_t, 256> t;
+            for(uint32_t i = 0; i < 256; ++i) {
+                uint32_t c = i;
+                for(int k = 0; k < 8; ++k) {
+                    c = (c & 1) ? 0xedb88320 ^ (c >> 1) : c >> 1;
+                }
+                t[i] = c;
+            }
+            return t;
+        }();
+        uint32_t crc = max32;
+        for(std::size_t i = 0; i < size; ++i) {
+            crc = table[(crc ^ static_cast<uint8_t>(data[i])) & 0xff] ^ (crc >> 8);
+        }
+        return crc ^ max32;
+    }
+
+
+    // zip uses little endian for all numbers
+    template<class T>
+    inline void put(std::vector<char> & out, const T val) {
+        for(std::size_t i = 0; i < sizeof(T); ++i) {
+            out.push_back(static_cast<char>((static_cast<uint64_t>(val) >> (8 * i)) & 0xff));
+        }
+    }
+
+    template<class T>
+    inline T get(const char * data) {
+        uint64_t val = 0;
+        for(std::size_t i = 0; i < sizeof(T); ++i) {
+            val |= static_cast<uint64_t>(static_cast<uint8_t>(data[i])) << (8 * i);
+        }
+        return static_cast<T>(val);
+    }
+
+
+    // file for concurrent reads at arbitrary offsets
+    class ReadFile {
+    public:
+        ReadFile(const fs::path & path) : path_(path.string()) {
+            #ifdef _WIN32
+            fd_ = _open(path_.c_str(), _O_RDONLY | _O_BINARY);
+            #else
+            fd_ = open(path_.c_str(), O_RDONLY);
+            #endif
+            if(fd_ < 0) {
+                throw std::runtime_error("Failed to open " + path_);
+            }
+            size_ = fs::file_size(path);
+        }
+
+        ~ReadFile() {
+            #ifdef _WIN32
+            _close(fd_);
+            #else
+            close(fd_);
+            #endif
+        }
+
+        ReadFile(const ReadFile &) = delete;
+        ReadFile & operator=(const ReadFile &) = delete;
+
+        // pread doesn't use the file position, so threads can read concurrently
+        inline void read(const uint64_t offset, const std::size_t size, char * out) const {
+            #ifdef _WIN32
+            std::lock_guard<std::mutex> lock(mutex_);
+            _lseeki64(fd_, offset, SEEK_SET);
+            #endif
+            std::size_t done = 0;
+            while(done < size) {
+                #ifdef _WIN32
+                const auto n = _read(fd_, out + done, static_cast<unsigned>(size - done));
+                #else
+                const auto n = pread(fd_, out + done, size - done, offset + done);
+                #endif
+                if(n <= 0) {
+                    throw std::runtime_error("Failed to read from " + path_);
+                }
+                done += n;
+            }
+        }
+
+        inline uint64_t size() const {return size_;}
+
+    private:
+        std::string path_;
+        int fd_;
+        uint64_t size_;
+        #ifdef _WIN32
+        mutable std::mutex mutex_;
+        #endif
+    };
+
+}
+
+
+    // read-only store for a container in a zip archive.
+    // the central directory is read once when opening, afterwards each
+    // chunk is read with two reads at its offset (local header and data)
+    class Store : public kv::Store {
+    public:
+        Store(const fs::path & path) : path_(path), file_(new zip_detail::ReadFile(path)) {
+            readCentralDirectory();
+        }
+
+        inline bool read(const std::string & key, std::vector<char> & value) const {
+            auto it = entries_.find(key);
+            if(it == entries_.end()) {
+                return false;
+            }
+            readEntry(key, it->second, 0, it->second.size, value);
+            return true;
+        }
+
+        inline bool readRange(const std::string & key, const std::size_t offset,
+                              const std::size_t size, std::vector<char> & value) const {
+            auto it = entries_.find(key);
+            if(it == entries_.end()) {
+                return false;
+            }
+            const uint64_t begin = std::min<uint64_t>(offset, it->second.size);
+            const uint64_t end = std::min<uint64_t>(offset + size, it->second.size);
+            readEntry(key, it->second, begin, end - begin, value);
+            return true;
+        }
+
+        inline bool exists(const std::string & key) const {
+            return entries_.find(key) != entries_.end();
+        }
+
+        inline bool objectSize(const std::string & key, std::size_t & size) const {
+            auto it = entries_.find(key);
+            if(it == entries_.end()) {
+                return false;
+            }
+            size = it->second.size;
+            return true;
+        }
+
+        inline void write(const std::string & key, const std::vector<char> & value) const {
+            checkWritable();
+        }
+
+        inline void remove(const std::string & key) const {
+            checkWritable();
+        }
+
+        inline void removePrefix(const std::string & prefix) const {
+            checkWritable();
+        }
+
+        inline void listChildren(const std::string & prefix, std::vector<std::string> & out) const {
+            const std::string dir = directoryKey(prefix);
+            std::string last;
+            for(auto it = entries_.lower_bound(dir); it != entries_.end() && it->first.compare(0, dir.size(), dir) == 0; ++it) {
+                const std::size_t sep = it->first.find('/', dir.size());
+                if(sep == std::string::npos) {
+                    continue;
+                }
+                // the keys are sorted, so the children are consecutive
+                std::string child = it->first.substr(dir.size(), sep - dir.size());
+                if(child != last) {
+                    out.push_back(child);
+                    last = std::move(child);
+                }
+            }
+        }
+
+        inline bool existsPrefix(const std::string & prefix) const {
+            const std::string dir = directoryKey(prefix);
+            auto it = entries_.lower_bound(dir);
+            return it != entries_.end() && it->first.compare(0, dir.size(), dir) == 0;
+        }
+
+        inline bool isReadOnly() const {return true;}
+
+        inline const fs::path & path() const {return path_;}
+
+        // all keys of the archive, in sorted order
+        inline void keys(std::vector<std::string> & out) const {
+            for(const auto & entry : entries_) {
+                out.push_back(entry.first);
+            }
+        }
+
+    private:
+        struct Entry {
+            uint64_t headerOffset;
+            uint64_t size;
+            uint16_t method;
+        };
+
+        static std::string directoryKey(const std::string & prefix) {
+            return prefix.empty() ? prefix : prefix + "/";
+        }
+
+        inline void readEntry(const std::string & key, const Entry & entry, const uint64_t offset,
+                              const uint64_t size, std::vector<char> & value) const {
+            if(entry.method != 0) {
+                throw std::runtime_error("Entry " + key + " of " + path_.string() +
+                                         " is compressed, only archives with stored entries are supported");
+            }
+            // the extra field of the local header may differ from the central directory,
+            // so we need to read the local header to find the data
+            char header[zip_detail::localHeaderSize];
+            file_->read(entry.headerOffset, zip_detail::localHeaderSize, header);
+            if(zip_detail::get<uint32_t>(header) != zip_detail::localHeaderSignature) {
+                throw std::runtime_error("Invalid local header for entry " + key + " of " + path_.string());
+            }
+            const uint64_t dataOffset = entry.headerOffset + zip_detail::localHeaderSize +
+                                        zip_detail::get<uint16_t>(header + 26) +
+                                        zip_detail::get<uint16_t>(header + 28);
+            value.resize(size);
+            if(size > 0) {
+                file_->read(dataOffset + offset, size, value.data());
+            }
+        }
+
+        inline void readCentralDirectory() {
+            using namespace zip_detail;
+            const uint64_t fileSize = file_->size();
+            if(fileSize < endOfCentralDirSize) {
+                throw std::runtime_error(path_.string() + " is not a zip archive");
+            }
+
+            // the end of central directory record is followed by a comment of at most 64 KB
+            const uint64_t tailSize = std::min<uint64_t>(fileSize, endOfCentralDirSize + max16);
+            std::vector<char> tail(tailSize);
+            file_->read(fileSize - tailSize, tailSize, tail.data());
+            std::size_t pos = tailSize - endOfCentralDirSize;
+            while(get<uint32_t>(&tail[pos]) != endOfCentralDirSignature) {
+                if(pos == 0) {
+                    throw std::runtime_error(path_.string() + " is not a zip archive");
+                }
+                --pos;
+            }
+            const char * eocd = &tail[pos];
+            const uint64_t eocdOffset = fileSize - tailSize + pos;
+
+            uint64_t nEntries = get<uint16_t>(eocd + 10);
+            uint64_t cdSize = get<uint32_t>(eocd + 12);
+            uint64_t cdOffset = get<uint32_t>(eocd + 16);
+
+            // zip64 archives store the actual values in the zip64 end of central directory record
+            if(nEntries == max16 || cdSize == max32 || cdOffset == max32) {
+                char locator[zip64LocatorSize];
+                file_->read(eocdOffset - zip64LocatorSize, zip64LocatorSize, locator);
+                if(get<uint32_t>(locator) != zip64LocatorSignature) {
+                    throw std::runtime_error("Missing zip64 locator in " + path_.string());
+                }
+                char record[zip64EndOfCentralDirSize];
+                file_->read(get<uint64_t>(locator + 8), zip64EndOfCentralDirSize, record);
+                if(get<uint32_t>(record) != zip64EndOfCentralDirSignature) {
+                    throw std::runtime_error("Invalid zip64 end of central directory in " + path_.string());
+                }
+                nEntries = get<uint64_t>(record + 32);
+                cdSize = get<uint64_t>(record + 40);
+                cdOffset = get<uint64_t>(record + 48);
+            }
+
+            std::vector<char> cd(cdSize);
+            file_->read(cdOffset, cdSize, cd.data());
+            const char * p = cd.data();
+            const char * cdEnd = cd.data() + cdSize;
+            for(uint64_t entryId = 0; entryId < nEntries; ++entryId) {
+                if(p + centralHeaderSize > cdEnd || get<uint32_t>(p) != centralHeaderSignature) {
+                    throw std::runtime_error("Invalid central directory in " + path_.string());
+                }
+                Entry entry;
+                entry.method = get<uint16_t>(p + 10);
+                uint64_t compressedSize = get<uint32_t>(p + 20);
+                uint64_t size = get<uint32_t>(p + 24);
+                const uint16_t nameLen = get<uint16_t>(p + 28);
+                const uint16_t extraLen = get<uint16_t>(p + 30);
+                const uint16_t commentLen = get<uint16_t>(p + 32);
+                entry.headerOffset = get<uint32_t>(p + 42);
+                const std::string name(p + centralHeaderSize, nameLen);
+
+                // the zip64 extra field holds the values that are set to the maximum in the header, in order
+                const char * extra = p + centralHeaderSize + nameLen;
+                const char * extraEnd = extra + extraLen;
+                while(extra + 4 <= extraEnd) {
+                    const uint16_t id = get<uint16_t>(extra);
+                    const uint16_t len = get<uint16_t>(extra + 2);
+                    if(id == zip64ExtraId) {
+                        const char * field = extra + 4;
+                        if(size == max32) {
+                            size = get<uint64_t>(field);
+                            field += 8;
+                        }
+                        if(compressedSize == max32) {
+                            compressedSize = get<uint64_t>(field);
+                            field += 8;
+                        }
+                        if(entry.headerOffset == max32) {
+                            entry.headerOffset = get<uint64_t>(field);
+                        }
+                    }
+                    extra += 4 + len;
+                }
+                p += centralHeaderSize + nameLen + extraLen + commentLen;
+
+                // skip the entries of directories
+                if(name.empty() || name.back() == '/') {
+                    continue;
+                }
+                entry.size = compressedSize;
+                entries_.emplace(name, entry);
+            }
+        }
+
+        fs::path path_;
+        std::unique_ptr<zip_detail::ReadFile> file_;
+        // sorted, so that we can list prefixes
+        std::map<std::string, Entry> entries_;
+    };
+
+
+    // write a zip archive with stored entries. entries can be added from several threads,
+    // the checksum and the local header are computed in parallel and only the bookkeeping
+    // of the offsets and writing to the file are serialized
+    class Writer {
+    public:
+        Writer(const fs::path & path) : path_(path), file_(path.string(), std::ios::binary | std::ios::trunc),
+                                        offset_(0), closed_(false) {
+            if(!file_) {
+                throw std::runtime_error("Failed to open " + path.string() + " for writing");
+            }
+        }
+
+        // an archive that was not closed is incomplete and is discarded
+        ~Writer() {
+            if(!closed_) {
+                try {
+                    abort();
+                } catch(...) {}
+            }
+        }
+
+        inline void add(const std::string & name, const char * data, const std::size_t size) {
+            using namespace zip_detail;
+            const uint32_t crc = crc32(data, size);
+            const bool isZip64 = size >= max32;
+
+            std::vector<char> header;
+            put<uint32_t>(header, localHeaderSignature);
+            put<uint16_t>(header, isZip64 ? zip64Version : version);
+            put<uint16_t>(header, 0);  // flags
+            put<uint16_t>(header, 0);  // method: stored
+            put<uint16_t>(header, 0);  // time
+            put<uint16_t>(header, dosDate);
+            put<uint32_t>(header, crc);
+            put<uint32_t>(header, isZip64 ? max32 : size);
+            put<uint32_t>(header, isZip64 ? max32 : size);
+            put<uint16_t>(header, name.size());
+            put<uint16_t>(header, isZip64 ? 20 : 0);
+            header.insert(header.end(), name.begin(), name.end());
+            if(isZip64) {
+                put<uint16_t>(header, zip64ExtraId);
+                put<uint16_t>(header, 16);
+                put<uint64_t>(header, size);
+                put<uint64_t>(header, size);
+            }
+
+            std::lock_guard<std::mutex> lock(mutex_);
+            entries_.push_back(CentralEntry{name, crc, size, offset_});
+            writeBytes(header.data(), header.size());
+            writeBytes(data, size);
+        }
+
+        // write the central directory, the archive is only valid after this was called
+        inline void close() {
+            using namespace zip_detail;
+            std::lock_guard<std::mutex> lock(mutex_);
+            closed_ = true;
+            const uint64_t cdOffset = offset_;
+            std::vector<char> cd;
+            for(const auto & entry : entries_) {
+                const bool largeSize = entry.size >= max32;
+                const bool largeOffset = entry.offset >= max32;
+                std::vector<char> extra;
+                if(largeSize || largeOffset) {
+                    put<uint16_t>(extra, zip64ExtraId);
+                    put<uint16_t>(extra, (largeSize ? 16 : 0) + (largeOffset ? 8 : 0));
+                    if(largeSize) {
+                        put<uint64_t>(extra, entry.size);
+                        put<uint64_t>(extra, entry.size);
+                    }
+                    if(largeOffset) {
+                        put<uint64_t>(extra, entry.offset);
+                    }
+                }
+                const uint16_t neededVersion = extra.empty() ? version : zip64Version;
+                put<uint32_t>(cd, centralHeaderSignature);
+                put<uint16_t>(cd, zip64Version);  // version made by
+                put<uint16_t>(cd, neededVersion);
+                put<uint16_t>(cd, 0);  // flags
+                put<uint16_t>(cd, 0);  // method: stored
+                put<uint16_t>(cd, 0);  // time
+                put<uint16_t>(cd, dosDate);
+                put<uint32_t>(cd, entry.crc);
+                put<uint32_t>(cd, largeSize ? max32 : entry.size);
+                put<uint32_t>(cd, largeSize ? max32 : entry.size);
+                put<uint16_t>(cd, entry.name.size());
+                put<uint16_t>(cd, extra.size());
+                put<uint16_t>(cd, 0);  // comment length
+                put<uint16_t>(cd, 0);  // disk number
+                put<uint16_t>(cd, 0);  // internal attributes
+                put<uint32_t>(cd, 0);  // external attributes
+                put<uint32_t>(cd, largeOffset ? max32 : entry.offset);
+                cd.insert(cd.end(), entry.name.begin(), entry.name.end());
+                cd.insert(cd.end(), extra.begin(), extra.end());
+            }
+            writeBytes(cd.data(), cd.size());
+
+            const uint64_t nEntries = entries_.size();
+            const uint64_t cdSize = cd.size();
+            const bool isZip64 = nEntries >= max16 || cdSize >= max32 || cdOffset >= max32;
+            std::vector<char> end;
+            if(isZip64) {
+                const uint64_t recordOffset = offset_;
+                put<uint32_t>(end, zip64EndOfCentralDirSignature);
+                put<uint64_t>(end, zip64EndOfCentralDirSize - 12);
+                put<uint16_t>(end, zip64Version);
+                put<uint16_t>(end, zip64Version);
+                put<uint32_t>(end, 0);
+                put<uint32_t>(end, 0);
+                put<uint64_t>(end, nEntries);
+                put<uint64_t>(end, nEntries);
+                put<uint64_t>(end, cdSize);
+                put<uint64_t>(end, cdOffset);
+
+                put<uint32_t>(end, zip64LocatorSignature);
+                put<uint32_t>(end, 0);
+                put<uint64_t>(end, recordOffset);
+                put<uint32_t>(end, 1);
+            }
+            put<uint32_t>(end, endOfCentralDirSignature);
+            put<uint16_t>(end, 0);
+            put<uint16_t>(end, 0);
+            put<uint16_t>(end, isZip64 ? max16 : nEntries);
+            put<uint16_t>(end, isZip64 ? max16 : nEntries);
+            put<uint32_t>(end, isZip64 ? max32 : cdSize);
+            put<uint32_t>(end, isZip64 ? max32 : cdOffset);
+            put<uint16_t>(end, 0);  // comment length
+            writeBytes(end.data(), end.size());
+            file_.close();
+            if(!file_) {
+                throw std::runtime_error("Failed to write " + path_.string());
+            }
+        }
+
+        // discard the archive, e.g. if not all entries could be added
+        inline void abort() {
+            std::lock_guard<std::mutex> lock(mutex_);
+            closed_ = true;
+            file_.close();
+            fs::remove(path_);
+        }
+
+    private:
+        struct CentralEntry {
+            std::string name;
+            uint32_t crc;
+            uint64_t size;
+            uint64_t offset;
+        };
+
+        inline void writeBytes(const char * data, const std::size_t size) {
+            file_.write(data, size);
+            if(!file_) {
+                throw std::runtime_error("Failed to write " + path_.string());
+            }
+            offset_ += size;
+        }
+
+        fs::path path_;
+        std::ofstream file_;
+        uint64_t offset_;
+        bool closed_;
+        std::vector<CentralEntry> entries_;
+        std::mutex mutex_;
+    };
+
+
+    // pack the filesystem container at `path` into a zip archive. the files are read
+    // and checksummed in parallel and appended to the archive as soon as they were read
+    inline void pack(const fs::path & path, const fs::path & zipPath, const int nThreads=1) {
+        std::vector<std::string> keys;
+        kv::listDirectoryKeys(path, keys);
+        Writer writer(zipPath);
+        try {
+            util::parallel_foreach(nThreads, keys.size(), [&](const int tid, const std::size_t keyId){
+                std::vector<char> value;
+                kv::readFile(path / keys[keyId], value);
+                writer.add(keys[keyId], value.data(), value.size());
+            });
+        } catch(...) {
+            // don't leave a valid archive that lacks some of the files
+            writer.abort();
+            throw;
+        }
+        writer.close();
+    }
+
+
+    // unpack the zip archive to a filesystem container at `path`
+    inline void unpack(const fs::path & zipPath, const fs::path & path, const int nThreads=1) {
+        if(fs::exists(path)) {
+            throw std::invalid_argument("Cannot unpack " + zipPath.string() + ", " + path.string() + " exists already");
+        }
+        const Store store(zipPath);
+        std::vector<std::string> keys;
+        store.keys(keys);
+        // check all keys before writing anything
+        for(const auto & key : keys) {
+            kv::checkKey(key);
+        }
+        fs::create_directories(path);
+        util::parallel_foreach(nThreads, keys.size(), [&](const int tid, const std::size_t keyId){
+            std::vector<char> value;
+            store.read(keys[keyId], value);
+            kv::writeFile(path, keys[keyId], value.data(), value.size());
+        });
+    }
+
+}
+}
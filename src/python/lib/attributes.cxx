@@ -34,11 +34,9 @@ namespace z5 {
         exportAttributesT<filesystem::handle::Group>(m);
         exportAttributesT<filesystem::handle::Dataset>(m);
 
-        #ifdef WITH_S3
-        exportAttributesT<s3::handle::File>(m);
-        exportAttributesT<s3::handle::Group>(m);
-        exportAttributesT<s3::handle::Dataset>(m);
-        #endif
+        exportAttributesT<kv::handle::File>(m);
+        exportAttributesT<kv::handle::Group>(m);
+        exportAttributesT<kv::handle::Dataset>(m);
     }
 
 }
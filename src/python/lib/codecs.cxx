@@ -0,0 +1,98 @@
+#include <pybind11/pybind11.h>
+#include <pybind11/stl.h>
+#include <cstring>
+#include <memory>
+
+#include "z5/compression/plugins.hxx"
+
+namespace py = pybind11;
+
+
+namespace z5 {
+
+    // keep python callbacks alive in the (static) codec registry;
+    // the callbacks are only released while the interpreter is running,
+    // afterwards (at exit of the process) they are leaked
+    inline std::shared_ptr<py::object> shareCallback(const py::function & callback) {
+        return std::shared_ptr<py::object>(new py::object(callback), [](py::object * obj){
+            if(Py_IsInitialized()) {
+                py::gil_scoped_acquire gil;
+                delete obj;
+            } else {
+                obj->release();
+                delete obj;
+            }
+        });
+    }
+
+
+    // the codec functions are called from the threads of the dataset io and need to acquire the GIL;
+    // python errors are converted to runtime errors, so that they can be rethrown without the GIL
+    inline void encodeWithCallback(const py::object & callback, const std::string & codecId,
+                                   const std::string & config, const char * data, const std::size_t size,
+                                   std::vector<char> & out) {
+        py::gil_scoped_acquire gil;
+        try {
+            py::bytes res = callback(config, py::bytes(data, size));
+            const std::string encoded = res;
+            out.assign(encoded.begin(), encoded.end());
+        } catch(py::error_already_set & e) {
+            throw std::runtime_error("Encoding with codec " + codecId + " failed: " + std::string(e.what()));
+        }
+    }
+
+
+    inline void decodeWithCallback(const py::object & callback, const std::string & codecId,
+                                   const std::string & config, const char * data, const std::size_t size,
+                                   char * out, const std::size_t outSize) {
+        py::gil_scoped_acquire gil;
+        std::string decoded;
+        try {
+            py::bytes res = callback(config, py::bytes(data, size), outSize);
+            decoded = res;
+        } catch(py::error_already_set & e) {
+            throw std::runtime_error("Decoding with codec " + codecId + " failed: " + std::string(e.what()));
+        }
+        if(decoded.size() != outSize) {
+            throw std::runtime_error("Codec " + codecId + " decoded " + std::to_string(decoded.size()) +
+                                     " bytes, expected " + std::to_string(outSize));
+        }
+        std::memcpy(out, decoded.data(), outSize);
+    }
+
+
+    void exportCodecs(py::module & module) {
+
+        // register the codec `codec_id` for zarr datasets:
+        // encode(config, data) -> bytes and decode(config, data, nbytes) -> bytes,
+        // where config is the json encoded zarr compressor
+        module.def("register_codec", [](const std::string & codecId,
+                                        const py::function & encode,
+                                        const py::function & decode){
+            auto encodeCallback = shareCallback(encode);
+            auto decodeCallback = shareCallback(decode);
+            compression::PluginCodec codec;
+            codec.encode = [encodeCallback, codecId](const std::string & config,
+                                                     const char * data, const std::size_t size,
+                                                     std::vector<char> & out){
+                encodeWithCallback(*encodeCallback, codecId, config, data, size, out);
+            };
+            codec.decode = [decodeCallback, codecId](const std::string & config,
+                                                     const char * data, const std::size_t size,
+                                                     char * out, const std::size_t outSize){
+                decodeWithCallback(*decodeCallback, codecId, config, data, size, out, outSize);
+            };
+            compression::PluginCodecs::registerCodec(codecId, codec);
+        }, py::arg("codec_id"), py::arg("encode"), py::arg("decode"));
+
+        module.def("unregister_codec", &compression::PluginCodecs::unregisterCodec,
+                   py::arg("codec_id"));
+
+        module.def("get_registered_codecs", [](){
+            std::vector<std::string> ids;
+            compression::PluginCodecs::registeredCodecs(ids);
+            return ids;
+        });
+    }
+
+}
@@ -8,6 +8,7 @@
 
 #include "z5/dataset.hxx"
 #include "z5/factory.hxx"
+#include "z5/util/threadpool.hxx"
 
 #include "z5/multiarray/broadcast.hxx"
 #include "z5/multiarray/xtensor_access.hxx"
@@ -157,6 +158,7 @@ namespace z5 {
             .def_property_readonly("size", [](const Dataset & ds){return ds.size();})
             .def_property_readonly("dtype", [](const Dataset & ds){return types::Datatypes::dtypeToN5()[ds.getDtype()];})
             .def_property_readonly("is_zarr", [](const Dataset & ds){return ds.isZarr();})
+            .def_property_readonly("dimension_separator", [](const Dataset & ds){return ds.dimensionSeparator();})
             .def_property_readonly("number_of_chunks", [](const Dataset & ds){return ds.numberOfChunks();})
             .def_property_readonly("chunks_per_dimension", [](const Dataset & ds){
                 return ds.chunksPerDimension();
@@ -168,15 +170,129 @@ namespace z5 {
                 ds.getCompressor(compressor);
                 return compressor;
             })
+            .def_property_readonly("has_plugin_codec", [](const Dataset & ds){
+                return ds.getCompressor() == types::plugin;
+            })
             .def_property_readonly("compression_options", [](const Dataset & ds){
                 types::CompressionOptions opts;
                 ds.getCompressionOptions(opts);
                 return opts;
             })
+            // the fill value as the bytes of a single value of the dtype,
+            // padded to the size of the largest dtype
+            .def_property_readonly("fill_value_bytes", [](const Dataset & ds){
+                char fillValue[sizeof(double)] = {};
+                ds.getFillValue(fillValue);
+                return py::bytes(fillValue, sizeof(fillValue));
+            })
+            // the filters as list of their zarr id and options
+            .def_property_readonly("filters", [](const Dataset & ds){
+                std::vector<types::CompressionOptions> filters;
+                for(const auto & filter : ds.filters()) {
+                    filters.emplace_back(filter.second);
+                    filters.back()["id"] = types::Filters::filterToZarr().at(filter.first);
+                }
+                return filters;
+            })
 
             .def("remove_chunk", &Dataset::removeChunk, py::arg("chunk_id"),
                  py::call_guard<py::gil_scoped_release>())
 
+            // raw (encoded) chunk data
+            .def("read_chunk_bytes", [](const Dataset & ds, const types::ShapeType & chunkId) -> py::object {
+                std::vector<char> buffer;
+                bool chunkExists;
+                {
+                    py::gil_scoped_release lift_gil;
+                    chunkExists = ds.readRawChunk(chunkId, buffer);
+                }
+                if(!chunkExists) {
+                    return py::none();
+                }
+                return py::bytes(buffer.data(), buffer.size());
+            }, py::arg("chunk_id"))
+            .def("write_chunk_bytes", [](const Dataset & ds, const types::ShapeType & chunkId, const std::string & data) {
+                const std::vector<char> buffer(data.begin(), data.end());
+                py::gil_scoped_release lift_gil;
+                ds.writeRawChunk(chunkId, buffer);
+            }, py::arg("chunk_id"), py::arg("data"))
+            .def("copy_chunk_bytes", &Dataset::copyRawChunk, py::arg("chunk_id"), py::arg("out"),
+                 py::call_guard<py::gil_scoped_release>())
+            // batched raw chunk data, the chunks are read and written in parallel
+            // without holding the GIL, so that they can be de- and encoded in python
+            // with a single switch between the io threads and python per batch
+            .def("read_chunks_bytes", [](const Dataset & ds,
+                                         const std::vector<types::ShapeType> & chunkIds,
+                                         const int nThreads) {
+                std::vector<std::vector<char>> buffers(chunkIds.size());
+                std::vector<char> chunksExist(chunkIds.size());
+                {
+                    py::gil_scoped_release lift_gil;
+                    util::parallel_foreach(nThreads, chunkIds.size(), [&](const int tid, const std::size_t i){
+                        chunksExist[i] = ds.readRawChunk(chunkIds[i], buffers[i]);
+                    });
+                }
+                py::list out;
+                for(std::size_t i = 0; i < chunkIds.size(); ++i) {
+                    if(chunksExist[i]) {
+                        out.append(py::bytes(buffers[i].data(), buffers[i].size()));
+                    } else {
+                        out.append(py::none());
+                    }
+                }
+                return out;
+            }, py::arg("chunk_ids"), py::arg("n_threads")=1)
+            .def("write_chunks_bytes", [](const Dataset & ds,
+                                          const std::vector<types::ShapeType> & chunkIds,
+                                          const std::vector<std::string> & data,
+                                          const int nThreads) {
+                if(chunkIds.size() != data.size()) {
+                    throw std::invalid_argument("Number of chunks and data do not agree");
+                }
+                std::vector<std::vector<char>> buffers;
+                buffers.reserve(data.size());
+                for(const auto & chunkData : data) {
+                    buffers.emplace_back(chunkData.begin(), chunkData.end());
+                }
+                py::gil_scoped_release lift_gil;
+                util::parallel_foreach(nThreads, chunkIds.size(), [&](const int tid, const std::size_t i){
+                    ds.writeRawChunk(chunkIds[i], buffers[i]);
+                });
+            }, py::arg("chunk_ids"), py::arg("data"), py::arg("n_threads")=1)
+
+            // chunk summaries
+            .def_property_readonly("has_chunk_summaries", &Dataset::hasChunkSummaries)
+            .def("enable_chunk_summaries", &Dataset::enableChunkSummaries,
+                 py::arg("max_labels"), py::arg("n_threads"),
+                 py::call_guard<py::gil_scoped_release>())
+            .def("chunks_where", [](const Dataset & ds,
+                                    const double min_gt, const double min_lt,
+                                    const double max_gt, const double max_lt,
+                                    const bool has_label, const py::int_ & label,
+                                    const bool non_empty) {
+                ChunkQuery query;
+                query.minGreater = min_gt;
+                query.minLess = min_lt;
+                query.maxGreater = max_gt;
+                query.maxLess = max_lt;
+                // the label is converted with the signedness of the dataset
+                if(has_label) {
+                    if(ds.getDtype() == types::uint64) {
+                        query.setLabel(label.cast<uint64_t>());
+                    } else {
+                        query.setLabel(label.cast<int64_t>());
+                    }
+                }
+                query.nonEmpty = non_empty;
+                std::vector<types::ShapeType> chunks;
+                {
+                    py::gil_scoped_release lift_gil;
+                    ds.chunksWhere(query, chunks);
+                }
+                return chunks;
+            }, py::arg("min_gt"), py::arg("min_lt"), py::arg("max_gt"), py::arg("max_lt"),
+               py::arg("has_label"), py::arg("label"), py::arg("non_empty"))
+
             // for now, we only support picking if we can get the path
             // of the dataset, i.e. if we have a filesystem dataset
             .def(py::pickle(
@@ -21,15 +21,20 @@ namespace z5 {
                                    const std::vector<uint64_t> & chunk_shape,
                                    const std::string & compression,
                                    const types::CompressionOptions & copts,
-                                   const double fill_value){
+                                   const double fill_value,
+                                   const std::string & dimension_separator,
+                                   const std::vector<types::CompressionOptions> & filters){
                 requireHierarchy(root, key);
-                return createDataset(root, key, dtype, shape, chunk_shape, compression, copts, fill_value);
+                return createDataset(root, key, dtype, shape, chunk_shape, compression, copts, fill_value,
+                                     dimension_separator, filters);
             },
             py::arg("root"), py::arg("key"),
             py::arg("dtype"), py::arg("shape"), py::arg("chunks"),
             py::arg("compression"),
             py::arg("compression_options")=types::CompressionOptions(),
-            py::arg("fill_value")=0);
+            py::arg("fill_value")=0,
+            py::arg("dimension_separator")=".",
+            py::arg("filters")=std::vector<types::CompressionOptions>());
     }
 
 
@@ -61,10 +66,27 @@ namespace z5 {
     void exportFactory(py::module & m) {
         // for filesystem
         exportFactoriesT<filesystem::handle::Group, filesystem::handle::File>(m);
-        // for s3
-        #ifdef WITH_S3
-        exportFactoriesT<s3::handle::Group, s3::handle::File>(m);
-        #endif
+        // open dataset directly from the handle
+        m.def("open_dataset", [](const filesystem::handle::Dataset & handle){
+            return filesystem::openDataset(handle);
+        }, py::arg("handle"));
+        m.def("set_dimension_separator", [](const filesystem::handle::Dataset & handle,
+                                            const std::string & dimension_separator,
+                                            const int n_threads){
+            filesystem::setDimensionSeparator(handle, dimension_separator, n_threads);
+        }, py::arg("handle"), py::arg("dimension_separator"), py::arg("n_threads")=1,
+           py::call_guard<py::gil_scoped_release>());
+        // for key-value stores
+        exportFactoriesT<kv::handle::Group, kv::handle::File>(m);
+        m.def("open_dataset", [](const kv::handle::Dataset & handle){
+            return kv::openDataset(handle);
+        }, py::arg("handle"));
+        m.def("set_dimension_separator", [](const kv::handle::Dataset & handle,
+                                            const std::string & dimension_separator,
+                                            const int n_threads){
+            kv::setDimensionSeparator(handle, dimension_separator, n_threads);
+        }, py::arg("handle"), py::arg("dimension_separator"), py::arg("n_threads")=1,
+           py::call_guard<py::gil_scoped_release>());
     }
 
 }
@@ -8,9 +8,21 @@
 #include "z5/filesystem/handle.hxx"
 #include "z5/filesystem/metadata.hxx"
 
+#include "z5/kv/handle.hxx"
+#include "z5/kv/metadata.hxx"
+#include "z5/memory/store.hxx"
+#include "z5/zip/store.hxx"
+
 #ifdef WITH_S3
-#include "z5/s3/handle.hxx"
-#include "z5/s3/metadata.hxx"
+#include "z5/s3/store.hxx"
+#endif
+
+#ifdef WITH_GCS
+#include "z5/gcs/store.hxx"
+#endif
+
+#ifdef WITH_HTTP
+#include "z5/http/store.hxx"
 #endif
 
 namespace py = pybind11;
@@ -48,6 +60,23 @@ namespace z5 {
             .def("get_dataset_handle", [](const GROUP & self, const std::string & name){
                 return DATASET(self, name);
             })
+            // list (path, kind, shape, dtype, chunks) for all groups and datasets below this group
+            .def("list_hierarchy", [](const GROUP & self){
+                std::vector<HierarchyEntry> entries;
+                {
+                    py::gil_scoped_release lift_gil;
+                    listHierarchy(self, entries);
+                }
+                typedef std::tuple<std::string, std::string,
+                                   types::ShapeType, std::string, types::ShapeType> Record;
+                std::vector<Record> records;
+                records.reserve(entries.size());
+                for(const auto & entry : entries) {
+                    records.emplace_back(entry.path, entry.isDataset ? "dataset" : "group",
+                                         entry.shape, entry.dtype, entry.chunks);
+                }
+                return records;
+            })
         ;
         return g;
     }
@@ -107,14 +136,106 @@ namespace z5 {
     }
 
 
-    // need actual constructor for S3File, but need to know params for s3 first
-    #ifdef WITH_S3
-    void exportS3(py::module & m) {
-        typedef s3::handle::File File;
-        typedef s3::handle::Group Group;
-        typedef s3::handle::Dataset Dataset;
+    void exportStores(py::module & m) {
+        // the stores are passed to the file handle and shared by all handles below it
+        py::class_<kv::Store, std::shared_ptr<kv::Store>>(m, "Store")
+            .def("is_read_only", &kv::Store::isReadOnly)
+        ;
+
+        py::class_<memory::Store, kv::Store, std::shared_ptr<memory::Store>>(m, "MemoryStore")
+            .def(py::init<std::size_t>(), py::arg("max_bytes")=0)
+            .def_property_readonly("nbytes", &memory::Store::nBytes)
+            .def_property_readonly("max_bytes", &memory::Store::maxBytes)
+            .def("keys", [](const memory::Store & self){
+                std::vector<std::string> keys;
+                self.keys(keys);
+                return keys;
+            })
+            .def("persist", [](const memory::Store & self, const std::string & path){
+                py::gil_scoped_release lift_gil;
+                memory::persist(self, fs::path(path));
+            }, py::arg("path"))
+            .def("load", [](const memory::Store & self, const std::string & path){
+                py::gil_scoped_release lift_gil;
+                memory::load(fs::path(path), self);
+            }, py::arg("path"))
+        ;
+
+        py::class_<zip::Store, kv::Store, std::shared_ptr<zip::Store>>(m, "ZipStore")
+            .def(py::init([](const std::string & path){
+                return std::make_shared<zip::Store>(fs::path(path));
+            }), py::arg("path"))
+            .def_property_readonly("path", [](const zip::Store & self){return self.path().string();})
+        ;
+
+        m.def("pack_zip", [](const std::string & path, const std::string & zipPath, const int nThreads){
+            zip::pack(fs::path(path), fs::path(zipPath), nThreads);
+        }, py::arg("path"), py::arg("zip_path"), py::arg("n_threads")=1,
+           py::call_guard<py::gil_scoped_release>());
 
-        auto g = getGroupHandle<Group, File, Dataset>(m, "S3Group");
+        m.def("unpack_zip", [](const std::string & zipPath, const std::string & path, const int nThreads){
+            zip::unpack(fs::path(zipPath), fs::path(path), nThreads);
+        }, py::arg("zip_path"), py::arg("path"), py::arg("n_threads")=1,
+           py::call_guard<py::gil_scoped_release>());
+
+        #ifdef WITH_S3
+        py::class_<s3::Store, kv::Store, std::shared_ptr<s3::Store>>(m, "S3Store")
+            .def(py::init([](const std::string & bucket, const std::string & prefix,
+                             const std::string & endpoint, const std::string & region,
+                             const bool anonymous, const unsigned maxConnections){
+                s3::Options options;
+                options.endpoint = endpoint;
+                options.region = region;
+                options.anonymous = anonymous;
+                options.maxConnections = maxConnections;
+                return std::make_shared<s3::Store>(bucket, prefix, options);
+            }), py::arg("bucket"), py::arg("prefix")="",
+                py::arg("endpoint")="", py::arg("region")="",
+                py::arg("anonymous")=false, py::arg("max_connections")=64)
+            .def_property_readonly("bucket", &s3::Store::bucket)
+            .def_property_readonly("prefix", &s3::Store::prefix)
+        ;
+        #endif
+
+        #ifdef WITH_GCS
+        py::class_<gcs::Store, kv::Store, std::shared_ptr<gcs::Store>>(m, "GCSStore")
+            .def(py::init([](const std::string & bucket, const std::string & prefix,
+                             const std::string & endpoint, const std::string & project,
+                             const bool anonymous, const unsigned maxConnections){
+                gcs::Options options;
+                options.endpoint = endpoint;
+                options.project = project;
+                options.anonymous = anonymous;
+                options.maxConnections = maxConnections;
+                return std::make_shared<gcs::Store>(bucket, prefix, options);
+            }), py::arg("bucket"), py::arg("prefix")="",
+                py::arg("endpoint")="", py::arg("project")="",
+                py::arg("anonymous")=false, py::arg("max_connections")=64)
+            .def_property_readonly("bucket", &gcs::Store::bucket)
+            .def_property_readonly("prefix", &gcs::Store::prefix)
+        ;
+        #endif
+
+        #ifdef WITH_HTTP
+        py::class_<http::Store, kv::Store, std::shared_ptr<http::Store>>(m, "HTTPStore")
+            .def(py::init([](const std::string & url, const long timeoutMs, const bool verifyPeer){
+                http::Options options;
+                options.timeoutMs = timeoutMs;
+                options.verifyPeer = verifyPeer;
+                return std::make_shared<http::Store>(url, options);
+            }), py::arg("url"), py::arg("timeout_ms")=30000, py::arg("verify_peer")=true)
+            .def_property_readonly("url", &http::Store::url)
+        ;
+        #endif
+    }
+
+
+    void exportKeyValue(py::module & m) {
+        typedef kv::handle::File File;
+        typedef kv::handle::Group Group;
+        typedef kv::handle::Dataset Dataset;
+
+        auto g = getGroupHandle<Group, File, Dataset>(m, "StoreGroup");
         g
             .def(py::init<Group, const std::string &>(),
                  py::arg("group"), py::arg("key"))
@@ -122,26 +243,28 @@ namespace z5 {
                  py::arg("file"), py::arg("key"))
         ;
 
-        auto f = getGroupHandle<File, File, Dataset>(m, "S3File");
+        auto f = getGroupHandle<File, Group, Dataset>(m, "StoreFile");
         f
-            // dummy construnctor
-            .def(py::init<FileMode>(), py::arg("mode"))
+            .def(py::init<const std::shared_ptr<kv::Store> &, FileMode>(),
+                 py::arg("store"), py::arg("mode"))
+            .def("read_metadata", [](const File & self){
+                nlohmann::json j;
+                kv::readMetadata(self, j);
+                return j.dump();
+            })
         ;
 
-        py::class_<Dataset>(m, "S3DatasetHandle")
+        py::class_<Dataset>(m, "StoreDatasetHandle")
             .def(py::init<Group, const std::string &>())
             .def(py::init<File, const std::string &>())
         ;
-
     }
-    #endif
 
 
     void exportHandles(py::module & m) {
         exportFilesystem(m);
-        #ifdef WITH_S3
-        exportS3(m);
-        #endif
+        exportStores(m);
+        exportKeyValue(m);
     }
 
 }
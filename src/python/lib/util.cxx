@@ -4,6 +4,7 @@
 
 #include "z5/dataset.hxx"
 #include "z5/util/functions.hxx"
+#include "z5/util/downscale.hxx"
 
 // for xtensor numpy bindings
 #include "xtensor-python/pyarray.hpp"
@@ -22,47 +23,163 @@ namespace z5 {
         module.def(fname.c_str(), [](const Dataset & ds,
                                      const int n_threads,
                                      const bool remove_specific_value,
-                                     const T value){
-            util::removeTrivialChunks(ds, n_threads, remove_specific_value, value);
+                                     const T value,
+                                     const bool dry_run,
+                                     const std::size_t max_compressed_size){
+            std::vector<types::ShapeType> chunks;
+            util::removeTrivialChunks(ds, n_threads, chunks, remove_specific_value,
+                                      value, dry_run, max_compressed_size);
+            return chunks;
         }, py::arg("ds"), py::arg("n_threads"),
-           py::arg("remove_trivial_chunks")=false,
+           py::arg("remove_specific_value")=false,
            py::arg("value")=0,
+           py::arg("dry_run")=false,
+           py::arg("max_compressed_size")=0,
            py::call_guard<py::gil_scoped_release>());
 
 
         // export unique functionality
         fname = "unique_" + dtype;
         module.def(fname.c_str(), [](const Dataset & ds,
-                                     const int n_threads){
-            std::set<T> unique_set;
-            util::unique(ds, n_threads, unique_set);
+                                     const int n_threads,
+                                     const bool ignore_fill_value){
+            std::vector<T> unique_vec;
+            {
+                py::gil_scoped_release lift_gil;
+                util::unique(ds, n_threads, unique_vec, ignore_fill_value);
+            }
 
             typedef typename xt::pytensor<T, 1, xt::layout_type::row_major>::shape_type ShapeType;
-            const ShapeType shape = {static_cast<int64_t>(unique_set.size())};
+            const ShapeType shape = {static_cast<int64_t>(unique_vec.size())};
             xt::pytensor<T, 1, xt::layout_type::row_major> uniques = xt::zeros<T>(shape);
-            std::copy(unique_set.begin(), unique_set.end(), uniques.begin());
+            std::copy(unique_vec.begin(), unique_vec.end(), uniques.begin());
             return uniques;
-        }, py::arg("ds"), py::arg("n_threads"));
+        }, py::arg("ds"), py::arg("n_threads"), py::arg("ignore_fill_value")=false);
 
 
         // export unique with counts functionality
         fname = "unique_with_counts_" + dtype;
         module.def(fname.c_str(), [](const Dataset & ds,
-                                     const int n_threads){
-            std::map<T, std::size_t> unique_map;
-            util::uniqueWithCounts(ds, n_threads, unique_map);
+                                     const int n_threads,
+                                     const bool ignore_fill_value){
+            std::vector<T> unique_vec;
+            std::vector<std::size_t> count_vec;
+            {
+                py::gil_scoped_release lift_gil;
+                util::uniqueWithCounts(ds, n_threads, unique_vec, count_vec, ignore_fill_value);
+            }
             typedef typename xt::pytensor<T, 1, xt::layout_type::row_major>::shape_type ShapeType;
-            const ShapeType shape = {static_cast<int64_t>(unique_map.size())};
+            const ShapeType shape = {static_cast<int64_t>(unique_vec.size())};
 
             xt::pytensor<T, 1, xt::layout_type::row_major> uniques = xt::zeros<T>(shape);
             xt::pytensor<std::size_t, 1, xt::layout_type::row_major> counts = xt::zeros<std::size_t>(shape);
-            std::size_t index = 0;
-            for(auto it = unique_map.begin(); it != unique_map.end(); ++it, ++index) {
-                uniques[index] = it->first;
-                counts[index] = it->second;
-            }
+            std::copy(unique_vec.begin(), unique_vec.end(), uniques.begin());
+            std::copy(count_vec.begin(), count_vec.end(), counts.begin());
             return std::make_pair(uniques, counts);
-        }, py::arg("ds"), py::arg("n_threads"));
+        }, py::arg("ds"), py::arg("n_threads"), py::arg("ignore_fill_value")=false);
+
+
+        // export label statistics
+        fname = "label_statistics_" + dtype;
+        module.def(fname.c_str(), [](const Dataset & ds,
+                                     const int n_threads,
+                                     const bool compute_centroids,
+                                     const bool ignore_fill_value){
+            std::vector<T> label_vec;
+            std::vector<std::size_t> count_vec, begin_vec, end_vec;
+            std::vector<double> centroid_vec;
+            {
+                py::gil_scoped_release lift_gil;
+                util::labelStatistics(ds, n_threads, label_vec, count_vec, begin_vec, end_vec,
+                                      centroid_vec, compute_centroids, ignore_fill_value);
+            }
+
+            const int64_t n_labels = label_vec.size();
+            const int64_t ndim = ds.dimension();
+            typedef typename xt::pytensor<T, 1, xt::layout_type::row_major>::shape_type ShapeType1;
+            typedef typename xt::pytensor<T, 2, xt::layout_type::row_major>::shape_type ShapeType2;
+            const ShapeType1 shape = {n_labels};
+            const ShapeType2 bb_shape = {n_labels, ndim};
+
+            xt::pytensor<T, 1, xt::layout_type::row_major> labels = xt::zeros<T>(shape);
+            xt::pytensor<std::size_t, 1, xt::layout_type::row_major> counts = xt::zeros<std::size_t>(shape);
+            xt::pytensor<std::size_t, 2, xt::layout_type::row_major> bb_begin = xt::zeros<std::size_t>(bb_shape);
+            xt::pytensor<std::size_t, 2, xt::layout_type::row_major> bb_end = xt::zeros<std::size_t>(bb_shape);
+            std::copy(label_vec.begin(), label_vec.end(), labels.begin());
+            std::copy(count_vec.begin(), count_vec.end(), counts.begin());
+            std::copy(begin_vec.begin(), begin_vec.end(), bb_begin.begin());
+            std::copy(end_vec.begin(), end_vec.end(), bb_end.begin());
+
+            py::object centroids = py::none();
+            if(compute_centroids) {
+                xt::pytensor<double, 2, xt::layout_type::row_major> centroid_array = xt::zeros<double>(bb_shape);
+                std::copy(centroid_vec.begin(), centroid_vec.end(), centroid_array.begin());
+                centroids = py::cast(centroid_array);
+            }
+            return py::make_tuple(labels, counts, bb_begin, bb_end, centroids);
+        }, py::arg("ds"), py::arg("n_threads"),
+           py::arg("compute_centroids")=false, py::arg("ignore_fill_value")=false);
+
+
+        // export mapping
+        fname = "apply_mapping_" + dtype;
+        module.def(fname.c_str(), [](const Dataset & ds,
+                                     const Dataset & out,
+                                     const xt::pytensor<T, 1> & keys,
+                                     const xt::pytensor<T, 1> & values,
+                                     const int n_threads){
+            const std::vector<T> key_vec(keys.begin(), keys.end());
+            const std::vector<T> value_vec(values.begin(), values.end());
+            py::gil_scoped_release lift_gil;
+            util::applyMapping(ds, out, key_vec, value_vec, n_threads);
+        }, py::arg("ds"), py::arg("out"), py::arg("keys"), py::arg("values"), py::arg("n_threads"));
+
+
+        // export reductions
+        fname = "min_max_sum_" + dtype;
+        module.def(fname.c_str(), [](const Dataset & ds,
+                                     const int n_threads,
+                                     const types::ShapeType & roi_begin,
+                                     const types::ShapeType & roi_end){
+            T minVal, maxVal;
+            double sum;
+            std::size_t count;
+            util::minMaxSum(ds, n_threads, roi_begin, roi_end, minVal, maxVal, sum, count);
+            return std::make_tuple(minVal, maxVal, sum, count);
+        }, py::arg("ds"), py::arg("n_threads"),
+           py::arg("roi_begin"), py::arg("roi_end"),
+           py::call_guard<py::gil_scoped_release>());
+
+
+        fname = "histogram_" + dtype;
+        module.def(fname.c_str(), [](const Dataset & ds,
+                                     const int n_threads,
+                                     const types::ShapeType & roi_begin,
+                                     const types::ShapeType & roi_end,
+                                     const double min_val,
+                                     const double max_val,
+                                     const std::size_t n_bins){
+            std::vector<std::size_t> histogram;
+            {
+                py::gil_scoped_release lift_gil;
+                util::histogram<T>(ds, n_threads, roi_begin, roi_end, min_val, max_val, n_bins, histogram);
+            }
+            typedef typename xt::pytensor<std::size_t, 1, xt::layout_type::row_major>::shape_type ShapeType;
+            const ShapeType shape = {static_cast<int64_t>(n_bins)};
+            xt::pytensor<std::size_t, 1, xt::layout_type::row_major> counts = xt::zeros<std::size_t>(shape);
+            std::copy(histogram.begin(), histogram.end(), counts.begin());
+            return counts;
+        }, py::arg("ds"), py::arg("n_threads"),
+           py::arg("roi_begin"), py::arg("roi_end"),
+           py::arg("min_val"), py::arg("max_val"), py::arg("n_bins"));
+
+
+        // export downscaling
+        fname = "downscale_" + dtype;
+        module.def(fname.c_str(), &util::downscale<T>,
+                   py::arg("ds"), py::arg("levels"), py::arg("factors"),
+                   py::arg("method"), py::arg("n_threads"),
+                   py::call_guard<py::gil_scoped_release>());
     }
 
 
@@ -14,6 +14,7 @@ namespace py = pybind11;
 
 namespace z5 {
     void exportAttributes(py::module &);
+    void exportCodecs(py::module &);
     void exportDataset(py::module &);
     void exportFactory(py::module &);
     void exportHandles(py::module &);
@@ -34,6 +35,7 @@ PYBIND11_MODULE(_z5py, module) {
     using namespace z5;
     exportAttributes(module);
     exportCompilerFlags(module);
+    exportCodecs(module);
     exportDataset(module);
     exportHandles(module);
     exportFactory(module);
@@ -1,4 +1,4 @@
-from .file import File, N5File, ZarrFile, S3File
+from .file import File, N5File, ZarrFile, MemoryFile, ZipFile, S3File, GCSFile, HTTPFile
 from .dataset import Dataset
 from .group import Group
 from .attribute_manager import set_json_encoder, set_json_decoder
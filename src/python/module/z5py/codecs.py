@@ -0,0 +1,143 @@
+""" Codecs for zarr datasets that are not built into z5.
+
+Codecs are registered by their zarr compressor id, usually from numcodecs:
+``z5py.codecs.register_codec('zstd')`` makes zarr datasets compressed with
+``numcodecs.Zstd`` readable and writable. The chunks of these datasets are
+read and written by the c++ io threads and de- and encoded in python.
+"""
+import json
+import threading
+
+import numpy as np
+
+from . import _z5py
+
+# factories that create the codec objects from the compressor config
+_FACTORIES = {}
+# codec objects per json encoded compressor config
+_CODECS = {}
+_LOCK = threading.Lock()
+
+
+def _numcodecs_factory(config):
+    try:
+        import numcodecs
+    except ImportError:
+        raise ImportError("Registering a codec without a factory requires numcodecs")
+    return numcodecs.get_codec(dict(config))
+
+
+def _to_bytes(buf):
+    if isinstance(buf, bytes):
+        return buf
+    return np.ascontiguousarray(buf).tobytes()
+
+
+# must be called with the lock held
+def _drop_codecs(codec_id):
+    for config in [config for config in _CODECS if json.loads(config)['id'] == codec_id]:
+        del _CODECS[config]
+
+
+def get_codec(config):
+    """ Get the codec for a json encoded zarr compressor config.
+
+    Args:
+        config (str): json encoded compressor config, including the codec id.
+
+    Returns:
+        object: codec with ``encode`` and ``decode`` functions.
+    """
+    codec = _CODECS.get(config)
+    if codec is None:
+        conf = json.loads(config)
+        try:
+            factory = _FACTORIES[conf['id']]
+        except KeyError:
+            raise ValueError("Codec \"%s\" is not registered" % conf['id'])
+        codec = factory(conf)
+        with _LOCK:
+            _CODECS[config] = codec
+    return codec
+
+
+def encode(config, data):
+    return _to_bytes(get_codec(config).encode(data))
+
+
+def decode(config, data, nbytes=None):
+    out = _to_bytes(get_codec(config).decode(data))
+    if nbytes is not None and len(out) != nbytes:
+        raise RuntimeError("Decoded %i bytes, expected %i" % (len(out), nbytes))
+    return out
+
+
+def register_codec(codec_id, factory=None):
+    """ Register a codec for zarr datasets.
+
+    Codecs that z5 was built with take precedence over registered codecs.
+
+    Args:
+        codec_id (str): zarr compressor id of the codec.
+        factory (callable): function that creates the codec from the compressor config;
+            the codec needs ``encode`` and ``decode`` functions and may implement ``get_config``
+            (default: numcodecs.get_codec)
+    """
+    with _LOCK:
+        _FACTORIES[codec_id] = _numcodecs_factory if factory is None else factory
+        # drop codecs that were created by a previous factory
+        _drop_codecs(codec_id)
+    _z5py.register_codec(codec_id, encode, decode)
+
+
+def unregister_codec(codec_id):
+    """ Unregister a codec; datasets that use it cannot be opened any more.
+
+    Args:
+        codec_id (str): zarr compressor id of the codec.
+
+    Returns:
+        bool: whether the codec was registered.
+    """
+    with _LOCK:
+        _FACTORIES.pop(codec_id, None)
+        _drop_codecs(codec_id)
+    return _z5py.unregister_codec(codec_id)
+
+
+def registered_codecs():
+    """ Ids of the registered codecs.
+    """
+    return tuple(_z5py.get_registered_codecs())
+
+
+def to_compression_options(codec_id, compression_options):
+    """ Get the compression options of a dataset that uses a registered codec.
+
+    Args:
+        codec_id (str): zarr compressor id of the codec.
+        compression_options (dict): parameters of the codec.
+
+    Returns:
+        dict: the json encoded compressor config.
+    """
+    config = dict(compression_options, id=codec_id)
+    # the codec validates the options and its config has all the defaults
+    codec = get_codec(json.dumps(config, sort_keys=True))
+    if hasattr(codec, 'get_config'):
+        config = codec.get_config()
+    return {'config': json.dumps(config, sort_keys=True)}
+
+
+def python_codec_config(ds_impl):
+    """ Get the config of the codec to de- and encode the chunks of a dataset in python.
+
+    Returns None if the dataset does not use a codec registered from python
+    or if it has filters, which are only applied by the c++ chunk io.
+    """
+    if not ds_impl.has_plugin_codec or ds_impl.filters:
+        return None
+    config = ds_impl.compression_options['config']
+    if json.loads(config)['id'] not in _FACTORIES:
+        return None
+    return config
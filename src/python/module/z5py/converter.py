@@ -2,7 +2,7 @@
 # - hdf5, tiff
 from __future__ import print_function
 import os
-from math import ceil
+from math import ceil, gcd
 from concurrent import futures
 import numpy as np
 
@@ -16,8 +16,14 @@ try:
 except ImportError:
     imageio = None
 
+try:
+    import tifffile
+except ImportError:
+    tifffile = None
+
 from .file import File
-from .util import copy_dataset_impl
+from .shape_utils import normalize_slices
+from .util import copy_dataset_impl, _prepare_copy_dataset, _copy_attributes
 
 
 if h5py:
@@ -64,7 +70,7 @@ if h5py:
                         n_threads, chunks=None,
                         block_shape=None, use_zarr_format=None,
                         roi=None, fit_to_roi=False,
-                        **z5_kwargs):
+                        use_processes=False, **z5_kwargs):
         """ Convert hdf5 dataset to n5 or zarr dataset.
 
         The chunks of the output dataset must be spcified.
@@ -88,21 +94,163 @@ if h5py:
             fit_to_roi (bool): if given a roi, whether to set the shape of
                 the output dataset to the roi's shape
                 and align chunks with the roi's origin. (default: False)
+            use_processes (bool): convert with a process pool instead of a thread pool.
+                h5py serializes all reads on a global lock, so threads give little speed-up.
+                By default, the blocks are aligned with the output chunks and,
+                where this is cheap, with the hdf5 chunks (default: False).
             **z5_kwargs: keyword arguments for ``z5py`` dataset, e.g. datatype or compression.
         """
         f_out = File(out_path, use_zarr_format=use_zarr_format)
         dtype = z5_kwargs.pop('dtype', None)
         with h5py.File(in_path, 'r') as f_in:
-            copy_dataset_impl(f_in, f_out, in_path_in_file, out_path_in_file,
-                              n_threads, chunks=chunks, block_shape=block_shape,
-                              dtype=dtype, roi=roi, fit_to_roi=fit_to_roi,
-                              **z5_kwargs)
+            if not use_processes:
+                copy_dataset_impl(f_in, f_out, in_path_in_file, out_path_in_file,
+                                  n_threads, chunks=chunks, block_shape=block_shape,
+                                  dtype=dtype, roi=roi, fit_to_roi=fit_to_roi,
+                                  **z5_kwargs)
+                return
+
+            ds_in = f_in[in_path_in_file]
+            chunks = ds_in.chunks if chunks is None else chunks
+            if block_shape is None:
+                block_shape = _process_block_shape(ds_in.chunks, chunks,
+                                                   np.dtype(ds_in.dtype if dtype is None else dtype).itemsize)
+            _, blocks, ds_out = _prepare_copy_dataset(f_in, f_out, ds_in, out_path_in_file,
+                                                      chunks=chunks, block_shape=block_shape,
+                                                      dtype=dtype, roi=roi, fit_to_roi=fit_to_roi,
+                                                      **z5_kwargs)
+            _copy_attributes(ds_in, ds_out)
+            dtype = ds_out.dtype
+            offset = None
+            if roi is not None and fit_to_roi:
+                offset = tuple(rr.start for rr in normalize_slices(roi, ds_in.shape)[0])
+
+        # distribute the blocks in batches, so that the files are not re-opened for every block
+        blocks = list(blocks)
+        n_batches = min(len(blocks), 4 * n_threads)
+        batches = [blocks[i::n_batches] for i in range(n_batches)]
+        with futures.ProcessPoolExecutor(max_workers=n_threads) as pp:
+            tasks = [pp.submit(_convert_h5_blocks, in_path, in_path_in_file,
+                               out_path, out_path_in_file, batch, dtype, offset)
+                     for batch in batches]
+            [t.result() for t in tasks]
+
+    def _lcm(a, b):
+        return a * b // gcd(a, b)
+
+    def _process_block_shape(h5_chunks, chunks, itemsize,
+                             max_factor=4, max_block_bytes=64 * 1024 ** 2):
+        """ Get the block shape for converting with a process pool.
+
+        The blocks are aligned with the output chunks, so that each output chunk is only written
+        by a single process. Along the axes where this is cheap, they are also rounded up to the hdf5 chunks,
+        so that fewer hdf5 chunks are decompressed by several processes.
+        """
+        block_shape = list(chunks)
+        if h5_chunks is None:
+            return tuple(block_shape)
+        # the least common multiple of unrelated chunk shapes can become very large,
+        # e.g. 64 and 63 give 4032, so we only use it if it is a small multiple of the output chunks
+        # and stay below the maximal block size
+        factors = sorted((_lcm(ch_in, ch_out) // ch_out, axis)
+                         for axis, (ch_in, ch_out) in enumerate(zip(h5_chunks, chunks)))
+        for factor, axis in factors:
+            if factor == 1:
+                continue
+            if factor > max_factor:
+                break
+            new_shape = block_shape[:axis] + [block_shape[axis] * factor] + block_shape[axis + 1:]
+            if int(np.prod(new_shape)) * itemsize > max_block_bytes:
+                break
+            block_shape = new_shape
+        return tuple(block_shape)
+
+    # needs to be on the module level so that it can be pickled for the process pool
+    def _convert_h5_blocks(in_path, in_path_in_file,
+                           out_path, out_path_in_file,
+                           blocks, dtype, offset):
+        # each process opens its own handles to the input and output file
+        ds_out = File(out_path, 'a')[out_path_in_file]
+        with h5py.File(in_path, 'r') as f_in:
+            ds_in = f_in[in_path_in_file]
+            for bb in blocks:
+                data = ds_in[bb].astype(dtype, copy=False)
+                if offset is not None:
+                    bb = tuple(slice(b.start - off, b.stop - off) for b, off in zip(bb, offset))
+                ds_out[bb] = data
 
 
 if imageio:
 
-    def convert_to_tif():
-        raise NotImplementedError("Conversion to tif not implemented.")
+    def convert_to_tif(in_path, out_path, in_path_in_file,
+                       n_threads, roi=None, one_file_per_slice=False,
+                       file_pattern='slice_%05i.tif'):
+        """ Convert 3d n5 or zarr dataset to tif stack or folder of tifs.
+
+        The dataset is read in slabs of one chunk-depth, which are read in parallel
+        over the chunks. The slices of a slab are written while the next slab is read,
+        so at most two slabs are kept in memory.
+
+        Args:
+            in_path (str): path to n5 or zarr file.
+            out_path (str): path to output tif file or folder of tifs.
+            in_path_in_file (str): name of input dataset.
+            n_threads (int): number of threads used for converting.
+            roi (tuple[slice]): region of interest that will be exported. (default: None)
+            one_file_per_slice (bool): write one tif per z-slice to the folder ``out_path``,
+                otherwise a single BigTIFF is written, which requires ``tifffile``. (default: False)
+            file_pattern (str): pattern for the file names of the slices;
+                the z-index relative to the roi is passed to it. (default: 'slice_%05i.tif')
+        """
+        if not one_file_per_slice and tifffile is None:
+            raise NotImplementedError("Conversion to a single tif requires tifffile")
+
+        ds = File(in_path, 'r')[in_path_in_file]
+        if ds.ndim != 3:
+            raise ValueError("Conversion to tif is only supported for 3d datasets")
+        roi, _ = normalize_slices(slice(None) if roi is None else roi, ds.shape)
+        ds.n_threads = n_threads
+
+        # the slabs are aligned with the chunks of the input dataset
+        z_begin, z_end = roi[0].start, roi[0].stop
+        depth = ds.chunks[0]
+        starts = [z_begin] + list(range((z_begin // depth + 1) * depth, z_end, depth))
+        stops = starts[1:] + [z_end]
+
+        def read_slab(z0, z1):
+            start = (z0,) + tuple(rr.start for rr in roi[1:])
+            stop = (z1,) + tuple(rr.stop for rr in roi[1:])
+            return ds.read_subarray(start, stop)
+
+        if one_file_per_slice:
+            os.makedirs(out_path, exist_ok=True)
+            write_image = tifffile.imwrite if tifffile else imageio.imwrite
+
+            def write_slice(z, im):
+                write_image(os.path.join(out_path, file_pattern % z), im)
+
+            n_writers = n_threads
+        else:
+            tif = tifffile.TiffWriter(out_path, bigtiff=True)
+
+            def write_slice(z, im):
+                tif.write(im, contiguous=True)
+
+            # the pages of a single file must be written in order
+            n_writers = 1
+
+        try:
+            with futures.ThreadPoolExecutor(max_workers=n_writers) as tp:
+                pending = []
+                for z0, z1 in zip(starts, stops):
+                    slab = read_slab(z0, z1)
+                    [t.result() for t in pending]
+                    pending = [tp.submit(write_slice, z - z_begin, slab[z - z0])
+                               for z in range(z0, z1)]
+                [t.result() for t in pending]
+        finally:
+            if not one_file_per_slice:
+                tif.close()
 
     def is_int(string):
         try:
@@ -135,7 +283,10 @@ if imageio:
 
     def _read_tif_metadata(in_path, file_names=None):
         if file_names is None:
-            pass
+            with tifffile.TiffFile(in_path) as f:
+                page = f.pages[0]
+                shape = (len(f.pages),) + tuple(page.shape)
+                dtype = page.dtype
         else:
             # TODO can we somehow read shape from the metadata ???
             # with imageio.get_reader(os.path.join(in_path, file_names[0])) as f:
@@ -147,15 +298,48 @@ if imageio:
             shape = (len(file_names),) + shape
         return shape, dtype
 
+    def _read_tif_page(tif, page):
+        # memory map uncompressed pages, so that the slice is only read when it is copied
+        page = tif.pages[page]
+        if page.is_memmappable:
+            return np.memmap(tif.filehandle.path, dtype=np.dtype(tif.byteorder + page.dtype.char),
+                             mode='r', offset=page.dataoffsets[0], shape=page.shape)
+        return page.asarray()
+
+    def _read_tif_slice(path):
+        if tifffile is not None:
+            with tifffile.TiffFile(path) as tif:
+                return _read_tif_page(tif, 0)
+        return imageio.imread(path)
+
+    def _convert_tif_streaming(read_slice, ds_z5, preprocess, n_threads):
+        shape, depth, dtype = ds_z5.shape, ds_z5.chunks[0], ds_z5.dtype
+        # read one chunk-depth of slices at a time and write it with n_threads over the chunks,
+        # while the next slab is read; so at most two slabs are kept in memory
+        ds_z5.n_threads = n_threads
+        with futures.ThreadPoolExecutor(max_workers=1) as writer:
+            pending = None
+            for z0 in range(0, shape[0], depth):
+                z1 = min(z0 + depth, shape[0])
+                slab = np.empty((z1 - z0,) + shape[1:], dtype=dtype)
+                for z in range(z0, z1):
+                    im = read_slice(z)
+                    slab[z - z0] = im if preprocess is None else preprocess(im, z)
+                if pending is not None:
+                    pending.result()
+                pending = writer.submit(ds_z5.__setitem__, np.s_[z0:z1], slab)
+            if pending is not None:
+                pending.result()
+
     # TODO
-    # - implement for tif volumes / stacks / multi-page tifs
+    # - implement for tif volumes / stacks / multi-page tifs in non-streaming mode
     # - fix behaviour for multi-channel images: now we would get (z, c, x, y)
     #   but we want (c, z, y x)
     def convert_from_tif(in_path, out_path,
                          out_path_in_file, chunks,
                          n_threads, use_zarr_format=None,
                          parser=None, preprocess=None,
-                         **z5_kwargs):
+                         streaming=False, **z5_kwargs):
         """ Convert tif stack or folder of tifs to n5 or zarr dataset.
 
         The chunks of the output dataset must be specified.
@@ -175,6 +359,10 @@ if imageio:
                 If None, some default patterns are tried (default: None)
             process (callable): function to preprocess chunks before wrting to n5/zarr
                 Must take np.ndarray and int as arguments. (default: None)
+            streaming (bool): read the slices sequentially, one chunk-depth at a time,
+                and write each slab in parallel over the chunks while the next one is read.
+                Keeps the memory bounded for large stacks, uses memory mapping for uncompressed tifs
+                and supports multi-page tifs if ``tifffile`` is available. (default: False)
             **z5_kwargs: keyword arguments for ``z5py`` dataset, e.g. datatype or compression.
         """
         parser_ = default_index_parser if parser is None else parser
@@ -191,13 +379,13 @@ if imageio:
             file_names = [fname for _, fname in sorted(zip(indices, file_names), key=lambda pair: pair[0])]
         elif os.path.isfile(in_path):
             file_names = None
-            raise NotImplementedError("Single tiff conversion not implemented")
+            if not (streaming and tifffile):
+                raise NotImplementedError("Single tiff conversion is only implemented in streaming mode with tifffile")
         else:
             raise RuntimeError("Path %s does not exist" % in_path)
 
         # get shape and dtype from metadata
         shape, dtype_ = _read_tif_metadata(in_path, file_names)
-        print(shape, dtype_)
 
         # create the z5 file
         f_z5 = File(out_path, use_zarr_format=use_zarr_format)
@@ -207,6 +395,20 @@ if imageio:
         ds_z5 = f_z5.create_dataset(out_path_in_file, dtype=dtype,
                                     shape=shape, chunks=chunks, **z5_kwargs)
 
+        if streaming:
+            if file_names is None:
+                # the file is only opened and parsed once, re-opening it for every page
+                # would be quadratic in the number of pages
+                with tifffile.TiffFile(in_path) as tif:
+                    def read_slice(z):
+                        return _read_tif_page(tif, z)
+                    _convert_tif_streaming(read_slice, ds_z5, preprocess, n_threads)
+            else:
+                def read_slice(z):
+                    return _read_tif_slice(os.path.join(in_path, file_names[z]))
+                _convert_tif_streaming(read_slice, ds_z5, preprocess, n_threads)
+            return
+
         # TODO implement for tif volume
         # write all chunks overlapping with z images
         def convert_block(i0, i1):
@@ -1,14 +1,18 @@
 import numbers
+from concurrent import futures
+from itertools import product
 
 import numpy as np
 
 from . import _z5py
+from . import codecs
 from .attribute_manager import AttributeManager
-from .shape_utils import normalize_slices, rectify_shape, get_default_chunks
+from .shape_utils import normalize_slices, rectify_shape, plan_chunks
 
 AVAILABLE_COMPRESSORS = _z5py.get_available_codecs()
-COMPRESSORS_ZARR = ('raw', 'blosc', 'zlib', 'bzip2', 'gzip')
+COMPRESSORS_ZARR = ('raw', 'blosc', 'blosc2', 'zlib', 'bzip2', 'gzip')
 COMPRESSORS_N5 = ('raw', 'gzip', 'bzip2', 'xz', 'lz4')
+FILTERS = ('delta', 'shuffle', 'quantize')
 
 
 class Dataset:
@@ -41,15 +45,35 @@ class Dataset:
     n5_default_compressor = 'gzip' if AVAILABLE_COMPRESSORS['gzip'] else 'raw'
 
     def __init__(self, dset_impl, handle, n_threads=1):
-        self._impl = dset_impl
+        # the implementation is opened lazily from the handle if it is not given
+        if dset_impl is not None:
+            self._impl = dset_impl
         self._handle = handle
         self._attrs = AttributeManager(self._handle)
         self.n_threads = n_threads
 
+    def __getattr__(self, name):
+        # only called if `_impl` or `_codec_config` were not set yet
+        if name == '_impl':
+            self._impl = _z5py.open_dataset(self._handle)
+            return self._impl
+        # the codec config is determined once, when the dataset is first read or written
+        if name == '_codec_config':
+            self._codec_config = codecs.python_codec_config(self._impl)
+            return self._codec_config
+        raise AttributeError("%s object has no attribute %s" % (type(self).__name__, name))
+
     @staticmethod
     def _to_zarr_compression_options(compression, compression_options):
         if compression == 'blosc':
             default_opts = {'codec': 'lz4', 'clevel': 5, 'shuffle': 1}
+        elif compression == 'blosc2':
+            # typesize 0 stands for the size of the datatype
+            default_opts = {'codec': 'zstd', 'level': 5, 'filters': 'shuffle', 'typesize': 0, 'nthreads': 1}
+            # the filters are applied in order and passed as comma separated names
+            filters = compression_options.get('filters')
+            if isinstance(filters, (list, tuple)):
+                compression_options = dict(compression_options, filters=','.join(filters))
         elif compression == 'zlib':
             default_opts = {'id': 'zlib', 'level': 5}
         elif compression == 'gzip':
@@ -58,6 +82,8 @@ class Dataset:
             default_opts = {'level': 5}
         elif compression == 'raw':
             default_opts = {}
+        elif compression in codecs.registered_codecs():
+            return codecs.to_compression_options(compression, compression_options)
         else:
             raise RuntimeError("Compression %s is not supported in zarr format" % compression)
 
@@ -98,6 +124,36 @@ class Dataset:
         default_opts.update(compression_options)
         return default_opts
 
+    @staticmethod
+    def _split_blosc2_filters(compression, filters, compression_options):
+        # blosc2 filters are given by name and are an option of the compressor,
+        # while the zarr filters are given by their config or as filter objects
+        if compression == 'blosc2' and filters and all(isinstance(filter_, str) for filter_ in filters):
+            return None, dict(compression_options, filters=filters)
+        return filters, compression_options
+
+    @staticmethod
+    def _to_filter_options(filters, dtype, is_zarr):
+        if not filters:
+            return []
+        if not is_zarr:
+            raise ValueError("Filters are only supported for zarr datasets")
+        filter_options = []
+        for filter_ in filters:
+            if isinstance(filter_, str):
+                raise ValueError("Filter \"%s\" must be given by its config, filters by name are only "
+                                 "supported for blosc2 compression" % filter_)
+            # numcodecs filters are given by their config
+            opts = dict(filter_ if isinstance(filter_, dict) else filter_.get_config())
+            if opts.get('id') not in FILTERS:
+                raise ValueError("Filter \"%s\" is unavailable" % opts.get('id'))
+            # the data type is fixed by the dataset
+            for key in ('dtype', 'astype'):
+                if np.dtype(opts.pop(key, dtype)) != dtype:
+                    raise ValueError("Filters that change the data type are not supported")
+            filter_options.append(opts)
+        return filter_options
+
     # NOTE in contrast to h5py, we also check that the chunks match
     # this is crucial, because different chunks can lead to subsequent incorrect
     # code when relying on chunk-aligned access for parallel writing
@@ -115,7 +171,7 @@ class Dataset:
             if shape != ds.shape:
                 raise TypeError("Shapes do not match (existing (%s) vs new (%s))" % (', '.join(map(str, ds.shape)),
                                                                                      ', '.join(map(str, shape))))
-            if chunks is not None:
+            if chunks is not None and not (isinstance(chunks, str) and chunks == 'auto'):
                 if chunks != ds.chunks:
                     raise TypeError("Chunks do not match (existing (%s) vs new (%s))" % (', '.join(map(str, ds.chunks)),
                                                                                          ', '.join(map(str, chunks))))
@@ -129,10 +185,15 @@ class Dataset:
             data = kwargs.pop('data', None)
             compression = kwargs.pop('compression', None)
             fillvalue = kwargs.pop('fillvalue', 0)
+            dimension_separator = kwargs.pop('dimension_separator', None)
+            filters = kwargs.pop('filters', None)
+            access = kwargs.pop('access', None)
             return cls._create_dataset(group, name, shape, dtype, data=data,
                                        chunks=chunks, compression=compression,
                                        fillvalue=fillvalue, n_threads=n_threads,
-                                       compression_options=kwargs)
+                                       compression_options=kwargs,
+                                       dimension_separator=dimension_separator,
+                                       filters=filters, access=access)
 
     @classmethod
     def _create_dataset(cls, group, name,
@@ -140,7 +201,9 @@ class Dataset:
                         data=None, chunks=None,
                         compression=None,
                         fillvalue=0, n_threads=1,
-                        compression_options={}):
+                        compression_options={},
+                        dimension_separator=None,
+                        filters=None, access=None):
 
         # check shape, dtype and data
         have_data = data is not None
@@ -163,11 +226,13 @@ class Dataset:
                 raise TypeError("One of dtype or data must be specified")
         parsed_dtype = np.dtype(dtype)
 
-        # get default chunks if necessary
+        # plan the chunks for the access pattern if necessary
         # NOTE in contrast to h5py, datasets are chunked
-        # by default, with chunk size ~ 64**3
-        if chunks is None:
-            chunks = get_default_chunks(shape)
+        # by default, with chunks of ~1 MiB for access in blocks
+        if chunks is None or (isinstance(chunks, str) and chunks == 'auto'):
+            chunks = plan_chunks(shape, parsed_dtype, 'cubes' if access is None else access)
+        elif access is not None:
+            raise ValueError("The access pattern can only be given for automatic chunks")
         # check chunks have the same len than the shape
         if len(chunks) != len(shape):
             raise RuntimeError("Chunks %s must have same length as shape %s" % (str(chunks),
@@ -181,13 +246,13 @@ class Dataset:
         if compression is None:
             compression = cls.zarr_default_compressor if is_zarr else cls.n5_default_compressor
         else:
-            valid_compression = compression in cls.compressors_zarr if is_zarr else\
-                compression in cls.compressors_n5
+            valid_compression = compression in cls.compressors_zarr + codecs.registered_codecs() if is_zarr\
+                else compression in cls.compressors_n5
             if not valid_compression:
                 raise ValueError("Compression filter \"%s\" is unavailable" % compression)
 
         # get and check compression
-        if is_zarr and compression not in cls.compressors_zarr:
+        if is_zarr and compression not in cls.compressors_zarr + codecs.registered_codecs():
             compression = cls.zarr_default_compressor
         elif not is_zarr and compression not in cls.compressors_n5:
             compression = cls.n5_default_compressor
@@ -195,6 +260,17 @@ class Dataset:
         if parsed_dtype not in cls._dtype_dict:
             raise ValueError("Invalid data type {} for N5 dataset".format(repr(dtype)))
 
+        # check the dimension separator, n5 always stores chunks in nested directories
+        if dimension_separator is None:
+            dimension_separator = '.'
+        if dimension_separator not in ('.', '/'):
+            raise ValueError("Invalid dimension separator \"%s\", must be '.' or '/'" % dimension_separator)
+        if not is_zarr and dimension_separator != '.':
+            raise ValueError("Dimension separator is only supported for zarr datasets")
+
+        filters, compression_options = cls._split_blosc2_filters(compression, filters, compression_options)
+        filters = cls._to_filter_options(filters, parsed_dtype, is_zarr)
+
         # update the compression options
         if is_zarr:
             copts = cls._to_zarr_compression_options(compression, compression_options)
@@ -203,7 +279,9 @@ class Dataset:
 
         # get the dataset and write data if necessary
         impl = _z5py.create_dataset(group, name, cls._dtype_dict[parsed_dtype],
-                                    shape, chunks, compression, copts)
+                                    shape, chunks, compression, copts,
+                                    dimension_separator=dimension_separator,
+                                    filters=filters)
         handle = group.get_dataset_handle(name)
         ds = cls(impl, handle, n_threads)
         if have_data:
@@ -211,9 +289,11 @@ class Dataset:
         return ds
 
     @classmethod
-    def _open_dataset(cls, group, name):
-        ds = _z5py.open_dataset(group, name)
+    def _open_dataset(cls, group, name, lazy=False):
         handle = group.get_dataset_handle(name)
+        if lazy:
+            return cls(None, handle)
+        ds = _z5py.open_dataset(group, name)
         return cls(ds, handle)
 
     @property
@@ -222,6 +302,18 @@ class Dataset:
         """
         return self._impl.is_zarr
 
+    @property
+    def filters(self):
+        """ Filters that are applied to the chunks before compression (only zarr).
+        """
+        return self._impl.filters
+
+    @property
+    def dimension_separator(self):
+        """ Separator of the chunk indices in the chunk keys, '/' for nested zarr chunks.
+        """
+        return self._impl.dimension_separator
+
     @property
     def attrs(self):
         """ The ``AttributeManager`` of this dataset.
@@ -270,6 +362,13 @@ class Dataset:
         """
         return self._impl.number_of_chunks
 
+    @property
+    def fillvalue(self):
+        """ Value of the data in chunks that don't exist.
+        """
+        fill_value = self._impl.fill_value_bytes[:self.dtype.itemsize]
+        return np.frombuffer(fill_value, dtype=self.dtype)[0]
+
     @property
     def compression(self):
         return self._impl.compressor
@@ -306,14 +405,81 @@ class Dataset:
             to_squeeze
         )
 
+    def _chunks_in_roi(self, roi_begin, shape):
+        # the chunk ids overlapping with the roi and for each chunk
+        # the overlapping bounding box in chunk and in roi coordinates
+        roi_end = [b + sh for b, sh in zip(roi_begin, shape)]
+        ranges = [range(b // ch, (e - 1) // ch + 1)
+                  for b, e, ch in zip(roi_begin, roi_end, self.chunks)]
+        for chunk_id in product(*ranges):
+            chunk_begin = [cid * ch for cid, ch in zip(chunk_id, self.chunks)]
+            begin = [max(cb, b) for cb, b in zip(chunk_begin, roi_begin)]
+            end = [min(cb + ch, e) for cb, ch, e in zip(chunk_begin, self.chunks, roi_end)]
+            local_bb = tuple(slice(b - cb, e - cb) for b, e, cb in zip(begin, end, chunk_begin))
+            roi_bb = tuple(slice(b - rb, e - rb) for b, e, rb in zip(begin, end, roi_begin))
+            yield chunk_id, local_bb, roi_bb
+
+    def _decode_chunk(self, config, data):
+        chunk_bytes = int(np.prod(self.chunks)) * self.dtype.itemsize
+        decoded = codecs.decode(config, data, chunk_bytes)
+        return np.frombuffer(decoded, dtype=self.dtype).reshape(self.chunks)
+
+    # the chunks of datasets with a codec registered from python are read by the c++ io threads
+    # and decoded in python, in one batch per call to limit switching between the io threads and python
+    def _read_with_codec(self, config, out, roi_begin):
+        chunks = list(self._chunks_in_roi(roi_begin, out.shape))
+        raw_chunks = self._impl.read_chunks_bytes([chunk[0] for chunk in chunks], n_threads=self.n_threads)
+        fill_value = self.fillvalue
+
+        def _read_chunk(chunk, data):
+            _, local_bb, roi_bb = chunk
+            if data is None:
+                out[roi_bb] = fill_value
+            else:
+                out[roi_bb] = self._decode_chunk(config, data)[local_bb]
+
+        with futures.ThreadPoolExecutor(self.n_threads) as tp:
+            list(tp.map(_read_chunk, chunks, raw_chunks))
+
+    def _write_with_codec(self, config, data, roi_begin):
+        chunks = list(self._chunks_in_roi(roi_begin, data.shape))
+        # chunks that are only partially written are updated
+        chunk_shapes = [tuple(min(ch, sh - cid * ch) for cid, ch, sh in zip(chunk[0], self.chunks, self.shape))
+                        for chunk in chunks]
+        is_partial = [any(bb.stop - bb.start != sh for bb, sh in zip(chunk[1], chunk_shape))
+                      for chunk, chunk_shape in zip(chunks, chunk_shapes)]
+        partial_ids = [chunk[0] for chunk, partial in zip(chunks, is_partial) if partial]
+        existing = dict(zip(partial_ids,
+                            self._impl.read_chunks_bytes(partial_ids, n_threads=self.n_threads)))
+        fill_value = self.fillvalue
+
+        def _encode_chunk(chunk):
+            chunk_id, local_bb, roi_bb = chunk
+            # zarr always stores complete chunks, also at the dataset border
+            chunk_data = existing.get(chunk_id)
+            if chunk_data is None:
+                chunk_data = np.full(self.chunks, fill_value, dtype=self.dtype)
+            else:
+                chunk_data = self._decode_chunk(config, chunk_data).copy()
+            chunk_data[local_bb] = data[roi_bb]
+            return codecs.encode(config, chunk_data)
+
+        with futures.ThreadPoolExecutor(self.n_threads) as tp:
+            encoded = list(tp.map(_encode_chunk, chunks))
+        self._impl.write_chunks_bytes([chunk[0] for chunk in chunks], encoded, n_threads=self.n_threads)
+
+    def _read_roi(self, out, roi_begin):
+        if self._codec_config is None:
+            _z5py.read_subarray(self._impl, out, roi_begin, n_threads=self.n_threads)
+        else:
+            self._read_with_codec(self._codec_config, out, roi_begin)
+
     # most checks are done in c++
     def __getitem__(self, index):
         roi_begin, shape, to_squeeze = self.index_to_roi(index)
         out = np.empty(shape, dtype=self.dtype)
         if 0 not in shape:
-            _z5py.read_subarray(self._impl,
-                                out, roi_begin,
-                                n_threads=self.n_threads)
+            self._read_roi(out, roi_begin)
 
         # todo: this probably has more copies than necessary
         if len(to_squeeze) == len(shape):
@@ -329,8 +495,13 @@ class Dataset:
         if 0 in shape:
             return
 
+        codec_config = self._codec_config
+
         # broadcast scalar
         if isinstance(item, (numbers.Number, np.number)):
+            if codec_config is not None:
+                self._write_with_codec(codec_config, np.full(shape, item, dtype=self.dtype), roi_begin)
+                return
             _z5py.write_scalar(self._impl, roi_begin,
                                list(shape), item,
                                str(self.dtype), self.n_threads)
@@ -351,6 +522,9 @@ class Dataset:
                 raise
 
         item_arr = rectify_shape(item_arr, shape)
+        if codec_config is not None:
+            self._write_with_codec(codec_config, item_arr, roi_begin)
+            return
         _z5py.write_subarray(self._impl,
                              item_arr,
                              roi_begin,
@@ -404,10 +578,11 @@ class Dataset:
             start (tuple): offset of the roi to write.
             data (np.ndarray): data to write; shape determines the roi shape.
         """
-        _z5py.write_subarray(self._impl,
-                             np.require(data, requirements='C'),
-                             list(start),
-                             n_threads=self.n_threads)
+        data = np.require(data, requirements='C')
+        if self._codec_config is not None:
+            self._write_with_codec(self._codec_config, data, list(start))
+            return
+        _z5py.write_subarray(self._impl, data, list(start), n_threads=self.n_threads)
 
     # expose the impl read subarray functionality
     def read_subarray(self, start, stop):
@@ -425,7 +600,7 @@ class Dataset:
         """
         shape = tuple(sto - sta for sta, sto in zip(start, stop))
         out = np.empty(shape, dtype=self.dtype)
-        _z5py.read_subarray(self._impl, out, start, n_threads=self.n_threads)
+        self._read_roi(out, list(start))
         return out
 
     def chunk_exists(self, chunk_indices):
@@ -474,3 +649,81 @@ class Dataset:
         except TypeError:
             return None
         return None if np.isnan(out).any() else out
+
+    def read_chunk_bytes(self, chunk_indices):
+        """ Read the encoded data of a single chunk as it is stored.
+
+        Args:
+            chunk_indices (tuple): indices of the chunk to read
+        Returns
+            bytes: the encoded chunk or None if the chunk does not exist
+        """
+        return self._impl.read_chunk_bytes(chunk_indices)
+
+    def write_chunk_bytes(self, chunk_indices, data):
+        """ Write the encoded data of a single chunk.
+
+        The data is written as is, so it must have been encoded with
+        the format, dtype, chunks and compression of this dataset.
+
+        Args:
+            chunk_indices (tuple): indices of the chunk to write to
+            data (bytes): encoded chunk data
+        """
+        self._impl.write_chunk_bytes(chunk_indices, data)
+
+    @property
+    def has_chunk_summaries(self):
+        """ Whether chunk summaries are enabled for this dataset.
+        """
+        return self._impl.has_chunk_summaries
+
+    def enable_chunk_summaries(self, max_labels=16, n_threads=None):
+        """ Compute and store summary statistics for each chunk.
+
+        The summaries hold the min and max value, the number of values
+        different from the fill value and the unique values of each chunk.
+        Once enabled, they are kept up to date when writing to the dataset with z5py
+        and can be used to find chunks with `chunks_where`. Chunks written by other tools
+        are detected by their modification and status change time, inode and size and have
+        no valid summary. On filesystems with timestamps of low resolution (e.g. 1 second),
+        a chunk that is rewritten in place with the same size within this time is not detected.
+
+        Args:
+            max_labels (int): maximal number of unique values stored per chunk;
+                only used for integer types (default: 16)
+            n_threads (int): number of threads used to compute the summaries,
+                defaults to the number of threads of this dataset (default: None)
+        """
+        n_threads = self.n_threads if n_threads is None else n_threads
+        self._impl.enable_chunk_summaries(max_labels, n_threads)
+
+    def chunks_where(self, min_gt=None, min_lt=None, max_gt=None, max_lt=None,
+                     contains_label=None, non_empty=False):
+        """ Find the chunks that may match all given conditions.
+
+        Uses the chunk summaries instead of reading the chunks, see `enable_chunk_summaries`.
+        The result is conservative: chunks whose summary is not known, e.g. because they were
+        written with `write_chunk_bytes`, are always returned.
+
+        Args:
+            min_gt (int or float): the chunk minimum is greater than this value (default: None)
+            min_lt (int or float): the chunk minimum is smaller than this value (default: None)
+            max_gt (int or float): the chunk maximum is greater than this value,
+                i.e. the chunk contains a larger value (default: None)
+            max_lt (int or float): the chunk maximum is smaller than this value (default: None)
+            contains_label (int): the chunk contains this value (default: None)
+            non_empty (bool): the chunk contains values different from the fill value (default: False)
+
+        Returns:
+            list[tuple]: ids of the matching chunks
+        """
+        def _bound(val):
+            return np.nan if val is None else float(val)
+
+        has_label = contains_label is not None
+        label = int(contains_label) if has_label else 0
+        chunks = self._impl.chunks_where(_bound(min_gt), _bound(min_lt),
+                                         _bound(max_gt), _bound(max_lt),
+                                         has_label, label, non_empty)
+        return [tuple(chunk) for chunk in chunks]
@@ -13,6 +13,7 @@ class File(Group):
     Groups are subdirectories and datasets are subdirectories
     that contain multi-dimensional data stored in binary format.
     Supports python dict api.
+    Urls starting with 'http://' or 'https://' are opened read-only with `HTTPFile`.
 
     Args:
         path (str): path on filesystem that holds the container.
@@ -24,6 +25,14 @@ class File(Group):
     zarr_exts = {'.zarr', '.zr'}
     #: file extensions that are inferred as n5 file
     n5_exts = {'.n5'}
+    #: url schemes that are opened with `HTTPFile`
+    http_schemes = ('http://', 'https://')
+
+    def __new__(cls, path, *args, **kwargs):
+        # containers served over http(s) are opened read-only from the url
+        if cls is File and isinstance(path, str) and path.startswith(cls.http_schemes):
+            return super().__new__(HTTPFile)
+        return super().__new__(cls)
 
     @classmethod
     def infer_format(cls, path):
@@ -132,22 +141,192 @@ class ZarrFile(File):
         super().__init__(path=path, use_zarr_format=True, mode=mode)
 
 
-# TODO can we implement automatic zarr/n5 inference for s3?
-class S3File(Group):
-    """ File to access zarr/n5 file in AWS S3 bucket.
+class StoreFile(File):
+    """ Base class for files that access zarr or n5 containers in a key-value store.
+
+    All objects of the container (metadata, attributes and chunks) are stored
+    in the key-value store, e.g. a bucket in cloud storage.
+    Should not be instantiated directly, but rather via one of the subclasses, e.g. `S3File`.
+
+    Args:
+        store (_z5py.Store): the key-value store holding the container.
+        name (str): name of the container, used to infer the format from its extension.
+        mode (str): file mode used to open / create the file (default: 'a').
+        use_zarr_format (bool): flag to determine if container is zarr or n5 (default: None).
+    """
+
+    def __init__(self, store, name, mode='a', use_zarr_format=None):
+        handle = _z5py.StoreFile(store, _z5py.FileMode(self.file_modes[mode]))
+        mode = handle.mode()
+        Group.__init__(self, handle, _z5py.StoreGroup)
+
+        if handle.exists() and mode.should_truncate():
+            handle.remove()
+        if handle.exists():
+            if mode.must_not_exist():
+                raise OSError(errno.EEXIST, os.strerror(errno.EEXIST), name)
+            is_zarr = handle.is_zarr()
+            if use_zarr_format is not None and use_zarr_format != is_zarr:
+                raise RuntimeError("%s file cannot be opened in %s format" % (("Zarr", "N5") if is_zarr
+                                                                              else ("N5", "zarr")))
+            self._check_version()
+        else:
+            if not mode.can_create():
+                raise OSError(errno.EROFS, os.strerror(errno.EROFS), name)
+            # we can only infer the format from the name for new containers
+            is_zarr = use_zarr_format
+            if is_zarr is None:
+                _, ext = os.path.splitext(name.rstrip('/'))
+                if ext.lower() in self.zarr_exts:
+                    is_zarr = True
+                elif ext.lower() in self.n5_exts:
+                    is_zarr = False
+                else:
+                    raise RuntimeError("Cannot infer the file format (zarr or N5)")
+            _z5py.create_file(handle, is_zarr)
+
+
+class MemoryFile(StoreFile):
+    """ File that holds a zarr or n5 container in memory.
+
+    Useful for scratch datasets and test fixtures that should not touch the filesystem.
+    Use `persist` to write the container to disc and `load` to read a container from disc.
+
+    Args:
+        use_zarr_format (bool): flag to determine if container is zarr or n5 (default: False).
+        max_bytes (int): maximal number of bytes the container may hold, writes that would
+            exceed it raise an error (default: None, which means unlimited).
+        store (_z5py.MemoryStore): store holding an existing container (default: None).
+    """
+
+    def __init__(self, use_zarr_format=False, max_bytes=None, store=None):
+        if store is None:
+            store = _z5py.MemoryStore(max_bytes or 0)
+        self._store = store
+        super().__init__(store, 'memory', mode='a', use_zarr_format=use_zarr_format)
+
+    @classmethod
+    def load(cls, path, max_bytes=None):
+        """ Load the container at `path` on disc into memory.
+
+        Args:
+            path (str): path of the zarr or n5 container.
+            max_bytes (int): maximal number of bytes the container may hold (default: None).
+        """
+        store = _z5py.MemoryStore(max_bytes or 0)
+        store.load(path)
+        is_zarr = File.infer_format(path)
+        return cls(use_zarr_format=is_zarr, store=store)
+
+    def persist(self, path):
+        """ Write the container to a new zarr or n5 container at `path` on disc.
+
+        Args:
+            path (str): path of the container, must not exist yet.
+        """
+        self._store.persist(path)
+
+    @property
+    def nbytes(self):
+        """ Number of bytes held by the container.
+        """
+        return self._store.nbytes
+
+
+class ZipFile(StoreFile):
+    """ File to read zarr or n5 containers that are packed into a single zip archive.
+
+    The archive is read-only and must hold uncompressed (stored) entries,
+    as written by `z5py.util.pack`.
+
+    Args:
+        path (str): path of the zip archive.
+        mode (str): file mode, only 'r' is supported (default: 'r').
+        use_zarr_format (bool): flag to determine if container is zarr or n5 (default: None).
+    """
+
+    def __init__(self, path, mode='r', use_zarr_format=None):
+        if mode != 'r':
+            raise ValueError("Zip archives can only be opened in mode 'r'")
+        store = _z5py.ZipStore(path)
+        super().__init__(store, path, mode=mode, use_zarr_format=use_zarr_format)
+
+
+class S3File(StoreFile):
+    """ File to access zarr or n5 containers in an AWS S3 bucket or in a S3 compatible object store.
+
+    The credentials are read from the environment or the aws config files.
+    Set `n_threads` of the datasets to read and write chunks with concurrent requests.
 
     Args:
+        bucket (str): name of the bucket.
+        prefix (str): key prefix of the container in the bucket (default: '').
+        mode (str): file mode used to open / create the file (default: 'a').
+        use_zarr_format (bool): flag to determine if container is zarr or n5 (default: None).
+        endpoint (str): url of the object store, e.g. 'http://localhost:9000' for a local
+            MinIO server (default: None, which uses the aws endpoint).
+        region (str): region of the bucket (default: None).
+        anonymous (bool): don't sign requests, to access public buckets (default: False).
+        max_connections (int): maximal number of connections that are kept open (default: 64).
     """
-    # TODO args for AWS
-    def __init__(self, *, mode='a', use_zarr_format=None):
 
-        if not hasattr(_z5py, "S3File"):
+    def __init__(self, bucket, prefix='', mode='a', use_zarr_format=None,
+                 endpoint=None, region=None, anonymous=False, max_connections=64):
+        if not hasattr(_z5py, "S3Store"):
             raise AttributeError("z5 was not compiled with s3 support")
-        handle = _z5py.S3File(_z5py.FileMode(self.file_modes[mode]))
+        store = _z5py.S3Store(bucket, prefix, endpoint or '', region or '',
+                              anonymous, max_connections)
+        super().__init__(store, prefix or bucket, mode=mode, use_zarr_format=use_zarr_format)
 
-        # TODO handle zarr/n5 flag properly
-        is_zarr = use_zarr_format
 
-        if not handle.exists():
-            _z5py.create_file(handle, is_zarr)
-        super().__init__(handle, _z5py.S3Group)
+class GCSFile(StoreFile):
+    """ File to access zarr or n5 containers in a Google Cloud Storage bucket.
+
+    The credentials are read from the environment (application default credentials).
+    Set `n_threads` of the datasets to read and write chunks with concurrent requests.
+
+    Args:
+        bucket (str): name of the bucket.
+        prefix (str): key prefix of the container in the bucket (default: '').
+        mode (str): file mode used to open / create the file (default: 'a').
+        use_zarr_format (bool): flag to determine if container is zarr or n5 (default: None).
+        endpoint (str): url of the storage api, e.g. 'http://localhost:4443' for a local
+            fake-gcs-server (default: None, which uses the google endpoint).
+        project (str): project of the bucket (default: None).
+        anonymous (bool): don't authenticate requests, to access public buckets
+            or emulators (default: False).
+        max_connections (int): maximal number of connections that are kept open (default: 64).
+    """
+
+    def __init__(self, bucket, prefix='', mode='a', use_zarr_format=None,
+                 endpoint=None, project=None, anonymous=False, max_connections=64):
+        if not hasattr(_z5py, "GCSStore"):
+            raise AttributeError("z5 was not compiled with gcs support")
+        store = _z5py.GCSStore(bucket, prefix, endpoint or '', project or '',
+                               anonymous, max_connections)
+        super().__init__(store, prefix or bucket, mode=mode, use_zarr_format=use_zarr_format)
+
+
+class HTTPFile(StoreFile):
+    """ File to read zarr or n5 containers that are served as static directories over http(s).
+
+    The container is read-only. Listing the keys of groups requires that the server
+    provides directory indices (e.g. python's http.server or nginx with autoindex).
+    Set `n_threads` of the datasets to read chunks with concurrent requests.
+
+    Args:
+        url (str): url of the container.
+        mode (str): file mode, only 'r' is supported; the default mode 'a' of `File`
+            is accepted and opens the container read-only (default: 'r').
+        use_zarr_format (bool): flag to determine if container is zarr or n5 (default: None).
+        timeout_ms (int): timeout for requests in milliseconds (default: 30000).
+        verify_peer (bool): verify the certificate of https servers (default: True).
+    """
+
+    def __init__(self, url, mode='r', use_zarr_format=None, timeout_ms=30000, verify_peer=True):
+        if not hasattr(_z5py, "HTTPStore"):
+            raise AttributeError("z5 was not compiled with http support")
+        if mode not in ('r', 'a'):
+            raise ValueError("Containers served over http can only be opened in mode 'r'")
+        store = _z5py.HTTPStore(url, timeout_ms, verify_peer)
+        super().__init__(store, url, mode='r', use_zarr_format=use_zarr_format)
@@ -144,7 +144,8 @@ class Group(Mapping):
                        shape=None, dtype=None,
                        data=None, chunks=None,
                        compression=None, fillvalue=0,
-                       n_threads=1, **compression_options):
+                       n_threads=1, dimension_separator=None,
+                       filters=None, access=None, **compression_options):
         """ Create a new dataset.
 
         Create a new dataset in the group. Syntax and behaviour similar to the
@@ -163,13 +164,27 @@ class Group(Mapping):
                 the ``data`` argument must be given (default: None).
             data (np.ndarray): data used to infer shape, dtype and fill the dataset
                 upon creation (default: None).
-            chunks (tuple): chunk sizes of the new dataset. If no chunks are given,
-                a suitable default value for the number of dimensions will be used (default: None).
+            chunks (tuple or str): chunk sizes of the new dataset. If no chunks or 'auto' are given,
+                chunks of ~1 MiB are planned for the ``access`` pattern, so the number of elements
+                per chunk depends on the dtype (default: None).
             compression (str): name of the compression library used to compress chunks.
                 If no compression is given, the default for the current format is used (default: None).
+                Zarr datasets can also use codecs registered with ``z5py.codecs.register_codec``.
             fillvalue (float): fillvalue for empty chunks (only zarr) (default: 0).
             n_threads (int): number of threads used for chunk I/O (default: 1).
+            dimension_separator (str): separator of the chunk indices in the chunk keys (only zarr).
+                '/' stores the chunks in nested directories, which keeps directories small
+                for datasets with many chunks (default: None, which stores chunks as '0.0.0').
+            filters (list): filters applied to the chunks before compression, in order (only zarr).
+                Given as numcodecs configs or filter objects, supported are 'delta', 'shuffle'
+                and 'quantize', e.g. ``[{'id': 'quantize', 'digits': 3}]``. For 'blosc2' compression,
+                filters given by name are the blosc2 filters (default: None).
+            access (str): expected access pattern used to plan automatic chunks:
+                'cubes' for blocks, 'slices' for 2d slices of the last two dimensions or
+                'timeseries' for the first dimension at few positions (default: None, which plans for 'cubes').
             **compression_options: options for the compression library.
+                For 'blosc2' these are 'codec', 'level', 'filters' (e.g. ``['shuffle', 'bytedelta']``),
+                'typesize' and 'nthreads', the number of blosc2 threads per chunk.
 
         Returns:
             ``Dataset``: the new dataset.
@@ -183,7 +198,9 @@ class Group(Mapping):
                                        shape, dtype,
                                        data, chunks, compression,
                                        fillvalue, n_threads,
-                                       compression_options)
+                                       compression_options,
+                                       dimension_separator,
+                                       filters, access)
 
     def require_dataset(self, name, shape,
                         dtype=None, chunks=None,
@@ -212,7 +229,21 @@ class Group(Mapping):
         return Dataset._require_dataset(self._handle, name, shape, dtype, chunks,
                                         n_threads, **kwargs)
 
-    def visititems(self, func, _root=None):
+    def visit(self, func):
+        """ Recursively visit names in this group.
+
+        Like ``visititems``, but the callable is only called with the member name:
+
+            func(<member name>) => <None or return value>
+
+        The hierarchy is listed in a single native scan and no dataset is opened.
+        """
+        for name, _, _, _, _ in self._handle.list_hierarchy():
+            func_ret = func(name)
+            if func_ret is not None:
+                return func_ret
+
+    def visititems(self, func):
         """ Recursively visit names and objects in this group.
 
         You supply a callable (function, method or callable object); it
@@ -222,10 +253,10 @@ class Group(Mapping):
             func(<member name>, <object>) => <None or return value>
 
         Returning None continues iteration, returning anything else stops
-        and immediately returns that value from the visit method.  No
-        particular order of iteration within groups is guranteed.
-
-        calls the function @param func with the found items, appended to @param path
+        and immediately returns that value from the visit method.
+        Groups are visited before their members and members are visited in alphabetical order.
+        The hierarchy is listed in a single native scan; datasets passed to the callable
+        are only opened once they are accessed.
 
         Example:
 
@@ -238,12 +269,27 @@ class Group(Mapping):
         >>> f = File('foo.n5')
         >>> f.visititems(func)
         """
-        _root = self._handle if _root is None else _root
-        for name, obj in self.items():
-            # the name needs to be relative to the root object visititems was called on
-            name = _root.relative_path(obj._handle)
+        for name, kind, _, _, _ in self._handle.list_hierarchy():
+            if kind == 'group':
+                obj = Group(self._handle_factory(self._handle, name), self._handle_factory)
+            else:
+                obj = Dataset._open_dataset(self._handle, name, lazy=True)
             func_ret = func(name, obj)
             if func_ret is not None:
                 return func_ret
-            if isinstance(obj, Group):
-                obj.visititems(func, _root=_root)
+
+    def tree(self):
+        """ Summarize the hierarchy below this group.
+
+        Returns:
+            str: one line per group and dataset, indented by nesting level;
+                datasets are listed with shape, dtype and chunks.
+        """
+        lines = ['/']
+        for name, kind, shape, dtype, chunks in self._handle.list_hierarchy():
+            parts = name.split('/')
+            line = '    ' * len(parts) + parts[-1]
+            if kind == 'dataset':
+                line += ' %s %s chunks=%s' % (tuple(shape), dtype, tuple(chunks))
+            lines.append(line)
+        return '\n'.join(lines)
@@ -1,5 +1,7 @@
 import numbers
 
+import numpy as np
+
 
 def slice_to_start_stop(s, size):
     """For a single dimension with a given size, normalize slice to size.
@@ -94,14 +96,69 @@ def rectify_shape(arr, required_shape):
     raise ValueError(msg)
 
 
-# TODO we should adjust chunk sizes better if some dimensions
-# are larger than the default chunks (e.g. shape (2, 2000, 2000)
-# should have chunks (1, 512, 512) instead of (2, 64, 64))
-def get_default_chunks(shape):
-    # the default size is 64**3
-    default_size = 262144
-    default_dim = int(round(default_size ** (1. / len(shape))))
-    return tuple(min(default_dim, sh) for sh in shape)
+# access patterns the chunk planner can optimize for
+ACCESS_PATTERNS = ('cubes', 'slices', 'timeseries')
+# the default chunk size, corresponds to 64**3 float32 values
+DEFAULT_CHUNK_BYTES = 2 ** 20
+
+
+def _distribute_chunk_size(size, shape):
+    """ Distribute the number of elements ``size`` evenly over the dimensions of ``shape``.
+    Dimensions that are smaller than their share are covered completely and their
+    remaining share goes to the larger dimensions."""
+    chunks = [1] * len(shape)
+    remaining = sorted(range(len(shape)), key=lambda dim: shape[dim])
+    while remaining:
+        # the epsilon avoids rounding down exact roots, e.g. 262144 ** (1 / 3)
+        extent = max(int(size ** (1. / len(remaining)) + 1e-6), 1)
+        dim = remaining[0]
+        if shape[dim] <= extent:
+            chunks[dim] = shape[dim]
+            size /= shape[dim]
+            remaining.pop(0)
+        else:
+            for dim in remaining:
+                chunks[dim] = extent
+            break
+    return chunks
+
+
+def plan_chunks(shape, dtype, access='cubes', target_bytes=DEFAULT_CHUNK_BYTES):
+    """ Plan the chunk shape of a dataset for the expected access pattern.
+
+    The chunks have about ``target_bytes`` bytes and their shape is tuned
+    so that the expected accesses need to read few chunks and little data outside
+    of the requested region:
+    'cubes': blocks in all dimensions, the chunks are as isotropic as possible.
+    'slices': 2d slices of the last two dimensions, the chunks have size 1 in all other dimensions.
+    'timeseries': full extent of the first (time) dimension for small regions of the other dimensions.
+
+    Args:
+        shape (tuple): shape of the dataset.
+        dtype (str or np.dtype): datatype of the dataset.
+        access (str): expected access pattern, one of 'cubes', 'slices' and 'timeseries' (default: 'cubes').
+        target_bytes (int): size of the chunks in bytes (default: 1 MiB).
+
+    Returns:
+        tuple: the chunk shape.
+    """
+    if access not in ACCESS_PATTERNS:
+        raise ValueError("Invalid access pattern \"%s\", must be one of %s" % (access, ', '.join(ACCESS_PATTERNS)))
+    if target_bytes <= 0:
+        raise ValueError("The target size of the chunks must be positive")
+    shape = tuple(max(int(sh), 1) for sh in shape)
+    if not shape:
+        return ()
+    size = max(target_bytes // np.dtype(dtype).itemsize, 1)
+
+    if access == 'slices' and len(shape) > 2:
+        chunks = [1] * (len(shape) - 2) + _distribute_chunk_size(size, shape[-2:])
+    elif access == 'timeseries' and len(shape) > 1:
+        time_extent = min(shape[0], size)
+        chunks = [time_extent] + _distribute_chunk_size(size / time_extent, shape[1:])
+    else:
+        chunks = _distribute_chunk_size(size, shape)
+    return tuple(chunks)
 
 
 def normalize_slices(slices, shape):
@@ -1,4 +1,7 @@
+import numbers
 import os
+import threading
+from collections import OrderedDict
 from itertools import product
 from concurrent import futures
 from contextlib import closing
@@ -6,7 +9,7 @@ from datetime import datetime
 import numpy as np
 
 from . import _z5py
-from .file import File, S3File
+from .file import File, S3File, StoreFile
 from .dataset import Dataset
 from .shape_utils import normalize_slices
 
@@ -73,35 +76,49 @@ def blocking(shape, block_shape, roi=None, center_blocks_at_roi=False):
                                                      min_coords, max_coords))
 
 
-def copy_dataset_impl(f_in, f_out, in_path_in_file, out_path_in_file,
-                      n_threads, chunks=None, block_shape=None, dtype=None,
-                      roi=None, fit_to_roi=False, **new_compression):
-    """ Implementation of copy dataset.
+def _copy_attributes(obj_in, obj_out):
+    in_attrs = obj_in.attrs
+    out_attrs = obj_out.attrs
+    for key, val in in_attrs.items():
+        out_attrs[key] = val
 
-    Used to implement `copy_dataset`, `convert_to_h5` and `convert_from_h5`.
-    Can also be used for more flexible use cases, like copying from a zarr/n5
-    cloud dataset to a filesytem dataset.
 
-    Args:
-        f_in (File): input file object.
-        f_out (File): output file object.
-        in_path_in_file (str): name of input dataset.
-        out_path_in_file (str): name of output dataset.
-        n_threads (int): number of threads used for copying.
-        chunks (tuple): chunks of the output dataset.
-            By default same as input dataset's chunks. (default: None)
-        block_shape (tuple): block shape used for copying. Must be a multiple
-            of ``chunks``, which are used by default (default: None)
-        dtype (str): datatype of the output dataset, default does not change datatype (default: None).
-        roi (tuple[slice]): region of interest that will be copied. (default: None)
-        fit_to_roi (bool): if given a roi, whether to set the shape of
-            the output dataset to the roi's shape
-            and align chunks with the roi's origin. (default: False)
-        **new_compression: compression library and options for output dataset. If not given,
-            the same compression as in the input is used.
+def _run_bounded(tp, tasks, max_pending):
+    """ Submit ``(function, args)`` tasks to the executor,
+    keeping at most ``max_pending`` of them in flight.
     """
-    ds_in = f_in[in_path_in_file]
+    pending = set()
+    for func, args in tasks:
+        if len(pending) >= max_pending:
+            done, pending = futures.wait(pending, return_when=futures.FIRST_COMPLETED)
+            [t.result() for t in done]
+        pending.add(tp.submit(func, *args))
+    [t.result() for t in futures.as_completed(pending)]
+
 
+def _existing_chunk_regions(ds, bb):
+    """ Get the intersections of the block with the existing chunks of the dataset.
+
+    Returns the list of intersections and the total number of chunks overlapping the block.
+    """
+    chunks = ds.chunks
+    chunk_ranges = [range(b.start // ch, (b.stop - 1) // ch + 1)
+                    for b, ch in zip(bb, chunks)]
+    n_chunks = int(np.prod([len(rr) for rr in chunk_ranges]))
+    regions = [tuple(slice(max(b.start, cid * ch), min(b.stop, (cid + 1) * ch))
+                     for b, cid, ch in zip(bb, chunk_id, chunks))
+               for chunk_id in product(*chunk_ranges) if ds.chunk_exists(chunk_id)]
+    return regions, n_chunks
+
+
+def _prepare_copy_dataset(f_in, f_out, ds_in, out_path_in_file,
+                          chunks=None, block_shape=None, dtype=None,
+                          roi=None, fit_to_roi=False, **new_compression):
+    """ Create the output dataset for a copy.
+
+    Returns the function that copies a single block, the blocks to copy
+    and the output dataset.
+    """
     # check if we can copy chunk by chunk
     in_is_z5 = isinstance(f_in, (File, S3File))
     out_is_z5 = isinstance(f_out, (File, S3File))
@@ -148,15 +165,51 @@ def copy_dataset_impl(f_in, f_out, in_path_in_file, out_path_in_file,
                                    compression=compression,
                                    **compression_opts)
 
-    def write_single_block(bb):
+    def write_region(bb):
         data_in = ds_in[bb].astype(dtype, copy=False)
-        if np.sum(data_in) == 0:
-            return
         if fit_to_roi and roi is not None:
             bb = tuple(slice(b.start - rr.start, b.stop - rr.start)
                        for b, rr in zip(bb, roi))
         ds_out[bb] = data_in
 
+    def write_regions(regions):
+        # the regions are merged per output chunk, so that each output chunk is written once
+        offset = [rr.start for rr in roi] if fit_to_roi and roi is not None else [0] * len(chunks)
+        parts_per_chunk = {}
+        for region in regions:
+            data_in = ds_in[region].astype(dtype, copy=False)
+            out_region = tuple(slice(b.start - off, b.stop - off) for b, off in zip(region, offset))
+            chunk_ranges = [range(b.start // ch, (b.stop - 1) // ch + 1)
+                            for b, ch in zip(out_region, chunks)]
+            for chunk_id in product(*chunk_ranges):
+                part = tuple(slice(max(b.start, cid * ch), min(b.stop, (cid + 1) * ch))
+                             for b, cid, ch in zip(out_region, chunk_id, chunks))
+                local_bb = tuple(slice(pa.start - b.start, pa.stop - b.start) for pa, b in zip(part, out_region))
+                parts_per_chunk.setdefault(chunk_id, []).append((part, data_in[local_bb]))
+
+        for parts in parts_per_chunk.values():
+            if len(parts) == 1:
+                part, data = parts[0]
+                ds_out[part] = data
+                continue
+            # the parts of the chunk that are not covered keep their values
+            chunk_bb = tuple(slice(min(part[d].start for part, _ in parts), max(part[d].stop for part, _ in parts))
+                             for d in range(len(chunks)))
+            data_out = ds_out[chunk_bb]
+            for part, data in parts:
+                data_out[tuple(slice(pa.start - cb.start, pa.stop - cb.start)
+                               for pa, cb in zip(part, chunk_bb))] = data
+            ds_out[chunk_bb] = data_out
+
+    def write_single_block(bb):
+        # for z5 input, we only copy the parts of the block covered by existing chunks
+        if in_is_z5:
+            regions, n_chunks = _existing_chunk_regions(ds_in, bb)
+            if len(regions) < n_chunks:
+                write_regions(regions)
+                return
+        write_region(bb)
+
     def write_single_chunk(bb):
         chunk_id = tuple(b.start // ch for b, ch in zip(bb, chunks))
         chunk_in = ds_in.read_chunk(chunk_id)
@@ -166,17 +219,63 @@ def copy_dataset_impl(f_in, f_out, in_path_in_file, out_path_in_file,
         varlen = tuple(chunk_in.shape) != tuple(b.stop - b.start for b in bb)
         ds_out.write_chunk(chunk_id, chunk_in.astype(dtype, copy=False), varlen)
 
-    write_single = write_single_chunk if copy_chunks else write_single_block
+    # if the chunks are stored in the same way, we can copy the encoded chunks
+    # without decompressing and compressing them again
+    def copy_single_chunk(bb):
+        chunk_id = tuple(b.start // ch for b, ch in zip(bb, chunks))
+        ds_in._impl.copy_chunk_bytes(chunk_id, ds_out._impl)
+
+    copy_encoded = copy_chunks and ds_in.is_zarr == ds_out.is_zarr and\
+        ds_in.dtype == ds_out.dtype and ds_in.chunks == ds_out.chunks and\
+        ds_in.compression == ds_out.compression and ds_in.compression_opts == ds_out.compression_opts and\
+        ds_in.filters == ds_out.filters
+
+    if copy_encoded:
+        write_single = copy_single_chunk
+    else:
+        write_single = write_single_chunk if copy_chunks else write_single_block
+    return write_single, blocks, ds_out
+
+
+def copy_dataset_impl(f_in, f_out, in_path_in_file, out_path_in_file,
+                      n_threads, chunks=None, block_shape=None, dtype=None,
+                      roi=None, fit_to_roi=False, **new_compression):
+    """ Implementation of copy dataset.
+
+    Used to implement `copy_dataset`, `convert_to_h5` and `convert_from_h5`.
+    Can also be used for more flexible use cases, like copying from a zarr/n5
+    cloud dataset to a filesytem dataset.
+
+    Args:
+        f_in (File): input file object.
+        f_out (File): output file object.
+        in_path_in_file (str): name of input dataset.
+        out_path_in_file (str): name of output dataset.
+        n_threads (int): number of threads used for copying.
+        chunks (tuple): chunks of the output dataset.
+            By default same as input dataset's chunks. (default: None)
+        block_shape (tuple): block shape used for copying. Must be a multiple
+            of ``chunks``, which are used by default (default: None)
+        dtype (str): datatype of the output dataset, default does not change datatype (default: None).
+        roi (tuple[slice]): region of interest that will be copied. (default: None)
+        fit_to_roi (bool): if given a roi, whether to set the shape of
+            the output dataset to the roi's shape
+            and align chunks with the roi's origin. (default: False)
+        **new_compression: compression library and options for output dataset. If not given,
+            the same compression as in the input is used.
+    """
+    ds_in = f_in[in_path_in_file]
+    write_single, blocks, ds_out = _prepare_copy_dataset(f_in, f_out, ds_in, out_path_in_file,
+                                                         chunks=chunks, block_shape=block_shape,
+                                                         dtype=dtype, roi=roi, fit_to_roi=fit_to_roi,
+                                                         **new_compression)
 
     with futures.ThreadPoolExecutor(max_workers=n_threads) as tp:
         tasks = [tp.submit(write_single, bb) for bb in blocks]
         [t.result() for t in tasks]
 
     # copy attributes
-    in_attrs = ds_in.attrs
-    out_attrs = ds_out.attrs
-    for key, val in in_attrs.items():
-        out_attrs[key] = val
+    _copy_attributes(ds_in, ds_out)
 
 
 def copy_dataset(in_path, out_path,
@@ -227,8 +326,10 @@ def copy_dataset(in_path, out_path,
 def copy_group(in_path, out_path, in_path_in_file, out_path_in_file, n_threads):
     """ Copy group recursively.
 
-    Copy the group recursively, using copy_dataset. Metadata of datasets that
+    Copy the group recursively. Metadata of datasets that
     are copied cannot be changed and rois cannot be applied.
+    The chunks of all datasets and the attributes of all objects are copied
+    on a single thread pool, so that many small datasets are copied concurrently.
 
     Args:
         in_path (str): path to the input file.
@@ -240,28 +341,34 @@ def copy_group(in_path, out_path, in_path_in_file, out_path_in_file, n_threads):
     f_in = File(in_path)
     f_out = File(out_path)
 
-    def copy_attrs(gin, gout):
-        in_attrs = gin.attrs
-        out_attrs = gout.attrs
-        for key, val in in_attrs.items():
-            out_attrs[key] = val
-
     g_in = f_in[in_path_in_file]
     g_out = f_out.require_group(out_path_in_file)
-    copy_attrs(g_in, g_out)
 
-    def copy_object(name, obj):
-        abs_in_key = os.path.join(in_path_in_file, name)
-        abs_out_key = os.path.join(out_path_in_file, name)
+    # create the output hierarchy first and collect the copy tasks of all datasets
+    attribute_pairs = [(g_in, g_out)]
+    dataset_tasks = []
 
+    def prepare_object(name, obj):
+        abs_out_key = os.path.join(out_path_in_file, name)
         if isinstance(obj, Dataset):
-            copy_dataset(in_path, out_path,
-                         abs_in_key, abs_out_key, n_threads)
+            write_single, blocks, ds_out = _prepare_copy_dataset(f_in, f_out, obj, abs_out_key)
+            dataset_tasks.append((write_single, blocks))
+            attribute_pairs.append((obj, ds_out))
         else:
-            g = f_out.require_group(abs_out_key)
-            copy_attrs(obj, g)
+            attribute_pairs.append((obj, f_out.require_group(abs_out_key)))
+
+    g_in.visititems(prepare_object)
 
-    g_in.visititems(copy_object)
+    def iterate_tasks():
+        for obj_in, obj_out in attribute_pairs:
+            yield _copy_attributes, (obj_in, obj_out)
+        for write_single, blocks in dataset_tasks:
+            for bb in blocks:
+                yield write_single, (bb,)
+
+    # bound the number of submitted tasks, because the containers can have a lot of chunks
+    with futures.ThreadPoolExecutor(max_workers=n_threads) as tp:
+        _run_bounded(tp, iterate_tasks(), max_pending=4 * n_threads)
 
 
 class Timer:
@@ -327,24 +434,171 @@ def fetch_test_data():
 
 
 def remove_trivial_chunks(dataset, n_threads,
-                          remove_specific_value=None):
+                          remove_specific_value=None,
+                          dry_run=False, max_compressed_size=None):
     """ Remove chunks that only contain a single value.
 
-    The input dataset will be copied to the output dataset chunk by chunk.
-    Allows to change datatype, file format and compression as well.
-
     Args:
         dataset (z5py.Dataset)
         n_threads (int): number of threads
         remove_specific_value (int or float): only remove chunks that contain (only) this specific value (default: None)
+        dry_run (bool): only find the trivial chunks, but don't remove them (default: False)
+        max_compressed_size (int): only check chunks that take at most this many bytes on disc;
+            constant chunks compress very well, so this skips decompressing most other chunks.
+            Only useful for compressed datasets (default: None)
 
+    Returns:
+        list[tuple]: ids of the trivial chunks
     """
 
     dtype = dataset.dtype
     function = getattr(_z5py, 'remove_trivial_chunks_%s' % dtype)
     remove_specific = remove_specific_value is not None
     value = remove_specific_value if remove_specific else 0
-    function(dataset._impl, n_threads, remove_specific, value)
+    max_compressed_size = 0 if max_compressed_size is None else max_compressed_size
+    chunks = function(dataset._impl, n_threads, remove_specific, value,
+                      dry_run, max_compressed_size)
+    return [tuple(chunk) for chunk in chunks]
+
+
+def _roi_begin_and_end(dataset, roi):
+    roi, _ = normalize_slices(slice(None) if roi is None else roi, dataset.shape)
+    roi_begin = [rr.start for rr in roi]
+    roi_end = [rr.stop for rr in roi]
+    if any(end <= begin for begin, end in zip(roi_begin, roi_end)):
+        raise ValueError("Region of interest is empty")
+    return roi_begin, roi_end
+
+
+def statistics(dataset, n_threads, roi=None):
+    """ Compute minimum, maximum, sum and mean of the dataset.
+
+    The values are computed in parallel over the chunks. Chunks that
+    don't exist contribute the fill value without being read.
+
+    Args:
+        dataset (z5py.Dataset)
+        n_threads (int): number of threads
+        roi (tuple[slice]): region of interest (default: None)
+
+    Returns:
+        dict: with keys 'min', 'max', 'sum', 'mean' and 'count'
+    """
+    roi_begin, roi_end = _roi_begin_and_end(dataset, roi)
+    function = getattr(_z5py, 'min_max_sum_%s' % dataset.dtype)
+    min_val, max_val, sum_val, count = function(dataset._impl, n_threads, roi_begin, roi_end)
+    return {'min': min_val, 'max': max_val, 'sum': sum_val,
+            'mean': sum_val / count, 'count': count}
+
+
+def histogram(dataset, bins, n_threads, value_range=None, roi=None):
+    """ Compute histogram of the dataset.
+
+    The histogram is computed in parallel over the chunks. Chunks that
+    don't exist contribute the fill value without being read.
+    Follows the conventions of ``np.histogram`` for bins of equal width.
+
+    Args:
+        dataset (z5py.Dataset)
+        bins (int): number of bins
+        n_threads (int): number of threads
+        value_range (tuple): lower and upper bound of the bins, values outside are ignored.
+            By default, the minimum and maximum of the dataset are used. (default: None)
+        roi (tuple[slice]): region of interest (default: None)
+
+    Returns:
+        np.ndarray: counts per bin
+        np.ndarray: bin edges
+    """
+    if value_range is None:
+        stats = statistics(dataset, n_threads, roi)
+        value_range = (stats['min'], stats['max'])
+    min_val, max_val = float(value_range[0]), float(value_range[1])
+    if min_val == max_val:
+        min_val, max_val = min_val - 0.5, max_val + 0.5
+
+    roi_begin, roi_end = _roi_begin_and_end(dataset, roi)
+    function = getattr(_z5py, 'histogram_%s' % dataset.dtype)
+    counts = function(dataset._impl, n_threads, roi_begin, roi_end, min_val, max_val, bins)
+    return counts, np.linspace(min_val, max_val, bins + 1)
+
+
+def _default_axes(ndim):
+    # OME-Zarr names the axes t, c, z, y, x and requires 2 to 5 of them
+    if ndim < 2 or ndim > 5:
+        raise ValueError("OME-Zarr multiscales require 2 to 5 axes, got %i" % ndim)
+    names = ['t', 'c', 'z', 'y', 'x'] if ndim > 3 else ['z', 'y', 'x']
+    types = {'t': 'time', 'c': 'channel'}
+    return [{'name': name, 'type': types.get(name, 'space')} for name in names[-ndim:]]
+
+
+def downscale(dataset, factors, method, out_group, n_threads,
+              chunks=None, source_path=None, axes=None, **new_compression):
+    """ Compute a multiscale pyramid of the dataset.
+
+    All levels are computed in a single pass that reads every chunk of the dataset once.
+    The levels are stored in ``out_group`` as ``s1``, ``s2``, ... and the group
+    gets ``multiscales`` attributes following the OME-Zarr (v0.4) convention.
+
+    Args:
+        dataset (z5py.Dataset): input dataset.
+        factors (list[int or tuple]): downscaling factor of each level relative to the level before.
+        method (str): downscaling method, 'mean' for intensity data or 'mode' for label data.
+        out_group (z5py.Group): group for the downscaled datasets.
+        n_threads (int): number of threads.
+        chunks (tuple): chunks of the downscaled datasets; the chunks times the factor of
+            each level must be a multiple of the chunks of the level before, so that no
+            chunk is read twice. By default the dataset's chunks are used. (default: None)
+        source_path (str): path of the dataset relative to ``out_group``.
+            If given, it is listed as the first scale level. (default: None)
+        axes (list[str or dict]): the axes of the dataset for the ``multiscales`` attributes,
+            either names or OME-Zarr axis dicts. By default the last ``ndim`` of
+            't', 'c', 'z', 'y', 'x' are used. (default: None)
+        **new_compression: compression library and options for the downscaled datasets.
+            If not given, the same compression as in the input is used.
+
+    Returns:
+        list[z5py.Dataset]: the downscaled datasets.
+    """
+    ndim = dataset.ndim
+    factors = [(int(factor),) * ndim if isinstance(factor, numbers.Integral) else tuple(int(fa) for fa in factor)
+               for factor in factors]
+    if axes is None:
+        axes = _default_axes(ndim)
+    else:
+        axes = [{'name': axis} if isinstance(axis, str) else dict(axis) for axis in axes]
+        if len(axes) != ndim:
+            raise ValueError("Expected %i axes, got %i" % (ndim, len(axes)))
+    chunks = dataset.chunks if chunks is None else chunks
+
+    compression = new_compression.pop("compression", dataset.compression)
+    compression_opts = new_compression
+    if compression == dataset.compression and not compression_opts:
+        compression_opts = dataset.compression_opts
+
+    levels = []
+    shape = dataset.shape
+    for level, factor in enumerate(factors, 1):
+        shape = tuple((sh + fa - 1) // fa for sh, fa in zip(shape, factor))
+        levels.append(out_group.require_dataset('s%i' % level, shape=shape,
+                                                chunks=tuple(min(ch, sh) for ch, sh in zip(chunks, shape)),
+                                                dtype=dataset.dtype, compression=compression,
+                                                **compression_opts))
+
+    function = getattr(_z5py, 'downscale_%s' % dataset.dtype)
+    function(dataset._impl, [ds._impl for ds in levels], factors, method, n_threads)
+
+    # write the multiscale metadata
+    scale = [1.] * ndim
+    datasets = [] if source_path is None else [{'path': source_path,
+                                                'coordinateTransformations': [{'type': 'scale',
+                                                                               'scale': list(scale)}]}]
+    for level, factor in enumerate(factors, 1):
+        scale = [sc * fa for sc, fa in zip(scale, factor)]
+        datasets.append({'path': 's%i' % level,
+                         'coordinateTransformations': [{'type': 'scale', 'scale': list(scale)}]})
+    out_group.attrs['multiscales'] = [{'version': '0.4', 'axes': axes, 'type': method, 'datasets': datasets}]
+    return levels
 
 
 def remove_dataset(dataset, n_threads):
@@ -370,13 +624,16 @@ def remove_chunks(dataset, bounding_box):
         remove_chunk(dataset, chunk_id)
 
 
-def unique(dataset, n_threads, return_counts=False):
+def unique(dataset, n_threads, return_counts=False, ignore_fill_value=False):
     """ Find unique values in dataset.
 
+    Chunks that don't exist are not taken into account.
+
     Args:
         dataset (z5py.Dataset)
         n_threads (int): number of threads
         return_counts (bool): return counts of unique values (default: False)
+        ignore_fill_value (bool): exclude the fill value from the result (default: False)
 
     """
     dtype = dataset.dtype
@@ -384,4 +641,234 @@ def unique(dataset, n_threads, return_counts=False):
         function = getattr(_z5py, 'unique_with_counts_%s' % dtype)
     else:
         function = getattr(_z5py, 'unique_%s' % dtype)
-    return function(dataset._impl, n_threads)
+    return function(dataset._impl, n_threads, ignore_fill_value)
+
+
+def _require_in_range(array, dtype, name):
+    # np.require silently wraps integers that are out of range of the dtype
+    array = np.asarray(array).ravel()
+    if np.issubdtype(dtype, np.integer) and array.size > 0:
+        info = np.iinfo(dtype)
+        if array.min() < info.min or array.max() > info.max:
+            raise ValueError("The %s are out of range for dtype %s" % (name, dtype))
+    return np.require(array, dtype=dtype)
+
+
+def apply_mapping(dataset, keys, values, out=None, n_threads=1):
+    """ Map the values of dataset through the table keys -> values.
+
+    The chunks are mapped in parallel and written to the same chunks of `out`,
+    or back to the dataset if `out` is not given. Values that are not
+    in keys stay the same and chunks that don't exist are skipped.
+
+    Args:
+        dataset (z5py.Dataset)
+        keys (np.ndarray): values to be mapped
+        values (np.ndarray): values the keys are mapped to
+        out (z5py.Dataset): output dataset with the same shape, chunks, dtype
+            and format as dataset (default: None)
+        n_threads (int): number of threads (default: 1)
+    """
+    out = dataset if out is None else out
+    dtype = dataset.dtype
+    if out.dtype != dtype:
+        raise ValueError("Output dataset has dtype %s, expected %s" % (out.dtype, dtype))
+    keys = _require_in_range(keys, dtype, 'keys')
+    values = _require_in_range(values, dtype, 'values')
+    if keys.shape != values.shape:
+        raise ValueError("Need the same number of keys and values")
+    function = getattr(_z5py, 'apply_mapping_%s' % dtype)
+    function(dataset._impl, out._impl, keys, values, n_threads)
+
+
+def label_statistics(dataset, n_threads, compute_centroids=False, ignore_fill_value=False):
+    """ Compute the voxel count, bounding box and centroid of all labels in dataset.
+
+    Chunks that don't exist are not taken into account.
+
+    Args:
+        dataset (z5py.Dataset)
+        n_threads (int): number of threads
+        compute_centroids (bool): compute the centroids of the labels (default: False)
+        ignore_fill_value (bool): exclude the fill value from the result (default: False)
+
+    Returns:
+        np.ndarray: the labels, sorted
+        np.ndarray: the number of voxels per label
+        np.ndarray: begin of the bounding boxes, shape (n_labels, ndim)
+        np.ndarray: end (exclusive) of the bounding boxes, shape (n_labels, ndim)
+        np.ndarray: centroids, shape (n_labels, ndim); only returned if compute_centroids is True
+    """
+    dtype = dataset.dtype
+    function = getattr(_z5py, 'label_statistics_%s' % dtype)
+    labels, counts, bb_begin, bb_end, centroids = function(dataset._impl, n_threads,
+                                                           compute_centroids, ignore_fill_value)
+    if compute_centroids:
+        return labels, counts, bb_begin, bb_end, centroids
+    return labels, counts, bb_begin, bb_end
+
+
+class _ChunkCache(object):
+    """ Thread-safe LRU cache of decoded chunks.
+
+    A chunk is only read once while it is cached, even if several threads request it at the same time.
+    Reading releases the GIL, so other threads can keep running.
+    """
+    def __init__(self, dataset, max_chunks):
+        self._ds = dataset
+        self._max_chunks = max_chunks
+        self._lock = threading.Lock()
+        self._chunks = OrderedDict()
+
+    def __getitem__(self, chunk_id):
+        with self._lock:
+            future = self._chunks.get(chunk_id)
+            is_owner = future is None
+            if is_owner:
+                future = futures.Future()
+                self._chunks[chunk_id] = future
+                while len(self._chunks) > self._max_chunks:
+                    self._chunks.popitem(last=False)
+            else:
+                self._chunks.move_to_end(chunk_id)
+
+        if is_owner:
+            chunks, shape = self._ds.chunks, self._ds.shape
+            bb = tuple(slice(cid * ch, min((cid + 1) * ch, sh))
+                       for cid, ch, sh in zip(chunk_id, chunks, shape))
+            try:
+                future.set_result(self._ds[bb])
+            except Exception as e:
+                future.set_exception(e)
+        return future.result()
+
+
+def _read_block_cached(cache, bb, dtype):
+    """ Assemble the block from the cached chunks overlapping it.
+    """
+    chunks = cache._ds.chunks
+    out = np.empty(tuple(b.stop - b.start for b in bb), dtype=dtype)
+    chunk_ranges = [range(b.start // ch, (b.stop - 1) // ch + 1)
+                    for b, ch in zip(bb, chunks)]
+    for chunk_id in product(*chunk_ranges):
+        chunk_data = cache[chunk_id]
+        overlap = [(max(b.start, cid * ch), min(b.stop, (cid + 1) * ch))
+                   for b, cid, ch in zip(bb, chunk_id, chunks)]
+        out_bb = tuple(slice(start - b.start, stop - b.start) for (start, stop), b in zip(overlap, bb))
+        chunk_bb = tuple(slice(start - cid * ch, stop - cid * ch)
+                         for (start, stop), cid, ch in zip(overlap, chunk_id, chunks))
+        out[out_bb] = chunk_data[chunk_bb]
+    return out
+
+
+def _default_cache_size(shape, chunks, block_shape, halo, n_threads):
+    """ Number of chunks that need to be cached so that each chunk is only read once by map_blocks.
+
+    The blocks are processed in C order, so a chunk in the halo between two planes of blocks
+    along the first axis is used again one plane of blocks later. Until then, the chunks of the
+    plane with halo and the chunks of the blocks in flight are accessed.
+    """
+    chunks_per_dim = [(sh + ch - 1) // ch for sh, ch in zip(shape, chunks)]
+    # number of chunks along an axis that overlap an interval of the block size with halo
+    chunks_per_block_dim = [min((bs + 2 * ha - 1) // ch + 2, n_chunks)
+                            for bs, ha, ch, n_chunks in zip(block_shape, halo, chunks, chunks_per_dim)]
+    chunks_per_plane = chunks_per_block_dim[0] * int(np.prod(chunks_per_dim[1:]))
+    chunks_per_block = int(np.prod(chunks_per_block_dim))
+    # _run_bounded keeps up to 2 * n_threads blocks in flight
+    return min(chunks_per_plane + 2 * n_threads * chunks_per_block, int(np.prod(chunks_per_dim)))
+
+
+def map_blocks(func, in_ds, out_ds, block_shape, halo, n_threads, cache_size=None):
+    """ Apply a function to all blocks of a dataset, enlarged by a halo.
+
+    The blocks are processed in parallel and in order and the decoded chunks of the input are kept
+    in a bounded cache, so that neighbouring blocks can reuse the chunks of their halo.
+    Only the inner block (without the halo) of the result is written to the output.
+
+    Args:
+        func (callable): function applied to the data of each block with halo;
+            must return an array of the same shape or of the shape of the inner block.
+        in_ds (z5py.Dataset): input dataset
+        out_ds (z5py.Dataset): output dataset, must have the same shape as the input
+        block_shape (tuple): shape of the blocks, must be a multiple of the output chunks
+        halo (tuple): halo added to each side of the blocks
+        n_threads (int): number of threads
+        cache_size (int): maximal number of decoded input chunks that are cached.
+            By default, the chunks of one plane of blocks along the first axis with halo
+            and of the blocks in flight are kept, so that each chunk is only decoded once (default: None)
+    """
+    shape = in_ds.shape
+    if out_ds.shape != shape:
+        raise ValueError("Output shape %s does not match input shape %s" % (str(out_ds.shape), str(shape)))
+    if len(block_shape) != len(shape) or len(halo) != len(shape):
+        raise ValueError("Block shape and halo must have the same dimension as the dataset")
+    if any(bs % ch != 0 for bs, ch in zip(block_shape, out_ds.chunks)):
+        raise ValueError("Block shape %s is not a multiple of the output chunks %s" % (str(block_shape),
+                                                                                       str(out_ds.chunks)))
+
+    if cache_size is None:
+        cache_size = _default_cache_size(shape, in_ds.chunks, block_shape, halo, n_threads)
+    cache = _ChunkCache(in_ds, cache_size)
+    dtype = in_ds.dtype
+
+    def process_block(bb):
+        outer_bb = tuple(slice(max(b.start - ha, 0), min(b.stop + ha, sh))
+                         for b, ha, sh in zip(bb, halo, shape))
+        data = _read_block_cached(cache, outer_bb, dtype)
+        res = np.asarray(func(data))
+        inner_shape = tuple(b.stop - b.start for b in bb)
+        if res.shape != inner_shape:
+            if res.shape != data.shape:
+                raise RuntimeError("Result of the block function has shape %s, expected %s or %s"
+                                   % (str(res.shape), str(data.shape), str(inner_shape)))
+            local_bb = tuple(slice(b.start - ob.start, b.stop - ob.start)
+                             for b, ob in zip(bb, outer_bb))
+            res = res[local_bb]
+        out_ds[bb] = res
+
+    with futures.ThreadPoolExecutor(max_workers=n_threads) as tp:
+        tasks = ((process_block, (bb,)) for bb in blocking(shape, block_shape))
+        _run_bounded(tp, tasks, max_pending=2 * n_threads)
+
+
+def set_dimension_separator(dataset, dimension_separator, n_threads=1):
+    """ Move the chunks of a zarr dataset between the flat and nested layout.
+
+    Chunks are moved in parallel and the metadata is only updated once all chunks were moved.
+
+    Args:
+        dataset (z5py.Dataset): zarr dataset opened with write permissions.
+        dimension_separator (str): '.' for the flat layout (0.0.0) or '/' for the nested layout (0/0/0).
+        n_threads (int): number of threads used to move the chunks (default: 1).
+    """
+    _z5py.set_dimension_separator(dataset._handle, dimension_separator, n_threads)
+    # the dataset needs to be reopened to use the new layout
+    dataset._impl = _z5py.open_dataset(dataset._handle)
+
+
+def pack(container, zip_path, n_threads=1):
+    """ Pack a container on the filesystem into a single zip archive.
+
+    The files of the container are read in parallel and stored without compression,
+    so the archive can be opened with `z5py.ZipFile` and chunks are read directly from it.
+
+    Args:
+        container (str or z5py.File): path of the container or file opened on the filesystem.
+        zip_path (str): path of the zip archive.
+        n_threads (int): number of threads used to read the files (default: 1).
+    """
+    if isinstance(container, StoreFile):
+        raise ValueError("Can only pack containers on the filesystem")
+    path = container._handle.path() if isinstance(container, File) else container
+    _z5py.pack_zip(path, zip_path, n_threads)
+
+
+def unpack(zip_path, path, n_threads=1):
+    """ Unpack a zip archive written by `pack` to a container on the filesystem.
+
+    Args:
+        zip_path (str): path of the zip archive.
+        path (str): path of the container, must not exist yet.
+        n_threads (int): number of threads used to write the files (default: 1).
+    """
+    _z5py.unpack_zip(zip_path, path, n_threads)
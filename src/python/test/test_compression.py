@@ -118,6 +118,38 @@ class CompressionTestMixin(ABC):
 class TestZarrCompression(CompressionTestMixin, unittest.TestCase):
     data_format = 'zarr'
 
+    @unittest.skipUnless(z5py.dataset.AVAILABLE_COMPRESSORS.get('blosc2', False), 'Requires blosc2')
+    def test_blosc2_options(self):
+        data = np.random.rand(*self.shape).astype('float32')
+        ds = self.root_file.create_dataset('data', data=data, chunks=(10, 20, 20),
+                                           compression='blosc2', codec='lz4', level=7,
+                                           filters=['shuffle', 'bytedelta'], nthreads=2)
+        opts = ds.compression_opts
+        self.assertEqual(opts['codec'], 'lz4')
+        self.assertEqual(opts['filters'], 'shuffle,bytedelta')
+        self.assertEqual(opts['typesize'], 4)
+        self.check_array(z5py.File('array.zarr')['data'][:], data)
+
+    def test_blosc2_filter_names(self):
+        from z5py.dataset import Dataset
+        # filters given by name are the blosc2 filters, this does not need blosc2
+        filters, opts = Dataset._split_blosc2_filters('blosc2', ['shuffle', 'bytedelta'], {'codec': 'lz4'})
+        self.assertIsNone(filters)
+        opts = Dataset._to_zarr_compression_options('blosc2', opts)
+        self.assertEqual(opts['filters'], 'shuffle,bytedelta')
+        self.assertEqual(opts['codec'], 'lz4')
+
+        # zarr filters are given by their config
+        zarr_filters = [{'id': 'delta'}]
+        filters, opts = Dataset._split_blosc2_filters('blosc2', zarr_filters, {})
+        self.assertEqual(filters, zarr_filters)
+        self.assertEqual(opts, {})
+
+        # other compressors don't have filters given by name
+        with self.assertRaises(ValueError):
+            self.root_file.create_dataset('data', shape=(10, 10), dtype='float32',
+                                          compression='raw', filters=['shuffle'])
+
 
 class TestN5Compression(CompressionTestMixin, unittest.TestCase):
     data_format = 'n5'
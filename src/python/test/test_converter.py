@@ -10,6 +10,13 @@ try:
 except ImportError:
     h5py = None
 
+try:
+    import imageio
+    import tifffile
+except ImportError:
+    imageio = None
+    tifffile = None
+
 
 class TestConverter(unittest.TestCase):
     tmp_dir = './tmp_dir'
@@ -58,6 +65,42 @@ class TestConverter(unittest.TestCase):
             data_n5 = fn5[key][:]
             self.assertTrue(np.allclose(data, data_n5))
 
+    @unittest.skipUnless(h5py, 'Requires h5py')
+    def test_h5_to_n5_processes(self):
+        from z5py.converter import convert_from_h5
+        h5_file = os.path.join(self.tmp_dir, 'tmp.h5')
+        n5_file = os.path.join(self.tmp_dir, 'tmp.n5')
+
+        key = 'data'
+        with h5py.File(h5_file, 'w') as f:
+            # use hdf5 chunks that are not aligned with the output chunks
+            ds = f.create_dataset(key, shape=self.shape, chunks=(25, 25, 25),
+                                  dtype='float32', compression='gzip')
+            data = np.random.rand(*self.shape).astype('float32')
+            ds[:] = data
+            ds.attrs['resolution'] = [4., 4., 40.]
+
+        # the output chunks give 1000 blocks, so each of the processes converts many of them
+        convert_from_h5(h5_file, n5_file, key, key,
+                        chunks=self.chunks, n_threads=4,
+                        use_processes=True, compression='gzip')
+        ds_n5 = z5py.File(n5_file)[key]
+        self.assertEqual(ds_n5.chunks, self.chunks)
+        self.assertTrue(np.allclose(data, ds_n5[:]))
+        self.assertEqual(ds_n5.attrs['resolution'], [4., 4., 40.])
+
+    @unittest.skipUnless(h5py, 'Requires h5py')
+    def test_process_block_shape(self):
+        from z5py.converter import _process_block_shape
+        # unrelated chunks must not blow up the block shape
+        self.assertEqual(_process_block_shape((64, 64, 64), (63, 63, 63), 4), (63, 63, 63))
+        self.assertEqual(_process_block_shape((25, 25, 25), (20, 20, 20), 4), (20, 20, 20))
+        # small multiples of the output chunks are used
+        self.assertEqual(_process_block_shape((1, 64, 32), (1, 32, 64), 4), (1, 64, 64))
+        self.assertEqual(_process_block_shape(None, (32, 32, 32), 4), (32, 32, 32))
+        # but the block size is capped
+        self.assertEqual(_process_block_shape((512, 512, 256), (256, 256, 256), 8), (256, 256, 256))
+
     @unittest.skipUnless(h5py, 'Requires h5py')
     def test_h5_to_n5_with_roi(self):
         from z5py.converter import convert_from_h5
@@ -171,6 +214,51 @@ class TestConverter(unittest.TestCase):
         self.assertEqual(roi_shape, data_h5.shape)
         self.assertTrue(np.allclose(data[roi], data_h5))
 
+    @unittest.skipUnless(imageio and tifffile, 'Requires imageio and tifffile')
+    def test_tif_to_n5_streaming(self):
+        from z5py.converter import convert_from_tif
+        tif_dir = os.path.join(self.tmp_dir, 'slices')
+        os.mkdir(tif_dir)
+        tif_file = os.path.join(self.tmp_dir, 'stack.tif')
+        n5_file = os.path.join(self.tmp_dir, 'tmp.n5')
+
+        shape = (25, 64, 64)
+        data = np.random.randint(0, 255, size=shape).astype('uint8')
+        for z in range(shape[0]):
+            tifffile.imwrite(os.path.join(tif_dir, 'slice_%03i.tif' % z), data[z])
+        tifffile.imwrite(tif_file, data)
+
+        chunks = (10, 32, 32)
+        for key, path in (('folder', tif_dir), ('stack', tif_file)):
+            convert_from_tif(path, n5_file, key, chunks=chunks,
+                             n_threads=4, streaming=True)
+            ds = z5py.File(n5_file)[key]
+            self.assertEqual(ds.shape, shape)
+            self.assertTrue(np.array_equal(ds[:], data))
+
+    @unittest.skipUnless(imageio and tifffile, 'Requires imageio and tifffile')
+    def test_n5_to_tif(self):
+        from z5py.converter import convert_to_tif
+        n5_file = os.path.join(self.tmp_dir, 'tmp.n5')
+        tif_dir = os.path.join(self.tmp_dir, 'slices')
+        tif_file = os.path.join(self.tmp_dir, 'stack.tif')
+
+        data = np.random.randint(0, 255, size=(25, 64, 64)).astype('uint8')
+        f = z5py.File(n5_file)
+        f.create_dataset('data', data=data, chunks=(10, 32, 32))
+
+        roi = np.s_[3:22, 5:60, :]
+        convert_to_tif(n5_file, tif_dir, 'data', n_threads=4,
+                       roi=roi, one_file_per_slice=True)
+        file_names = sorted(os.listdir(tif_dir))
+        self.assertEqual(len(file_names), 19)
+        out = np.stack([tifffile.imread(os.path.join(tif_dir, fname)) for fname in file_names])
+        self.assertTrue(np.array_equal(out, data[roi]))
+
+        convert_to_tif(n5_file, tif_file, 'data', n_threads=4, roi=roi)
+        out = tifffile.imread(tif_file)
+        self.assertTrue(np.array_equal(out, data[roi]))
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -271,6 +271,63 @@ class DatasetTestMixin(ABC):
                     self.assertEqual(data.shape, out.shape)
                     self.assertTrue(np.allclose(data, out))
 
+    def test_readwrite_chunk_bytes(self):
+        shape = (100, 100)
+        chunks = (10, 10)
+        ds = self.root_file.create_dataset('test', dtype='int32',
+                                           shape=shape, chunks=chunks,
+                                           compression='gzip')
+        self.assertIsNone(ds.read_chunk_bytes((0, 0)))
+
+        data = np.random.randint(0, 100, size=chunks).astype('int32')
+        ds.write_chunk((0, 0), data)
+        encoded = ds.read_chunk_bytes((0, 0))
+        self.assertIsInstance(encoded, bytes)
+
+        ds_out = self.root_file.create_dataset('test_out', dtype='int32',
+                                               shape=shape, chunks=chunks,
+                                               compression='gzip')
+        ds_out.write_chunk_bytes((1, 1), encoded)
+        self.assertTrue(np.array_equal(ds_out.read_chunk((1, 1)), data))
+
+    def test_chunks_where(self):
+        shape = (100, 100)
+        chunks = (10, 10)
+        ds = self.root_file.create_dataset('test', dtype='uint32',
+                                           shape=shape, chunks=chunks)
+        data = np.zeros(shape, dtype='uint32')
+        data[:10, :10] = 3
+        data[20:25, 20:25] = 5
+        data[50:60, 50:60] = np.arange(100).reshape(chunks)
+        ds[:] = data
+        self.assertFalse(ds.has_chunk_summaries)
+
+        ds.enable_chunk_summaries(max_labels=4)
+        self.assertTrue(ds.has_chunk_summaries)
+        self.assertEqual(ds.chunks_where(non_empty=True), [(0, 0), (2, 2), (5, 5)])
+        self.assertEqual(ds.chunks_where(max_gt=4), [(2, 2), (5, 5)])
+        self.assertEqual(ds.chunks_where(min_gt=0), [(0, 0)])
+        self.assertEqual(ds.chunks_where(contains_label=5, max_lt=10), [(2, 2)])
+
+        # the summaries are updated when writing
+        ds[95:, 95:] = 200
+        self.assertEqual(ds.chunks_where(max_gt=100), [(9, 9)])
+
+        # chunks changed by other tools are detected by their modification time
+        chunk_path = os.path.join(self.path, 'test', '0.0' if ds.is_zarr else os.path.join('0', '0'))
+        mtime = os.stat(chunk_path).st_mtime_ns
+        os.utime(chunk_path, ns=(mtime, mtime + 10 ** 9))
+        self.assertEqual(ds.chunks_where(max_gt=100), [(0, 0), (9, 9)])
+
+        # labels of uint64 datasets that don't fit into int64
+        ds = self.root_file.create_dataset('test_uint64', dtype='uint64',
+                                           shape=shape, chunks=chunks)
+        label = 2 ** 63 + 5
+        ds[10:20, 30:40] = np.full(chunks, label, dtype='uint64')
+        ds.enable_chunk_summaries(max_labels=4)
+        self.assertEqual(ds.chunks_where(contains_label=label), [(1, 3)])
+        self.assertEqual(ds.chunks_where(contains_label=label + 1), [])
+
     def test_read_direct(self):
         shape = (100, 100)
         chunks = (10, 10)
@@ -408,6 +465,33 @@ class DatasetTestMixin(ABC):
         out = ds[-32:]
         self.assertTrue(np.allclose(out, 0))
 
+    def test_auto_chunks(self):
+        from z5py.shape_utils import plan_chunks
+        shape = (2, 2000, 2000)
+        # dimensions smaller than their share are covered completely
+        self.assertEqual(plan_chunks(shape, 'float32'), (2, 362, 362))
+        self.assertEqual(plan_chunks((100, 100, 100), 'float32'), (64, 64, 64))
+        self.assertEqual(plan_chunks(shape, 'uint8', 'slices'), (1, 1024, 1024))
+        self.assertEqual(plan_chunks((10000, 100, 100), 'float32', 'timeseries'), (10000, 5, 5))
+        self.assertEqual(plan_chunks((50, 512, 512), 'float64', 'cubes', target_bytes=512), (4, 4, 4))
+        with self.assertRaises(ValueError):
+            plan_chunks(shape, 'float32', 'rows')
+
+        ds = self.root_file.create_dataset('slices', shape=shape, dtype='uint16',
+                                           chunks='auto', access='slices')
+        self.assertEqual(ds.chunks, (1, 724, 724))
+        # the default chunks have ~1 MiB, so they depend on the datatype
+        ds = self.root_file.create_dataset('default', shape=shape, dtype='float64')
+        self.assertEqual(ds.chunks, (2, 256, 256))
+        for dtype, chunks in (('uint8', (101, 101, 101)), ('float32', (64, 64, 64)), ('float64', (50, 50, 50))):
+            ds = self.root_file.create_dataset('default_%s' % dtype, shape=(200, 200, 200), dtype=dtype)
+            self.assertEqual(ds.chunks, chunks)
+        ds = self.root_file.require_dataset('default', shape=shape, dtype='float64', chunks='auto')
+        self.assertEqual(ds.chunks, (2, 256, 256))
+        with self.assertRaises(ValueError):
+            self.root_file.create_dataset('explicit', shape=shape, dtype='float64',
+                                          chunks=(1, 100, 100), access='slices')
+
 
 class TestZarrDataset(DatasetTestMixin, unittest.TestCase):
     data_format = 'zarr'
@@ -0,0 +1,45 @@
+import os
+import unittest
+import numpy as np
+
+import z5py
+from z5py import _z5py
+
+
+# the tests need the fake-gcs-server emulator:
+# docker run -p 4443:4443 fsouza/fake-gcs-server -scheme http
+# Z5_GCS_ENDPOINT=http://localhost:4443 Z5_GCS_BUCKET=z5-test python -m unittest test_gcs
+@unittest.skipUnless(hasattr(_z5py, 'GCSStore') and 'Z5_GCS_ENDPOINT' in os.environ,
+                     "Needs z5 with gcs support and the gcs emulator")
+class TestGCS(unittest.TestCase):
+    bucket = os.environ.get('Z5_GCS_BUCKET', 'z5-test')
+    endpoint = os.environ.get('Z5_GCS_ENDPOINT')
+
+    def open_file(self, mode='a'):
+        return z5py.GCSFile(self.bucket, 'test.zarr', mode=mode, endpoint=self.endpoint,
+                            project='z5-test', anonymous=True)
+
+    def setUp(self):
+        self.open_file(mode='w')
+
+    def tearDown(self):
+        self.open_file(mode='w')
+
+    def test_read_write(self):
+        f = self.open_file()
+        g = f.create_group('group')
+        data = np.random.rand(100, 100)
+        ds = g.create_dataset('data', data=data, chunks=(32, 32), n_threads=4)
+        self.assertTrue(np.allclose(ds[:], data))
+        g.attrs['a'] = 1
+
+        f = self.open_file(mode='r')
+        self.assertEqual(list(f.keys()), ['group'])
+        self.assertEqual(f['group'].attrs['a'], 1)
+        ds = f['group/data']
+        self.assertTrue(ds.is_zarr)
+        self.assertTrue(np.allclose(ds[10:50, 20:60], data[10:50, 20:60]))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -128,6 +128,33 @@ class GroupTestMixin(ABC):
         expected_names = {'d1', 'd2'}
         self.assertEqual(names, expected_names)
 
+    def test_visit(self):
+        f = self.root_file
+        f.create_dataset('g1/d1', shape=(10, 10), dtype='uint8')
+
+        names = []
+        f.visit(names.append)
+        self.assertEqual(names, ['g1', 'g1/d1', 'test', 'test/test'])
+
+        # datasets are only opened when accessed in the callback
+        shapes = {}
+
+        def visitor(name, obj):
+            if isinstance(obj, z5py.Dataset):
+                shapes[name] = obj.shape
+
+        f.visititems(visitor)
+        self.assertEqual(shapes, {'g1/d1': (10, 10), 'test/test': self.shape})
+
+    def test_tree(self):
+        f = self.root_file
+        f.create_dataset('g1/d1', shape=(10, 10), chunks=(5, 5), dtype='uint8')
+        tree = f.tree().split('\n')
+        self.assertEqual(tree[0], '/')
+        self.assertEqual(tree[1].strip(), 'g1')
+        self.assertEqual(tree[2].strip(), 'd1 (10, 10) uint8 chunks=(5, 5)')
+        self.assertEqual(len(tree), 5)
+
 
 class TestGroupZarr(GroupTestMixin, unittest.TestCase):
     data_format = 'zr'
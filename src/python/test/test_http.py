@@ -0,0 +1,70 @@
+import os
+import functools
+import threading
+import unittest
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from shutil import rmtree
+
+import numpy as np
+
+import z5py
+from z5py import _z5py
+
+
+class QuietHandler(SimpleHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+
+@unittest.skipUnless(hasattr(_z5py, 'HTTPStore'), "Needs z5 with http support")
+class TestHTTP(unittest.TestCase):
+    tmp_dir = './tmp_http'
+
+    def setUp(self):
+        os.makedirs(self.tmp_dir, exist_ok=True)
+        handler = functools.partial(QuietHandler, directory=self.tmp_dir)
+        self.server = ThreadingHTTPServer(('localhost', 0), handler)
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        self.url = 'http://localhost:%i' % self.server.server_address[1]
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        rmtree(self.tmp_dir, ignore_errors=True)
+
+    def test_read(self):
+        data = np.random.rand(100, 100)
+        for ext in ('.n5', '.zarr'):
+            with z5py.File(os.path.join(self.tmp_dir, 'data' + ext), 'w') as f:
+                g = f.create_group('group')
+                ds = g.create_dataset('data', shape=data.shape, chunks=(32, 32), dtype='float64')
+                # leave the first chunk empty
+                ds[32:, :] = data[32:, :]
+                ds[:32, 32:] = data[:32, 32:]
+                g.attrs['a'] = 1
+
+            f = z5py.File(self.url + '/data' + ext)
+            self.assertIsInstance(f, z5py.HTTPFile)
+            self.assertEqual(list(f.keys()), ['group'])
+            self.assertEqual(f['group'].attrs['a'], 1)
+
+            ds = f['group/data']
+            self.assertEqual(ds.is_zarr, ext == '.zarr')
+            ds.n_threads = 4
+            expected = data.copy()
+            expected[:32, :32] = 0
+            self.assertTrue(np.allclose(ds[:], expected))
+
+            with self.assertRaises(ValueError):
+                f.create_group('other')
+
+    def test_modes(self):
+        with self.assertRaises(ValueError):
+            z5py.File(self.url + '/data.n5', 'w')
+        with self.assertRaises(OSError):
+            z5py.File(self.url + '/missing.n5')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,54 @@
+import os
+import unittest
+from shutil import rmtree
+
+import numpy as np
+import z5py
+
+
+class TestMemory(unittest.TestCase):
+    tmp_dir = './tmp_memory'
+
+    def setUp(self):
+        os.makedirs(self.tmp_dir, exist_ok=True)
+
+    def tearDown(self):
+        rmtree(self.tmp_dir, ignore_errors=True)
+
+    def test_read_write(self):
+        data = np.random.rand(100, 100)
+        for use_zarr_format in (False, True):
+            f = z5py.MemoryFile(use_zarr_format=use_zarr_format)
+            g = f.create_group('group')
+            ds = g.create_dataset('data', data=data, chunks=(32, 32), n_threads=4)
+            g.attrs['a'] = 1
+            self.assertTrue(np.allclose(ds[:], data))
+            self.assertEqual(list(f.keys()), ['group'])
+            self.assertEqual(f['group'].attrs['a'], 1)
+            self.assertGreater(f.nbytes, 0)
+
+    def test_max_bytes(self):
+        f = z5py.MemoryFile(max_bytes=10000)
+        ds = f.create_dataset('data', shape=(100, 100), chunks=(10, 10), dtype='float64')
+        ds[:10, :10] = np.random.rand(10, 10)
+        with self.assertRaises(RuntimeError):
+            ds[:] = np.random.rand(100, 100)
+
+    def test_persist_load(self):
+        data = np.random.rand(100, 100)
+        for ext in ('.n5', '.zarr'):
+            f = z5py.MemoryFile(use_zarr_format=ext == '.zarr')
+            f.create_dataset('data', data=data, chunks=(32, 32))
+            path = os.path.join(self.tmp_dir, 'data' + ext)
+            f.persist(path)
+
+            with z5py.File(path, 'r') as f_disc:
+                self.assertTrue(np.allclose(f_disc['data'][:], data))
+
+            f_loaded = z5py.MemoryFile.load(path)
+            self.assertEqual(f_loaded.nbytes, f.nbytes)
+            self.assertTrue(np.allclose(f_loaded['data'][:], data))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,15 +1,43 @@
+import os
 import unittest
+import numpy as np
 
+import z5py
+from z5py import _z5py
 
+
+# the tests need a s3 compatible server, e.g. a local minio server:
+# Z5_S3_ENDPOINT=http://localhost:9000 Z5_S3_BUCKET=z5-test python -m unittest test_s3
+@unittest.skipUnless(hasattr(_z5py, 'S3Store') and 'Z5_S3_ENDPOINT' in os.environ,
+                     "Needs z5 with s3 support and a s3 server")
 class TestS3(unittest.TestCase):
-    # this is just a dummy test that checks the
-    # handle imports and constructors
-    def test_dummy(self):
-        from z5py import _z5py
-        m = _z5py.FileMode(_z5py.FileMode.a)
-        fhandle = _z5py.S3File(m)
-        ghandle = _z5py.S3Group(fhandle, "test")
-        _z5py.S3DatasetHandle(ghandle, "test")
+    bucket = os.environ.get('Z5_S3_BUCKET', 'z5-test')
+    endpoint = os.environ.get('Z5_S3_ENDPOINT')
+
+    def open_file(self, mode='a'):
+        return z5py.S3File(self.bucket, 'test.n5', mode=mode,
+                           endpoint=self.endpoint, region='us-east-1')
+
+    def setUp(self):
+        self.open_file(mode='w')
+
+    def tearDown(self):
+        self.open_file(mode='w')
+
+    def test_read_write(self):
+        f = self.open_file()
+        g = f.create_group('group')
+        data = np.random.rand(100, 100)
+        ds = g.create_dataset('data', data=data, chunks=(32, 32), n_threads=4)
+        self.assertTrue(np.allclose(ds[:], data))
+        g.attrs['a'] = 1
+
+        f = self.open_file(mode='r')
+        self.assertEqual(list(f.keys()), ['group'])
+        self.assertEqual(f['group'].attrs['a'], 1)
+        self.assertTrue(np.allclose(f['group/data'][10:50, 20:60], data[10:50, 20:60]))
+        with self.assertRaises(ValueError):
+            f.create_group('other')
 
 
 if __name__ == '__main__':
@@ -1,5 +1,9 @@
 import os
+import threading
 import unittest
+from unittest import mock
+from collections import Counter
+from itertools import product
 from shutil import rmtree
 
 import numpy as np
@@ -154,6 +158,74 @@ class TestUtil(unittest.TestCase):
                 sorted(blocking2)
                 self.assertEqual(blocking1, blocking2)
 
+    def test_copy_dataset_sparse(self):
+        from z5py.util import copy_dataset
+        in_path = os.path.join(self.tmp_dir, 'in.n5')
+        out_path = os.path.join(self.tmp_dir, 'out.n5')
+
+        in_file = z5py.File(in_path, use_zarr_format=False)
+        ds_in = in_file.create_dataset('data', dtype='int32',
+                                       shape=self.shape, chunks=self.chunks,
+                                       compression='gzip')
+        # signed data that sums to zero in the written chunk
+        data = np.zeros(self.shape, dtype='int32')
+        data[:5, :10, :10] = -1
+        data[5:10, :10, :10] = 1
+        data[50:60, 50:60, 50:60] = 7
+        # two existing input chunks in the same output chunk
+        data[10:20, 10:20, :10] = 3
+        ds_in[:10, :10, :10] = data[:10, :10, :10]
+        ds_in[50:60, 50:60, 50:60] = data[50:60, 50:60, 50:60]
+        ds_in[10:20, 10:20, :10] = data[10:20, 10:20, :10]
+
+        # each output chunk is written once
+        setitem = z5py.Dataset.__setitem__
+        written = []
+
+        def _count_setitem(ds, index, item):
+            written.append(index)
+            setitem(ds, index, item)
+
+        with mock.patch.object(z5py.Dataset, '__setitem__', _count_setitem):
+            copy_dataset(in_path, out_path, 'data', 'data',
+                         chunks=(20, 20, 20), n_threads=4)
+        self.assertEqual(len(written), 2)
+        ds_out = z5py.File(out_path)['data']
+        self.assertTrue(np.array_equal(ds_out[:], data))
+        # only the output chunks covering existing input chunks were written
+        n_chunks = sum(ds_out.chunk_exists(chunk_id)
+                       for chunk_id in np.ndindex(*ds_out.chunks_per_dimension))
+        self.assertEqual(n_chunks, 2)
+
+    def test_copy_group(self):
+        from z5py.util import copy_group
+        in_path = os.path.join(self.tmp_dir, 'in.n5')
+        out_path = os.path.join(self.tmp_dir, 'out.n5')
+
+        in_file = z5py.File(in_path, use_zarr_format=False)
+        g = in_file.create_group('g')
+        g.attrs['a'] = 1
+        sub = g.create_group('sub')
+        sub.attrs['b'] = [1, 2]
+
+        data = {}
+        for key in ('g/x', 'g/y', 'g/sub/z'):
+            vals = np.random.rand(*self.shape)
+            ds = in_file.create_dataset(key, data=vals, chunks=self.chunks)
+            ds.attrs['name'] = key.split('/')[-1]
+            data[key] = vals
+
+        copy_group(in_path, out_path, 'g', 'g', n_threads=4)
+
+        out_file = z5py.File(out_path)
+        self.assertEqual(out_file['g'].attrs['a'], 1)
+        self.assertEqual(out_file['g/sub'].attrs['b'], [1, 2])
+        for key, vals in data.items():
+            ds_out = out_file[key]
+            self.assertEqual(ds_out.chunks, self.chunks)
+            self.assertEqual(ds_out.attrs['name'], key.split('/')[-1])
+            self.assertTrue(np.allclose(ds_out[:], vals))
+
     def test_remove_trivial_chunks(self):
         from z5py.util import remove_trivial_chunks
         path = './tmp_dir/data.n5'
@@ -187,6 +259,17 @@ class TestUtil(unittest.TestCase):
         self.assertTrue(np.allclose(c[50:60, 50:60],
                                     np.arange(100).reshape(chunks)))
 
+        ds[:] = a
+        trivial = remove_trivial_chunks(ds, n_threads=4, dry_run=True)
+        # chunks that only contain the fill value are not written in the first place
+        self.assertEqual(trivial, [(1, 1), (2, 2)])
+        self.assertTrue(np.allclose(ds[:], a))
+
+        trivial = remove_trivial_chunks(ds, n_threads=4, remove_specific_value=2,
+                                        max_compressed_size=1024)
+        self.assertEqual(trivial, [(2, 2)])
+        self.assertTrue(np.allclose(ds[20:30, 20:30], 0))
+
     def test_unique(self):
         from z5py.util import unique
         path = './tmp_dir/data.n5'
@@ -207,6 +290,242 @@ class TestUtil(unittest.TestCase):
         self.assertTrue(np.allclose(uniques, exp_uniques))
         self.assertTrue(np.allclose(counts, exp_counts))
 
+        uniques = unique(ds, n_threads=4, ignore_fill_value=True)
+        self.assertTrue(np.allclose(uniques, exp_uniques[exp_uniques != 0]))
+
+        # small integer types are counted with a dense histogram
+        ds = f.create_dataset('data_uint8', dtype='uint8',
+                              shape=shape, chunks=chunks)
+        data = data.astype('uint8')
+        ds[:] = data
+        uniques, counts = unique(ds, n_threads=4, return_counts=True)
+        self.assertTrue(np.allclose(uniques, exp_uniques))
+        self.assertTrue(np.allclose(counts, exp_counts))
+
+    def test_label_statistics(self):
+        from z5py.util import label_statistics
+        path = './tmp_dir/data.n5'
+        f = z5py.File(path)
+        shape = (50, 60, 70)
+        chunks = (16, 16, 16)
+
+        ds = f.create_dataset('data', dtype='uint64',
+                              shape=shape, chunks=chunks)
+        data = np.random.randint(0, 50, size=shape).astype('uint64')
+        data[:20, :20, :20] = 100
+        ds[:] = data
+
+        labels, counts, bb_begin, bb_end, centroids = label_statistics(ds, n_threads=4,
+                                                                       compute_centroids=True)
+        exp_labels, exp_counts = np.unique(data, return_counts=True)
+        self.assertTrue(np.array_equal(labels, exp_labels))
+        self.assertTrue(np.array_equal(counts, exp_counts))
+        self.assertEqual(bb_begin.shape, (len(labels), 3))
+        for label_id in (0, len(labels) - 1):
+            coords = np.where(data == labels[label_id])
+            self.assertEqual(bb_begin[label_id].tolist(), [c.min() for c in coords])
+            self.assertEqual(bb_end[label_id].tolist(), [c.max() + 1 for c in coords])
+            self.assertTrue(np.allclose(centroids[label_id], [c.mean() for c in coords]))
+
+        labels, _, _, _ = label_statistics(ds, n_threads=4, ignore_fill_value=True)
+        self.assertTrue(np.array_equal(labels, exp_labels[1:]))
+
+    def test_apply_mapping(self):
+        from z5py.util import apply_mapping
+        path = './tmp_dir/data.n5'
+        f = z5py.File(path)
+        shape = (100, 100)
+        chunks = (10, 10)
+
+        ds = f.create_dataset('data', dtype='uint64',
+                              shape=shape, chunks=chunks)
+        data = np.random.randint(1, 50, size=shape).astype('uint64')
+        data[:10, :10] = 0
+        ds[:] = data
+
+        keys = np.arange(1, 40, dtype='uint64')
+        values = np.random.randint(100, 200, size=keys.size).astype('uint64')
+        lut = np.arange(50, dtype='uint64')
+        lut[keys] = values
+        expected = lut[data]
+
+        ds_out = f.create_dataset('out', dtype='uint64',
+                                  shape=shape, chunks=chunks)
+        apply_mapping(ds, keys, values, out=ds_out, n_threads=4)
+        self.assertTrue(np.array_equal(ds_out[:], expected))
+        self.assertFalse(ds_out.chunk_exists((0, 0)))
+
+        apply_mapping(ds, keys, values, n_threads=4)
+        self.assertTrue(np.array_equal(ds[:], expected))
+
+        with self.assertRaises(ValueError):
+            apply_mapping(ds, keys, values[:-1])
+
+        # duplicate keys and keys that are out of range of the dtype
+        ds_small = f.create_dataset('small', data=data.astype('uint8'), chunks=chunks)
+        for dataset in (ds, ds_small):
+            with self.assertRaises(RuntimeError):
+                apply_mapping(dataset, [1, 1], [2, 3])
+        with self.assertRaises(ValueError):
+            apply_mapping(ds_small, [300], [1])
+        with self.assertRaises(ValueError):
+            apply_mapping(ds_small, [1], [-1])
+
+    def test_map_blocks(self):
+        from z5py.util import map_blocks
+        path = './tmp_dir/data.n5'
+        f = z5py.File(path)
+        shape = (64, 64, 64)
+        chunks = (16, 16, 16)
+
+        ds = f.create_dataset('data', dtype='float32',
+                              shape=shape, chunks=chunks)
+        data = np.random.rand(*shape).astype('float32')
+        ds[:] = data
+        ds_out = f.create_dataset('out', dtype='float32',
+                                  shape=shape, chunks=chunks)
+
+        # a 3x3x3 box filter needs a halo of 1
+        def box_filter(x):
+            padded = np.pad(x, 1, mode='edge')
+            res = np.zeros_like(x)
+            for offset in product(range(3), repeat=3):
+                res += padded[tuple(slice(off, off + sh) for off, sh in zip(offset, x.shape))]
+            return res / 27
+
+        map_blocks(box_filter, ds, ds_out, block_shape=(32, 32, 32),
+                   halo=(1, 1, 1), n_threads=4, cache_size=8)
+        self.assertTrue(np.allclose(ds_out[:], box_filter(data), atol=1e-5))
+
+        with self.assertRaises(ValueError):
+            map_blocks(box_filter, ds, ds_out, block_shape=(20, 20, 20),
+                       halo=(1, 1, 1), n_threads=4)
+
+    def test_map_blocks_chunk_reads(self):
+        from z5py.util import map_blocks
+        path = './tmp_dir/data.n5'
+        f = z5py.File(path)
+        shape = (128, 128, 128)
+        chunks = (16, 16, 16)
+
+        data = np.random.rand(*shape).astype('float32')
+        ds = f.create_dataset('data', data=data, chunks=chunks)
+        ds_out = f.create_dataset('out', dtype='float32',
+                                  shape=shape, chunks=chunks)
+
+        # count how often each chunk of the input is read
+        class CountingDataset(object):
+            def __init__(self, ds):
+                self.shape, self.chunks, self.dtype = ds.shape, ds.chunks, ds.dtype
+                self.ds = ds
+                self.reads = Counter()
+                self.lock = threading.Lock()
+
+            def __getitem__(self, bb):
+                with self.lock:
+                    self.reads[tuple(b.start for b in bb)] += 1
+                return self.ds[bb]
+
+        # with the default cache size, each chunk is only read once
+        n_chunks = int(np.prod([sh // ch for sh, ch in zip(shape, chunks)]))
+        for n_threads in (1, 4):
+            counting_ds = CountingDataset(ds)
+            map_blocks(lambda x: x, counting_ds, ds_out, block_shape=(32, 32, 32),
+                       halo=(4, 4, 4), n_threads=n_threads)
+            self.assertEqual(len(counting_ds.reads), n_chunks)
+            self.assertEqual(max(counting_ds.reads.values()), 1)
+            self.assertTrue(np.array_equal(ds_out[:], data))
+
+    def test_statistics_and_histogram(self):
+        from z5py.util import statistics, histogram
+        path = './tmp_dir/data.zr'
+        f = z5py.File(path, use_zarr_format=True)
+        shape = (100, 100)
+        chunks = (10, 10)
+
+        ds = f.create_dataset('data', dtype='int16', shape=shape, chunks=chunks,
+                              fillvalue=3)
+        data = np.full(shape, 3, dtype='int16')
+        data[:35, 20:65] = np.random.randint(-100, 100, size=(35, 45))
+        ds[:35, 20:65] = data[:35, 20:65]
+
+        for roi in (None, np.s_[5:73, 13:67]):
+            expected = data if roi is None else data[roi]
+            stats = statistics(ds, n_threads=4, roi=roi)
+            self.assertEqual(stats['min'], expected.min())
+            self.assertEqual(stats['max'], expected.max())
+            self.assertEqual(stats['sum'], expected.sum())
+            self.assertAlmostEqual(stats['mean'], expected.mean())
+
+            counts, edges = histogram(ds, 16, n_threads=4, roi=roi)
+            exp_counts, exp_edges = np.histogram(expected, bins=16)
+            self.assertTrue(np.array_equal(counts, exp_counts))
+            self.assertTrue(np.allclose(edges, exp_edges))
+
+        # NaN values are ignored by the histogram
+        data = np.random.rand(*shape).astype('float32')
+        data[::3] = np.nan
+        ds = f.create_dataset('data_nan', data=data, chunks=chunks)
+        counts, _ = histogram(ds, 8, n_threads=4, value_range=(0, 1))
+        exp_counts, _ = np.histogram(data[~np.isnan(data)], bins=8, range=(0, 1))
+        self.assertTrue(np.array_equal(counts, exp_counts))
+
+        # and by the minimum and maximum, also if a chunk starts with NaN
+        stats = statistics(ds, n_threads=4)
+        self.assertEqual(stats['min'], np.nanmin(data))
+        self.assertEqual(stats['max'], np.nanmax(data))
+        self.assertTrue(np.isnan(stats['sum']))
+        counts, edges = histogram(ds, 8, n_threads=4)
+        exp_counts, exp_edges = np.histogram(data[~np.isnan(data)], bins=8)
+        self.assertTrue(np.array_equal(counts, exp_counts))
+        self.assertTrue(np.allclose(edges, exp_edges))
+        # only NaN values
+        stats = statistics(ds, n_threads=4, roi=np.s_[3:4, :])
+        self.assertTrue(np.isnan(stats['min']))
+        self.assertTrue(np.isnan(stats['max']))
+
+    def test_downscale(self):
+        from z5py.util import downscale
+        path = './tmp_dir/data.n5'
+        f = z5py.File(path)
+        shape = (64, 64, 64)
+        chunks = (16, 16, 16)
+
+        data = np.random.randint(0, 10, size=shape).astype('uint32')
+        ds = f.create_dataset('data', data=data, chunks=chunks)
+
+        for method in ('mean', 'mode'):
+            g = f.create_group(method)
+            levels = downscale(ds, [2, np.int64(2), (1, 2, 2)], method, g, n_threads=4, source_path='../data')
+            self.assertEqual([lev.shape for lev in levels], [(32, 32, 32), (16, 16, 16), (16, 8, 8)])
+
+            # check the first level against numpy
+            blocks = data.reshape(32, 2, 32, 2, 32, 2).transpose(0, 2, 4, 1, 3, 5).reshape(32, 32, 32, 8)
+            if method == 'mean':
+                # std::round rounds half away from zero
+                expected = np.floor(blocks.mean(axis=-1) + 0.5).astype('uint32')
+            else:
+                expected = np.array([np.bincount(block).argmax() for block in blocks.reshape(-1, 8)],
+                                    dtype='uint32').reshape(32, 32, 32)
+            self.assertTrue(np.array_equal(levels[0][:], expected))
+
+            multiscales = g.attrs['multiscales'][0]
+            self.assertEqual([dd['path'] for dd in multiscales['datasets']], ['../data', 's1', 's2', 's3'])
+            self.assertEqual(multiscales['datasets'][-1]['coordinateTransformations'][0]['scale'],
+                             [4., 8., 8.])
+            self.assertEqual(multiscales['axes'], [{'name': 'z', 'type': 'space'},
+                                                   {'name': 'y', 'type': 'space'},
+                                                   {'name': 'x', 'type': 'space'}])
+
+        g = f.create_group('custom_axes')
+        downscale(ds, [2], 'mean', g, n_threads=4, axes=['c', 'y', 'x'])
+        self.assertEqual([axis['name'] for axis in g.attrs['multiscales'][0]['axes']], ['c', 'y', 'x'])
+
+        # the chunks of the levels must be aligned with the chunks of the level before
+        g = f.create_group('unaligned')
+        with self.assertRaises(RuntimeError):
+            downscale(ds, [2], 'mean', g, n_threads=4, chunks=(12, 12, 12))
+
     def test_remove_dataset(self):
         from z5py.util import remove_dataset
         path = './tmp_dir/data.n5'
@@ -219,6 +538,29 @@ class TestUtil(unittest.TestCase):
         remove_dataset(ds, 4)
         self.assertFalse(os.path.exists(os.path.join(path, 'data')))
 
+    def test_set_dimension_separator(self):
+        from z5py.util import set_dimension_separator
+        path = os.path.join(self.tmp_dir, 'data.zarr')
+        f = z5py.File(path, use_zarr_format=True)
+        data = np.random.rand(100, 100)
+        ds = f.create_dataset('data', data=data, chunks=(10, 10),
+                              compression='raw', dimension_separator='/')
+        self.assertEqual(ds.dimension_separator, '/')
+        self.assertTrue(os.path.exists(os.path.join(path, 'data', '1', '2')))
+
+        # move the chunks to the flat layout and back
+        for sep in ('.', '/'):
+            set_dimension_separator(ds, sep, n_threads=4)
+            self.assertEqual(ds.dimension_separator, sep)
+            self.assertEqual(os.path.exists(os.path.join(path, 'data', '1.2')), sep == '.')
+            self.assertEqual(os.path.isdir(os.path.join(path, 'data', '1')), sep == '/')
+            self.assertTrue(np.allclose(ds[:], data))
+            self.assertTrue(np.allclose(z5py.File(path)['data'][:], data))
+
+        with self.assertRaises(ValueError):
+            z5py.File(os.path.join(self.tmp_dir, 'data.n5')).create_dataset('data', shape=(10, 10), dtype='int8',
+                                                                            dimension_separator='/')
+
 
 if __name__ == '__main__':
     unittest.main()
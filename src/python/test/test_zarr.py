@@ -128,6 +128,116 @@ class TestZarr(unittest.TestCase):
             self.assertTrue(k in attrs)
             self.assertEqual(attrs[k], v)
 
+    def test_filters(self):
+        f = z5py.File(self.path, use_zarr_format=True)
+        data = np.random.randint(0, 100, size=self.shape).astype('int32')
+        filters = [{'id': 'delta'}, {'id': 'shuffle'}]
+        ds = f.create_dataset('int', data=data, chunks=self.chunks, filters=filters)
+        self.assertEqual(ds.filters, [{'id': 'delta'}, {'id': 'shuffle', 'elementsize': 4}])
+        self.assertTrue(np.array_equal(z5py.File(self.path)['int'][:], data))
+
+        data = np.random.rand(*self.shape)
+        ds = f.create_dataset('float', data=data, chunks=self.chunks,
+                              filters=[{'id': 'quantize', 'digits': 3, 'dtype': '<f8'}])
+        self.assertTrue(np.allclose(ds[:], data, atol=1e-3))
+
+        with self.assertRaises(ValueError):
+            f.create_dataset('astype', shape=self.shape, dtype='float64',
+                             filters=[{'id': 'quantize', 'digits': 3, 'astype': '<f4'}])
+        with self.assertRaises(ValueError):
+            f.create_dataset('unknown', shape=self.shape, dtype='float64', filters=[{'id': 'categorize'}])
+
+    @unittest.skipUnless(zarr, 'Requires zarr package')
+    def test_filters_zarr(self):
+        data = np.random.rand(*self.shape)
+        filters = [numcodecs.Quantize(digits=3, dtype='<f8'), numcodecs.Delta(dtype='<f8'),
+                   numcodecs.Shuffle(elementsize=8)]
+        fz = zarr.open(self.path)
+        fz.create_dataset('zarr', data=data, chunks=self.chunks, filters=filters)
+        f = z5py.File(self.path)
+        self.assertTrue(np.allclose(f['zarr'][:], fz['zarr'][:]))
+
+        f.create_dataset('z5', data=data, chunks=self.chunks, filters=filters)
+        self.assertTrue(np.allclose(zarr.open(self.path)['z5'][:], fz['zarr'][:]))
+
+    def test_registered_codec(self):
+        import json
+        import zlib
+
+        class ZlibCodec:
+            # minimal codec that is not built into z5
+            def __init__(self, level=1):
+                self.level = level
+
+            def encode(self, buf):
+                return zlib.compress(bytes(memoryview(buf)), self.level)
+
+            def decode(self, buf):
+                return zlib.decompress(buf)
+
+            def get_config(self):
+                return {'id': 'pyzlib', 'level': self.level}
+
+        f = z5py.File(self.path, use_zarr_format=True)
+        with self.assertRaises(ValueError):
+            f.create_dataset('data', shape=self.shape, dtype='int32', compression='pyzlib')
+
+        def factory(config):
+            config = dict(config)
+            config.pop('id')
+            return ZlibCodec(**config)
+
+        z5py.codecs.register_codec('pyzlib', factory)
+        self.addCleanup(z5py.codecs.unregister_codec, 'pyzlib')
+        self.assertIn('pyzlib', z5py.codecs.registered_codecs())
+
+        # irregular shape to also write the chunks at the border
+        shape = (95, 103)
+        data = np.random.randint(0, 100, size=shape).astype('int32')
+        ds = f.create_dataset('data', data=data, chunks=self.chunks, compression='pyzlib', level=5)
+        self.assertEqual(ds.compression, 'pyzlib')
+        with open(os.path.join(self.path, 'data', '.zarray')) as fz:
+            self.assertEqual(json.load(fz)['compressor'], {'id': 'pyzlib', 'level': 5})
+
+        ds = z5py.File(self.path)['data']
+        self.assertTrue(np.array_equal(ds[:], data))
+        self.assertTrue(np.array_equal(ds[10:35, 17:90], data[10:35, 17:90]))
+        self.assertTrue(np.array_equal(ds.read_subarray((10, 17), (35, 90)), data[10:35, 17:90]))
+        # chunks are also de- and encoded by the c++ io
+        self.assertTrue(np.array_equal(ds.read_chunk((1, 2)), data[20:40, 40:60]))
+
+        # partial writes keep the rest of the chunks
+        ds[5:15, 5:15] = 42
+        data[5:15, 5:15] = 42
+        self.assertTrue(np.array_equal(ds[:], data))
+        ds.write_subarray((50, 60), np.full((10, 10), 7, dtype='int32'))
+        data[50:60, 60:70] = 7
+        self.assertTrue(np.array_equal(ds[:], data))
+
+        # missing chunks are read as fill value
+        empty = f.create_dataset('empty', shape=shape, dtype='int32', chunks=self.chunks,
+                                 compression='pyzlib')
+        self.assertTrue((empty[:] == 0).all())
+
+        # datasets with an unregistered codec can't be opened
+        z5py.codecs.unregister_codec('pyzlib')
+        self.assertFalse([config for config in z5py.codecs._CODECS if 'pyzlib' in config])
+        with self.assertRaises(RuntimeError):
+            z5py.File(self.path)['data'][:]
+
+    @unittest.skipUnless(zarr, 'Requires zarr package')
+    def test_registered_codec_numcodecs(self):
+        data = np.random.rand(*self.shape)
+        fz = zarr.open(self.path)
+        fz.create_dataset('zarr', data=data, chunks=self.chunks, compressor=numcodecs.LZMA())
+        z5py.codecs.register_codec('lzma')
+        self.addCleanup(z5py.codecs.unregister_codec, 'lzma')
+        f = z5py.File(self.path)
+        self.assertTrue(np.allclose(f['zarr'][:], data))
+
+        f.create_dataset('z5', data=data, chunks=self.chunks, compression='lzma')
+        self.assertTrue(np.allclose(zarr.open(self.path)['z5'][:], data))
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,46 @@
+import os
+import unittest
+from shutil import rmtree
+
+import numpy as np
+import z5py
+
+
+class TestZip(unittest.TestCase):
+    tmp_dir = './tmp_zip'
+
+    def setUp(self):
+        os.makedirs(self.tmp_dir, exist_ok=True)
+
+    def tearDown(self):
+        rmtree(self.tmp_dir, ignore_errors=True)
+
+    def test_pack_unpack(self):
+        data = np.random.rand(100, 100)
+        for ext in ('.n5', '.zarr'):
+            path = os.path.join(self.tmp_dir, 'data' + ext)
+            with z5py.File(path, 'w') as f:
+                g = f.create_group('group')
+                g.create_dataset('data', data=data, chunks=(10, 10))
+                g.attrs['a'] = 1
+
+            zip_path = path + '.zip'
+            z5py.util.pack(z5py.File(path, 'r'), zip_path, n_threads=4)
+            f = z5py.ZipFile(zip_path)
+            self.assertEqual(list(f.keys()), ['group'])
+            self.assertEqual(f['group'].attrs['a'], 1)
+            ds = f['group/data']
+            self.assertEqual(ds.is_zarr, ext == '.zarr')
+            ds.n_threads = 4
+            self.assertTrue(np.allclose(ds[:], data))
+            with self.assertRaises(ValueError):
+                f.create_group('other')
+
+            out_path = os.path.join(self.tmp_dir, 'unpacked' + ext)
+            z5py.util.unpack(zip_path, out_path, n_threads=4)
+            with z5py.File(out_path, 'r') as f:
+                self.assertTrue(np.allclose(f['group/data'][:], data))
+
+
+if __name__ == '__main__':
+    unittest.main()
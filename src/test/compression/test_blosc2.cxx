@@ -0,0 +1,100 @@
+#include "gtest/gtest.h"
+
+#include <random>
+
+#include "z5/compression/blosc2_compressor.hxx"
+#include "z5/util/threadpool.hxx"
+#include "z5/metadata.hxx"
+
+#include "test_helper.hxx"
+
+
+namespace z5 {
+namespace compression {
+
+
+    TEST_F(CompressionTest, Blosc2CompressDecompressInt) {
+
+        DatasetMetadata metadata;
+        metadata.compressor = types::blosc2;
+        metadata.compressionOptions["codec"] = std::string("zstd");
+        metadata.compressionOptions["level"] = 5;
+        metadata.compressionOptions["filters"] = std::string("shuffle");
+        metadata.compressionOptions["typesize"] = 0;
+        metadata.compressionOptions["nthreads"] = 1;
+        Blosc2Compressor<int> compressor(metadata);
+
+        types::CompressionOptions opts;
+        compressor.getOptions(opts);
+        ASSERT_EQ(boost::get<int>(opts["typesize"]), sizeof(int));
+
+        std::vector<char> dataOut;
+        compressor.compress(dataInt_, dataOut, SIZE);
+        ASSERT_TRUE(dataOut.size() / sizeof(int) < SIZE);
+
+        int dataTmp[SIZE];
+        compressor.decompress(dataOut, dataTmp, SIZE);
+        for(std::size_t i = 0; i < SIZE; ++i) {
+            ASSERT_EQ(dataTmp[i], dataInt_[i]);
+        }
+
+        // chunks that don't decompress to the chunk size are rejected
+        compressor.compress(dataInt_, dataOut, SIZE / 2);
+        ASSERT_THROW(compressor.decompress(dataOut, dataTmp, SIZE), std::runtime_error);
+    }
+
+
+    TEST_F(CompressionTest, Blosc2FilterPipeline) {
+
+        // float data with bytedelta after shuffle and internal threads
+        DatasetMetadata metadata;
+        metadata.compressor = types::blosc2;
+        metadata.compressionOptions["codec"] = std::string("lz4");
+        metadata.compressionOptions["level"] = 5;
+        metadata.compressionOptions["filters"] = std::string("shuffle,bytedelta");
+        metadata.compressionOptions["typesize"] = 4;
+        metadata.compressionOptions["nthreads"] = 2;
+        Blosc2Compressor<float> compressor(metadata);
+
+        std::vector<char> dataOut;
+        compressor.compress(dataFloat_, dataOut, SIZE);
+        ASSERT_TRUE(dataOut.size() / sizeof(float) < SIZE);
+
+        // the chunks are decompressed from several threads, each with its own context
+        util::parallel_foreach(4, 8, [&](const int tid, const std::size_t i){
+            std::vector<float> dataTmp(SIZE);
+            compressor.decompress(dataOut, &dataTmp[0], SIZE);
+            for(std::size_t j = 0; j < SIZE; ++j) {
+                ASSERT_EQ(dataTmp[j], dataFloat_[j]);
+            }
+        });
+
+        metadata.compressionOptions["filters"] = std::string("shuffle,unknown");
+        ASSERT_THROW(Blosc2Compressor<float> invalidFilter(metadata), std::runtime_error);
+        metadata.compressionOptions["filters"] = std::string("");
+        metadata.compressionOptions["codec"] = std::string("unknown");
+        ASSERT_THROW(Blosc2Compressor<float> invalidCodec(metadata), std::runtime_error);
+    }
+
+
+    TEST_F(CompressionTest, Blosc2Metadata) {
+        auto j = "{\"chunks\": [10], \"compressor\": {\"id\": \"blosc2\", \"cname\": \"zstd\", \"clevel\": 3, \"filters\": [\"bitshuffle\", \"bytedelta\"], \"typesize\": 4, \"nthreads\": 2}, \"dtype\": \"<f4\", \"fill_value\": 0, \"order\": \"C\", \"shape\": [100], \"zarr_format\": 2, \"filters\": null}"_json;
+        DatasetMetadata metadata;
+        metadata.fromJson(j, true);
+        ASSERT_EQ(metadata.compressor, types::blosc2);
+        ASSERT_EQ(boost::get<std::string>(metadata.compressionOptions["filters"]), "bitshuffle,bytedelta");
+
+        nlohmann::json jOut;
+        metadata.toJson(jOut);
+        ASSERT_EQ(jOut["compressor"], j["compressor"]);
+
+        // the typesize defaults to the size of the datatype
+        DatasetMetadata created;
+        createDatasetMetadata("float64", types::ShapeType({100}), types::ShapeType({10}), true,
+                              "blosc2", types::CompressionOptions(), 0, created);
+        ASSERT_EQ(boost::get<int>(created.compressionOptions["typesize"]), 8);
+        ASSERT_EQ(boost::get<std::string>(created.compressionOptions["codec"]), "zstd");
+    }
+
+}
+}
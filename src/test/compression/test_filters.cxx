@@ -0,0 +1,128 @@
+#include "gtest/gtest.h"
+
+#include <random>
+
+#include "z5/compression/filters.hxx"
+#include "z5/metadata.hxx"
+
+#include "test_helper.hxx"
+
+
+namespace z5 {
+namespace compression {
+
+
+    TEST_F(CompressionTest, DeltaFilter) {
+        DeltaFilter<int> filter;
+        std::vector<int> encoded(SIZE);
+        filter.encode(dataInt_, &encoded[0], SIZE);
+        ASSERT_EQ(encoded[0], dataInt_[0]);
+        ASSERT_EQ(encoded[1], dataInt_[1] - dataInt_[0]);
+
+        filter.decode(&encoded[0], SIZE);
+        for(std::size_t i = 0; i < SIZE; ++i) {
+            ASSERT_EQ(encoded[i], dataInt_[i]);
+        }
+
+        // unsigned values wrap around
+        const std::vector<uint8_t> data({3, 1, 255, 0});
+        std::vector<uint8_t> out(data.size());
+        DeltaFilter<uint8_t> uFilter;
+        uFilter.encode(&data[0], &out[0], data.size());
+        ASSERT_EQ(out, std::vector<uint8_t>({3, 254, 254, 1}));
+        uFilter.decode(&out[0], out.size());
+        ASSERT_EQ(out, data);
+
+        // signed values wrap around as well
+        const std::vector<int64_t> sData({std::numeric_limits<int64_t>::max(), std::numeric_limits<int64_t>::min(),
+                                          std::numeric_limits<int64_t>::max(), -1});
+        std::vector<int64_t> sOut(sData.size());
+        DeltaFilter<int64_t> sFilter;
+        sFilter.encode(&sData[0], &sOut[0], sData.size());
+        ASSERT_EQ(sOut, std::vector<int64_t>({std::numeric_limits<int64_t>::max(), 1, -1,
+                                              std::numeric_limits<int64_t>::min()}));
+        sFilter.decode(&sOut[0], sOut.size());
+        ASSERT_EQ(sOut, sData);
+    }
+
+
+    TEST_F(CompressionTest, ShuffleFilter) {
+        types::CompressionOptions opts;
+        opts["elementsize"] = 4;
+        ShuffleFilter<int> filter(opts);
+        const std::vector<int> data({1, 2, 256});
+        std::vector<int> encoded(data.size());
+        filter.encode(&data[0], &encoded[0], data.size());
+        const char * bytes = reinterpret_cast<const char *>(&encoded[0]);
+        // the least significant bytes of all elements come first (little endian)
+        ASSERT_EQ(std::vector<char>(bytes, bytes + 6), std::vector<char>({1, 2, 0, 0, 0, 1}));
+
+        std::vector<int> out(SIZE);
+        filter.encode(dataInt_, &out[0], SIZE);
+        filter.decode(&out[0], SIZE);
+        for(std::size_t i = 0; i < SIZE; ++i) {
+            ASSERT_EQ(out[i], dataInt_[i]);
+        }
+
+        // trailing bytes that don't fill an element are kept
+        opts["elementsize"] = 3;
+        ShuffleFilter<float> floatFilter(opts);
+        std::vector<float> floatOut(SIZE);
+        floatFilter.encode(dataFloat_, &floatOut[0], SIZE);
+        floatFilter.decode(&floatOut[0], SIZE);
+        for(std::size_t i = 0; i < SIZE; ++i) {
+            ASSERT_EQ(floatOut[i], dataFloat_[i]);
+        }
+    }
+
+
+    TEST_F(CompressionTest, QuantizeFilter) {
+        types::CompressionOptions opts;
+        opts["digits"] = 2;
+        QuantizeFilter<float> filter(opts);
+        std::vector<float> encoded(SIZE);
+        filter.encode(dataFloat_, &encoded[0], SIZE);
+        for(std::size_t i = 0; i < SIZE; ++i) {
+            ASSERT_NEAR(encoded[i], dataFloat_[i], 0.01);
+            // the values are multiples of 2^-7
+            ASSERT_EQ(encoded[i] * 128, std::floor(encoded[i] * 128));
+        }
+        // decoding keeps the quantized values
+        std::vector<float> decoded(encoded);
+        filter.decode(&decoded[0], SIZE);
+        ASSERT_EQ(decoded, encoded);
+
+        ASSERT_THROW(QuantizeFilter<int> intFilter(opts), std::runtime_error);
+    }
+
+
+    TEST_F(CompressionTest, FilterMetadata) {
+        auto j = "{\"chunks\": [10], \"compressor\": null, \"dtype\": \"<f4\", \"fill_value\": 0, \"order\": \"C\", \"shape\": [100], \"zarr_format\": 2, \"filters\": [{\"id\": \"delta\", \"dtype\": \"<f4\"}, {\"id\": \"shuffle\", \"elementsize\": 4}, {\"id\": \"quantize\", \"digits\": 3, \"dtype\": \"<f4\", \"astype\": \"<f4\"}]}"_json;
+        DatasetMetadata metadata;
+        metadata.fromJson(j, true);
+        ASSERT_EQ(metadata.filters.size(), 3);
+        ASSERT_EQ(metadata.filters[0].first, types::delta);
+        ASSERT_EQ(metadata.filters[1].first, types::shuffle);
+        ASSERT_EQ(boost::get<int>(metadata.filters[1].second.at("elementsize")), 4);
+        ASSERT_EQ(metadata.filters[2].first, types::quantize);
+        ASSERT_EQ(boost::get<int>(metadata.filters[2].second.at("digits")), 3);
+
+        nlohmann::json jOut;
+        metadata.toJson(jOut);
+        ASSERT_EQ(jOut["filters"][1], nlohmann::json({{"id", "shuffle"}, {"elementsize", 4}}));
+        DatasetMetadata metadataOut;
+        metadataOut.fromJson(jOut, true);
+        ASSERT_EQ(metadataOut.filters, metadata.filters);
+
+        // filters that change the dtype and unknown filters are not supported
+        j["filters"] = "[{\"id\": \"delta\", \"dtype\": \"<f4\", \"astype\": \"<f8\"}]"_json;
+        ASSERT_THROW(metadata.fromJson(j, true), std::runtime_error);
+        j["filters"] = "[{\"id\": \"categorize\"}]"_json;
+        ASSERT_THROW(metadata.fromJson(j, true), std::runtime_error);
+        j["filters"] = nullptr;
+        metadata.fromJson(j, true);
+        ASSERT_TRUE(metadata.filters.empty());
+    }
+
+}
+}
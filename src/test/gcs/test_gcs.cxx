@@ -0,0 +1,132 @@
+#include <cstdlib>
+#include <numeric>
+#include "gtest/gtest.h"
+
+#include "z5/factory.hxx"
+#include "z5/attributes.hxx"
+#include "z5/gcs/store.hxx"
+#include "z5/util/for_each.hxx"
+
+
+namespace z5 {
+
+    // the tests run against the fake-gcs-server emulator given by Z5_GCS_ENDPOINT,
+    // so no google cloud account is needed
+    class GcsTest : public ::testing::Test {
+
+    protected:
+        GcsTest() : shape_({100, 100}), chunks_({32, 32}) {
+            const char * endpoint = std::getenv("Z5_GCS_ENDPOINT");
+            const char * bucket = std::getenv("Z5_GCS_BUCKET");
+            options_.endpoint = endpoint ? endpoint : "http://localhost:4443";
+            options_.project = "z5-test";
+            options_.anonymous = true;
+            bucket_ = bucket ? bucket : "z5-test";
+        }
+
+        void SetUp() {
+            // create the bucket, this fails if it exists already, which we can ignore
+            auto client = gcs::store_detail::clientFromPool(options_);
+            client->CreateBucketForProject(bucket_, options_.project, gcs::gcs_sdk::BucketMetadata());
+
+            store_ = std::make_shared<gcs::Store>(bucket_, "test.zarr", options_);
+            kv::handle::File file(store_);
+            if(file.exists()) {
+                file.remove();
+            }
+            createFile(file, true);
+        }
+
+        void TearDown() {
+            kv::handle::File file(store_);
+            file.remove();
+        }
+
+        gcs::Options options_;
+        std::string bucket_;
+        std::shared_ptr<gcs::Store> store_;
+        types::ShapeType shape_;
+        types::ShapeType chunks_;
+    };
+
+
+    TEST_F(GcsTest, Hierarchy) {
+        kv::handle::File file(store_);
+        ASSERT_TRUE(file.exists());
+        ASSERT_TRUE(file.isGcs());
+        ASSERT_FALSE(file.isS3());
+        ASSERT_TRUE(file.isZarr());
+
+        createGroup(file, "group");
+        kv::handle::Group group(file, "group");
+        createGroup(group, "sub");
+        auto ds = createDataset(group, "data", "float32", shape_, chunks_);
+
+        std::vector<std::string> keys;
+        group.keys(keys);
+        std::sort(keys.begin(), keys.end());
+        ASSERT_EQ(keys, std::vector<std::string>({"data", "sub"}));
+        ASSERT_TRUE(isSubGroup(group, "sub"));
+        ASSERT_FALSE(isSubGroup(group, "data"));
+
+        std::vector<HierarchyEntry> entries;
+        listHierarchy(file, entries);
+        ASSERT_EQ(entries.size(), 3);
+        ASSERT_EQ(entries[1].path, "group/data");
+        ASSERT_EQ(entries[1].shape, shape_);
+
+        nlohmann::json attrs = {{"a", 1}};
+        writeAttributes(group, attrs);
+        nlohmann::json j;
+        readAttributes(group, j);
+        ASSERT_EQ(j, attrs);
+
+        group.remove();
+        ASSERT_FALSE(file.in("group"));
+    }
+
+
+    TEST_F(GcsTest, ReadWriteParallel) {
+        kv::handle::File file(store_);
+        auto ds = createDataset(file, "data", "int32", shape_, chunks_, "zlib");
+
+        // write and read all chunks concurrently
+        util::parallel_for_each_chunk(*ds, 8, [](const int tid, const Dataset & ds,
+                                                 const types::ShapeType & chunkId){
+            std::vector<int> data(ds.defaultChunkSize(), ds.chunking().blockCoordinatesToBlockId(chunkId) + 1);
+            ds.writeChunk(chunkId, &data[0]);
+        });
+
+        auto dsRead = openDataset(file, "data");
+        util::parallel_for_each_chunk(*dsRead, 8, [](const int tid, const Dataset & ds,
+                                                     const types::ShapeType & chunkId){
+            std::vector<int> data(ds.defaultChunkSize());
+            bool isVarlen;
+            ASSERT_TRUE(ds.readChunkIfExists(chunkId, &data[0], isVarlen));
+            for(const int val : data) {
+                ASSERT_EQ(val, ds.chunking().blockCoordinatesToBlockId(chunkId) + 1);
+            }
+        });
+
+        const types::ShapeType chunkId = {0, 0};
+        dsRead->removeChunk(chunkId);
+        ASSERT_FALSE(dsRead->chunkExists(chunkId));
+    }
+
+
+    TEST_F(GcsTest, RangeReads) {
+        std::vector<char> value(1000);
+        std::iota(value.begin(), value.end(), 0);
+        store_->write("object", value);
+
+        std::vector<char> out;
+        ASSERT_TRUE(store_->read("object", out));
+        ASSERT_EQ(out, value);
+        ASSERT_TRUE(store_->readRange("object", 100, 10, out));
+        ASSERT_EQ(out.size(), 10);
+        ASSERT_TRUE(std::equal(out.begin(), out.end(), value.begin() + 100));
+        ASSERT_FALSE(store_->read("missing", out));
+        ASSERT_FALSE(store_->exists("missing"));
+    }
+
+}
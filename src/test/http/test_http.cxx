@@ -0,0 +1,131 @@
+#include <cstdlib>
+#include <numeric>
+#include "gtest/gtest.h"
+
+#include "z5/factory.hxx"
+#include "z5/attributes.hxx"
+#include "z5/http/store.hxx"
+#include "z5/util/for_each.hxx"
+
+
+namespace z5 {
+
+    // the containers are written to the working directory and read through a http server
+    // that serves it, given by Z5_HTTP_ENDPOINT, e.g. `python -m http.server 8000`
+    class HttpTest : public ::testing::Test {
+
+    protected:
+        HttpTest() : tmp("http_test_data"), shape_({25, 30}), chunks_({10, 10}) {
+            const char * endpoint = std::getenv("Z5_HTTP_ENDPOINT");
+            url_ = std::string(endpoint ? endpoint : "http://localhost:8000") + "/" + tmp.string();
+        }
+
+        void SetUp() {
+            fs::create_directories(tmp);
+            for(int isZarr = 0; isZarr < 2; ++isZarr) {
+                filesystem::handle::File file(tmp / (isZarr ? "test.zarr" : "test.n5"));
+                createFile(file, isZarr);
+                createGroup(file, "group");
+                filesystem::handle::Group group(file, "group");
+                auto ds = createDataset(group, "data", "int32", shape_, chunks_, "zlib");
+
+                // write all chunks except for the last one
+                std::vector<int> data(ds->defaultChunkSize());
+                types::ShapeType chunkId;
+                for(std::size_t chunkIndex = 0; chunkIndex < ds->numberOfChunks() - 1; ++chunkIndex) {
+                    ds->chunking().blockIdToBlockCoordinate(chunkIndex, chunkId);
+                    std::iota(data.begin(), data.end(), chunkIndex + 1);
+                    ds->writeChunk(chunkId, &data[0]);
+                }
+                writeAttributes(group, nlohmann::json({{"a", 1}}));
+            }
+        }
+
+        void TearDown() {
+            fs::remove_all(tmp);
+        }
+
+        fs::path tmp;
+        std::string url_;
+        types::ShapeType shape_;
+        types::ShapeType chunks_;
+    };
+
+
+    TEST_F(HttpTest, Hierarchy) {
+        for(int isZarr = 0; isZarr < 2; ++isZarr) {
+            auto store = std::make_shared<http::Store>(url_ + (isZarr ? "/test.zarr" : "/test.n5/"));
+            kv::handle::File file(store, FileMode::r);
+            ASSERT_TRUE(file.exists());
+            ASSERT_EQ(file.isZarr(), bool(isZarr));
+
+            std::vector<std::string> keys;
+            file.keys(keys);
+            ASSERT_EQ(keys, std::vector<std::string>({"group"}));
+            ASSERT_TRUE(file.in("group"));
+            ASSERT_FALSE(file.in("missing"));
+
+            kv::handle::Group group(file, "group");
+            ASSERT_TRUE(isSubGroup(file, "group"));
+            ASSERT_FALSE(isSubGroup(group, "data"));
+            nlohmann::json j;
+            readAttributes(group, j);
+            ASSERT_EQ(j, nlohmann::json({{"a", 1}}));
+
+            std::vector<HierarchyEntry> entries;
+            listHierarchy(file, entries);
+            ASSERT_EQ(entries.size(), 2);
+            ASSERT_EQ(entries[1].path, "group/data");
+            ASSERT_EQ(entries[1].shape, shape_);
+        }
+    }
+
+
+    TEST_F(HttpTest, ReadChunks) {
+        for(int isZarr = 0; isZarr < 2; ++isZarr) {
+            auto store = std::make_shared<http::Store>(url_ + (isZarr ? "/test.zarr" : "/test.n5"));
+            kv::handle::File file(store, FileMode::r);
+            kv::handle::Group group(file, "group");
+            auto ds = openDataset(group, "data");
+            const std::size_t nChunks = ds->numberOfChunks();
+
+            // read all chunks concurrently, the missing chunk must not raise
+            util::parallel_for_each_chunk(*ds, 4, [nChunks](const int tid, const Dataset & ds,
+                                                            const types::ShapeType & chunkId){
+                const std::size_t chunkIndex = ds.chunking().blockCoordinatesToBlockId(chunkId);
+                std::vector<int> out(ds.defaultChunkSize());
+                bool isVarlen;
+                const bool exists = ds.readChunkIfExists(chunkId, &out[0], isVarlen);
+                ASSERT_EQ(exists, chunkIndex < nChunks - 1);
+                if(exists) {
+                    ASSERT_EQ(out[0], chunkIndex + 1);
+                }
+            });
+
+            // the n5 header is read with a range request
+            std::size_t chunkSize;
+            ASSERT_FALSE(ds->checkVarlenChunk(types::ShapeType({0, 0}), chunkSize));
+            ASSERT_EQ(chunkSize, isZarr ? ds->defaultChunkSize() : 100);
+        }
+    }
+
+
+    TEST_F(HttpTest, ReadOnly) {
+        auto store = std::make_shared<http::Store>(url_ + "/test.n5");
+        kv::handle::File file(store);
+        ASSERT_THROW(createGroup(file, "other"), std::invalid_argument);
+        ASSERT_THROW(file.remove(), std::invalid_argument);
+
+        std::vector<char> value;
+        ASSERT_FALSE(store->read("missing", value));
+        ASSERT_TRUE(store->readRange("attributes.json", 0, 4, value));
+        ASSERT_EQ(value.size(), 4);
+        ASSERT_TRUE(store->readRange("attributes.json", 1000000, 4, value));
+        ASSERT_TRUE(value.empty());
+
+        auto missing = std::make_shared<http::Store>(url_ + "/missing.n5");
+        kv::handle::File missingFile(missing, FileMode::r);
+        ASSERT_FALSE(missingFile.exists());
+    }
+
+}
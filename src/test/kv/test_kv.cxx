@@ -0,0 +1,270 @@
+#include <map>
+#include <set>
+#include <mutex>
+#include "gtest/gtest.h"
+
+#include "z5/factory.hxx"
+#include "z5/attributes.hxx"
+
+
+namespace z5 {
+
+    // minimal store that keeps the objects in a map,
+    // to test the key-value backend independent of a server
+    class MapStore : public kv::Store {
+    public:
+        bool read(const std::string & key, std::vector<char> & value) const {
+            std::lock_guard<std::mutex> lock(mutex_);
+            auto it = objects_.find(key);
+            if(it == objects_.end()) {
+                return false;
+            }
+            value = it->second;
+            return true;
+        }
+
+        void write(const std::string & key, const std::vector<char> & value) const {
+            std::lock_guard<std::mutex> lock(mutex_);
+            objects_[key] = value;
+        }
+
+        bool exists(const std::string & key) const {
+            std::lock_guard<std::mutex> lock(mutex_);
+            return objects_.find(key) != objects_.end();
+        }
+
+        void remove(const std::string & key) const {
+            std::lock_guard<std::mutex> lock(mutex_);
+            objects_.erase(key);
+        }
+
+        void listChildren(const std::string & prefix, std::vector<std::string> & out) const {
+            std::lock_guard<std::mutex> lock(mutex_);
+            const std::string dir = prefix.empty() ? prefix : prefix + "/";
+            std::set<std::string> children;
+            for(auto it = objects_.lower_bound(dir); it != objects_.end() && it->first.compare(0, dir.size(), dir) == 0; ++it) {
+                const std::size_t sep = it->first.find('/', dir.size());
+                if(sep != std::string::npos) {
+                    children.insert(it->first.substr(dir.size(), sep - dir.size()));
+                }
+            }
+            out.insert(out.end(), children.begin(), children.end());
+        }
+
+        bool existsPrefix(const std::string & prefix) const {
+            std::lock_guard<std::mutex> lock(mutex_);
+            const std::string dir = prefix.empty() ? prefix : prefix + "/";
+            auto it = objects_.lower_bound(dir);
+            return it != objects_.end() && it->first.compare(0, dir.size(), dir) == 0;
+        }
+
+        void removePrefix(const std::string & prefix) const {
+            std::lock_guard<std::mutex> lock(mutex_);
+            const std::string dir = prefix.empty() ? prefix : prefix + "/";
+            auto it = objects_.lower_bound(dir);
+            while(it != objects_.end() && it->first.compare(0, dir.size(), dir) == 0) {
+                it = objects_.erase(it);
+            }
+        }
+
+    private:
+        mutable std::mutex mutex_;
+        mutable std::map<std::string, std::vector<char>> objects_;
+    };
+
+
+    class KeyValueTest : public ::testing::Test {
+
+    protected:
+        KeyValueTest() : shape_({25, 30}), chunks_({10, 10}) {
+        }
+
+        void SetUp() {
+            for(int isZarr = 0; isZarr < 2; ++isZarr) {
+                stores_.push_back(std::make_shared<MapStore>());
+                kv::handle::File file(stores_.back());
+                createFile(file, isZarr);
+            }
+        }
+
+        std::vector<std::shared_ptr<MapStore>> stores_;
+        types::ShapeType shape_;
+        types::ShapeType chunks_;
+    };
+
+
+    TEST_F(KeyValueTest, Hierarchy) {
+        for(int isZarr = 0; isZarr < 2; ++isZarr) {
+            kv::handle::File file(stores_[isZarr]);
+            ASSERT_TRUE(file.exists());
+            ASSERT_TRUE(file.isKeyValueStore());
+            ASSERT_FALSE(file.isS3());
+            ASSERT_EQ(file.isZarr(), bool(isZarr));
+
+            createGroup(file, "group");
+            kv::handle::Group group(file, "group");
+            ASSERT_TRUE(group.exists());
+            ASSERT_EQ(group.isZarr(), bool(isZarr));
+            createGroup(group, "sub");
+            auto ds = createDataset(group, "data", "float32", shape_, chunks_);
+            requireHierarchy(file, "a/b/c");
+
+            std::vector<std::string> keys;
+            file.keys(keys);
+            std::sort(keys.begin(), keys.end());
+            ASSERT_EQ(keys, std::vector<std::string>({"a", "group"}));
+            keys.clear();
+            group.keys(keys);
+            std::sort(keys.begin(), keys.end());
+            ASSERT_EQ(keys, std::vector<std::string>({"data", "sub"}));
+
+            ASSERT_TRUE(file.in("group"));
+            ASSERT_FALSE(file.in("data"));
+            ASSERT_TRUE(isSubGroup(file, "group"));
+            ASSERT_FALSE(isSubGroup(group, "data"));
+            ASSERT_TRUE(isSubGroup(group, "sub"));
+
+            kv::handle::Group sub(group, "sub");
+            ASSERT_EQ(relativePath(sub, file), "group/sub");
+            ASSERT_EQ(relativePath(file, group), "..");
+
+            std::vector<HierarchyEntry> entries;
+            listHierarchy(file, entries);
+            std::vector<std::string> paths;
+            for(const auto & entry : entries) {
+                paths.push_back(entry.path);
+            }
+            ASSERT_EQ(paths, std::vector<std::string>({"a", "a/b", "group", "group/data", "group/sub"}));
+            ASSERT_TRUE(entries[3].isDataset);
+            ASSERT_EQ(entries[3].shape, shape_);
+            ASSERT_EQ(entries[3].chunks, chunks_);
+            ASSERT_EQ(entries[3].dtype, "float32");
+
+            group.remove();
+            ASSERT_FALSE(group.exists());
+            ASSERT_FALSE(file.in("group"));
+            ASSERT_TRUE(file.in("a"));
+        }
+    }
+
+
+    TEST_F(KeyValueTest, Attributes) {
+        for(int isZarr = 0; isZarr < 2; ++isZarr) {
+            kv::handle::File file(stores_[isZarr]);
+            createGroup(file, "group");
+            kv::handle::Group group(file, "group");
+            auto ds = createDataset(file, "data", "int32", shape_, chunks_);
+            kv::handle::Dataset dsHandle(file, "data");
+
+            nlohmann::json attrs = {{"a", 1}, {"b", "x"}};
+            writeAttributes(file, attrs);
+            writeAttributes(group, attrs);
+            writeAttributes(dsHandle, attrs);
+            removeAttribute(group, "b");
+
+            nlohmann::json j;
+            readAttributes(file, j);
+            ASSERT_EQ(j["a"], 1);
+            ASSERT_EQ(j["b"], "x");
+            j.clear();
+            readAttributes(group, j);
+            ASSERT_EQ(j, nlohmann::json({{"a", 1}}));
+            // the n5 dataset metadata must not show up in the attributes
+            j.clear();
+            readAttributes(dsHandle, j);
+            ASSERT_EQ(j, attrs);
+
+            // writing attributes must not break the metadata
+            auto dsReopened = openDataset(file, "data");
+            ASSERT_EQ(dsReopened->shape(), shape_);
+        }
+    }
+
+
+    TEST_F(KeyValueTest, ReadWriteChunks) {
+        for(int isZarr = 0; isZarr < 2; ++isZarr) {
+            kv::handle::File file(stores_[isZarr]);
+            auto ds = createDataset(file, "data", "int32", shape_, chunks_, "zlib");
+            ASSERT_TRUE(ds->isZarr() == bool(isZarr));
+
+            // write all chunks except for the last one
+            std::vector<int> data(ds->defaultChunkSize());
+            const std::size_t nChunks = ds->numberOfChunks();
+            types::ShapeType chunkId;
+            for(std::size_t chunkIndex = 0; chunkIndex < nChunks - 1; ++chunkIndex) {
+                ds->chunking().blockIdToBlockCoordinate(chunkIndex, chunkId);
+                std::iota(data.begin(), data.end(), chunkIndex);
+                ds->writeChunk(chunkId, &data[0]);
+            }
+
+            auto dsRead = openDataset(file, "data");
+            std::vector<int> out(ds->defaultChunkSize());
+            bool isVarlen;
+            for(std::size_t chunkIndex = 0; chunkIndex < nChunks; ++chunkIndex) {
+                dsRead->chunking().blockIdToBlockCoordinate(chunkIndex, chunkId);
+                const bool exists = dsRead->readChunkIfExists(chunkId, &out[0], isVarlen);
+                ASSERT_EQ(exists, chunkIndex < nChunks - 1);
+                ASSERT_EQ(dsRead->chunkExists(chunkId), exists);
+                if(!exists) {
+                    ASSERT_THROW(dsRead->readChunk(chunkId, &out[0]), std::runtime_error);
+                    continue;
+                }
+                ASSERT_FALSE(isVarlen);
+                const std::size_t size = isZarr ? dsRead->defaultChunkSize() : dsRead->getChunkSize(chunkId);
+                for(std::size_t i = 0; i < size; ++i) {
+                    ASSERT_EQ(out[i], chunkIndex + i);
+                }
+            }
+
+            // chunks with only the fill value are removed
+            chunkId = {0, 0};
+            std::fill(data.begin(), data.end(), 0);
+            ds->writeChunk(chunkId, &data[0]);
+            ASSERT_FALSE(ds->chunkExists(chunkId));
+
+            // raw chunks are copied unchanged
+            std::vector<char> raw;
+            chunkId = {1, 1};
+            ASSERT_TRUE(ds->readRawChunk(chunkId, raw));
+            ds->writeRawChunk(types::ShapeType({0, 0}), raw);
+            ds->readChunk(types::ShapeType({0, 0}), &out[0]);
+            ASSERT_EQ(out[0], ds->chunking().blockCoordinatesToBlockId(chunkId));
+
+            ds->removeChunk(chunkId);
+            ASSERT_FALSE(ds->chunkExists(chunkId));
+            ASSERT_THROW(ds->path(), std::runtime_error);
+        }
+    }
+
+
+    TEST_F(KeyValueTest, VarlenChunks) {
+        kv::handle::File file(stores_[0]);
+        auto ds = createDataset(file, "data", "uint8", shape_, chunks_);
+        const std::vector<uint8_t> data = {1, 2, 3, 4, 5};
+        const types::ShapeType chunkId = {0, 1};
+        ds->writeChunk(chunkId, &data[0], true, data.size());
+
+        std::size_t chunkSize;
+        ASSERT_TRUE(ds->checkVarlenChunk(chunkId, chunkSize));
+        ASSERT_EQ(chunkSize, data.size());
+        ASSERT_FALSE(ds->checkVarlenChunk(types::ShapeType({1, 1}), chunkSize));
+        ASSERT_EQ(chunkSize, ds->defaultChunkSize());
+
+        std::vector<uint8_t> out(chunkSize);
+        ASSERT_TRUE(ds->readChunk(chunkId, &out[0]));
+        ASSERT_TRUE(std::equal(data.begin(), data.end(), out.begin()));
+    }
+
+
+    TEST_F(KeyValueTest, Modes) {
+        kv::handle::File file(stores_[0], FileMode::r);
+        ASSERT_THROW(createGroup(file, "group"), std::invalid_argument);
+        ASSERT_THROW(writeAttributes(file, nlohmann::json({{"a", 1}})), std::invalid_argument);
+        ASSERT_THROW(file.remove(), std::invalid_argument);
+
+        kv::handle::File newFile(std::make_shared<MapStore>());
+        ASSERT_FALSE(newFile.exists());
+        ASSERT_THROW(newFile.isZarr(), std::runtime_error);
+    }
+
+}
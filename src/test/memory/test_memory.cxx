@@ -0,0 +1,154 @@
+#include <numeric>
+#include "gtest/gtest.h"
+
+#include "z5/factory.hxx"
+#include "z5/attributes.hxx"
+#include "z5/memory/store.hxx"
+#include "z5/util/for_each.hxx"
+
+
+namespace z5 {
+
+    class MemoryTest : public ::testing::Test {
+
+    protected:
+        MemoryTest() : tmp("tmp_dir"), shape_({25, 30}), chunks_({10, 10}) {
+        }
+
+        void SetUp() {
+            fs::create_directories(tmp);
+        }
+
+        void TearDown() {
+            fs::remove_all(tmp);
+        }
+
+        // write the chunk index + 1 to all chunks of the dataset
+        void writeChunks(const Dataset & ds) {
+            util::parallel_for_each_chunk(ds, 4, [](const int tid, const Dataset & ds,
+                                                    const types::ShapeType & chunkId){
+                std::vector<int> data(ds.defaultChunkSize(), ds.chunking().blockCoordinatesToBlockId(chunkId) + 1);
+                ds.writeChunk(chunkId, &data[0]);
+            });
+        }
+
+        void checkChunks(const Dataset & ds) {
+            util::parallel_for_each_chunk(ds, 4, [](const int tid, const Dataset & ds,
+                                                    const types::ShapeType & chunkId){
+                std::vector<int> data(ds.defaultChunkSize());
+                ds.readChunk(chunkId, &data[0]);
+                const std::size_t chunkSize = ds.isZarr() ? ds.defaultChunkSize() : ds.getChunkSize(chunkId);
+                for(std::size_t i = 0; i < chunkSize; ++i) {
+                    ASSERT_EQ(data[i], ds.chunking().blockCoordinatesToBlockId(chunkId) + 1);
+                }
+            });
+        }
+
+        fs::path tmp;
+        types::ShapeType shape_;
+        types::ShapeType chunks_;
+    };
+
+
+    TEST_F(MemoryTest, ReadWrite) {
+        for(int isZarr = 0; isZarr < 2; ++isZarr) {
+            auto store = std::make_shared<memory::Store>();
+            kv::handle::File file(store);
+            createFile(file, isZarr);
+            createGroup(file, "group");
+            kv::handle::Group group(file, "group");
+            auto ds = createDataset(group, "data", "int32", shape_, chunks_, "zlib");
+            writeChunks(*ds);
+            checkChunks(*openDataset(group, "data"));
+
+            std::vector<std::string> keys;
+            file.keys(keys);
+            ASSERT_EQ(keys, std::vector<std::string>({"group"}));
+            ASSERT_GT(store->nBytes(), 0);
+
+            // removing all objects releases the memory
+            file.remove();
+            ASSERT_FALSE(file.exists());
+            ASSERT_EQ(store->nBytes(), 0);
+        }
+    }
+
+
+    TEST_F(MemoryTest, ByteLimit) {
+        auto store = std::make_shared<memory::Store>(1000);
+        store->write("a", std::vector<char>(600));
+        ASSERT_EQ(store->nBytes(), 600);
+        ASSERT_THROW(store->write("b", std::vector<char>(600)), std::runtime_error);
+        ASSERT_FALSE(store->exists("b"));
+
+        // replacing an object only counts the difference
+        store->write("a", std::vector<char>(900));
+        ASSERT_EQ(store->nBytes(), 900);
+        std::size_t size;
+        ASSERT_TRUE(store->objectSize("a", size));
+        ASSERT_EQ(size, 900);
+        ASSERT_FALSE(store->objectSize("b", size));
+        store->remove("a");
+        ASSERT_EQ(store->nBytes(), 0);
+        store->write("b", std::vector<char>(600));
+        ASSERT_EQ(store->maxBytes(), 1000);
+    }
+
+
+    TEST_F(MemoryTest, PersistLoad) {
+        for(int isZarr = 0; isZarr < 2; ++isZarr) {
+            auto store = std::make_shared<memory::Store>();
+            kv::handle::File file(store);
+            createFile(file, isZarr);
+            auto ds = createDataset(file, "data", "int32", shape_, chunks_, "zlib");
+            writeChunks(*ds);
+            kv::handle::Dataset dsHandle(file, "data");
+            writeAttributes(dsHandle, nlohmann::json({{"a", 1}}));
+
+            // the persisted container can be opened with the filesystem backend
+            const fs::path path = tmp / (isZarr ? "data.zarr" : "data.n5");
+            memory::persist(*store, path);
+            ASSERT_THROW(memory::persist(*store, path), std::invalid_argument);
+            filesystem::handle::File fsFile(path);
+            ASSERT_EQ(fsFile.isZarr(), bool(isZarr));
+            auto fsDs = openDataset(fsFile, "data");
+            ASSERT_EQ(fsDs->shape(), shape_);
+            checkChunks(*fsDs);
+            nlohmann::json j;
+            filesystem::handle::Dataset fsDsHandle(fsFile, "data");
+            readAttributes(fsDsHandle, j);
+            ASSERT_EQ(j, nlohmann::json({{"a", 1}}));
+
+            // and loaded back into memory
+            auto loaded = std::make_shared<memory::Store>();
+            memory::load(path, *loaded);
+            ASSERT_EQ(loaded->nBytes(), store->nBytes());
+            kv::handle::File loadedFile(loaded);
+            ASSERT_EQ(loadedFile.isZarr(), bool(isZarr));
+            checkChunks(*openDataset(loadedFile, "data"));
+        }
+    }
+
+
+    TEST_F(MemoryTest, NestedChunks) {
+        auto store = std::make_shared<memory::Store>();
+        kv::handle::File file(store);
+        createFile(file, true);
+        auto ds = createDataset(file, "data", "int32", shape_, chunks_, "zlib",
+                                types::CompressionOptions(), 0, "/");
+        writeChunks(*ds);
+        ASSERT_TRUE(store->exists("data/1/2"));
+        ASSERT_FALSE(store->exists("data/1.2"));
+
+        // move the chunks to the flat layout and back
+        for(const std::string sep : {".", "/"}) {
+            setDimensionSeparator(file, "data", sep, 4);
+            auto dsMoved = openDataset(file, "data");
+            ASSERT_EQ(dsMoved->dimensionSeparator(), sep);
+            ASSERT_EQ(store->exists("data/1.2"), sep == ".");
+            ASSERT_EQ(store->exists("data/1/2"), sep == "/");
+            checkChunks(*dsMoved);
+        }
+    }
+
+}
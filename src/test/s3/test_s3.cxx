@@ -0,0 +1,138 @@
+#include <cstdlib>
+#include <random>
+#include "gtest/gtest.h"
+
+#include <aws/s3/model/CreateBucketRequest.h>
+
+#include "z5/factory.hxx"
+#include "z5/attributes.hxx"
+#include "z5/util/for_each.hxx"
+
+
+namespace z5 {
+
+    // the tests run against the server given by Z5_S3_ENDPOINT (e.g. a local minio or moto server),
+    // the credentials are read from the environment (AWS_ACCESS_KEY_ID and AWS_SECRET_ACCESS_KEY)
+    class S3Test : public ::testing::Test {
+
+    protected:
+        S3Test() : shape_({100, 100}), chunks_({32, 32}) {
+            const char * endpoint = std::getenv("Z5_S3_ENDPOINT");
+            const char * bucket = std::getenv("Z5_S3_BUCKET");
+            options_.endpoint = endpoint ? endpoint : "http://localhost:9000";
+            options_.region = "us-east-1";
+            bucket_ = bucket ? bucket : "z5-test";
+        }
+
+        void SetUp() {
+            // create the bucket, this fails if it exists already, which we can ignore
+            auto client = s3::store_detail::Client::fromPool(options_);
+            Aws::S3::Model::CreateBucketRequest request;
+            request.SetBucket(bucket_.c_str());
+            client->get().CreateBucket(request);
+
+            store_ = std::make_shared<s3::Store>(bucket_, "test.n5", options_);
+            kv::handle::File file(store_);
+            if(file.exists()) {
+                file.remove();
+            }
+            createFile(file, false);
+        }
+
+        void TearDown() {
+            kv::handle::File file(store_);
+            file.remove();
+        }
+
+        s3::Options options_;
+        std::string bucket_;
+        std::shared_ptr<s3::Store> store_;
+        types::ShapeType shape_;
+        types::ShapeType chunks_;
+    };
+
+
+    TEST_F(S3Test, Hierarchy) {
+        kv::handle::File file(store_);
+        ASSERT_TRUE(file.exists());
+        ASSERT_TRUE(file.isS3());
+        ASSERT_FALSE(file.isZarr());
+
+        createGroup(file, "group");
+        kv::handle::Group group(file, "group");
+        createGroup(group, "sub");
+        auto ds = createDataset(group, "data", "float32", shape_, chunks_);
+
+        std::vector<std::string> keys;
+        group.keys(keys);
+        std::sort(keys.begin(), keys.end());
+        ASSERT_EQ(keys, std::vector<std::string>({"data", "sub"}));
+        ASSERT_TRUE(isSubGroup(group, "sub"));
+        ASSERT_FALSE(isSubGroup(group, "data"));
+
+        nlohmann::json attrs = {{"a", 1}};
+        writeAttributes(group, attrs);
+        nlohmann::json j;
+        readAttributes(group, j);
+        ASSERT_EQ(j, attrs);
+
+        group.remove();
+        ASSERT_FALSE(file.in("group"));
+
+        // the prefix of the container is not part of the keys
+        s3::Store root(bucket_, "", options_);
+        ASSERT_TRUE(root.exists("test.n5/attributes.json"));
+    }
+
+
+    TEST_F(S3Test, ReadWriteParallel) {
+        kv::handle::File file(store_);
+        auto ds = createDataset(file, "data", "int32", shape_, chunks_, "gzip");
+
+        // write and read all chunks concurrently
+        util::parallel_for_each_chunk(*ds, 8, [](const int tid, const Dataset & ds,
+                                                 const types::ShapeType & chunkId){
+            std::vector<int> data(ds.getChunkSize(chunkId), ds.chunking().blockCoordinatesToBlockId(chunkId) + 1);
+            ds.writeChunk(chunkId, &data[0]);
+        });
+
+        auto dsRead = openDataset(file, "data");
+        util::parallel_for_each_chunk(*dsRead, 8, [](const int tid, const Dataset & ds,
+                                                     const types::ShapeType & chunkId){
+            std::vector<int> data(ds.getChunkSize(chunkId));
+            bool isVarlen;
+            ASSERT_TRUE(ds.readChunkIfExists(chunkId, &data[0], isVarlen));
+            for(const int val : data) {
+                ASSERT_EQ(val, ds.chunking().blockCoordinatesToBlockId(chunkId) + 1);
+            }
+        });
+
+        const types::ShapeType chunkId = {0, 0};
+        dsRead->removeChunk(chunkId);
+        ASSERT_FALSE(dsRead->chunkExists(chunkId));
+    }
+
+
+    TEST_F(S3Test, MultipartUpload) {
+        s3::Options options = options_;
+        options.multipartThreshold = 1024 * 1024;
+        s3::Store store(bucket_, "test.n5", options);
+
+        std::vector<char> value(12 * 1024 * 1024);
+        std::default_random_engine generator;
+        std::uniform_int_distribution<int> distr(0, 255);
+        for(auto & val : value) {
+            val = static_cast<char>(distr(generator));
+        }
+        store.write("large", value);
+
+        std::vector<char> out;
+        ASSERT_TRUE(store.read("large", out));
+        ASSERT_EQ(out, value);
+
+        ASSERT_TRUE(store.readRange("large", 100, 10, out));
+        ASSERT_TRUE(std::equal(out.begin(), out.end(), value.begin() + 100));
+        ASSERT_FALSE(store.read("missing", out));
+    }
+
+}
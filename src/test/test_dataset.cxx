@@ -222,4 +222,333 @@ namespace z5 {
         }
     }
 
+    TEST_F(DatasetTest, RawChunkIO) {
+        types::CompressionOptions opts;
+        opts["level"] = 5;
+        auto dsIn = createDataset(fileHandle_, "raw_in", "int32",
+                                  types::ShapeType({100, 100, 100}), types::ShapeType({10, 10, 10}),
+                                  "zlib", opts);
+        auto dsOut = createDataset(fileHandle_, "raw_out", "int32",
+                                   types::ShapeType({100, 100, 100}), types::ShapeType({10, 10, 10}),
+                                   "zlib", opts);
+
+        const types::ShapeType chunkId({1, 2, 3});
+        std::vector<char> buffer;
+        ASSERT_FALSE(dsIn->readRawChunk(chunkId, buffer));
+        ASSERT_FALSE(dsIn->copyRawChunk(chunkId, *dsOut));
+        ASSERT_FALSE(dsOut->chunkExists(chunkId));
+
+        dsIn->writeChunk(chunkId, dataInt_);
+        ASSERT_TRUE(dsIn->readRawChunk(chunkId, buffer));
+        fs::path chunkPath;
+        dsIn->chunkPath(chunkId, chunkPath);
+        ASSERT_EQ(buffer.size(), fs::file_size(chunkPath));
+
+        // copy via the file and via the buffer
+        ASSERT_TRUE(dsIn->copyRawChunk(chunkId, *dsOut));
+        const types::ShapeType otherId({0, 0, 0});
+        dsOut->writeRawChunk(otherId, buffer);
+
+        int dataTmp[size_];
+        for(const auto & cid : {chunkId, otherId}) {
+            dsOut->readChunk(cid, dataTmp);
+            for(std::size_t i = 0; i < size_; ++i) {
+                ASSERT_EQ(dataTmp[i], dataInt_[i]);
+            }
+        }
+    }
+
+
+    TEST_F(DatasetTest, ChunkSummaries) {
+        auto ds = createDataset(fileHandle_, "summaries", "int32",
+                                types::ShapeType({95, 100, 100}), types::ShapeType({10, 10, 10}), "raw");
+        ASSERT_FALSE(ds->hasChunkSummaries());
+
+        int labels[size_];
+        for(std::size_t i = 0; i < size_; ++i) {
+            labels[i] = 5 + i % 3;
+        }
+        const types::ShapeType randomId({0, 0, 0}), labelId({1, 0, 0});
+        ds->writeChunk(randomId, dataInt_);
+        ds->writeChunk(labelId, labels);
+        ds->enableChunkSummaries(4, 2);
+        ASSERT_TRUE(ds->hasChunkSummaries());
+
+        std::vector<types::ShapeType> chunks;
+        ChunkQuery query;
+        query.maxGreater = 500;
+        ds->chunksWhere(query, chunks);
+        ASSERT_EQ(chunks, std::vector<types::ShapeType>({randomId}));
+
+        ChunkQuery labelQuery;
+        labelQuery.setLabel(2000);
+        ds->chunksWhere(labelQuery, chunks);
+        ASSERT_TRUE(chunks.empty());
+
+        // writing and removing chunks updates the summaries
+        const types::ShapeType newId({2, 0, 0});
+        ds->writeChunk(newId, labels);
+        ds->removeChunk(labelId);
+        labelQuery.setLabel(7);
+        ChunkQuery nonEmptyQuery;
+        nonEmptyQuery.nonEmpty = true;
+        // the random chunk has more uniques than the summary stores, so it can't be excluded
+        for(const auto & q : {labelQuery, nonEmptyQuery}) {
+            ds->chunksWhere(q, chunks);
+            ASSERT_EQ(chunks, std::vector<types::ShapeType>({randomId, newId}));
+        }
+
+        // the padding of edge chunks is not part of the summary
+        const types::ShapeType edgeId({9, 0, 0});
+        std::vector<int> edgeData(size_, 1000);
+        std::fill(edgeData.begin(), edgeData.begin() + 500, 7);
+        ds->writeChunk(edgeId, &edgeData[0]);
+
+        // chunks written as raw data have no valid summary and always match
+        const types::ShapeType rawId({3, 0, 0});
+        std::vector<char> buffer;
+        ds->readRawChunk(randomId, buffer);
+        ds->writeRawChunk(rawId, buffer);
+
+        // the summaries are found when the dataset is opened again,
+        // pending updates are written when the dataset is closed
+        ds.reset();
+        auto dsReopened = openDataset(fileHandle_, "summaries");
+        ASSERT_TRUE(dsReopened->hasChunkSummaries());
+        dsReopened->chunksWhere(query, chunks);
+        ASSERT_EQ(chunks, std::vector<types::ShapeType>({randomId, rawId}));
+        dsReopened->chunksWhere(labelQuery, chunks);
+        ASSERT_EQ(chunks, std::vector<types::ShapeType>({randomId, newId, rawId, edgeId}));
+
+        // chunks that are changed by other tools have no valid summary
+        fs::path newPath;
+        dsReopened->chunkPath(newId, newPath);
+        {
+            std::ofstream file(newPath.string(), std::ios::binary | std::ios::app);
+            file.put(0);
+        }
+        dsReopened->chunksWhere(query, chunks);
+        ASSERT_EQ(chunks, std::vector<types::ShapeType>({randomId, newId, rawId}));
+
+        // also if they are rewritten with the same size and modification time
+        fs::path edgePath;
+        dsReopened->chunkPath(edgeId, edgePath);
+        const auto mtime = fs::last_write_time(edgePath);
+        std::vector<char> edgeBuffer;
+        ASSERT_TRUE(dsReopened->readRawChunk(edgeId, edgeBuffer));
+        {
+            std::ofstream file(edgePath.string(), std::ios::binary | std::ios::trunc);
+            file.write(&edgeBuffer[0], edgeBuffer.size());
+        }
+        fs::last_write_time(edgePath, mtime);
+        dsReopened->chunksWhere(query, chunks);
+        ASSERT_EQ(chunks, std::vector<types::ShapeType>({randomId, newId, rawId, edgeId}));
+    }
+
+
+    TEST_F(DatasetTest, ChunkSummariesUint64) {
+        auto ds = createDataset(fileHandle_, "summaries_uint64", "uint64",
+                                types::ShapeType({20, 10, 10}), types::ShapeType({10, 10, 10}), "raw");
+        // labels that don't fit into int64
+        const uint64_t large = std::numeric_limits<uint64_t>::max() - 5;
+        std::vector<uint64_t> labels(size_);
+        for(std::size_t i = 0; i < size_; ++i) {
+            labels[i] = i % 2 == 0 ? 3 : large + i % 4;
+        }
+        const types::ShapeType labelId({1, 0, 0});
+        ds->writeChunk(labelId, &labels[0]);
+        ds->enableChunkSummaries(4, 1);
+
+        std::vector<types::ShapeType> chunks;
+        for(const uint64_t label : {uint64_t(3), large + 1, large + 3}) {
+            ChunkQuery query;
+            query.setLabel(label);
+            ds->chunksWhere(query, chunks);
+            ASSERT_EQ(chunks, std::vector<types::ShapeType>({labelId}));
+        }
+        ChunkQuery query;
+        query.setLabel(large + 2);
+        ds->chunksWhere(query, chunks);
+        ASSERT_TRUE(chunks.empty());
+    }
+
+
+    TEST_F(DatasetTest, NestedChunks) {
+        filesystem::handle::File zarrFile("nested.zarr");
+        createFile(zarrFile, true);
+        auto ds = createDataset(zarrFile, "nested", "int32",
+                                types::ShapeType({100, 100, 100}), types::ShapeType({10, 10, 10}),
+                                "raw", types::CompressionOptions(), 0, "/");
+        ASSERT_TRUE(ds->isZarr());
+        ASSERT_EQ(ds->dimensionSeparator(), "/");
+
+        const types::ShapeType chunkId({1, 2, 3}), otherId({0, 0, 9});
+        ds->writeChunk(chunkId, dataInt_);
+        ds->writeChunk(otherId, dataInt_);
+        fs::path chunkPath;
+        ds->chunkPath(chunkId, chunkPath);
+        ASSERT_EQ(chunkPath, zarrFile.path() / "nested" / "1" / "2" / "3");
+        ASSERT_TRUE(fs::exists(chunkPath));
+
+        // the separator is read from the metadata
+        auto dsNested = openDataset(zarrFile, "nested");
+        ASSERT_EQ(dsNested->dimensionSeparator(), "/");
+        int dataTmp[size_];
+        dsNested->readChunk(chunkId, dataTmp);
+        for(std::size_t i = 0; i < size_; ++i) {
+            ASSERT_EQ(dataTmp[i], dataInt_[i]);
+        }
+
+        // move the chunks to the flat layout and back
+        for(const std::string sep : {".", "/"}) {
+            setDimensionSeparator(zarrFile, "nested", sep, 4);
+            auto dsMoved = openDataset(zarrFile, "nested");
+            ASSERT_EQ(dsMoved->dimensionSeparator(), sep);
+            for(const auto & cid : {chunkId, otherId}) {
+                ASSERT_TRUE(dsMoved->chunkExists(cid));
+                dsMoved->readChunk(cid, dataTmp);
+                for(std::size_t i = 0; i < size_; ++i) {
+                    ASSERT_EQ(dataTmp[i], dataInt_[i]);
+                }
+            }
+            ASSERT_FALSE(dsMoved->chunkExists(types::ShapeType({0, 0, 0})));
+            ASSERT_EQ(fs::exists(zarrFile.path() / "nested" / "1"), sep == "/");
+        }
+
+        // n5 datasets don't have a dimension separator
+        filesystem::handle::File n5File("data.n5");
+        createFile(n5File, false);
+        ASSERT_THROW(createDataset(n5File, "data", "int32", types::ShapeType({10, 10}), types::ShapeType({5, 5}),
+                                   "raw", types::CompressionOptions(), 0, "/"),
+                     std::runtime_error);
+        createDataset(n5File, "data", "int32", types::ShapeType({10, 10}), types::ShapeType({5, 5}));
+        ASSERT_THROW(setDimensionSeparator(n5File, "data", "/"), std::invalid_argument);
+        fs::remove_all(n5File.path());
+        fs::remove_all(zarrFile.path());
+    }
+
+
+    TEST_F(DatasetTest, Filters) {
+        filesystem::handle::File zarrFile("filters.zarr");
+        createFile(zarrFile, true);
+        types::CompressionOptions opts;
+        opts["level"] = 5;
+        std::vector<types::CompressionOptions> filters(2);
+        filters[0]["id"] = std::string("delta");
+        filters[1]["id"] = std::string("shuffle");
+        auto ds = createDataset(zarrFile, "int", "int32",
+                                types::ShapeType({100, 100, 100}), types::ShapeType({10, 10, 10}),
+                                "zlib", opts, 0, ".", filters);
+        ASSERT_EQ(ds->filters().size(), 2);
+        // the element size of the shuffle filter defaults to the size of the dtype
+        ASSERT_EQ(boost::get<int>(ds->filters()[1].second.at("elementsize")), 4);
+
+        const types::ShapeType chunkId({1, 2, 3});
+        ds->writeChunk(chunkId, dataInt_);
+        auto dsReopened = openDataset(zarrFile, "int");
+        ASSERT_EQ(dsReopened->filters(), ds->filters());
+        int dataTmp[size_];
+        dsReopened->readChunk(chunkId, dataTmp);
+        for(std::size_t i = 0; i < size_; ++i) {
+            ASSERT_EQ(dataTmp[i], dataInt_[i]);
+        }
+
+        // quantized data is rounded to the given number of digits
+        std::vector<types::CompressionOptions> quantize(1);
+        quantize[0]["id"] = std::string("quantize");
+        quantize[0]["digits"] = 3;
+        auto dsFloat = createDataset(zarrFile, "float", "float32",
+                                     types::ShapeType({100, 100, 100}), types::ShapeType({10, 10, 10}),
+                                     "zlib", opts, 0, ".", quantize);
+        dsFloat->writeChunk(chunkId, dataFloat_);
+        float dataFloatTmp[size_];
+        dsFloat->readChunk(chunkId, dataFloatTmp);
+        for(std::size_t i = 0; i < size_; ++i) {
+            ASSERT_NEAR(dataFloatTmp[i], dataFloat_[i], 1e-3);
+        }
+
+        // quantize needs floating point data and filters are not supported by n5
+        ASSERT_THROW(createDataset(zarrFile, "int_quantized", "int32",
+                                   types::ShapeType({10, 10}), types::ShapeType({5, 5}),
+                                   "raw", types::CompressionOptions(), 0, ".", quantize),
+                     std::runtime_error);
+        filesystem::handle::File n5File("filters.n5");
+        createFile(n5File, false);
+        ASSERT_THROW(createDataset(n5File, "data", "int32", types::ShapeType({10, 10}), types::ShapeType({5, 5}),
+                                   "raw", types::CompressionOptions(), 0, ".", filters),
+                     std::runtime_error);
+        fs::remove_all(n5File.path());
+        fs::remove_all(zarrFile.path());
+    }
+
+
+    TEST_F(DatasetTest, PluginCodec) {
+        // codec that is not built into z5: inverts all bits of the chunk and prepends the configured tag
+        compression::PluginCodec codec;
+        codec.encode = [](const std::string & config, const char * data,
+                          const std::size_t size, std::vector<char> & out){
+            const char tag = nlohmann::json::parse(config)["tag"].get<int>();
+            out.resize(size + 1);
+            out[0] = tag;
+            for(std::size_t i = 0; i < size; ++i) {
+                out[i + 1] = ~data[i];
+            }
+        };
+        codec.decode = [](const std::string & config, const char * data, const std::size_t size,
+                          char * out, const std::size_t outSize){
+            const char tag = nlohmann::json::parse(config)["tag"].get<int>();
+            if(size != outSize + 1 || data[0] != tag) {
+                throw std::runtime_error("invalid chunk");
+            }
+            for(std::size_t i = 0; i < outSize; ++i) {
+                out[i] = ~data[i + 1];
+            }
+        };
+
+        filesystem::handle::File zarrFile("plugin.zarr");
+        createFile(zarrFile, true);
+        types::CompressionOptions opts;
+        opts["tag"] = 42;
+        // unknown codecs can only be used after they are registered
+        ASSERT_THROW(createDataset(zarrFile, "data", "int32",
+                                   types::ShapeType({100, 100, 100}), types::ShapeType({10, 10, 10}),
+                                   "invert", opts),
+                     std::runtime_error);
+        compression::PluginCodecs::registerCodec("invert", codec);
+        ASSERT_TRUE(compression::PluginCodecs::isRegistered("invert"));
+        auto ds = createDataset(zarrFile, "data", "int32",
+                                types::ShapeType({100, 100, 100}), types::ShapeType({10, 10, 10}),
+                                "invert", opts);
+        ASSERT_EQ(ds->getCompressor(), types::plugin);
+        std::string compressor;
+        ds->getCompressor(compressor);
+        ASSERT_EQ(compressor, "invert");
+
+        const types::ShapeType chunkId({1, 2, 3});
+        ds->writeChunk(chunkId, dataInt_);
+        auto dsReopened = openDataset(zarrFile, "data");
+        int dataTmp[size_];
+        dsReopened->readChunk(chunkId, dataTmp);
+        for(std::size_t i = 0; i < size_; ++i) {
+            ASSERT_EQ(dataTmp[i], dataInt_[i]);
+        }
+
+        // the codec configuration is stored as zarr compressor
+        nlohmann::json j;
+        filesystem::metadata_detail::readMetadata(zarrFile.path() / "data" / ".zarray", j);
+        ASSERT_EQ(j["compressor"], nlohmann::json({{"id", "invert"}, {"tag", 42}}));
+
+        // n5 does not support plugin codecs and opening fails once the codec is unregistered
+        filesystem::handle::File n5File("plugin.n5");
+        createFile(n5File, false);
+        ASSERT_THROW(createDataset(n5File, "data", "int32", types::ShapeType({10, 10}), types::ShapeType({5, 5}),
+                                   "invert", opts),
+                     std::runtime_error);
+        ASSERT_TRUE(compression::PluginCodecs::unregisterCodec("invert"));
+        ASSERT_THROW(openDataset(zarrFile, "data"), std::runtime_error);
+        fs::remove_all(n5File.path());
+        fs::remove_all(zarrFile.path());
+    }
+
+
 }
@@ -189,4 +189,37 @@ namespace z5 {
 
     }
 
+
+    TEST_F(FactoryTest, ListHierarchy) {
+        for(const bool isZarr : {false, true}) {
+            fs::path p = tmp / (isZarr ? "f.zr" : "f.n5");
+            z5::filesystem::handle::File file(p);
+            z5::createFile(file, isZarr);
+
+            z5::createGroup(file, "group");
+            z5::filesystem::handle::Group group(file, "group");
+            createDataset(group, "data", "uint8",
+                          types::ShapeType({100, 50}), types::ShapeType({10, 5}));
+            createDataset(file, "a", "float32",
+                          types::ShapeType({20}), types::ShapeType({10}));
+
+            std::vector<HierarchyEntry> entries;
+            listHierarchy(file, entries);
+            ASSERT_EQ(entries.size(), 3);
+
+            ASSERT_EQ(entries[0].path, "a");
+            ASSERT_TRUE(entries[0].isDataset);
+            ASSERT_EQ(entries[0].dtype, "float32");
+
+            ASSERT_EQ(entries[1].path, "group");
+            ASSERT_FALSE(entries[1].isDataset);
+
+            ASSERT_EQ(entries[2].path, "group/data");
+            ASSERT_TRUE(entries[2].isDataset);
+            ASSERT_EQ(entries[2].shape, types::ShapeType({100, 50}));
+            ASSERT_EQ(entries[2].chunks, types::ShapeType({10, 5}));
+            ASSERT_EQ(entries[2].dtype, "uint8");
+        }
+    }
+
 }
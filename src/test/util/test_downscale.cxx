@@ -0,0 +1,163 @@
+#include <random>
+#include <map>
+#include "gtest/gtest.h"
+
+#include "z5/factory.hxx"
+#include "z5/util/downscale.hxx"
+
+
+namespace z5 {
+namespace util {
+
+    class DownscaleTest : public ::testing::Test {
+
+    protected:
+        DownscaleTest() : fileHandle_("data.n5"), shape_({37, 45, 29}), chunks_({8, 8, 8}) {
+        }
+
+        virtual void SetUp() {
+            createFile(fileHandle_, false);
+
+            const std::size_t size = std::accumulate(shape_.begin(), shape_.end(), 1, std::multiplies<std::size_t>());
+            std::default_random_engine generator;
+            std::uniform_int_distribution<int> distr(0, 5);
+            data_.resize(size);
+            for(auto & val : data_) {
+                val = distr(generator);
+            }
+
+            auto ds = createDataset(fileHandle_, "data", "int32", shape_, chunks_);
+            for(std::size_t chunkId = 0; chunkId < ds->numberOfChunks(); ++chunkId) {
+                types::ShapeType chunkCoord, chunkBegin, chunkShape;
+                ds->chunking().blockIdToBlockCoordinate(chunkId, chunkCoord);
+                ds->chunking().getBlockBeginAndShape(chunkCoord, chunkBegin, chunkShape);
+                std::vector<int> chunkData(std::accumulate(chunkShape.begin(), chunkShape.end(),
+                                                           1, std::multiplies<std::size_t>()));
+                copyRegion(&data_[0], shape_, chunkBegin, &chunkData[0], chunkShape,
+                           types::ShapeType(3, 0), chunkShape);
+                writeCompleteChunk(*ds, chunkCoord, chunkData);
+            }
+        }
+
+        virtual void TearDown() {
+            fs::remove_all(fileHandle_.path());
+        }
+
+        // naive reference implementation
+        void downscaleReference(const std::vector<int> & in, const types::ShapeType & inShape,
+                                const std::size_t factor, const bool useMode,
+                                std::vector<int> & out, types::ShapeType & outShape) {
+            outShape.resize(3);
+            for(unsigned d = 0; d < 3; ++d) {
+                outShape[d] = (inShape[d] + factor - 1) / factor;
+            }
+            out.resize(outShape[0] * outShape[1] * outShape[2]);
+            for(std::size_t z = 0; z < outShape[0]; ++z) {
+                for(std::size_t y = 0; y < outShape[1]; ++y) {
+                    for(std::size_t x = 0; x < outShape[2]; ++x) {
+                        double sum = 0;
+                        std::size_t count = 0;
+                        std::map<int, std::size_t> counts;
+                        for(std::size_t zz = z * factor; zz < std::min((z + 1) * factor, inShape[0]); ++zz) {
+                            for(std::size_t yy = y * factor; yy < std::min((y + 1) * factor, inShape[1]); ++yy) {
+                                for(std::size_t xx = x * factor; xx < std::min((x + 1) * factor, inShape[2]); ++xx) {
+                                    const int val = in[(zz * inShape[1] + yy) * inShape[2] + xx];
+                                    sum += val;
+                                    ++count;
+                                    ++counts[val];
+                                }
+                            }
+                        }
+                        int res;
+                        if(useMode) {
+                            std::size_t maxCount = 0;
+                            for(const auto & elem : counts) {
+                                if(elem.second > maxCount) {
+                                    maxCount = elem.second;
+                                    res = elem.first;
+                                }
+                            }
+                        } else {
+                            res = static_cast<int>(std::round(sum / count));
+                        }
+                        out[(z * outShape[1] + y) * outShape[2] + x] = res;
+                    }
+                }
+            }
+        }
+
+        void testMethod(const std::string & method, const int nThreads) {
+            const std::vector<std::size_t> factors = {2, 2, 3};
+            auto ds = openDataset(fileHandle_, "data");
+
+            std::vector<std::unique_ptr<Dataset>> levels;
+            std::vector<const Dataset *> levelPtrs;
+            std::vector<types::ShapeType> levelFactors;
+            types::ShapeType shape = shape_;
+            for(unsigned level = 0; level < factors.size(); ++level) {
+                for(auto & sh : shape) {
+                    sh = (sh + factors[level] - 1) / factors[level];
+                }
+                const std::string key = method + "_s" + std::to_string(level + 1);
+                levels.emplace_back(createDataset(fileHandle_, key, "int32", shape, chunks_));
+                levelPtrs.push_back(levels.back().get());
+                levelFactors.emplace_back(3, factors[level]);
+            }
+
+            downscale<int>(*ds, levelPtrs, levelFactors, method, nThreads);
+
+            std::vector<int> expected = data_, tmp, result;
+            types::ShapeType expectedShape = shape_, tmpShape;
+            for(unsigned level = 0; level < factors.size(); ++level) {
+                downscaleReference(expected, expectedShape, factors[level], method == "mode", tmp, tmpShape);
+                expected = tmp;
+                expectedShape = tmpShape;
+
+                const auto & dsLevel = *levels[level];
+                ASSERT_EQ(dsLevel.shape(), expectedShape);
+                readRegion(dsLevel, types::ShapeType(3, 0), expectedShape, result);
+                ASSERT_EQ(result.size(), expected.size());
+                for(std::size_t i = 0; i < result.size(); ++i) {
+                    ASSERT_EQ(result[i], expected[i]);
+                }
+            }
+        }
+
+        filesystem::handle::File fileHandle_;
+        types::ShapeType shape_;
+        types::ShapeType chunks_;
+        std::vector<int> data_;
+    };
+
+
+    TEST_F(DownscaleTest, Mean) {
+        testMethod("mean", 1);
+    }
+
+
+    TEST_F(DownscaleTest, MeanParallel) {
+        testMethod("mean", 4);
+    }
+
+
+    TEST_F(DownscaleTest, ModeParallel) {
+        testMethod("mode", 4);
+    }
+
+
+    TEST_F(DownscaleTest, InvalidArguments) {
+        auto ds = openDataset(fileHandle_, "data");
+        auto out = createDataset(fileHandle_, "out", "int32", types::ShapeType({19, 23, 15}), chunks_);
+        const std::vector<const Dataset *> levels = {out.get()};
+        ASSERT_THROW(downscale<int>(*ds, levels, {types::ShapeType(3, 2)}, "max", 1), std::runtime_error);
+        ASSERT_THROW(downscale<int>(*ds, levels, {types::ShapeType(3, 3)}, "mean", 1), std::runtime_error);
+
+        // the chunks of the first level times the factor are not a multiple of the input chunks
+        auto unaligned = createDataset(fileHandle_, "unaligned", "int32", types::ShapeType({19, 23, 15}),
+                                       types::ShapeType({5, 5, 5}));
+        ASSERT_THROW(downscale<int>(*ds, {unaligned.get()}, {types::ShapeType(3, 2)}, "mean", 1),
+                     std::runtime_error);
+    }
+
+}
+}
@@ -0,0 +1,375 @@
+#include <random>
+#include <map>
+#include <set>
+#include "gtest/gtest.h"
+
+#include "z5/factory.hxx"
+#include "z5/util/functions.hxx"
+
+
+namespace z5 {
+namespace util {
+
+    class ReductionsTest : public ::testing::Test {
+
+    protected:
+        ReductionsTest() : fileHandle_("data.zr"), shape_({37, 45, 29}), chunks_({8, 8, 8}) {
+        }
+
+        virtual void SetUp() {
+            createFile(fileHandle_, true);
+            auto ds = createDataset(fileHandle_, "data", "int32", shape_, chunks_,
+                                    "raw", types::CompressionOptions(), fillValue_);
+
+            // write every other chunk and leave the rest at the fill value
+            const std::size_t size = std::accumulate(shape_.begin(), shape_.end(), 1, std::multiplies<std::size_t>());
+            data_.assign(size, fillValue_);
+            std::default_random_engine generator;
+            std::uniform_int_distribution<int> distr(-100, 100);
+            for(std::size_t chunkId = 0; chunkId < ds->numberOfChunks(); chunkId += 2) {
+                types::ShapeType chunkCoord, chunkBegin, chunkShape;
+                ds->chunking().blockIdToBlockCoordinate(chunkId, chunkCoord);
+                ds->chunking().getBlockBeginAndShape(chunkCoord, chunkBegin, chunkShape);
+                std::vector<int> chunkData(std::accumulate(chunkShape.begin(), chunkShape.end(),
+                                                           1, std::multiplies<std::size_t>()));
+                for(auto & val : chunkData) {
+                    val = distr(generator);
+                }
+                writeCompleteChunk(*ds, chunkCoord, chunkData);
+                copyRegion(&chunkData[0], chunkShape, types::ShapeType(3, 0),
+                           &data_[0], shape_, chunkBegin, chunkShape);
+            }
+        }
+
+        virtual void TearDown() {
+            fs::remove_all(fileHandle_.path());
+        }
+
+        void getRoiData(const types::ShapeType & roiBegin, const types::ShapeType & roiEnd,
+                        std::vector<int> & out) {
+            types::ShapeType roiShape(3);
+            for(unsigned d = 0; d < 3; ++d) {
+                roiShape[d] = roiEnd[d] - roiBegin[d];
+            }
+            out.resize(roiShape[0] * roiShape[1] * roiShape[2]);
+            copyRegion(&data_[0], shape_, roiBegin, &out[0], roiShape, types::ShapeType(3, 0), roiShape);
+        }
+
+        filesystem::handle::File fileHandle_;
+        types::ShapeType shape_;
+        types::ShapeType chunks_;
+        const int fillValue_ = 7;
+        std::vector<int> data_;
+    };
+
+
+    TEST_F(ReductionsTest, MinMaxSum) {
+        auto ds = openDataset(fileHandle_, "data");
+        const std::vector<std::pair<types::ShapeType, types::ShapeType>> rois = {
+            {types::ShapeType({0, 0, 0}), shape_},
+            {types::ShapeType({3, 11, 5}), types::ShapeType({30, 20, 29})}
+        };
+        for(const auto & roi : rois) {
+            std::vector<int> expected;
+            getRoiData(roi.first, roi.second, expected);
+
+            int minVal, maxVal;
+            double sum;
+            std::size_t count;
+            minMaxSum(*ds, 4, roi.first, roi.second, minVal, maxVal, sum, count);
+
+            ASSERT_EQ(count, expected.size());
+            ASSERT_EQ(minVal, *std::min_element(expected.begin(), expected.end()));
+            ASSERT_EQ(maxVal, *std::max_element(expected.begin(), expected.end()));
+            ASSERT_EQ(sum, std::accumulate(expected.begin(), expected.end(), 0.));
+        }
+    }
+
+
+    TEST_F(ReductionsTest, Histogram) {
+        auto ds = openDataset(fileHandle_, "data");
+        const types::ShapeType roiBegin({3, 11, 5});
+        const types::ShapeType roiEnd({30, 20, 29});
+        std::vector<int> expectedData;
+        getRoiData(roiBegin, roiEnd, expectedData);
+
+        const std::size_t nBins = 10;
+        std::vector<std::size_t> expected(nBins, 0);
+        for(const int val : expectedData) {
+            if(val < -50 || val > 50) {
+                continue;
+            }
+            ++expected[std::min(static_cast<std::size_t>((val + 50.) * (nBins / 100.)), nBins - 1)];
+        }
+
+        std::vector<std::size_t> counts;
+        histogram<int>(*ds, 4, roiBegin, roiEnd, -50., 50., nBins, counts);
+        ASSERT_EQ(counts, expected);
+    }
+
+    TEST_F(ReductionsTest, HistogramNaN) {
+        auto ds = createDataset(fileHandle_, "float", "float32", shape_, chunks_);
+        std::vector<float> data(ds->defaultChunkSize());
+        for(std::size_t i = 0; i < data.size(); ++i) {
+            data[i] = i % 3 == 0 ? std::numeric_limits<float>::quiet_NaN() : static_cast<float>(i % 10);
+        }
+        ds->writeChunk(types::ShapeType({0, 0, 0}), &data[0]);
+
+        // NaN values are not counted
+        const types::ShapeType roiEnd({8, 8, 8});
+        std::vector<std::size_t> counts;
+        histogram<float>(*ds, 2, types::ShapeType(3, 0), roiEnd, 0., 10., 10, counts);
+        std::vector<std::size_t> expected(10, 0);
+        for(std::size_t i = 0; i < data.size(); ++i) {
+            if(i % 3 != 0) {
+                ++expected[i % 10];
+            }
+        }
+        ASSERT_EQ(counts, expected);
+    }
+
+    TEST_F(ReductionsTest, MinMaxSumNaN) {
+        auto ds = createDataset(fileHandle_, "float", "float32", shape_, chunks_);
+        std::vector<float> data(ds->defaultChunkSize());
+        for(std::size_t i = 0; i < data.size(); ++i) {
+            data[i] = i % 3 == 0 ? std::numeric_limits<float>::quiet_NaN() : static_cast<float>(i);
+        }
+        // the chunk starts with NaN
+        ds->writeChunk(types::ShapeType({0, 0, 0}), &data[0]);
+        std::fill(data.begin(), data.end(), std::numeric_limits<float>::quiet_NaN());
+        ds->writeChunk(types::ShapeType({0, 0, 1}), &data[0]);
+
+        // NaN is ignored by the minimum and maximum, but propagates to the sum
+        float minVal, maxVal;
+        double sum;
+        std::size_t count;
+        minMaxSum<float>(*ds, 2, types::ShapeType(3, 0), types::ShapeType({8, 8, 16}), minVal, maxVal, sum, count);
+        ASSERT_EQ(minVal, 1.);
+        ASSERT_EQ(maxVal, 511.);
+        ASSERT_TRUE(std::isnan(sum));
+        ASSERT_EQ(count, 1024);
+
+        // the minimum and maximum of only NaN values are NaN
+        minMaxSum<float>(*ds, 2, types::ShapeType({0, 0, 8}), types::ShapeType({8, 8, 16}), minVal, maxVal, sum, count);
+        ASSERT_TRUE(std::isnan(minVal));
+        ASSERT_TRUE(std::isnan(maxVal));
+    }
+
+    TEST_F(ReductionsTest, Unique) {
+        auto ds = openDataset(fileHandle_, "data");
+
+        // missing chunks are not counted
+        std::map<int, std::size_t> expected;
+        for(std::size_t chunkId = 0; chunkId < ds->numberOfChunks(); chunkId += 2) {
+            types::ShapeType chunkCoord, chunkBegin, chunkShape;
+            ds->chunking().blockIdToBlockCoordinate(chunkId, chunkCoord);
+            ds->chunking().getBlockBeginAndShape(chunkCoord, chunkBegin, chunkShape);
+            std::vector<int> chunkData(std::accumulate(chunkShape.begin(), chunkShape.end(),
+                                                       1, std::multiplies<std::size_t>()));
+            copyRegion(&data_[0], shape_, chunkBegin, &chunkData[0], chunkShape,
+                       types::ShapeType(3, 0), chunkShape);
+            for(const int val : chunkData) {
+                ++expected[val];
+            }
+        }
+
+        for(const bool ignoreFillValue : {false, true}) {
+            std::vector<int> uniques;
+            std::vector<std::size_t> counts;
+            uniqueWithCounts(*ds, 4, uniques, counts, ignoreFillValue);
+            const std::size_t nExpected = expected.size() - (ignoreFillValue && expected.count(fillValue_) ? 1 : 0);
+            ASSERT_EQ(uniques.size(), nExpected);
+            ASSERT_TRUE(std::is_sorted(uniques.begin(), uniques.end()));
+            for(std::size_t i = 0; i < uniques.size(); ++i) {
+                ASSERT_FALSE(ignoreFillValue && uniques[i] == fillValue_);
+                ASSERT_EQ(counts[i], expected[uniques[i]]);
+            }
+        }
+
+        // the overload with std::set
+        std::set<int> uniqueSet;
+        unique(*ds, 2, uniqueSet);
+        ASSERT_EQ(uniqueSet.size(), expected.size());
+    }
+
+
+    TEST_F(ReductionsTest, UniqueBincount) {
+        auto ds = createDataset(fileHandle_, "small", "int16", shape_, chunks_);
+        std::vector<int16_t> data(data_.begin(), data_.end());
+        ds->writeChunk(types::ShapeType({0, 0, 0}), &data[0]);
+        ds->writeChunk(types::ShapeType({4, 5, 3}), &data[0]);
+
+        std::map<int16_t, std::size_t> expected;
+        for(std::size_t i = 0; i < ds->defaultChunkSize(); ++i) {
+            expected[data[i]] += 1;
+        }
+        // the last chunk is an edge chunk, we only count the part inside the dataset
+        types::ShapeType chunkShape;
+        ds->getChunkShape(types::ShapeType({4, 5, 3}), chunkShape);
+        for(std::size_t z = 0; z < chunkShape[0]; ++z) {
+            for(std::size_t y = 0; y < chunkShape[1]; ++y) {
+                for(std::size_t x = 0; x < chunkShape[2]; ++x) {
+                    expected[data[(z * 8 + y) * 8 + x]] += 1;
+                }
+            }
+        }
+
+        std::vector<int16_t> uniques;
+        std::vector<std::size_t> counts;
+        uniqueWithCounts(*ds, 4, uniques, counts);
+        ASSERT_EQ(uniques.size(), expected.size());
+        for(std::size_t i = 0; i < uniques.size(); ++i) {
+            ASSERT_EQ(counts[i], expected[uniques[i]]);
+        }
+    }
+
+
+    TEST_F(ReductionsTest, LabelStatistics) {
+        auto ds = openDataset(fileHandle_, "data");
+
+        // brute force statistics over the chunks that exist
+        std::map<int, std::size_t> expCounts;
+        std::map<int, types::ShapeType> expBegin, expEnd;
+        std::map<int, std::vector<double>> expSums;
+        for(std::size_t chunkId = 0; chunkId < ds->numberOfChunks(); chunkId += 2) {
+            types::ShapeType chunkBegin, chunkEnd;
+            ds->chunking().getBlockBeginAndEnd(chunkId, chunkBegin, chunkEnd);
+            for(std::size_t z = chunkBegin[0]; z < chunkEnd[0]; ++z) {
+                for(std::size_t y = chunkBegin[1]; y < chunkEnd[1]; ++y) {
+                    for(std::size_t x = chunkBegin[2]; x < chunkEnd[2]; ++x) {
+                        const int label = data_[(z * shape_[1] + y) * shape_[2] + x];
+                        const types::ShapeType coord({z, y, x});
+                        if(expCounts.count(label) == 0) {
+                            expBegin[label] = coord;
+                            expEnd[label] = types::ShapeType({z + 1, y + 1, x + 1});
+                            expSums[label] = std::vector<double>(3, 0.);
+                        }
+                        ++expCounts[label];
+                        for(unsigned d = 0; d < 3; ++d) {
+                            expBegin[label][d] = std::min(expBegin[label][d], coord[d]);
+                            expEnd[label][d] = std::max(expEnd[label][d], coord[d] + 1);
+                            expSums[label][d] += coord[d];
+                        }
+                    }
+                }
+            }
+        }
+
+        std::vector<int> labels;
+        std::vector<std::size_t> counts, bbBegin, bbEnd;
+        std::vector<double> centroids;
+        labelStatistics(*ds, 4, labels, counts, bbBegin, bbEnd, centroids, true);
+        ASSERT_EQ(labels.size(), expCounts.size());
+        ASSERT_TRUE(std::is_sorted(labels.begin(), labels.end()));
+        for(std::size_t i = 0; i < labels.size(); ++i) {
+            const int label = labels[i];
+            ASSERT_EQ(counts[i], expCounts[label]);
+            for(unsigned d = 0; d < 3; ++d) {
+                ASSERT_EQ(bbBegin[3 * i + d], expBegin[label][d]);
+                ASSERT_EQ(bbEnd[3 * i + d], expEnd[label][d]);
+                ASSERT_NEAR(centroids[3 * i + d], expSums[label][d] / expCounts[label], 1e-6);
+            }
+        }
+
+        labelStatistics(*ds, 2, labels, counts, bbBegin, bbEnd, centroids, false, true);
+        ASSERT_EQ(labels.size(), expCounts.size() - expCounts.count(fillValue_));
+        ASSERT_TRUE(centroids.empty());
+        ASSERT_EQ(bbBegin.size(), 3 * labels.size());
+    }
+
+    TEST_F(ReductionsTest, ApplyMapping) {
+        auto ds = openDataset(fileHandle_, "data");
+        auto out = createDataset(fileHandle_, "mapped", "int32", shape_, chunks_,
+                                 "raw", types::CompressionOptions(), fillValue_);
+
+        // map the negative values, the other values stay the same
+        std::vector<int> keys, values;
+        for(int key = -100; key < 0; ++key) {
+            keys.push_back(key);
+            values.push_back(1000 - key);
+        }
+        auto mapValue = [](const int val){return val < 0 ? 1000 - val : val;};
+
+        applyMapping(*ds, *out, keys, values, 4);
+        std::vector<int> result;
+        for(std::size_t chunkId = 0; chunkId < ds->numberOfChunks(); ++chunkId) {
+            types::ShapeType chunkCoord;
+            ds->chunking().blockIdToBlockCoordinate(chunkId, chunkCoord);
+            ASSERT_EQ(out->chunkExists(chunkCoord), chunkId % 2 == 0);
+        }
+        readRegion(*out, types::ShapeType(3, 0), shape_, result);
+        for(std::size_t i = 0; i < data_.size(); ++i) {
+            ASSERT_EQ(result[i], mapValue(data_[i]));
+        }
+
+        // in place, with a dense lookup table
+        auto small = createDataset(fileHandle_, "small", "int16", shape_, chunks_);
+        std::vector<int16_t> smallData(ds->defaultChunkSize());
+        for(std::size_t i = 0; i < smallData.size(); ++i) {
+            smallData[i] = static_cast<int16_t>(data_[i]);
+        }
+        small->writeChunk(types::ShapeType({1, 1, 1}), &smallData[0]);
+        applyMapping(*small, *small, std::vector<int16_t>(keys.begin(), keys.end()),
+                     std::vector<int16_t>(values.begin(), values.end()), 2);
+        std::vector<int16_t> smallResult(smallData.size());
+        small->readChunk(types::ShapeType({1, 1, 1}), &smallResult[0]);
+        for(std::size_t i = 0; i < smallData.size(); ++i) {
+            ASSERT_EQ(smallResult[i], mapValue(smallData[i]));
+        }
+
+        // invalid mappings
+        ASSERT_THROW(applyMapping(*ds, *out, keys, std::vector<int>(), 1), std::runtime_error);
+        ASSERT_THROW(applyMapping(*ds, *out, std::vector<int>({1, 1}), std::vector<int>({2, 3}), 1),
+                     std::runtime_error);
+        ASSERT_THROW(applyMapping(*small, *small, std::vector<int16_t>({1, 1}), std::vector<int16_t>({2, 3}), 1),
+                     std::runtime_error);
+    }
+
+    TEST_F(ReductionsTest, TrivialChunks) {
+        types::CompressionOptions cOpts;
+        cOpts["level"] = 5;
+        cOpts["useZlib"] = true;
+        auto ds = createDataset(fileHandle_, "trivial", "int32", shape_, chunks_, "zlib", cOpts);
+        const types::ShapeType edgeChunk({4, 5, 3});
+        types::ShapeType edgeShape;
+        ds->getChunkShape(edgeChunk, edgeShape);
+
+        // a constant chunk, a constant edge chunk, a chunk with a single differing value
+        // and a random chunk
+        std::vector<int> constant(ds->defaultChunkSize(), 3);
+        ds->writeChunk(types::ShapeType({0, 0, 0}), &constant[0]);
+        writeCompleteChunk(*ds, edgeChunk, std::vector<int>(ds->getChunkSize(edgeChunk), 3));
+        constant.back() = 4;
+        ds->writeChunk(types::ShapeType({1, 0, 0}), &constant[0]);
+        ds->writeChunk(types::ShapeType({2, 0, 0}), &data_[0]);
+
+        std::vector<types::ShapeType> chunks;
+        removeTrivialChunks(*ds, 4, chunks, false, 0, true);
+        const std::vector<types::ShapeType> expected = {types::ShapeType({0, 0, 0}), edgeChunk};
+        ASSERT_EQ(chunks, expected);
+        ASSERT_TRUE(ds->chunkExists(edgeChunk));
+
+        // the size heuristic does not decompress the random chunk
+        std::vector<char> raw;
+        ds->readRawChunk(types::ShapeType({2, 0, 0}), raw);
+        // the size is read from the file system without reading the chunk
+        std::size_t rawSize;
+        ASSERT_TRUE(ds->getRawChunkSize(types::ShapeType({2, 0, 0}), rawSize));
+        ASSERT_EQ(rawSize, raw.size());
+        ASSERT_FALSE(ds->getRawChunkSize(types::ShapeType({3, 0, 0}), rawSize));
+        findTrivialChunks(*ds, 4, chunks, false, 0, raw.size() - 1);
+        ASSERT_EQ(chunks, expected);
+        // and a too small size skips all chunks
+        findTrivialChunks(*ds, 4, chunks, false, 0, 1);
+        ASSERT_TRUE(chunks.empty());
+
+        removeTrivialChunks(*ds, 4, chunks, true, 3);
+        ASSERT_EQ(chunks, expected);
+        ASSERT_FALSE(ds->chunkExists(edgeChunk));
+        ASSERT_FALSE(ds->chunkExists(types::ShapeType({0, 0, 0})));
+        ASSERT_TRUE(ds->chunkExists(types::ShapeType({1, 0, 0})));
+    }
+
+
+}
+}
@@ -0,0 +1,179 @@
+#include <numeric>
+#include "gtest/gtest.h"
+
+#include "z5/factory.hxx"
+#include "z5/attributes.hxx"
+#include "z5/zip/store.hxx"
+#include "z5/util/for_each.hxx"
+
+
+namespace z5 {
+
+    class ZipTest : public ::testing::Test {
+
+    protected:
+        ZipTest() : tmp("tmp_dir"), shape_({25, 30}), chunks_({10, 10}) {
+        }
+
+        void SetUp() {
+            fs::create_directories(tmp);
+        }
+
+        void TearDown() {
+            fs::remove_all(tmp);
+        }
+
+        // write a container with all chunks except for the last one
+        fs::path writeContainer(const bool isZarr) {
+            const fs::path path = tmp / (isZarr ? "data.zarr" : "data.n5");
+            filesystem::handle::File file(path);
+            createFile(file, isZarr);
+            createGroup(file, "group");
+            filesystem::handle::Group group(file, "group");
+            writeAttributes(group, nlohmann::json({{"a", 1}}));
+            auto ds = createDataset(group, "data", "int32", shape_, chunks_, "zlib");
+            std::vector<int> data(ds->defaultChunkSize());
+            types::ShapeType chunkId;
+            for(std::size_t chunkIndex = 0; chunkIndex < ds->numberOfChunks() - 1; ++chunkIndex) {
+                ds->chunking().blockIdToBlockCoordinate(chunkIndex, chunkId);
+                std::iota(data.begin(), data.end(), chunkIndex + 1);
+                ds->writeChunk(chunkId, &data[0]);
+            }
+            return path;
+        }
+
+        void checkContainer(const kv::handle::File & file) {
+            std::vector<std::string> keys;
+            file.keys(keys);
+            ASSERT_EQ(keys, std::vector<std::string>({"group"}));
+            kv::handle::Group group(file, "group");
+            nlohmann::json j;
+            readAttributes(group, j);
+            ASSERT_EQ(j, nlohmann::json({{"a", 1}}));
+
+            auto ds = openDataset(group, "data");
+            const std::size_t nChunks = ds->numberOfChunks();
+            util::parallel_for_each_chunk(*ds, 4, [nChunks](const int tid, const Dataset & ds,
+                                                            const types::ShapeType & chunkId){
+                const std::size_t chunkIndex = ds.chunking().blockCoordinatesToBlockId(chunkId);
+                std::vector<int> out(ds.defaultChunkSize());
+                bool isVarlen;
+                const bool exists = ds.readChunkIfExists(chunkId, &out[0], isVarlen);
+                ASSERT_EQ(exists, chunkIndex < nChunks - 1);
+                if(exists) {
+                    ASSERT_EQ(out[0], chunkIndex + 1);
+                }
+            });
+        }
+
+        fs::path tmp;
+        types::ShapeType shape_;
+        types::ShapeType chunks_;
+    };
+
+
+    TEST_F(ZipTest, PackUnpack) {
+        for(int isZarr = 0; isZarr < 2; ++isZarr) {
+            const fs::path path = writeContainer(isZarr);
+            const fs::path zipPath = tmp / (isZarr ? "data.zarr.zip" : "data.n5.zip");
+            zip::pack(path, zipPath, 4);
+
+            auto store = std::make_shared<zip::Store>(zipPath);
+            kv::handle::File file(store, FileMode::r);
+            ASSERT_TRUE(file.exists());
+            ASSERT_EQ(file.isZarr(), bool(isZarr));
+            checkContainer(file);
+
+            // the archive is read-only
+            ASSERT_THROW(createGroup(file, "other"), std::invalid_argument);
+            std::vector<char> value;
+            ASSERT_TRUE(store->readRange(isZarr ? ".zgroup" : "attributes.json", 1, 3, value));
+            ASSERT_EQ(value.size(), 3);
+
+            // unpacking restores the filesystem container
+            const fs::path unpacked = tmp / (isZarr ? "unpacked.zarr" : "unpacked.n5");
+            zip::unpack(zipPath, unpacked, 4);
+            ASSERT_THROW(zip::unpack(zipPath, unpacked), std::invalid_argument);
+            std::vector<std::string> keys, unpackedKeys;
+            kv::listDirectoryKeys(path, keys);
+            kv::listDirectoryKeys(unpacked, unpackedKeys);
+            ASSERT_EQ(keys, unpackedKeys);
+            filesystem::handle::File unpackedFile(unpacked);
+            auto ds = openDataset(unpackedFile, "group/data");
+            ASSERT_EQ(ds->shape(), shape_);
+        }
+    }
+
+
+    TEST_F(ZipTest, Zip64) {
+        // more entries than fit in the end of central directory record
+        const fs::path path = tmp / "many.n5";
+        filesystem::handle::File file(path);
+        createFile(file, false);
+        auto ds = createDataset(file, "data", "uint8", types::ShapeType({300, 250}), types::ShapeType({1, 1}));
+        const uint8_t val = 1;
+        util::parallel_for_each_chunk(*ds, 4, [val](const int tid, const Dataset & ds,
+                                                    const types::ShapeType & chunkId){
+            ds.writeChunk(chunkId, &val);
+        });
+
+        const fs::path zipPath = tmp / "many.n5.zip";
+        zip::pack(path, zipPath, 4);
+        auto store = std::make_shared<zip::Store>(zipPath);
+        std::vector<std::string> keys;
+        store->keys(keys);
+        ASSERT_EQ(keys.size(), 300 * 250 + 2);
+
+        kv::handle::File zipFile(store, FileMode::r);
+        auto zipDs = openDataset(zipFile, "data");
+        uint8_t out;
+        zipDs->readChunk(types::ShapeType({299, 249}), &out);
+        ASSERT_EQ(out, val);
+    }
+
+
+    TEST_F(ZipTest, UnpackOutsideRoot) {
+        // archives from other tools can have entries that point outside of the container
+        for(const std::string key : {"../escaped", "group/../../escaped", "/tmp/z5_escaped"}) {
+            const fs::path zipPath = tmp / "crafted.zip";
+            {
+                zip::Writer writer(zipPath);
+                writer.add("group/ok", "ok", 2);
+                writer.add(key, "escaped", 7);
+                writer.close();
+            }
+            const fs::path unpacked = tmp / "crafted" / "unpacked";
+            ASSERT_THROW(zip::unpack(zipPath, unpacked), std::runtime_error);
+            ASSERT_FALSE(fs::exists(unpacked));
+            ASSERT_FALSE(fs::exists(tmp / "crafted" / "escaped"));
+            ASSERT_FALSE(fs::exists(tmp / "escaped"));
+            ASSERT_FALSE(fs::exists("/tmp/z5_escaped"));
+        }
+        ASSERT_THROW(kv::writeFile(tmp, "../escaped", "escaped", 7), std::runtime_error);
+    }
+
+
+    TEST_F(ZipTest, DiscardIncompleteArchive) {
+        const fs::path zipPath = tmp / "incomplete.zip";
+        {
+            zip::Writer writer(zipPath);
+            writer.add("a", "a", 1);
+            writer.abort();
+        }
+        ASSERT_FALSE(fs::exists(zipPath));
+        // archives that were not closed are discarded as well
+        {
+            zip::Writer writer(zipPath);
+            writer.add("a", "a", 1);
+        }
+        ASSERT_FALSE(fs::exists(zipPath));
+    }
+
+
+    TEST_F(ZipTest, InvalidArchive) {
+        const fs::path path = tmp / "invalid.zip";
+        kv::writeFile(tmp, "invalid.zip", "not a zip archive", 17);
+        ASSERT_THROW(zip::Store store(path), std::runtime_error);
+    }
+
+}